@@ -47,6 +47,7 @@ async def validation_exception_handler(
             "バリデーションエラーが発生",
             errors=exc.errors(),
             path=request.url.path,
+            log_key="validation_error",
         )
         return JSONResponse(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -0,0 +1,71 @@
+"""
+リクエストメトリクス収集ミドルウェア
+
+BaseHTTPMiddlewareを使わない純粋なASGIミドルウェアとして実装し、
+レスポンス本体をバッファせずにルートごとの処理時間を記録する。
+ラベルにはURLではなくルートのパステンプレートを使い、
+パスパラメーターで系列数が増え続けないようにする。
+"""
+import time
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auto_chat_maker.utils.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+)
+
+# どのルートにも一致しなかったリクエストのラベル
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_label(scope: Scope) -> str:
+    """リクエストが一致したルートのパステンプレートを取得"""
+    # ルーティング時にFastAPIがscopeへ格納したルートを参照する。
+    # include_routerしたルートのpathはプレフィックスを含まないため、
+    # プレフィックス込みのパスを持つルートコンテキストを優先する。
+    fastapi_scope = scope.get("fastapi")
+    route: Any = (
+        fastapi_scope.get("effective_route_context")
+        if isinstance(fastapi_scope, dict)
+        else None
+    ) or scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None and "endpoint" in scope and not scope.get("path_params"):
+        # Starlette標準のルートはscopeにルートを格納しないが、
+        # パスパラメーターがなければパスがそのままテンプレートになる
+        path = scope["path"]
+    return path if isinstance(path, str) else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """HTTPリクエストの処理時間と処理中の件数を記録するミドルウェア"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], route_label(scope), status_code
+            ).observe(time.perf_counter() - started)
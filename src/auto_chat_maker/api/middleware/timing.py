@@ -0,0 +1,102 @@
+"""
+リクエスト処理時間の内訳計測ミドルウェア
+
+純粋なASGIミドルウェアとしてリクエストごとのタイマーを開始し、
+レスポンスヘッダーにServer-Timingとしてフェーズ別の所要時間を付与する。
+閾値を超えたリクエストのみ内訳付きの構造化ログを出力し、
+全リクエストをトレースする場合と比べて負荷を抑える。
+"""
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auto_chat_maker.api.middleware.metrics import route_label
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.profiling import get_sampling_profiler
+from auto_chat_maker.utils.timing import (
+    PHASE_HANDLER,
+    PHASE_ROUTING,
+    current_request_timer,
+    reset_request_timer,
+    start_request_timer,
+    timed,
+)
+
+logger = get_logger(__name__)
+
+
+class TimedRoute(APIRoute):
+    """ルーティング完了までとハンドラー実行の所要時間を記録するルート"""
+
+    def get_route_handler(
+        self,
+    ) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            timer = current_request_timer()
+            if timer is not None:
+                timer.add(PHASE_ROUTING, timer.elapsed())
+            with timed(PHASE_HANDLER):
+                return await handler(request)
+
+        return timed_handler
+
+
+class TimingMiddleware:
+    """Server-Timingヘッダーの付与と遅いリクエストのログ出力を行うミドルウェア
+
+    slow_request_thresholdが0以下の場合はログを出力しない。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        slow_request_threshold: float = 1.0,
+        server_timing: bool = True,
+    ) -> None:
+        self.app = app
+        self._slow_request_threshold = slow_request_threshold
+        self._server_timing = server_timing
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer, token = start_request_timer()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self._server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", timer.server_timing(timer.elapsed())
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_request_timer(token)
+            get_sampling_profiler().request_finished()
+            total = timer.elapsed()
+            if 0 < self._slow_request_threshold <= total:
+                logger.warning(
+                    "処理時間の長いリクエストを検出しました",
+                    method=scope["method"],
+                    path=scope["path"],
+                    route=route_label(scope),
+                    status_code=status_code,
+                    duration_ms=round(total * 1000, 1),
+                    log_key="slow_request",
+                    **timer.summary(),
+                )
@@ -0,0 +1,143 @@
+"""
+管理用エンドポイント
+
+本番環境での遅延調査のため、サンプリングプロファイラーと
+遅いコールバックの検出を実行時に切り替える。
+``X-Admin-Token`` ヘッダーが ``secret_key`` と一致する場合のみ利用できる。
+"""
+import hmac
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from auto_chat_maker.api.middleware.timing import TimedRoute
+from auto_chat_maker.config.settings import get_settings
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.profiling import (
+    get_sampling_profiler,
+    get_slow_callback_detector,
+)
+
+logger = get_logger(__name__)
+
+PROFILE_FILENAME = "profile.collapsed"
+
+
+async def verify_admin_token(
+    x_admin_token: Optional[str] = Header(default=None),
+) -> None:
+    """管理用トークンを検証"""
+    secret_key = get_settings().secret_key
+    if not secret_key:
+        # 管理機能が無効な場合は存在自体を隠す
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), secret_key.encode()
+    ):
+        logger.warning("管理用エンドポイントへの不正なアクセス")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="管理用トークンが不正です",
+        )
+
+
+router = APIRouter(
+    route_class=TimedRoute, dependencies=[Depends(verify_admin_token)]
+)
+
+
+class ProfilingRequest(BaseModel):
+    """プロファイリング開始リクエスト"""
+
+    duration: Optional[float] = Field(None, gt=0, le=300, description="採取する秒数")
+    requests: Optional[int] = Field(None, gt=0, description="採取を終了するまでのリクエスト数")
+    interval: Optional[float] = Field(
+        None, ge=0.001, le=1.0, description="採取間隔（秒）"
+    )
+
+
+class SlowCallbackRequest(BaseModel):
+    """遅いコールバック検出の切り替えリクエスト"""
+
+    enabled: bool = Field(..., description="検出を有効にするか")
+    threshold: Optional[float] = Field(None, gt=0, description="ブロックとみなす秒数")
+
+
+def _profiling_status() -> Dict[str, Any]:
+    detector = get_slow_callback_detector()
+    return {
+        "profiler": get_sampling_profiler().status(),
+        "slow_callbacks": {
+            "enabled": detector.enabled,
+            "threshold": detector.threshold,
+            "detected": detector.detected,
+        },
+    }
+
+
+def _profile_response() -> PlainTextResponse:
+    return PlainTextResponse(
+        get_sampling_profiler().collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{PROFILE_FILENAME}"'
+        },
+    )
+
+
+@router.get("/profiling")  # type: ignore[misc]
+async def profiling_status() -> Dict[str, Any]:
+    """プロファイリングの状態を取得"""
+    return _profiling_status()
+
+
+@router.post("/profiling/start")  # type: ignore[misc]
+async def start_profiling(request: ProfilingRequest) -> Dict[str, Any]:
+    """イベントループのスレッドのサンプリングを開始
+
+    指定秒数・指定リクエスト数のどちらかに達すると停止する。
+    """
+    profiler = get_sampling_profiler()
+    if profiler.active:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="プロファイリングは既に実行中です",
+        )
+    profiler.start(
+        duration=request.duration,
+        # この開始リクエスト自体の完了も数えられるため1件加える
+        requests=None if request.requests is None else request.requests + 1,
+        interval=request.interval,
+    )
+    return _profiling_status()
+
+
+@router.post(
+    "/profiling/stop", response_class=PlainTextResponse
+)  # type: ignore[misc]
+async def stop_profiling() -> PlainTextResponse:
+    """サンプリングを停止し、collapsed stacks形式の結果を返す"""
+    get_sampling_profiler().stop()
+    return _profile_response()
+
+
+@router.get(
+    "/profiling/result", response_class=PlainTextResponse
+)  # type: ignore[misc]
+async def profiling_result() -> PlainTextResponse:
+    """直近のサンプリング結果をcollapsed stacks形式で返す"""
+    return _profile_response()
+
+
+@router.put("/profiling/slow-callbacks")  # type: ignore[misc]
+async def configure_slow_callbacks(
+    request: SlowCallbackRequest,
+) -> Dict[str, Any]:
+    """遅いコールバックの検出を切り替え"""
+    detector = get_slow_callback_detector()
+    if request.enabled:
+        detector.enable(request.threshold)
+    else:
+        detector.disable()
+    return _profiling_status()
@@ -1,54 +1,138 @@
 """
 ヘルスチェックエンドポイント
+
+最も呼び出し頻度の高い /health と /api/health は、起動時に組み立てた
+固定部分に時刻だけを埋め込むASGIエンドポイントで応答する。
+依存サービスの確認が必要な場合は /api/health/ready を利用する。
 """
+import json
 from datetime import datetime
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, status
+from fastapi.responses import JSONResponse
+from starlette.types import Receive, Scope, Send
 
-from auto_chat_maker.config.settings import get_settings
+from auto_chat_maker.api.middleware.timing import TimedRoute
+from auto_chat_maker.config.settings import Settings, get_settings
 from auto_chat_maker.utils.logger import get_logger
 
-router = APIRouter()
+if TYPE_CHECKING:
+    from auto_chat_maker.services.health_service import HealthService
+
+router = APIRouter(route_class=TimedRoute)
 logger = get_logger(__name__)
 
+# 高速なヘルスチェックを提供するパス
+STATIC_HEALTH_PATHS = ("/health", "/api/health")
 
-@router.get("/health", status_code=status.HTTP_200_OK)  # type: ignore[misc]
-async def health_check() -> Dict[str, Any]:
-    """ヘルスチェックエンドポイント"""
-    settings = get_settings()
 
-    health_info: Dict[str, Any] = {
-        "status": "healthy",
-        "service": settings.app_name,
-        "version": settings.app_version,
-        "timestamp": datetime.utcnow().isoformat(),
-        "environment": "development" if settings.debug else "production",
-    }
+class StaticHealthEndpoint:
+    """固定のヘルス情報に現在時刻を埋め込んで返すASGIエンドポイント
 
-    logger.info("ヘルスチェック実行", health_info=health_info)
-    return health_info
+    設定の参照・辞書の組み立て・JSONの生成・ログ出力をリクエストごとに行わない。
+    時刻はマイクロ秒まで固定長で出力するため、Content-Lengthも事前に計算できる。
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        static_info = {
+            "status": "healthy",
+            "service": settings.app_name,
+            "version": settings.app_version,
+            "environment": "development" if settings.debug else "production",
+        }
+        encoded = json.dumps(static_info, ensure_ascii=False).encode()
+        self._prefix = encoded[:-1] + b', "timestamp": "'
+        self._suffix = b'"}'
+        length = len(self._prefix) + len(self._now()) + len(self._suffix)
+        self._headers: List[Tuple[bytes, bytes]] = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(length).encode()),
+            (b"cache-control", b"no-store"),
+        ]
+
+    @staticmethod
+    def _now() -> bytes:
+        return datetime.utcnow().isoformat(timespec="microseconds").encode()
+
+    def render(self) -> bytes:
+        """レスポンス本文を生成"""
+        return self._prefix + self._now() + self._suffix
+
+    async def __call__(
+        self, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_200_OK,
+                "headers": self._headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": self.render()})
+
+
+def _get_health_service(request: Request) -> Optional["HealthService"]:
+    service: Optional["HealthService"] = getattr(
+        request.app.state, "health_service", None
+    )
+    return service
+
+
+@router.get(
+    "/health/live", status_code=status.HTTP_200_OK
+)  # type: ignore[misc]
+async def liveness() -> Dict[str, str]:
+    """生存確認（I/Oを行わず、プロセスが応答できるかのみを返す）"""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")  # type: ignore[misc]
+async def readiness(request: Request) -> JSONResponse:
+    """準備完了確認（必須の依存サービスが利用できなければ503を返す）"""
+    health_service = _get_health_service(request)
+    if health_service is None:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting", "ready": False},
+        )
+    report = await health_service.check()
+    return JSONResponse(
+        status_code=(
+            status.HTTP_200_OK
+            if report.ready
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        content=report.model_dump(mode="json"),
+    )
 
 
 @router.get(
     "/health/detailed", status_code=status.HTTP_200_OK
 )  # type: ignore[misc]
-async def detailed_health_check() -> Dict[str, Any]:
+async def detailed_health_check(request: Request) -> Dict[str, Any]:
     """詳細ヘルスチェックエンドポイント"""
     settings = get_settings()
+    health_service = _get_health_service(request)
+    report = (
+        await health_service.check() if health_service is not None else None
+    )
 
     # 基本的なヘルス情報
     health_info: Dict[str, Any] = {
-        "status": "healthy",
+        "status": report.status if report is not None else "starting",
         "service": settings.app_name,
         "version": settings.app_version,
         "timestamp": datetime.utcnow().isoformat(),
         "environment": "development" if settings.debug else "production",
-        "components": {
-            "database": "healthy",  # 後で実装
-            "mcp_server": "unknown",  # 後で実装
-            "claude_api": "unknown",  # 後で実装
-        },
+        "components": (
+            {
+                name: result.model_dump(mode="json")
+                for name, result in report.components.items()
+            }
+            if report is not None
+            else {}
+        ),
         "settings": {
             "debug": settings.debug,
             "log_level": settings.log_level,
@@ -58,5 +142,5 @@ async def detailed_health_check() -> Dict[str, Any]:
         },
     }
 
-    logger.info("詳細ヘルスチェック実行", health_info=health_info)
+    logger.info("詳細ヘルスチェック実行", health_info=health_info, log_key="health_check")
     return health_info
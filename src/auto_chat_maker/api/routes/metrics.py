@@ -0,0 +1,20 @@
+"""
+メトリクスエンドポイント
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from auto_chat_maker.api.middleware.timing import TimedRoute
+from auto_chat_maker.utils.metrics import CONTENT_TYPE, get_metrics_registry
+
+router = APIRouter(route_class=TimedRoute)
+
+
+@router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False
+)  # type: ignore[misc]
+async def metrics() -> PlainTextResponse:
+    """Prometheusのテキスト形式でメトリクスを出力"""
+    registry = get_metrics_registry()
+    await registry.collect()
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,179 @@
+"""
+Microsoft Graph変更通知のWebhookエンドポイント
+
+Graphは通知に数秒以内の応答を求め、応答が遅いと同じ通知を再送する。
+受信時はclientStateの検証と重複排除のみを行い、
+通知をまとめて1回でキューへ投入して202を返す。
+メッセージの取得・返信案の生成はキューのワーカーで行う。
+"""
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, Request, status
+from fastapi.responses import PlainTextResponse, Response
+
+from auto_chat_maker.api.middleware.timing import TimedRoute
+from auto_chat_maker.services.notification_dedup import (
+    NotificationDeduplicator,
+)
+from auto_chat_maker.services.notification_processor import (
+    created_message_id,
+)
+from auto_chat_maker.services.subscription_index import SubscriptionIndex
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.metrics import WEBHOOK_NOTIFICATIONS
+
+logger = get_logger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+VALIDATION_TOKEN_PARAM = "validationToken"
+
+OUTCOME_ACCEPTED = "accepted"
+OUTCOME_DUPLICATE = "duplicate"
+OUTCOME_REJECTED = "rejected"
+OUTCOME_INVALID = "invalid"
+
+
+def _notification_key(notification: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (
+        str(notification.get("subscriptionId", "")),
+        str(notification.get("changeType", "")),
+        str(notification.get("resource", "")),
+    )
+
+
+def select_notifications(
+    notifications: List[Any], index: SubscriptionIndex
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """検証済み・重複排除済みの通知をキュー投入用のペイロードに変換
+
+    戻り値は(ペイロード, 結果ごとの件数)。
+    clientStateはキューに保存しない。
+    """
+    payloads: List[Dict[str, Any]] = []
+    counts = {
+        OUTCOME_ACCEPTED: 0,
+        OUTCOME_DUPLICATE: 0,
+        OUTCOME_REJECTED: 0,
+        OUTCOME_INVALID: 0,
+    }
+    seen: Set[Tuple[str, str, str]] = set()
+    for notification in notifications:
+        if not isinstance(notification, dict) or not notification.get(
+            "subscriptionId"
+        ):
+            counts[OUTCOME_INVALID] += 1
+            continue
+        key = _notification_key(notification)
+        if key in seen:
+            counts[OUTCOME_DUPLICATE] += 1
+            continue
+        seen.add(key)
+        if not index.verify_client_state(
+            key[0], notification.get("clientState")
+        ):
+            counts[OUTCOME_REJECTED] += 1
+            continue
+        payloads.append(
+            {
+                "subscription_id": key[0],
+                "change_type": key[1],
+                "resource": key[2],
+                "resource_data": notification.get("resourceData"),
+                "tenant_id": notification.get("tenantId"),
+            }
+        )
+        counts[OUTCOME_ACCEPTED] += 1
+    return payloads, counts
+
+
+async def drop_known_messages(
+    payloads: List[Dict[str, Any]],
+    deduplicator: NotificationDeduplicator,
+    counts: Dict[str, int],
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """受け付け済みのメッセージの再送通知を除外
+
+    戻り値は(残すペイロード, 今回受け付けたmessage_id)。
+    更新・削除の通知は除外しない。
+    """
+    message_ids = [created_message_id(payload) for payload in payloads]
+    accepted = await deduplicator.filter_new(
+        [message_id for message_id in message_ids if message_id is not None]
+    )
+    new_ids = set(accepted)
+    selected: List[Dict[str, Any]] = []
+    for payload, message_id in zip(payloads, message_ids):
+        if message_id is None:
+            selected.append(payload)
+        elif message_id in new_ids:
+            # 同じメッセージを指す別のresourceの通知は1件にまとめる
+            selected.append(payload)
+            new_ids.discard(message_id)
+        else:
+            counts[OUTCOME_ACCEPTED] -= 1
+            counts[OUTCOME_DUPLICATE] += 1
+    return selected, accepted
+
+
+def _record_outcomes(counts: Dict[str, int]) -> None:
+    for outcome, count in counts.items():
+        if count:
+            WEBHOOK_NOTIFICATIONS.labels(outcome).inc(count)
+
+
+@router.post("", include_in_schema=False)  # type: ignore[misc]
+async def receive_notifications(request: Request) -> Response:
+    """変更通知を受信してキューに投入
+
+    サブスクリプション作成時の検証リクエスト（validationToken）には
+    本文を読まずにトークンをそのまま返す。
+    """
+    validation_token: Optional[str] = request.query_params.get(
+        VALIDATION_TOKEN_PARAM
+    )
+    if validation_token is not None:
+        return PlainTextResponse(validation_token)
+
+    try:
+        body = json.loads(await request.body())
+        notifications = body["value"]
+        if not isinstance(notifications, list):
+            raise TypeError("valueが配列ではありません")
+    except (ValueError, KeyError, TypeError) as e:
+        WEBHOOK_NOTIFICATIONS.labels(OUTCOME_INVALID).inc()
+        logger.warning("不正なWebhook通知を受信しました", error=str(e))
+        return Response(status_code=status.HTTP_400_BAD_REQUEST)
+
+    payloads, counts = select_notifications(
+        notifications, request.app.state.subscription_index
+    )
+    deduplicator: Optional[NotificationDeduplicator] = getattr(
+        request.app.state, "notification_deduplicator", None
+    )
+    accepted: List[str] = []
+    if deduplicator is not None and payloads:
+        payloads, accepted = await drop_known_messages(
+            payloads, deduplicator, counts
+        )
+    if payloads:
+        try:
+            await request.app.state.notification_queue.enqueue_many(payloads)
+        except Exception:
+            # 再送された通知を重複として捨てないよう記録を取り消す
+            if deduplicator is not None:
+                deduplicator.forget(accepted)
+            raise
+        # 同じプロセスのワーカーはポーリングを待たずに取り出す
+        queue_worker = getattr(request.app.state, "queue_worker", None)
+        if queue_worker is not None:
+            queue_worker.notify()
+    _record_outcomes(counts)
+    if counts[OUTCOME_REJECTED] or counts[OUTCOME_INVALID]:
+        logger.warning(
+            "検証できないWebhook通知を破棄しました",
+            rejected=counts[OUTCOME_REJECTED],
+            invalid=counts[OUTCOME_INVALID],
+        )
+    return Response(status_code=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,86 @@
+"""
+チャット同期スケジューラー
+
+起動直後に停止中の取りこぼしを同期し、以降は一定間隔で差分同期を行う。
+新着メッセージを登録した場合はコールバックで返信案の生成を促す。
+"""
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.services.chat_sync import ChatSyncService
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChatSyncScheduler:
+    """ChatSyncServiceを定期実行するスケジューラー"""
+
+    def __init__(
+        self,
+        service: ChatSyncService,
+        interval: float = 900.0,
+        on_synced: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        self._service = service
+        self._interval = interval
+        self._on_synced = on_synced
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        service: ChatSyncService,
+        on_synced: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> "ChatSyncScheduler":
+        """設定値からインスタンスを生成"""
+        return cls(
+            service, interval=settings.chat_sync_interval, on_synced=on_synced
+        )
+
+    @property
+    def is_running(self) -> bool:
+        """スケジューラーが動作中かどうか"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """バックグラウンドタスクを開始"""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(
+            self._run(), name="chat-sync-scheduler"
+        )
+        logger.info("チャット同期スケジューラーを開始しました", interval=self._interval)
+
+    async def stop(self) -> None:
+        """停止（同期中のチャットは次回ウォーターマークから再取得する）"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("チャット同期スケジューラーを停止しました")
+
+    async def run_once(self) -> int:
+        """全チャットを同期し、新規登録したメッセージ数を返す"""
+        inserted = await self._service.sync_all()
+        if inserted and self._on_synced is not None:
+            await self._on_synced()
+        return inserted
+
+    async def _run(self) -> None:
+        # intervalが0以下の場合は起動時の1回のみ実行する
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(
+                    "チャットの同期でエラーが発生しました",
+                    error=str(e),
+                    exc_info=True,
+                )
+            if self._interval <= 0:
+                return
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,193 @@
+"""
+永続ワークキューのコンシューマー
+
+複数のワーカーコルーチンがキューからアイテムをリースし、
+ハンドラーの成否に応じてack/nackする。
+デッドレターになったアイテムはon_dead_letterで呼び出し元に通知する。
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.infrastructure.queue.durable_queue import (
+    DurableWorkQueue,
+    QueueItem,
+)
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.metrics import (
+    WORK_QUEUE_ACK_LATENCY,
+    WORK_QUEUE_ITEMS,
+)
+
+logger = get_logger(__name__)
+
+QueueHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+DeadLetterHandler = Callable[[Dict[str, Any]], None]
+
+
+class QueueWorker:
+    """キューを消費するワーカー群"""
+
+    def __init__(
+        self,
+        queue: DurableWorkQueue,
+        handler: QueueHandler,
+        concurrency: int = 2,
+        lease_batch_size: int = 10,
+        poll_interval: float = 1.0,
+        shutdown_timeout: float = 30.0,
+        on_dead_letter: Optional[DeadLetterHandler] = None,
+    ) -> None:
+        self._queue = queue
+        self._handler = handler
+        self._on_dead_letter = on_dead_letter
+        self._concurrency = concurrency
+        self._lease_batch_size = lease_batch_size
+        self._poll_interval = poll_interval
+        self._shutdown_timeout = shutdown_timeout
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks: List[asyncio.Task[None]] = []
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        queue: DurableWorkQueue,
+        handler: QueueHandler,
+        on_dead_letter: Optional[DeadLetterHandler] = None,
+    ) -> "QueueWorker":
+        """設定値からインスタンスを生成"""
+        return cls(
+            queue,
+            handler,
+            concurrency=settings.work_queue_workers,
+            lease_batch_size=settings.work_queue_lease_batch_size,
+            poll_interval=settings.work_queue_poll_interval,
+            on_dead_letter=on_dead_letter,
+        )
+
+    @property
+    def is_running(self) -> bool:
+        """ワーカーが動作中かどうか"""
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        """ワーカーコルーチンを起動"""
+        if self.is_running:
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(
+                self._run(), name=f"queue-worker-{self._queue.queue_name}-{i}"
+            )
+            for i in range(self._concurrency)
+        ]
+        logger.info(
+            "キューワーカーを開始しました",
+            queue_name=self._queue.queue_name,
+            concurrency=self._concurrency,
+        )
+
+    def notify(self) -> None:
+        """新しいアイテムの投入を通知し、待機中のワーカーを起こす"""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """処理中のアイテムを完了させてから停止
+
+        タイムアウトした場合は中断し、リース中のアイテムは
+        可視性タイムアウト後に再度取り出される。
+        """
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(
+            self._tasks, timeout=self._shutdown_timeout
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("キューワーカーを停止しました", queue_name=self._queue.queue_name)
+
+    async def run_once(self) -> int:
+        """リース可能なアイテムを1回分処理し、処理件数を返す
+
+        リースしたアイテムは並行して処理する（並列数はlease_batch_sizeまで）。
+        順に処理すると後のアイテムが可視性タイムアウトを超えやすく、
+        ハンドラー内のGraph呼び出しも$batchにまとまらない。
+        """
+        for item in await self._queue.dead_letter_expired():
+            logger.warning(
+                "リース切れのまま試行回数の上限に達したためデッドレターにしました",
+                queue_name=item.queue_name,
+                item_id=item.id,
+                attempts=item.attempts,
+            )
+            self._dead_lettered(item)
+        items = await self._queue.lease(limit=self._lease_batch_size)
+        results = await asyncio.gather(
+            *(self._handle(item) for item in items), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return len(items)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            # リース前にクリアし、取り出し中に届いた通知を取りこぼさない
+            self._wakeup.clear()
+            try:
+                handled = await self.run_once()
+            except Exception as e:
+                logger.error(
+                    "キューの取り出しに失敗しました",
+                    queue_name=self._queue.queue_name,
+                    error=str(e),
+                )
+                handled = 0
+            if handled:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _handle(self, item: QueueItem) -> None:
+        error: Optional[str] = None
+        try:
+            await self._handler(item.payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.warning(
+                "キューアイテムの処理に失敗しました",
+                queue_name=item.queue_name,
+                item_id=item.id,
+                attempts=item.attempts,
+                error=error,
+            )
+        if error is None:
+            if await self._queue.ack(item):
+                # 投入（Webhook受信）から処理完了までの時間
+                WORK_QUEUE_ACK_LATENCY.labels(item.queue_name).observe(
+                    (datetime.utcnow() - item.created_at).total_seconds()
+                )
+                WORK_QUEUE_ITEMS.labels(item.queue_name, "acked").inc()
+            else:
+                WORK_QUEUE_ITEMS.labels(item.queue_name, "lease_lost").inc()
+        else:
+            nacked = await self._queue.nack(item, error=error)
+            WORK_QUEUE_ITEMS.labels(item.queue_name, "failed").inc()
+            if nacked and self._queue.is_final_attempt(item):
+                self._dead_lettered(item)
+
+    def _dead_lettered(self, item: QueueItem) -> None:
+        WORK_QUEUE_ITEMS.labels(item.queue_name, "dead").inc()
+        if self._on_dead_letter is not None:
+            self._on_dead_letter(item.payload)
@@ -0,0 +1,233 @@
+"""
+返信案生成スケジューラー
+
+未処理メッセージをバッチ単位で取り出し、並列度を制限しながら
+AIバックエンドで返信案を生成する。一定間隔のポーリングに加えて
+notify()で即座に起床できるため、Webhook経由の新着は数秒で処理される。
+スケジューラーはリーダーのワーカーでのみ動作するため、他のワーカーからは
+ReplyGenerationWakerがキュー経由でリーダーを起こす。
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Protocol
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.domain.repositories.interfaces import (
+    ChatMessageRepository,
+    ReplySuggestionRepository,
+)
+from auto_chat_maker.infrastructure.queue.durable_queue import (
+    DurableWorkQueue,
+)
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ReplySuggestionGenerator(Protocol):
+    """返信案を生成するAIバックエンドのインターフェース"""
+
+    async def generate_reply_suggestions(
+        self, message: ChatMessage
+    ) -> List[ReplySuggestion]:
+        """メッセージに対する返信案を生成"""
+        ...
+
+
+class ReplyGenerationScheduler:
+    """未処理メッセージの返信案をバッチ生成するスケジューラー"""
+
+    def __init__(
+        self,
+        message_repository: ChatMessageRepository,
+        suggestion_repository: ReplySuggestionRepository,
+        generator: ReplySuggestionGenerator,
+        batch_size: int = 10,
+        interval: float = 300.0,
+        max_concurrency: int = 4,
+        shutdown_timeout: float = 30.0,
+    ) -> None:
+        self._message_repository = message_repository
+        self._suggestion_repository = suggestion_repository
+        self._generator = generator
+        self._batch_size = batch_size
+        self._interval = interval
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._shutdown_timeout = shutdown_timeout
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        message_repository: ChatMessageRepository,
+        suggestion_repository: ReplySuggestionRepository,
+        generator: ReplySuggestionGenerator,
+    ) -> "ReplyGenerationScheduler":
+        """設定値からインスタンスを生成"""
+        return cls(
+            message_repository,
+            suggestion_repository,
+            generator,
+            batch_size=settings.reply_generation_batch_size,
+            interval=settings.reply_generation_interval,
+            max_concurrency=settings.reply_generation_concurrency,
+            shutdown_timeout=settings.reply_generation_shutdown_timeout,
+        )
+
+    @property
+    def is_running(self) -> bool:
+        """スケジューラーが動作中かどうか"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """バックグラウンドタスクを開始"""
+        if self.is_running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(
+            self._run(), name="reply-generation-scheduler"
+        )
+        logger.info(
+            "返信案生成スケジューラーを開始しました",
+            batch_size=self._batch_size,
+            interval=self._interval,
+        )
+
+    def notify(self) -> None:
+        """新着メッセージを通知し、待機中のループを即座に起こす"""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        """処理中のバッチを完了させてから停止"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(self._task), timeout=self._shutdown_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "返信案生成の完了待ちがタイムアウトしたため中断します",
+                timeout=self._shutdown_timeout,
+            )
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        finally:
+            self._task = None
+        logger.info("返信案生成スケジューラーを停止しました")
+
+    async def run_once(self) -> int:
+        """未処理メッセージを最後まで処理し、成功件数を返す
+
+        キーセットで前進するため、失敗したメッセージは次回の実行まで
+        再試行されず、同じメッセージで空回りしない。
+        """
+        processed = 0
+        after_id: Optional[int] = None
+        while not self._stopping:
+            batch = await self._message_repository.list_unprocessed(
+                after_id=after_id, limit=self._batch_size
+            )
+            if not batch:
+                break
+            results = await asyncio.gather(
+                *(self._process_message(message) for message in batch)
+            )
+            processed += sum(results)
+            if len(batch) < self._batch_size:
+                break
+            after_id = batch[-1].id
+        return processed
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                processed = await self.run_once()
+                if processed:
+                    logger.info("返信案生成バッチが完了しました", processed=processed)
+            except Exception as e:
+                logger.error(
+                    "返信案生成バッチでエラーが発生しました",
+                    error=str(e),
+                    exc_info=True,
+                )
+            # stop()もイベントをセットするため、停止要求でも即座に抜ける
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self._interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process_message(self, message: ChatMessage) -> bool:
+        """1件のメッセージの返信案を生成して保存"""
+        async with self._semaphore:
+            try:
+                # 返信案の保存後・処理済みの更新前に停止した場合は
+                # 保存済みの返信案を使い、重複して生成・保存しない
+                existing = await self._suggestion_repository.get_by_message_id(
+                    message.message_id
+                )
+                if existing:
+                    logger.info(
+                        "返信案が保存済みのため生成を省略します",
+                        message_id=message.message_id,
+                    )
+                else:
+                    suggestions = (
+                        await self._generator.generate_reply_suggestions(
+                            message
+                        )
+                    )
+                    await self._suggestion_repository.create_many(suggestions)
+                message.mark_as_processed()
+                await self._message_repository.update(message)
+                return True
+            except Exception as e:
+                logger.error(
+                    "返信案の生成に失敗しました",
+                    message_id=message.message_id,
+                    error=str(e),
+                )
+                return False
+
+
+class ReplyGenerationWaker:
+    """新着メッセージを返信案生成スケジューラーに知らせる
+
+    同じプロセスでスケジューラーが動作していればnotify()で起こし、
+    それ以外のワーカーではキューに起床要求を投入する。
+    リーダーはキューを消費するワーカーのハンドラーとしてhandle()を使う。
+    """
+
+    def __init__(
+        self, scheduler: ReplyGenerationScheduler, queue: DurableWorkQueue
+    ) -> None:
+        self._scheduler = scheduler
+        self._queue = queue
+
+    @property
+    def queue(self) -> DurableWorkQueue:
+        """起床要求のキュー"""
+        return self._queue
+
+    async def wake(self) -> None:
+        """スケジューラーを起こす（投入に失敗しても定期実行で処理される）"""
+        if self._scheduler.is_running:
+            self._scheduler.notify()
+            return
+        try:
+            await self._queue.enqueue({})
+        except Exception as e:
+            logger.warning("返信案生成の起床要求を投入できません", error=str(e))
+
+    async def handle(self, payload: Dict[str, Any]) -> None:
+        """キューから取り出した起床要求でスケジューラーを起こす"""
+        self._scheduler.notify()
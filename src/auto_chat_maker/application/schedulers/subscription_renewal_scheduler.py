@@ -0,0 +1,193 @@
+"""
+Webhookサブスクリプション更新スケジューラー
+
+索引の有効期限ヒープから次に期限を迎えるサブスクリプションを求め、
+期限の一定時間（margin）前まで待機して更新する。同じ時間枠（batch_window）
+内に期限を迎えるものはまとめて並行に更新し、起床回数を抑える。
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional, Protocol
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.domain.repositories.interfaces import (
+    SubscriptionRepository,
+)
+from auto_chat_maker.services.subscription_index import SubscriptionIndex
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SubscriptionRenewer(Protocol):
+    """Microsoft Graph上のサブスクリプションを更新するインターフェース"""
+
+    async def renew_subscription(
+        self, subscription_id: str, expiration: datetime
+    ) -> datetime:
+        """有効期限を延長し、Graphが受け付けた新しい有効期限を返す"""
+        ...
+
+
+class SubscriptionRenewalScheduler:
+    """期限が近いサブスクリプションを更新するスケジューラー"""
+
+    def __init__(
+        self,
+        index: SubscriptionIndex,
+        repository: SubscriptionRepository,
+        renewer: SubscriptionRenewer,
+        extension: float = 3600.0,
+        margin: float = 600.0,
+        batch_window: float = 60.0,
+        retry_delay: float = 30.0,
+    ) -> None:
+        self._index = index
+        self._repository = repository
+        self._renewer = renewer
+        self._extension = timedelta(seconds=extension)
+        self._margin = timedelta(seconds=margin)
+        self._batch_window = timedelta(seconds=batch_window)
+        self._retry_delay = retry_delay
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        index: SubscriptionIndex,
+        repository: SubscriptionRepository,
+        renewer: SubscriptionRenewer,
+    ) -> "SubscriptionRenewalScheduler":
+        """設定値からインスタンスを生成"""
+        return cls(
+            index,
+            repository,
+            renewer,
+            extension=settings.webhook_subscription_expiration,
+            margin=settings.subscription_renewal_margin,
+            batch_window=settings.subscription_renewal_batch_window,
+            retry_delay=settings.subscription_renewal_retry_delay,
+        )
+
+    @property
+    def is_running(self) -> bool:
+        """スケジューラーが動作中かどうか"""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """バックグラウンドタスクを開始"""
+        if self.is_running:
+            return
+        self._task = asyncio.create_task(
+            self._run(), name="subscription-renewal-scheduler"
+        )
+        logger.info(
+            "サブスクリプション更新スケジューラーを開始しました",
+            subscriptions=len(self._index),
+        )
+
+    async def stop(self) -> None:
+        """停止（更新中のリクエストは中断する）"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("サブスクリプション更新スケジューラーを停止しました")
+
+    async def run_once(self) -> int:
+        """更新時期を迎えたサブスクリプションをまとめて更新し、失敗件数を返す
+
+        失敗したものは索引に戻し、次回の実行で再試行する。
+        """
+        now = datetime.utcnow()
+        due = self._index.pop_expiring(now + self._margin + self._batch_window)
+        if not due:
+            return 0
+        results = await asyncio.gather(
+            *(self._renew(subscription, now) for subscription in due)
+        )
+        failed = [
+            subscription
+            for subscription, renewed in zip(due, results)
+            if not renewed
+        ]
+        for subscription in failed:
+            if subscription.is_expired(now):
+                # Graph側では削除済みのため再試行しない
+                subscription.deactivate()
+                await self._save(subscription)
+            else:
+                self._index.put(subscription)
+        logger.info(
+            "サブスクリプションを更新しました",
+            renewed=len(due) - len(failed),
+            failed=len(failed),
+        )
+        return len(failed)
+
+    async def _renew(self, subscription: Subscription, now: datetime) -> bool:
+        try:
+            expiration = await self._renewer.renew_subscription(
+                subscription.subscription_id, now + self._extension
+            )
+        except Exception as e:
+            logger.warning(
+                "サブスクリプションの更新に失敗しました",
+                subscription_id=subscription.subscription_id,
+                error=str(e),
+            )
+            return False
+        subscription.expiration_date_time = expiration
+        subscription.updated_at = datetime.utcnow()
+        return await self._save(subscription)
+
+    async def _save(self, subscription: Subscription) -> bool:
+        try:
+            await self._repository.update(subscription)
+        except Exception as e:
+            logger.error(
+                "サブスクリプションを保存できません",
+                subscription_id=subscription.subscription_id,
+                error=str(e),
+            )
+            return False
+        # 新しい有効期限でヒープに登録し直す（非アクティブなら索引から削除）
+        self._index.put(subscription)
+        return True
+
+    def _seconds_until_due(self) -> Optional[float]:
+        expiration = self._index.next_expiration()
+        if expiration is None:
+            return None
+        due = expiration - self._margin
+        return max(0.0, (due - datetime.utcnow()).total_seconds())
+
+    async def _run(self) -> None:
+        while True:
+            self._index.changed.clear()
+            failed = 0
+            try:
+                failed = await self.run_once()
+            except Exception as e:
+                logger.error(
+                    "サブスクリプションの更新でエラーが発生しました",
+                    error=str(e),
+                    exc_info=True,
+                )
+            if failed:
+                # 失敗したものはすぐに期限を迎えるため、間隔を空けて再試行する
+                await asyncio.sleep(self._retry_delay)
+                continue
+            timeout = self._seconds_until_due()
+            if timeout == 0:
+                continue
+            # 期限がより早いサブスクリプションが追加されたら待機を打ち切る
+            try:
+                await asyncio.wait_for(
+                    self._index.changed.wait(), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                pass
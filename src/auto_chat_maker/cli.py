@@ -0,0 +1,46 @@
+"""
+コマンドラインインターフェース
+"""
+from typing import Optional
+
+import click
+
+from auto_chat_maker.config.settings import get_settings
+
+
+@click.group()
+def main() -> None:
+    """Auto Chat Maker"""
+
+
+@main.command()
+@click.option("--host", default=None, help="待ち受けるホスト（既定: HOST）")
+@click.option("--port", type=int, default=None, help="待ち受けるポート（既定: PORT）")
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="ワーカー数（既定: WORKERS、未設定ならCPU数）",
+)
+@click.option(
+    "--reload/--no-reload",
+    default=None,
+    help="コード変更時に再起動する開発モード（既定: DEBUG）",
+)
+def serve(
+    host: Optional[str],
+    port: Optional[int],
+    workers: Optional[int],
+    reload: Optional[bool],
+) -> None:
+    """APIサーバーを起動"""
+    from auto_chat_maker import server
+
+    settings = get_settings()
+    server.serve(
+        settings,
+        workers=workers,
+        host=host,
+        port=port,
+        reload=settings.debug if reload is None else reload,
+    )
@@ -3,10 +3,12 @@ Azure AD認証設定管理モジュール
 """
 from typing import Optional
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import SettingsConfigDict
 
+from auto_chat_maker.config.env_file import EnvFileSettings
 
-class AzureSettings(BaseSettings):
+
+class AzureSettings(EnvFileSettings):
     """Azure AD認証設定クラス"""
 
     # Azure AD基本設定
@@ -33,16 +35,17 @@ class AzureSettings(BaseSettings):
     enable_https: bool = False
     allowed_hosts: str = "localhost,127.0.0.1"
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        env_file_encoding = "utf-8"
-        env_prefix = "AZURE_"
+    model_config = SettingsConfigDict(
+        case_sensitive=False, env_prefix="AZURE_"
+    )
 
 
-azure_settings = AzureSettings()
+_azure_settings: Optional[AzureSettings] = None
 
 
 def get_azure_settings() -> AzureSettings:
-    """Azure AD設定インスタンスを取得"""
-    return azure_settings
+    """Azure AD設定インスタンスを取得（初回呼び出し時に生成）"""
+    global _azure_settings
+    if _azure_settings is None:
+        _azure_settings = AzureSettings()
+    return _azure_settings
@@ -0,0 +1,92 @@
+"""
+.envファイルの読み込みを設定クラス間で共有するモジュール
+
+Settings・AzureSettings・MCPSettingsはそれぞれ同じ.envを参照する。
+パース結果をファイルの更新時刻ごとにキャッシュし、
+プロセス内で.envを1回だけ読み込むようにする。
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple, Type
+
+from dotenv import dotenv_values
+from pydantic_settings import (
+    BaseSettings,
+    DotEnvSettingsSource,
+    PydanticBaseSettingsSource,
+    SettingsConfigDict,
+)
+
+ENV_FILE = ".env"
+ENV_FILE_ENCODING = "utf-8"
+
+
+@lru_cache(maxsize=8)
+def _parse_env_file(
+    path: str,
+    mtime_ns: int,
+    encoding: Optional[str],
+    case_sensitive: bool,
+    ignore_empty: bool,
+    parse_none_str: Optional[str],
+) -> Dict[str, Optional[str]]:
+    # mtime_nsはキャッシュキーとしてのみ使用（更新されたら読み直す）
+    env_vars: Dict[str, Optional[str]] = {}
+    for key, value in dotenv_values(path, encoding=encoding).items():
+        if ignore_empty and value == "":
+            continue
+        if parse_none_str is not None and value == parse_none_str:
+            value = None
+        env_vars[key if case_sensitive else key.lower()] = value
+    return env_vars
+
+
+def clear_env_file_cache() -> None:
+    """.envのパース結果のキャッシュを破棄"""
+    _parse_env_file.cache_clear()
+
+
+class SharedDotEnvSettingsSource(DotEnvSettingsSource):
+    """パース済みの.envを共有する設定ソース"""
+
+    def _read_env_file(self, file_path: Path) -> Mapping[str, Optional[str]]:
+        return _parse_env_file(
+            str(file_path.resolve()),
+            file_path.stat().st_mtime_ns,
+            self.env_file_encoding,
+            self.case_sensitive,
+            self.env_ignore_empty,
+            self.env_parse_none_str,
+        )
+
+
+class EnvFileSettings(BaseSettings):
+    """.envを共有して読み込む設定クラスの基底クラス
+
+    env_fileはmodel_configではなくENV_FILEで指定する。model_configに指定すると
+    pydantic-settings標準のソースがクラスごとに.envを読み込むため。
+    .envには他の設定クラス向けのキー（MCP_・AZURE_等）も含まれるため、
+    該当するフィールドのないキーは無視する。
+    """
+
+    model_config = SettingsConfigDict(extra="ignore")
+
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls: Type[BaseSettings],
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ) -> Tuple[PydanticBaseSettingsSource, ...]:
+        return (
+            init_settings,
+            env_settings,
+            SharedDotEnvSettingsSource(
+                settings_cls,
+                env_file=ENV_FILE,
+                env_file_encoding=ENV_FILE_ENCODING,
+            ),
+            file_secret_settings,
+        )
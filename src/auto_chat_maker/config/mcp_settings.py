@@ -3,10 +3,12 @@ MCPサーバー設定管理モジュール
 """
 from typing import Optional
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import SettingsConfigDict
 
+from auto_chat_maker.config.env_file import EnvFileSettings
 
-class MCPSettings(BaseSettings):
+
+class MCPSettings(EnvFileSettings):
     """MCPサーバー設定クラス"""
 
     # MCPサーバー基本設定
@@ -32,16 +34,15 @@ class MCPSettings(BaseSettings):
     enable_mail_operations: bool = False
     enable_calendar_operations: bool = False
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        env_file_encoding = "utf-8"
-        env_prefix = "MCP_"
+    model_config = SettingsConfigDict(case_sensitive=False, env_prefix="MCP_")
 
 
-mcp_settings = MCPSettings()
+_mcp_settings: Optional[MCPSettings] = None
 
 
 def get_mcp_settings() -> MCPSettings:
-    """MCP設定インスタンスを取得"""
-    return mcp_settings
+    """MCP設定インスタンスを取得（初回呼び出し時に生成）"""
+    global _mcp_settings
+    if _mcp_settings is None:
+        _mcp_settings = MCPSettings()
+    return _mcp_settings
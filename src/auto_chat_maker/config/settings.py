@@ -1,13 +1,15 @@
 """
 環境変数・.envファイルから設定値を読み込む参照用モジュール
 """
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import field_validator
-from pydantic_settings import BaseSettings
+from pydantic_settings import SettingsConfigDict
 
+from auto_chat_maker.config.env_file import EnvFileSettings
 
-class Settings(BaseSettings):
+
+class Settings(EnvFileSettings):
     """アプリケーション全体の設定値を環境変数から読み込むクラス"""
 
     # アプリケーション基本設定
@@ -15,13 +17,40 @@ class Settings(BaseSettings):
     app_version: str = "1.0.0"
     debug: bool = False
     log_level: str = "INFO"
+    log_format: str = "json"
+    log_profile: str = "standard"  # fast: orjson・遅延プロセッサーを利用
+    log_async: bool = False  # 整形・出力をバックグラウンドスレッドで行う
+    log_queue_size: int = 10000
+    log_queue_policy: str = "drop"  # 満杯時: drop（破棄）/ block（待機）
+    # ログキー（log_keyまたはイベント名）ごとのサンプリング率（0.0〜1.0）
+    log_sample_rates: Dict[str, float] = {}
+    # ログキーごとのレート制限（"件数/秒数"、超過分は件数のみ報告）
+    log_rate_limits: Dict[str, str] = {
+        "health_check": "1/60",
+        "validation_error": "20/60",
+    }
     secret_key: Optional[str] = None
     host: str = "0.0.0.0"
     port: int = 8000
 
+    # サーバー設定（auto-chat-maker serve）
+    workers: Optional[int] = None  # 未設定の場合は利用可能なCPU数
+    backlog: int = 2048  # 受け付け待ちの接続数の上限
+    keep_alive_timeout: int = 5  # 秒
+    limit_concurrency: Optional[int] = None  # 超過分は503を返す
+    # 定期実行のスケジューラーを1ワーカーだけで動かすためのロックファイル
+    scheduler_lock_file: str = "./auto_chat_maker.scheduler.lock"
+    scheduler_lock_poll_interval: float = 10.0  # 秒
+
     # データベース設定
     database_url: str = "sqlite:///./auto_chat_maker.db"
     database_echo: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800  # 30分
+    database_pool_pre_ping: bool = True
+    database_statement_cache_size: int = 500
 
     # Azure AD認証設定
     microsoft_client_id: Optional[str] = None
@@ -36,6 +65,47 @@ class Settings(BaseSettings):
     claude_model: str = "claude-3-sonnet-20240229"
     claude_max_tokens: int = 4000
     claude_temperature: float = 0.7
+    claude_api_version: str = "2023-06-01"
+    claude_timeout: float = 60.0
+    claude_connect_timeout: float = 5.0
+    claude_http2: bool = True
+    claude_max_connections: int = 20
+    claude_max_keepalive_connections: int = 10
+    claude_keepalive_expiry: float = 30.0
+    claude_requests_per_second: float = 5.0  # 0以下で無制限
+    claude_burst: int = 10
+    claude_initial_concurrency: int = 4
+    claude_max_concurrency: int = 16
+    claude_max_retries: int = 2
+    claude_retry_base_delay: float = 1.0
+    claude_retry_max_delay: float = 30.0
+    claude_request_deadline: float = 120.0
+
+    # Microsoft Graph API設定
+    graph_api_base_url: str = "https://graph.microsoft.com/v1.0"
+    graph_timeout: float = 30.0
+    graph_connect_timeout: float = 5.0
+    graph_http2: bool = True
+    graph_max_connections: int = 20
+    graph_max_keepalive_connections: int = 10
+    graph_keepalive_expiry: float = 30.0
+    graph_requests_per_second: float = 10.0  # 0以下で無制限
+    graph_burst: int = 20
+    graph_initial_concurrency: int = 4
+    graph_max_concurrency: int = 16
+    graph_max_retries: int = 2
+    graph_retry_base_delay: float = 1.0
+    graph_retry_max_delay: float = 30.0
+    # 個別の取得をまとめて$batchで送信するまでの待機秒数と件数（最大20）
+    graph_batch_window: float = 0.01
+    graph_batch_max_size: int = 20
+
+    # チャット同期設定（Webhookで取りこぼしたメッセージの差分取得）
+    chat_sync_enabled: bool = True
+    chat_sync_interval: float = 900.0  # 秒（0以下で起動時のみ）
+    chat_sync_initial_lookback: float = 86400.0  # 初回同期で遡る秒数
+    chat_sync_page_size: int = 50  # 最大50
+    chat_sync_concurrency: int = 4
 
     # MCPサーバー設定
     mcp_server_url: Optional[str] = None
@@ -46,23 +116,65 @@ class Settings(BaseSettings):
     mcp_connection_timeout: int = 30
     mcp_max_retries: int = 3
 
+    # サーキットブレーカー設定（依存先ごとに適用）
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_recovery_timeout: float = 30.0
+
     # Webhook設定
     webhook_secret: Optional[str] = None
     webhook_endpoint: str = "/api/webhook/microsoft-graph"
     webhook_timeout: int = 10
     webhook_subscription_expiration: int = 3600  # 60分
+    # 有効期限の何秒前にサブスクリプションを更新するか
+    subscription_renewal_margin: float = 600.0
+    # この秒数内に更新時期を迎えるものはまとめて更新する
+    subscription_renewal_batch_window: float = 60.0
+    subscription_renewal_retry_delay: float = 30.0
+    # 他のワーカーでの変更を索引に反映する間隔（秒、0で無効）
+    subscription_index_refresh_interval: float = 60.0
+
+    # ワークキュー設定
+    work_queue_visibility_timeout: float = 60.0
+    work_queue_max_attempts: int = 5
+    work_queue_retry_delay: float = 5.0
+    work_queue_workers: int = 2
+    work_queue_lease_batch_size: int = 10
+    work_queue_poll_interval: float = 1.0
 
     # 返信生成設定
     reply_generation_batch_size: int = 10
     reply_generation_interval: int = 300  # 5分
+    reply_generation_concurrency: int = 4
+    reply_generation_shutdown_timeout: float = 30.0
     reply_quality_threshold: float = 0.8
     max_reply_suggestions: int = 3
 
+    # 返信案キャッシュ設定
+    reply_cache_enabled: bool = True
+    reply_cache_max_entries: int = 1024
+    reply_cache_ttl: float = 3600.0  # 60分
+    reply_cache_sqlite_path: Optional[str] = None
+
+    # 変更通知の重複排除設定
+    notification_dedup_enabled: bool = True
+    notification_dedup_recent_size: int = 10000  # LRUで保持する件数
+    notification_dedup_bloom_capacity: int = 100000  # ブルームフィルター1世代の件数
+    notification_dedup_error_rate: float = 0.01  # ブルームフィルターの偽陽性率
+
+    # ヘルスチェック設定
+    health_check_timeout: float = 2.0  # プローブごとの秒数
+    health_check_cache_ttl: float = 5.0  # 結果をキャッシュする秒数
+
     # 機能フラグ
     enable_teams_plugin: bool = True
     enable_mail_plugin: bool = False
     enable_ai_processing: bool = True
     enable_webhook_processing: bool = True
+    enable_metrics: bool = True  # /metrics とリクエスト計測ミドルウェア
+    enable_server_timing: bool = True  # Server-Timingヘッダーで内訳を返す
+    slow_request_threshold: float = 1.0  # 秒（超えたら内訳をログ出力、0で無効）
+    # 秒（0より大きければ起動時からイベントループのブロックを検出）
+    slow_callback_threshold: float = 0.0
 
     @field_validator(  # type: ignore[misc]
         "secret_key",
@@ -73,6 +185,9 @@ class Settings(BaseSettings):
         "mcp_server_url",
         "mcp_api_key",
         "webhook_secret",
+        "reply_cache_sqlite_path",
+        "workers",
+        "limit_concurrency",
         mode="before",
     )
     @classmethod
@@ -81,15 +196,15 @@ class Settings(BaseSettings):
             return None
         return v
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-        env_file_encoding = "utf-8"
+    model_config = SettingsConfigDict(case_sensitive=False)
 
 
-settings = Settings()
+_settings: Optional[Settings] = None
 
 
 def get_settings() -> Settings:
-    """設定インスタンスを取得"""
-    return settings
+    """設定インスタンスを取得（初回呼び出し時に生成）"""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
@@ -0,0 +1,45 @@
+"""
+チャット同期状態エンティティ
+"""
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ChatSyncState(BaseModel):
+    """チャットごとの差分同期の状態"""
+
+    id: Optional[int] = None
+    chat_id: str = Field(..., description="チャットID")
+    watermark: Optional[datetime] = Field(
+        None, description="同期済みメッセージの最終更新日時の最大値"
+    )
+    synced_at: Optional[datetime] = Field(None, description="最終同期日時")
+    created_at: datetime = Field(
+        default_factory=datetime.utcnow, description="作成日時"
+    )
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow, description="更新日時"
+    )
+
+    class Config:
+        from_attributes = True
+
+    def __str__(self) -> str:
+        return (
+            f"ChatSyncState(chat_id={self.chat_id}, "
+            f"watermark={self.watermark})"
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def advance(self, watermark: Optional[datetime]) -> None:
+        """同期の完了を記録し、ウォーターマークを進める（後退はしない）"""
+        if watermark is not None and (
+            self.watermark is None or watermark > self.watermark
+        ):
+            self.watermark = watermark
+        self.synced_at = datetime.utcnow()
+        self.updated_at = self.synced_at
@@ -40,9 +40,12 @@ class Subscription(BaseModel):
     def __repr__(self) -> str:
         return self.__str__()
 
-    def is_expired(self) -> bool:
-        """サブスクリプションが期限切れかどうかを判定"""
-        return datetime.utcnow() > self.expiration_date_time
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        """サブスクリプションが期限切れかどうかを判定
+
+        複数件を判定する場合は同じnowを渡し、時刻の取得を1回にできる。
+        """
+        return (now or datetime.utcnow()) > self.expiration_date_time
 
     def deactivate(self) -> None:
         """サブスクリプションを非アクティブにする"""
@@ -1,9 +1,10 @@
 """
 リポジトリインターフェース定義
 """
-from typing import List, Optional, Protocol
+from typing import AsyncIterator, List, Optional, Protocol, Set
 
 from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.chat_sync_state import ChatSyncState
 from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
 from auto_chat_maker.domain.models.subscription import Subscription
 from auto_chat_maker.domain.models.user import User
@@ -36,8 +37,14 @@ class UserRepository(Protocol):
         """ユーザーを削除"""
         ...
 
-    async def list_all(self) -> List[User]:
-        """全ユーザーを取得"""
+    async def list_all(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[User]:
+        """全ユーザーを取得（after_id・limitでキーセットページ取得）"""
+        ...
+
+    def iter_all(self, chunk_size: int = 500) -> AsyncIterator[User]:
+        """全ユーザーをチャンク単位で逐次取得"""
         ...
 
 
@@ -48,6 +55,18 @@ class ChatMessageRepository(Protocol):
         """メッセージを作成"""
         ...
 
+    async def create_many(
+        self, messages: List[ChatMessage]
+    ) -> List[ChatMessage]:
+        """複数のメッセージを一括作成"""
+        ...
+
+    async def upsert_many(
+        self, messages: List[ChatMessage]
+    ) -> List[ChatMessage]:
+        """message_idをキーに一括登録し、新規登録分のみを返す"""
+        ...
+
     async def get_by_id(self, message_id: int) -> Optional[ChatMessage]:
         """IDでメッセージを取得"""
         ...
@@ -58,6 +77,16 @@ class ChatMessageRepository(Protocol):
         """Microsoft TeamsのメッセージIDでメッセージを取得"""
         ...
 
+    async def find_existing_message_ids(
+        self, message_ids: List[str]
+    ) -> Set[str]:
+        """登録済みのmessage_idを取得"""
+        ...
+
+    async def list_recent_message_ids(self, limit: int) -> List[str]:
+        """最近登録されたメッセージのmessage_idを取得"""
+        ...
+
     async def update(self, message: ChatMessage) -> ChatMessage:
         """メッセージを更新"""
         ...
@@ -66,12 +95,31 @@ class ChatMessageRepository(Protocol):
         """メッセージを削除"""
         ...
 
-    async def list_unprocessed(self) -> List[ChatMessage]:
-        """未処理のメッセージを取得"""
+    async def list_unprocessed(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[ChatMessage]:
+        """未処理のメッセージを取得（after_id・limitでキーセットページ取得）"""
+        ...
+
+    def iter_unprocessed(
+        self, chunk_size: int = 500
+    ) -> AsyncIterator[ChatMessage]:
+        """未処理のメッセージをチャンク単位で逐次取得"""
+        ...
+
+    async def list_by_chat_id(
+        self,
+        chat_id: str,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[ChatMessage]:
+        """チャットIDでメッセージを取得（after_id・limitでキーセットページ取得）"""
         ...
 
-    async def list_by_chat_id(self, chat_id: str) -> List[ChatMessage]:
-        """チャットIDでメッセージを取得"""
+    def iter_by_chat_id(
+        self, chat_id: str, chunk_size: int = 500
+    ) -> AsyncIterator[ChatMessage]:
+        """チャットIDでメッセージをチャンク単位で逐次取得"""
         ...
 
 
@@ -82,6 +130,12 @@ class ReplySuggestionRepository(Protocol):
         """返信案を作成"""
         ...
 
+    async def create_many(
+        self, suggestions: List[ReplySuggestion]
+    ) -> List[ReplySuggestion]:
+        """複数の返信案を一括作成"""
+        ...
+
     async def get_by_id(self, suggestion_id: int) -> Optional[ReplySuggestion]:
         """IDで返信案を取得"""
         ...
@@ -100,12 +154,28 @@ class ReplySuggestionRepository(Protocol):
         """返信案を削除"""
         ...
 
-    async def list_selected(self) -> List[ReplySuggestion]:
-        """選択済みの返信案を取得"""
+    async def list_selected(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[ReplySuggestion]:
+        """選択済みの返信案を取得（after_id・limitでキーセットページ取得）"""
+        ...
+
+    def iter_selected(
+        self, chunk_size: int = 500
+    ) -> AsyncIterator[ReplySuggestion]:
+        """選択済みの返信案をチャンク単位で逐次取得"""
+        ...
+
+    async def list_sent(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[ReplySuggestion]:
+        """送信済みの返信案を取得（after_id・limitでキーセットページ取得）"""
         ...
 
-    async def list_sent(self) -> List[ReplySuggestion]:
-        """送信済みの返信案を取得"""
+    def iter_sent(
+        self, chunk_size: int = 500
+    ) -> AsyncIterator[ReplySuggestion]:
+        """送信済みの返信案をチャンク単位で逐次取得"""
         ...
 
 
@@ -138,6 +208,30 @@ class SubscriptionRepository(Protocol):
         """アクティブなサブスクリプションを取得"""
         ...
 
-    async def list_expired(self) -> List[Subscription]:
-        """期限切れのサブスクリプションを取得"""
+    async def list_expired(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[Subscription]:
+        """期限切れのサブスクリプションを取得（after_id・limitでキーセットページ取得）"""
+        ...
+
+    def iter_expired(
+        self, chunk_size: int = 500
+    ) -> AsyncIterator[Subscription]:
+        """期限切れのサブスクリプションをチャンク単位で逐次取得"""
+        ...
+
+
+class ChatSyncStateRepository(Protocol):
+    """チャット同期状態リポジトリインターフェース"""
+
+    async def get(self, chat_id: str) -> Optional[ChatSyncState]:
+        """チャットIDで同期状態を取得"""
+        ...
+
+    async def save(self, state: ChatSyncState) -> ChatSyncState:
+        """同期状態を登録・更新"""
+        ...
+
+    async def list_chat_ids(self) -> List[str]:
+        """同期対象のチャットID（同期状態またはメッセージがあるもの）を取得"""
         ...
@@ -0,0 +1,275 @@
+"""
+非同期データベース接続管理モジュール
+
+SQLAlchemy 2.0の非同期エンジンとコネクションプールを管理する。
+ローカルではaiosqlite、本番ではasyncpgを利用する。
+クエリの実行時間はリクエストごとの処理時間の内訳として記録する。
+"""
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.infrastructure.database.models import Base
+from auto_chat_maker.utils.exceptions import ConfigurationError, DatabaseError
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.timing import PHASE_DB, record_timing
+
+logger = get_logger(__name__)
+
+# 同期ドライバ名から非同期ドライバ名への対応表
+_ASYNC_DRIVERS: Dict[str, str] = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(database_url: str) -> URL:
+    """データベースURLを非同期ドライバ用のURLに変換"""
+    url = make_url(database_url)
+    async_driver = _ASYNC_DRIVERS.get(url.drivername)
+    if async_driver is not None:
+        url = url.set(drivername=async_driver)
+    return url
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+class Database:
+    """非同期エンジンとセッションファクトリを保持するクラス"""
+
+    def __init__(
+        self,
+        database_url: str,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = 1800,
+        pool_pre_ping: bool = True,
+        statement_cache_size: int = 500,
+    ) -> None:
+        self.url = to_async_url(database_url)
+        self._engine = create_async_engine(
+            self.url,
+            **self._engine_options(
+                echo=echo,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+                statement_cache_size=statement_cache_size,
+            ),
+        )
+        if self.url.get_backend_name() == "sqlite":
+            event.listen(
+                self._engine.sync_engine, "connect", self._set_sqlite_pragma
+            )
+        event.listen(
+            self._engine.sync_engine,
+            "before_cursor_execute",
+            self._before_cursor_execute,
+        )
+        event.listen(
+            self._engine.sync_engine,
+            "after_cursor_execute",
+            self._after_cursor_execute,
+        )
+        self._session_factory = async_sessionmaker(
+            self._engine, expire_on_commit=False
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "Database":
+        """設定値からインスタンスを生成"""
+        return cls(
+            settings.database_url,
+            echo=settings.database_echo,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+            pool_pre_ping=settings.database_pool_pre_ping,
+            statement_cache_size=settings.database_statement_cache_size,
+        )
+
+    def _engine_options(
+        self,
+        echo: bool,
+        pool_size: int,
+        max_overflow: int,
+        pool_timeout: float,
+        pool_recycle: int,
+        pool_pre_ping: bool,
+        statement_cache_size: int,
+    ) -> Dict[str, Any]:
+        """バックエンドに応じたエンジン引数を組み立てる"""
+        options: Dict[str, Any] = {
+            "echo": echo,
+            # コンパイル済みSQLのキャッシュ
+            "query_cache_size": statement_cache_size,
+        }
+        if _is_memory_sqlite(self.url):
+            # インメモリDBは単一コネクションを共有しないとテーブルが消える。
+            # そのため並行トランザクションには対応しない（テスト用途）。
+            options["poolclass"] = StaticPool
+            options["connect_args"] = {"check_same_thread": False}
+            return options
+
+        options.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+        if self.url.get_driver_name() == "asyncpg":
+            # asyncpg側のプリペアドステートメントキャッシュ
+            options["connect_args"] = {
+                "prepared_statement_cache_size": statement_cache_size,
+            }
+        return options
+
+    @staticmethod
+    def _set_sqlite_pragma(dbapi_connection: Any, _record: Any) -> None:
+        """SQLiteの同時実行性能を上げるPRAGMAを設定"""
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.execute("PRAGMA busy_timeout=5000")
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _before_cursor_execute(conn: Any, *_args: Any) -> None:
+        conn.info.setdefault("query_started_at", []).append(
+            time.perf_counter()
+        )
+
+    @staticmethod
+    def _after_cursor_execute(conn: Any, *_args: Any) -> None:
+        """クエリの実行時間を現在のリクエストに記録"""
+        started_at = conn.info["query_started_at"].pop()
+        record_timing(PHASE_DB, time.perf_counter() - started_at)
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """非同期エンジンを取得"""
+        return self._engine
+
+    def pool_status(self) -> Dict[str, int]:
+        """コネクションプールの使用状況を取得
+
+        StaticPool等の統計を持たないプールでは空の辞書を返す。
+        """
+        pool: Any = self._engine.pool
+        status: Dict[str, int] = {}
+        for state, method in (
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+            ("size", "size"),
+        ):
+            getter = getattr(pool, method, None)
+            if callable(getter):
+                status[state] = int(getter())
+        return status
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """トランザクション付きのセッションを提供
+
+        正常終了時にコミット、例外発生時にロールバックする。
+        """
+        async with self._session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise DatabaseError(
+                    "データベース操作に失敗しました",
+                    error_code="DATABASE_ERROR",
+                    details={"error": str(e)},
+                ) from e
+            except BaseException:
+                await session.rollback()
+                raise
+
+    async def ping(self) -> None:
+        """プールからコネクションを取得して疎通を確認"""
+        try:
+            async with self._engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except SQLAlchemyError as e:
+            raise DatabaseError(
+                "データベースに接続できません",
+                error_code="DATABASE_UNAVAILABLE",
+                details={"error": str(e)},
+            ) from e
+
+    async def create_tables(self) -> None:
+        """未作成のテーブルを作成"""
+        async with self._engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def dispose(self) -> None:
+        """コネクションプールを破棄"""
+        await self._engine.dispose()
+
+
+_database: Optional[Database] = None
+
+
+async def init_database(settings: Settings) -> Database:
+    """データベースを初期化してテーブルを作成"""
+    global _database
+    if _database is None:
+        _database = Database.from_settings(settings)
+        await _database.create_tables()
+        logger.info(
+            "データベースを初期化しました",
+            backend=_database.url.get_backend_name(),
+            driver=_database.url.get_driver_name(),
+        )
+    return _database
+
+
+def get_database() -> Database:
+    """初期化済みのデータベースインスタンスを取得"""
+    if _database is None:
+        raise ConfigurationError(
+            "データベースが初期化されていません",
+            error_code="DATABASE_NOT_INITIALIZED",
+        )
+    return _database
+
+
+async def close_database() -> None:
+    """データベース接続を閉じる"""
+    global _database
+    if _database is not None:
+        await _database.dispose()
+        _database = None
+        logger.info("データベース接続を閉じました")
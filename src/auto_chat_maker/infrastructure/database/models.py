@@ -0,0 +1,183 @@
+"""
+SQLAlchemy ORMモデル定義
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    """ORMモデルの基底クラス"""
+
+    pass
+
+
+class UserModel(Base):
+    """usersテーブル"""
+
+    __tablename__ = "users"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    email: Mapped[str] = mapped_column(
+        String(255), unique=True, nullable=False
+    )
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    microsoft_id: Mapped[Optional[str]] = mapped_column(
+        String(255), unique=True, nullable=True
+    )
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class ChatMessageModel(Base):
+    """chat_messagesテーブル"""
+
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("idx_chat_messages_is_processed", "is_processed", "id"),
+        Index("idx_chat_messages_chat_id", "chat_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    message_id: Mapped[str] = mapped_column(
+        String(255), unique=True, nullable=False
+    )
+    chat_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    thread_id: Mapped[Optional[str]] = mapped_column(
+        String(255), nullable=True
+    )
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    sender_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    sender_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    message_type: Mapped[str] = mapped_column(String(50), default="text")
+    sent_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    processed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
+    is_processed: Mapped[bool] = mapped_column(Boolean, default=False)
+    # "metadata"はDeclarativeBaseの予約属性のため属性名をずらす
+    metadata_: Mapped[Dict[str, Any]] = mapped_column(
+        "metadata", JSON, default=dict
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class ReplySuggestionModel(Base):
+    """reply_suggestionsテーブル"""
+
+    __tablename__ = "reply_suggestions"
+    __table_args__ = (
+        Index("idx_reply_suggestions_is_selected", "is_selected", "id"),
+        Index("idx_reply_suggestions_is_sent", "is_sent", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    message_id: Mapped[str] = mapped_column(
+        String(255), nullable=False, index=True
+    )
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    confidence_score: Mapped[float] = mapped_column(Float, nullable=False)
+    is_selected: Mapped[bool] = mapped_column(Boolean, default=False)
+    is_sent: Mapped[bool] = mapped_column(Boolean, default=False)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class SubscriptionModel(Base):
+    """subscriptionsテーブル"""
+
+    __tablename__ = "subscriptions"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    subscription_id: Mapped[str] = mapped_column(
+        String(255), unique=True, nullable=False
+    )
+    resource: Mapped[str] = mapped_column(String(1024), nullable=False)
+    change_type: Mapped[str] = mapped_column(
+        String(100), default="created,updated"
+    )
+    client_state: Mapped[Optional[str]] = mapped_column(
+        String(255), nullable=True
+    )
+    notification_url: Mapped[str] = mapped_column(String(1024), nullable=False)
+    expiration_date_time: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, index=True
+    )
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class ChatSyncStateModel(Base):
+    """chat_sync_statesテーブル"""
+
+    __tablename__ = "chat_sync_states"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    chat_id: Mapped[str] = mapped_column(
+        String(255), unique=True, nullable=False
+    )
+    watermark: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
+    synced_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class WorkQueueItemModel(Base):
+    """work_queue_itemsテーブル（永続ワークキュー）"""
+
+    __tablename__ = "work_queue_items"
+    __table_args__ = (
+        Index(
+            "idx_work_queue_items_lease",
+            "queue_name",
+            "status",
+            "available_at",
+            "id",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, autoincrement=True
+    )
+    queue_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    lease_token: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
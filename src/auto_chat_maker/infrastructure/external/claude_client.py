@@ -0,0 +1,375 @@
+"""
+Claude APIクライアント
+
+アプリケーション全体で1つのhttpx.AsyncClientを共有し、
+keep-aliveコネクションプール（利用可能ならHTTP/2）を再利用する。
+呼び出しごとのTLSハンドシェイクを避け、ストリーミングAPIで
+生成途中のテキストを逐次受け取れるようにする。
+一時的な障害はジッター付きバックオフで再試行し、Claudeが停止している間は
+サーキットブレーカーで即座に失敗させる。
+"""
+import importlib.util
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.utils.exceptions import (
+    CircuitOpenError,
+    ConfigurationError,
+    ExternalServiceError,
+    NetworkError,
+    RateLimitError,
+    TimeoutError,
+)
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.metrics import AI_TOKENS
+from auto_chat_maker.utils.rate_limit import OutboundLimiter
+from auto_chat_maker.utils.retry import STATE_OPEN, CircuitBreaker, RetryPolicy
+
+logger = get_logger(__name__)
+
+MESSAGES_PATH = "/v1/messages"
+MODELS_PATH = "/v1/models"
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class ClaudeClient:
+    """Claude Messages APIとの通信を管理するクライアント"""
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = "https://api.anthropic.com",
+        model: str = "claude-3-sonnet-20240229",
+        max_tokens: int = 4000,
+        temperature: float = 0.7,
+        api_version: str = "2023-06-01",
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limiter: Optional[OutboundLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        if not api_key:
+            raise ConfigurationError(
+                "Claude APIキーが設定されていません",
+                error_code="CLAUDE_API_KEY_MISSING",
+            )
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._limiter = limiter or OutboundLimiter("claude")
+        self._circuit_breaker = circuit_breaker or CircuitBreaker("claude")
+        self._retry_policy = (
+            retry_policy or RetryPolicy(max_attempts=1)
+        ).with_circuit_breaker(self._circuit_breaker)
+
+        use_http2 = http2 and transport is None and _http2_available()
+        if http2 and not use_http2 and transport is None:
+            logger.warning("h2が未インストールのためHTTP/1.1で接続します")
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": api_version,
+                "content-type": "application/json",
+            },
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=use_http2,
+            transport=transport,
+        )
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> "ClaudeClient":
+        """設定値からインスタンスを生成"""
+        return cls(
+            settings.claude_api_key,
+            base_url=settings.claude_api_base_url,
+            model=settings.claude_model,
+            max_tokens=settings.claude_max_tokens,
+            temperature=settings.claude_temperature,
+            api_version=settings.claude_api_version,
+            timeout=settings.claude_timeout,
+            connect_timeout=settings.claude_connect_timeout,
+            http2=settings.claude_http2,
+            max_connections=settings.claude_max_connections,
+            max_keepalive_connections=(
+                settings.claude_max_keepalive_connections
+            ),
+            keepalive_expiry=settings.claude_keepalive_expiry,
+            transport=transport,
+            limiter=OutboundLimiter(
+                "claude",
+                requests_per_second=settings.claude_requests_per_second,
+                burst=settings.claude_burst,
+                initial_concurrency=settings.claude_initial_concurrency,
+                max_concurrency=settings.claude_max_concurrency,
+            ),
+            retry_policy=RetryPolicy(
+                max_attempts=settings.claude_max_retries + 1,
+                base_delay=settings.claude_retry_base_delay,
+                max_delay=settings.claude_retry_max_delay,
+                deadline=settings.claude_request_deadline,
+            ),
+            circuit_breaker=CircuitBreaker(
+                "claude",
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                recovery_timeout=settings.circuit_breaker_recovery_timeout,
+            ),
+        )
+
+    def _build_payload(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        stream: bool,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": (
+                self.temperature if temperature is None else temperature
+            ),
+        }
+        if system:
+            payload["system"] = system
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _raise_for_status(self, response: httpx.Response) -> None:
+        """エラーレスポンスをアプリケーション例外に変換"""
+        if response.status_code < 400:
+            return
+        details: Dict[str, Any] = {
+            "status_code": response.status_code,
+            "retry_after": _parse_retry_after(response),
+        }
+        if response.status_code == 429:
+            raise RateLimitError(
+                "Claude APIのレート制限に達しました",
+                error_code="CLAUDE_RATE_LIMITED",
+                details=details,
+            )
+        raise ExternalServiceError(
+            "Claude APIがエラーを返しました",
+            error_code="CLAUDE_API_ERROR",
+            details=details,
+        )
+
+    async def create_message(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Messages APIを呼び出し、レスポンスJSONを返す"""
+        payload = self._build_payload(
+            messages, system, max_tokens, temperature, stream=False
+        )
+        return await self._retry_policy.call(self._send_message, payload)
+
+    async def _send_message(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Messages APIを1回呼び出す"""
+        async with self._circuit_breaker, self._limiter.limit(MESSAGES_PATH):
+            try:
+                response = await self._client.post(MESSAGES_PATH, json=payload)
+            except httpx.TimeoutException as e:
+                raise TimeoutError(
+                    "Claude APIの呼び出しがタイムアウトしました",
+                    error_code="CLAUDE_TIMEOUT",
+                ) from e
+            except httpx.TransportError as e:
+                raise NetworkError(
+                    "Claude APIに接続できません",
+                    error_code="CLAUDE_NETWORK_ERROR",
+                    details={"error": str(e)},
+                ) from e
+            self._raise_for_status(response)
+            result: Dict[str, Any] = response.json()
+            self._record_usage(result.get("usage"))
+            return result
+
+    def _record_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        """レスポンスのusageから消費トークン数を記録"""
+        if not usage:
+            return
+        for token_type in ("input_tokens", "output_tokens"):
+            count = usage.get(token_type)
+            if count:
+                AI_TOKENS.labels(
+                    self.model, token_type[: -len("_tokens")]
+                ).inc(count)
+
+    async def generate_response(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """プロンプトに基づいてAI応答のテキストを生成"""
+        result = await self.create_message(
+            [{"role": "user", "content": prompt}],
+            system=system,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return "".join(
+            block.get("text", "")
+            for block in result.get("content", [])
+            if block.get("type") == "text"
+        )
+
+    async def stream_response(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """生成されたテキストを到着順に逐次返す"""
+        async for text in self.stream_message(
+            [{"role": "user", "content": prompt}],
+            system=system,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        ):
+            yield text
+
+    async def stream_message(
+        self,
+        messages: List[Dict[str, Any]],
+        system: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Messages APIをストリーミングで呼び出し、テキスト差分を返す
+
+        Server-Sent Eventsの ``content_block_delta`` からテキストを取り出す。
+        途中まで返したテキストと重複するため、ストリーミングは再試行しない。
+        """
+        payload = self._build_payload(
+            messages, system, max_tokens, temperature, stream=True
+        )
+        async with self._circuit_breaker, self._limiter.limit(MESSAGES_PATH):
+            try:
+                async with self._client.stream(
+                    "POST", MESSAGES_PATH, json=payload
+                ) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        self._raise_for_status(response)
+                    async for line in response.aiter_lines():
+                        event = self._parse_event(line)
+                        if event is None:
+                            continue
+                        event_type = event.get("type")
+                        if event_type == "content_block_delta":
+                            delta = event.get("delta", {})
+                            if delta.get("type") == "text_delta":
+                                yield delta.get("text", "")
+                        elif event_type == "message_start":
+                            self._record_usage(
+                                event.get("message", {}).get("usage")
+                            )
+                        elif event_type == "message_delta":
+                            self._record_usage(event.get("usage"))
+                        elif event_type == "message_stop":
+                            break
+                        elif event_type == "error":
+                            raise ExternalServiceError(
+                                "Claude APIのストリーミング中にエラーが発生しました",
+                                error_code="CLAUDE_STREAM_ERROR",
+                                details=event.get("error", {}),
+                            )
+            except httpx.TimeoutException as e:
+                raise TimeoutError(
+                    "Claude APIのストリーミングがタイムアウトしました",
+                    error_code="CLAUDE_TIMEOUT",
+                ) from e
+            except httpx.TransportError as e:
+                raise NetworkError(
+                    "Claude APIに接続できません",
+                    error_code="CLAUDE_NETWORK_ERROR",
+                    details={"error": str(e)},
+                ) from e
+
+    @staticmethod
+    def _parse_event(line: str) -> Optional[Dict[str, Any]]:
+        """SSEのdata行をJSONとして解釈"""
+        if not line.startswith("data:"):
+            return None
+        data = line[len("data:") :].strip()
+        if not data:
+            return None
+        try:
+            event: Dict[str, Any] = json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning("解釈できないSSEイベントを無視しました", data=data)
+            return None
+        return event
+
+    async def ping(self) -> None:
+        """トークンを消費せずにClaude APIへの疎通を確認
+
+        ヘルスチェック用のため再試行・流量制御の対象外とし、
+        サーキットがオープンの間はAPIを呼ばずに失敗させる。
+        """
+        if self._circuit_breaker.state == STATE_OPEN:
+            raise CircuitOpenError(
+                "Claude APIへの呼び出しを一時停止しています",
+                error_code="CIRCUIT_OPEN",
+                details={"service": self._circuit_breaker.name},
+            )
+        try:
+            response = await self._client.get(MODELS_PATH, params={"limit": 1})
+        except httpx.TimeoutException as e:
+            raise TimeoutError(
+                "Claude APIの呼び出しがタイムアウトしました",
+                error_code="CLAUDE_TIMEOUT",
+            ) from e
+        except httpx.TransportError as e:
+            raise NetworkError(
+                "Claude APIに接続できません",
+                error_code="CLAUDE_NETWORK_ERROR",
+                details={"error": str(e)},
+            ) from e
+        self._raise_for_status(response)
+
+    async def aclose(self) -> None:
+        """コネクションプールを閉じる"""
+        await self._client.aclose()
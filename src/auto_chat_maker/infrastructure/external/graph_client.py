@@ -0,0 +1,624 @@
+"""
+Microsoft Graph APIクライアント
+
+アプリケーション全体で1つのhttpx.AsyncClientを共有し、
+keep-aliveコネクションプールを再利用する。
+変更通知ごとのメッセージ取得のように短時間に集中する個別のGETは、
+一定時間（batch_window）まとめてJSONバッチ（$batch、最大20件）で送信し、
+結果を待機中の呼び出し元ごとに振り分ける。
+再試行・流量制御・サーキットブレーカーはClaudeクライアントと共通の
+仕組みを使い、バッチ内で429・503となったリクエストのみを再送する。
+"""
+import asyncio
+import importlib.util
+import re
+import time
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+from urllib.parse import quote, unquote
+
+import httpx
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.utils.exceptions import (
+    AuthenticationError,
+    ConfigurationError,
+    ExternalServiceError,
+    NetworkError,
+    RateLimitError,
+    TimeoutError,
+)
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.rate_limit import (
+    OVERLOAD_STATUS_CODES,
+    OutboundLimiter,
+)
+from auto_chat_maker.utils.retry import CircuitBreaker, RetryPolicy
+
+logger = get_logger(__name__)
+
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+BATCH_PATH = "/$batch"
+
+# JSONバッチ1回に含められるリクエスト数の上限（Graphの仕様）
+MAX_BATCH_SIZE = 20
+
+# 小数秒（Graphは最大7桁を返す）
+_FRACTION_PATTERN = re.compile(r"(?<=\.)(\d+)")
+
+# チャットのメッセージを指すresource
+# （chats('id')/messages('id') と /chats/id/messages/id の両方の形式）
+_CHAT_RESOURCE_PATTERN = re.compile(
+    r"^/?chats(?:\('(?P<quoted_chat>[^']+)'\)|/(?P<chat>[^/(]+))"
+    r"/messages(?:\('(?P<quoted_message>[^']+)'\)|/(?P<message>[^/?]+))?"
+)
+
+# アクセストークンを取得する関数
+TokenProvider = Callable[[], Awaitable[str]]
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _limit_key(path: str) -> str:
+    """流量制御のキー（パスの先頭のセグメント）"""
+    return path.lstrip("/").split("/", 1)[0].split("?", 1)[0].split("(")[0]
+
+
+def format_graph_datetime(value: datetime) -> str:
+    """GraphのdateTimeOffset形式（UTC）に変換"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="seconds") + "Z"
+
+
+def parse_graph_datetime(value: str) -> datetime:
+    """GraphのdateTimeOffsetをUTCのnaiveなdatetimeに変換
+
+    Python 3.11未満のfromisoformatは末尾のZと7桁の小数秒を
+    解釈できないため、+00:00と6桁に揃えてから変換する。
+    """
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    value = _FRACTION_PATTERN.sub(
+        lambda match: match.group(1)[:6].ljust(6, "0"), value, count=1
+    )
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_chat_resource(resource: str) -> Tuple[Optional[str], Optional[str]]:
+    """変更通知・サブスクリプションのresourceから(チャットID, メッセージID)を取得
+
+    チャットのメッセージを指さないresource（/chats/getAllMessages等）は
+    (None, None)、チャット全体を指す場合はメッセージIDをNoneとする。
+    """
+    match = _CHAT_RESOURCE_PATTERN.match(resource)
+    if match is None:
+        return None, None
+    chat_id = match.group("quoted_chat") or unquote(match.group("chat"))
+    message_id = match.group("quoted_message") or match.group("message")
+    return chat_id, unquote(message_id) if message_id else None
+
+
+def graph_error(
+    status_code: int,
+    body: Any,
+    headers: Mapping[str, str],
+) -> ExternalServiceError:
+    """Graphのエラー応答をアプリケーション例外に変換"""
+    error = body.get("error", {}) if isinstance(body, dict) else {}
+    details: Dict[str, Any] = {
+        "status_code": status_code,
+        "retry_after": _parse_retry_after(headers),
+        "code": error.get("code") if isinstance(error, dict) else None,
+    }
+    if status_code == 429:
+        return RateLimitError(
+            "Graph APIのレート制限に達しました",
+            error_code="GRAPH_RATE_LIMITED",
+            details=details,
+        )
+    return ExternalServiceError(
+        "Graph APIがエラーを返しました",
+        error_code="GRAPH_API_ERROR",
+        details=details,
+    )
+
+
+class ClientCredentialsTokenProvider:
+    """クライアント資格情報フローでアプリケーションのトークンを取得
+
+    有効期限のexpiration_buffer秒前まではキャッシュしたトークンを返し、
+    同時に期限切れを検知した呼び出しは1回の取得を共有する。
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        token_url: str,
+        client_id: str,
+        client_secret: str,
+        scope: str = GRAPH_SCOPE,
+        expiration_buffer: float = 300.0,
+    ) -> None:
+        self._client = client
+        self._token_url = token_url
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._scope = scope
+        self._expiration_buffer = expiration_buffer
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def __call__(self) -> str:
+        if self._token is not None and time.monotonic() < self._expires_at:
+            return self._token
+        async with self._lock:
+            if self._token is None or time.monotonic() >= self._expires_at:
+                self._token = await self._refresh()
+            return self._token
+
+    async def _refresh(self) -> str:
+        try:
+            response = await self._client.post(
+                self._token_url,
+                data={
+                    "grant_type": "client_credentials",
+                    "client_id": self._client_id,
+                    "client_secret": self._client_secret,
+                    "scope": self._scope,
+                },
+            )
+        except httpx.HTTPError as e:
+            raise NetworkError(
+                "アクセストークンを取得できません",
+                error_code="GRAPH_TOKEN_NETWORK_ERROR",
+                details={"error": str(e)},
+            ) from e
+        if response.status_code >= 400:
+            raise AuthenticationError(
+                "アクセストークンの取得に失敗しました",
+                error_code="GRAPH_TOKEN_ERROR",
+                details={"status_code": response.status_code},
+            )
+        result = response.json()
+        self._expires_at = (
+            time.monotonic()
+            + float(result.get("expires_in", 3600))
+            - self._expiration_buffer
+        )
+        token: str = result["access_token"]
+        return token
+
+
+class _BatchItem:
+    """$batchで送信を待つリクエスト"""
+
+    __slots__ = ("method", "url", "body", "future")
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Dict[str, Any]],
+        future: "asyncio.Future[Dict[str, Any]]",
+    ) -> None:
+        self.method = method
+        self.url = url
+        self.body = body
+        self.future = future
+
+    def to_request(self, request_id: str) -> Dict[str, Any]:
+        request: Dict[str, Any] = {
+            "id": request_id,
+            "method": self.method,
+            "url": self.url,
+        }
+        if self.body is not None:
+            request["body"] = self.body
+            request["headers"] = {"Content-Type": "application/json"}
+        return request
+
+
+class GraphClient:
+    """Microsoft Graph APIとの通信を管理するクライアント"""
+
+    def __init__(
+        self,
+        token_provider: Optional[TokenProvider] = None,
+        base_url: str = "https://graph.microsoft.com/v1.0",
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        batch_window: float = 0.01,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limiter: Optional[OutboundLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self._limiter = limiter or OutboundLimiter("graph")
+        self._circuit_breaker = circuit_breaker or CircuitBreaker("graph")
+        self._retry_policy = (
+            retry_policy or RetryPolicy(max_attempts=1)
+        ).with_circuit_breaker(self._circuit_breaker)
+        self._batch_window = batch_window
+        self._max_batch_size = max(1, min(max_batch_size, MAX_BATCH_SIZE))
+        self._pending: List[_BatchItem] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set["asyncio.Task[None]"] = set()
+
+        use_http2 = http2 and transport is None and _http2_available()
+        if http2 and not use_http2 and transport is None:
+            logger.warning("h2が未インストールのためHTTP/1.1で接続します")
+        self._base_url = base_url.rstrip("/")
+        self._client = httpx.AsyncClient(
+            base_url=self._base_url,
+            headers={"accept": "application/json"},
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=use_http2,
+            transport=transport,
+        )
+        self._token_provider = token_provider
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> "GraphClient":
+        """設定値からインスタンスを生成
+
+        トークンの取得にもGraphと同じコネクションプールを使う。
+        """
+        if not (
+            settings.microsoft_tenant_id
+            and settings.microsoft_client_id
+            and settings.microsoft_client_secret
+        ):
+            raise ConfigurationError(
+                "Microsoftのアプリケーション資格情報が設定されていません",
+                error_code="MICROSOFT_CREDENTIALS_MISSING",
+            )
+        client = cls(
+            base_url=settings.graph_api_base_url,
+            timeout=settings.graph_timeout,
+            connect_timeout=settings.graph_connect_timeout,
+            http2=settings.graph_http2,
+            max_connections=settings.graph_max_connections,
+            max_keepalive_connections=(
+                settings.graph_max_keepalive_connections
+            ),
+            keepalive_expiry=settings.graph_keepalive_expiry,
+            batch_window=settings.graph_batch_window,
+            max_batch_size=settings.graph_batch_max_size,
+            transport=transport,
+            limiter=OutboundLimiter(
+                "graph",
+                requests_per_second=settings.graph_requests_per_second,
+                burst=settings.graph_burst,
+                initial_concurrency=settings.graph_initial_concurrency,
+                max_concurrency=settings.graph_max_concurrency,
+            ),
+            retry_policy=RetryPolicy(
+                max_attempts=settings.graph_max_retries + 1,
+                base_delay=settings.graph_retry_base_delay,
+                max_delay=settings.graph_retry_max_delay,
+            ),
+            circuit_breaker=CircuitBreaker(
+                "graph",
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                recovery_timeout=settings.circuit_breaker_recovery_timeout,
+            ),
+        )
+        authority = settings.azure_ad_authority.rstrip("/")
+        client._token_provider = ClientCredentialsTokenProvider(
+            client._client,
+            f"{authority}/{settings.microsoft_tenant_id}/oauth2/v2.0/token",
+            settings.microsoft_client_id,
+            settings.microsoft_client_secret,
+        )
+        return client
+
+    async def _authorization(self) -> Dict[str, str]:
+        if self._token_provider is None:
+            return {}
+        return {"authorization": f"Bearer {await self._token_provider()}"}
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Graph APIを個別に呼び出し、レスポンスJSONを返す"""
+        return await self._retry_policy.call(
+            self._send, method, path, json, params
+        )
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Graph APIを1回呼び出す"""
+        headers = await self._authorization()
+        async with self._circuit_breaker, self._limiter.limit(
+            _limit_key(self._relative_path(path))
+        ):
+            try:
+                response = await self._client.request(
+                    method, path, json=json, params=params, headers=headers
+                )
+            except httpx.TimeoutException as e:
+                raise TimeoutError(
+                    "Graph APIの呼び出しがタイムアウトしました",
+                    error_code="GRAPH_TIMEOUT",
+                ) from e
+            except httpx.TransportError as e:
+                raise NetworkError(
+                    "Graph APIに接続できません",
+                    error_code="GRAPH_NETWORK_ERROR",
+                    details={"error": str(e)},
+                ) from e
+            if response.status_code >= 400:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = None
+                raise graph_error(response.status_code, body, response.headers)
+            if not response.content:
+                return {}
+            result: Dict[str, Any] = response.json()
+            return result
+
+    async def batch_request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """リクエストを$batchにまとめて送信し、自分の結果を返す
+
+        urlはベースURLからの相対パス。batch_window内に届いた
+        リクエストを最大20件ずつ1回のHTTPリクエストで送信する。
+        """
+        future: "asyncio.Future[Dict[str, Any]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending.append(_BatchItem(method, url, body, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._batch_window, self._dispatch
+            )
+        return await future
+
+    def _dispatch(self) -> None:
+        """待機中のリクエストを$batchとして送信するタスクを起動"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        items, self._pending = self._pending, []
+        if not items:
+            return
+        task = asyncio.create_task(self._send_batch(items), name="graph-batch")
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _send_batch(self, items: List[_BatchItem]) -> None:
+        try:
+            await self._retry_policy.call(self._send_batch_once, items)
+        except Exception as e:
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+    async def _send_batch_once(self, items: List[_BatchItem]) -> None:
+        """未完了のリクエストを$batchで1回送信し、結果を振り分ける
+
+        制限（429・503）された分が残った場合はRateLimitErrorとし、
+        再試行ポリシーにより残りのリクエストだけを再送する。
+        """
+        # 呼び出し元がキャンセル済みのものは送信しない
+        pending = [item for item in items if not item.future.done()]
+        if not pending:
+            return
+        result = await self._send(
+            "POST",
+            BATCH_PATH,
+            {
+                "requests": [
+                    item.to_request(str(i)) for i, item in enumerate(pending)
+                ]
+            },
+            None,
+        )
+        responses = {
+            str(response.get("id")): response
+            for response in result.get("responses", [])
+        }
+        throttled = 0
+        retry_after: Optional[float] = None
+        for i, item in enumerate(pending):
+            response = responses.get(str(i))
+            if response is None:
+                item.future.set_exception(
+                    ExternalServiceError(
+                        "$batchの応答にリクエストの結果が含まれていません",
+                        error_code="GRAPH_BATCH_ERROR",
+                        details={"url": item.url},
+                    )
+                )
+                continue
+            status_code = int(response.get("status", 500))
+            headers = response.get("headers") or {}
+            body = response.get("body")
+            if item.future.done():
+                continue
+            if status_code in OVERLOAD_STATUS_CODES:
+                throttled += 1
+                delay = _parse_retry_after(headers)
+                if delay is not None:
+                    retry_after = max(retry_after or 0.0, delay)
+            elif status_code >= 400:
+                item.future.set_exception(
+                    graph_error(status_code, body, headers)
+                )
+            else:
+                item.future.set_result(body if isinstance(body, dict) else {})
+        if throttled:
+            if retry_after:
+                self._limiter.rate_limiter.defer(
+                    _limit_key(BATCH_PATH), retry_after
+                )
+            raise RateLimitError(
+                "$batch内のリクエストがGraph APIに制限されました",
+                error_code="GRAPH_RATE_LIMITED",
+                details={
+                    "status_code": 429,
+                    "retry_after": retry_after,
+                    "throttled": throttled,
+                },
+            )
+
+    async def get_resource(self, resource: str) -> Dict[str, Any]:
+        """変更通知のresource（例: chats('id')/messages('id')）を取得"""
+        return await self.batch_request("GET", "/" + resource.lstrip("/"))
+
+    def _relative_path(self, url: str) -> str:
+        """@odata.nextLink等の絶対URLをベースURLからの相対パスに変換"""
+        if url.startswith(self._base_url):
+            return url[len(self._base_url) :] or "/"
+        return url
+
+    async def list_chat_messages(
+        self,
+        chat_id: str,
+        modified_after: Optional[datetime] = None,
+        page_size: int = 50,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """チャットのメッセージを最終更新日時の新しい順にページ単位で返す
+
+        modified_afterを指定するとそれより後に作成・更新されたものだけを
+        取得する。@odata.nextLinkを辿って最後のページまで返す。
+        """
+        # $filterはlastModifiedDateTimeの降順指定と併せてのみ使える
+        query: Dict[str, Any] = {
+            "$top": min(page_size, 50),
+            "$orderby": "lastModifiedDateTime desc",
+        }
+        if modified_after is not None:
+            query[
+                "$filter"
+            ] = "lastModifiedDateTime gt " + format_graph_datetime(
+                modified_after
+            )
+        url: Optional[str] = f"/chats/{quote(chat_id, safe='')}/messages"
+        params: Optional[Dict[str, Any]] = query
+        while url is not None:
+            page = await self.request(
+                "GET", self._relative_path(url), params=params
+            )
+            yield page.get("value", [])
+            # nextLinkにはクエリが含まれる
+            url = page.get("@odata.nextLink")
+            params = None
+
+    async def get_chat_message(
+        self, chat_id: str, message_id: str
+    ) -> Dict[str, Any]:
+        """チャットのメッセージを取得"""
+        return await self.batch_request(
+            "GET",
+            f"/chats/{quote(chat_id, safe='')}"
+            f"/messages/{quote(message_id, safe='')}",
+        )
+
+    async def create_subscription(
+        self,
+        resource: str,
+        change_type: str,
+        notification_url: str,
+        expiration: datetime,
+        client_state: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Webhookサブスクリプションを作成"""
+        body: Dict[str, Any] = {
+            "changeType": change_type,
+            "notificationUrl": notification_url,
+            "resource": resource,
+            "expirationDateTime": format_graph_datetime(expiration),
+        }
+        if client_state is not None:
+            body["clientState"] = client_state
+        return await self.request("POST", "/subscriptions", json=body)
+
+    async def renew_subscription(
+        self, subscription_id: str, expiration: datetime
+    ) -> datetime:
+        """サブスクリプションの有効期限を延長し、新しい有効期限を返す"""
+        result = await self.request(
+            "PATCH",
+            f"/subscriptions/{quote(subscription_id, safe='')}",
+            json={"expirationDateTime": format_graph_datetime(expiration)},
+        )
+        value = result.get("expirationDateTime")
+        return parse_graph_datetime(value) if value else expiration
+
+    async def delete_subscription(self, subscription_id: str) -> bool:
+        """サブスクリプションを削除（存在しない場合はFalse）"""
+        try:
+            await self.request(
+                "DELETE", f"/subscriptions/{quote(subscription_id, safe='')}"
+            )
+        except ExternalServiceError as e:
+            if e.details.get("status_code") == 404:
+                return False
+            raise
+        return True
+
+    async def aclose(self) -> None:
+        """送信待ちの$batchを送信してからコネクションプールを閉じる"""
+        self._dispatch()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+        await self._client.aclose()
@@ -0,0 +1,300 @@
+"""
+永続ワークキュー
+
+Webhook受信とAI処理を分離するため、データベースのテーブルを
+キューとして利用する。リース（可視性タイムアウト）方式で取り出し、
+ack/nackで完了・再試行を通知する。最大試行回数を超えたアイテムは
+デッドレターとして残し、再起動してもキューの内容は失われない。
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from sqlalchemy import ScalarResult, delete, func, insert, select, update
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.database.models import WorkQueueItemModel
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DEAD = "dead"
+
+
+class QueueItem(BaseModel):
+    """キューから取り出したアイテム"""
+
+    id: int
+    queue_name: str
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    attempts: int = 0
+    lease_token: Optional[str] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+
+
+def _to_item(model: WorkQueueItemModel) -> QueueItem:
+    return QueueItem(
+        id=model.id,
+        queue_name=model.queue_name,
+        payload=model.payload,
+        attempts=model.attempts,
+        lease_token=model.lease_token,
+        last_error=model.last_error,
+        created_at=model.created_at,
+    )
+
+
+class DurableWorkQueue:
+    """データベースを利用した永続ワークキュー"""
+
+    def __init__(
+        self,
+        database: Database,
+        queue_name: str = "default",
+        visibility_timeout: float = 60.0,
+        max_attempts: int = 5,
+        retry_delay: float = 5.0,
+    ) -> None:
+        self._database = database
+        self.queue_name = queue_name
+        self._visibility_timeout = visibility_timeout
+        self._max_attempts = max_attempts
+        self._retry_delay = retry_delay
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, database: Database, queue_name: str
+    ) -> "DurableWorkQueue":
+        """設定値からインスタンスを生成"""
+        return cls(
+            database,
+            queue_name=queue_name,
+            visibility_timeout=settings.work_queue_visibility_timeout,
+            max_attempts=settings.work_queue_max_attempts,
+            retry_delay=settings.work_queue_retry_delay,
+        )
+
+    def is_final_attempt(self, item: QueueItem) -> bool:
+        """失敗した場合にデッドレターとなる試行かどうか"""
+        return item.attempts >= self._max_attempts
+
+    async def enqueue(self, payload: Dict[str, Any], delay: float = 0) -> int:
+        """アイテムを1件追加し、IDを返す"""
+        ids = await self.enqueue_many([payload], delay=delay)
+        return ids[0]
+
+    async def enqueue_many(
+        self, payloads: List[Dict[str, Any]], delay: float = 0
+    ) -> List[int]:
+        """複数のアイテムを1往復で追加し、IDを返す"""
+        if not payloads:
+            return []
+        now = datetime.utcnow()
+        available_at = now + timedelta(seconds=delay)
+        rows = [
+            {
+                "queue_name": self.queue_name,
+                "payload": payload,
+                "status": STATUS_PENDING,
+                "attempts": 0,
+                "available_at": available_at,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for payload in payloads
+        ]
+        async with self._database.session() as session:
+            ids: ScalarResult[int] = await session.scalars(
+                insert(WorkQueueItemModel).returning(
+                    WorkQueueItemModel.id, sort_by_parameter_order=True
+                ),
+                rows,
+            )
+            return list(ids)
+
+    async def dead_letter_expired(self) -> List[QueueItem]:
+        """リース切れのまま試行回数の上限に達したアイテムをデッドレターにする
+
+        デッドレターにしたアイテムを返す。
+        """
+        now = datetime.utcnow()
+        async with self._database.session() as session:
+            models: ScalarResult[WorkQueueItemModel] = await session.scalars(
+                update(WorkQueueItemModel)
+                .where(
+                    WorkQueueItemModel.queue_name == self.queue_name,
+                    WorkQueueItemModel.status.in_(
+                        (STATUS_PENDING, STATUS_LEASED)
+                    ),
+                    WorkQueueItemModel.available_at <= now,
+                    WorkQueueItemModel.attempts >= self._max_attempts,
+                )
+                .values(
+                    status=STATUS_DEAD,
+                    lease_token=None,
+                    last_error=func.coalesce(
+                        WorkQueueItemModel.last_error,
+                        "visibility timeout exceeded",
+                    ),
+                    updated_at=now,
+                )
+                .returning(WorkQueueItemModel)
+                .execution_options(synchronize_session=False)
+            )
+            return sorted(
+                (_to_item(model) for model in models),
+                key=lambda item: item.id,
+            )
+
+    async def lease(
+        self, limit: int = 10, visibility_timeout: Optional[float] = None
+    ) -> List[QueueItem]:
+        """取り出し可能なアイテムをリースする
+
+        リース中のアイテムは可視性タイムアウトまで他のワーカーから
+        見えない。タイムアウトまでにackされなければ再度取り出される。
+        試行回数が上限に達したアイテムはリースせず、
+        dead_letter_expired()でデッドレターにする。
+        """
+        now = datetime.utcnow()
+        timeout = (
+            self._visibility_timeout
+            if visibility_timeout is None
+            else visibility_timeout
+        )
+        claimable = (
+            WorkQueueItemModel.queue_name == self.queue_name,
+            WorkQueueItemModel.status.in_((STATUS_PENDING, STATUS_LEASED)),
+            WorkQueueItemModel.available_at <= now,
+            WorkQueueItemModel.attempts < self._max_attempts,
+        )
+        async with self._database.session() as session:
+            # 取得と確保を単一のUPDATEで行い、複数ワーカー間で競合させない
+            candidate_ids = (
+                select(WorkQueueItemModel.id)
+                .where(*claimable)
+                .order_by(WorkQueueItemModel.id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            models: ScalarResult[WorkQueueItemModel] = await session.scalars(
+                update(WorkQueueItemModel)
+                .where(WorkQueueItemModel.id.in_(candidate_ids), *claimable)
+                .values(
+                    status=STATUS_LEASED,
+                    attempts=WorkQueueItemModel.attempts + 1,
+                    lease_token=uuid.uuid4().hex,
+                    available_at=now + timedelta(seconds=timeout),
+                    updated_at=now,
+                )
+                .returning(WorkQueueItemModel)
+                .execution_options(synchronize_session=False)
+            )
+            return sorted(
+                (_to_item(model) for model in models),
+                key=lambda item: item.id,
+            )
+
+    async def ack(self, item: QueueItem) -> bool:
+        """処理完了としてアイテムを削除
+
+        リースが期限切れで他のワーカーに再取得されていた場合はFalseを返す。
+        """
+        async with self._database.session() as session:
+            deleted: ScalarResult[int] = await session.scalars(
+                delete(WorkQueueItemModel)
+                .where(
+                    WorkQueueItemModel.id == item.id,
+                    WorkQueueItemModel.lease_token == item.lease_token,
+                )
+                .returning(WorkQueueItemModel.id)
+            )
+            return deleted.first() is not None
+
+    async def nack(
+        self,
+        item: QueueItem,
+        error: Optional[str] = None,
+        delay: Optional[float] = None,
+    ) -> bool:
+        """処理失敗としてアイテムを戻す
+
+        delay未指定時は試行回数に応じた指数バックオフで再取り出しを遅らせる。
+        試行回数が上限に達していればデッドレターにする。
+        """
+        now = datetime.utcnow()
+        if self.is_final_attempt(item):
+            values: Dict[str, Any] = {"status": STATUS_DEAD}
+        else:
+            backoff = (
+                self._retry_delay * (2 ** max(item.attempts - 1, 0))
+                if delay is None
+                else delay
+            )
+            values = {
+                "status": STATUS_PENDING,
+                "available_at": now + timedelta(seconds=backoff),
+            }
+        values.update(lease_token=None, last_error=error, updated_at=now)
+        async with self._database.session() as session:
+            updated: ScalarResult[int] = await session.scalars(
+                update(WorkQueueItemModel)
+                .where(
+                    WorkQueueItemModel.id == item.id,
+                    WorkQueueItemModel.lease_token == item.lease_token,
+                )
+                .values(**values)
+                .returning(WorkQueueItemModel.id)
+            )
+            return updated.first() is not None
+
+    async def depth(self) -> int:
+        """未完了（待機中・リース中）のアイテム数を取得"""
+        async with self._database.session() as session:
+            count = await session.scalar(
+                select(func.count())
+                .select_from(WorkQueueItemModel)
+                .where(
+                    WorkQueueItemModel.queue_name == self.queue_name,
+                    WorkQueueItemModel.status.in_(
+                        (STATUS_PENDING, STATUS_LEASED)
+                    ),
+                )
+            )
+            return int(count or 0)
+
+    async def list_dead_letters(self, limit: int = 100) -> List[QueueItem]:
+        """デッドレターのアイテムを取得"""
+        async with self._database.session() as session:
+            models: ScalarResult[WorkQueueItemModel] = await session.scalars(
+                select(WorkQueueItemModel)
+                .where(
+                    WorkQueueItemModel.queue_name == self.queue_name,
+                    WorkQueueItemModel.status == STATUS_DEAD,
+                )
+                .order_by(WorkQueueItemModel.id)
+                .limit(limit)
+            )
+            return [_to_item(model) for model in models]
+
+    async def requeue_dead_letter(self, item_id: int) -> bool:
+        """デッドレターのアイテムを試行回数をリセットして再投入"""
+        now = datetime.utcnow()
+        async with self._database.session() as session:
+            updated: ScalarResult[int] = await session.scalars(
+                update(WorkQueueItemModel)
+                .where(
+                    WorkQueueItemModel.id == item_id,
+                    WorkQueueItemModel.status == STATUS_DEAD,
+                )
+                .values(
+                    status=STATUS_PENDING,
+                    attempts=0,
+                    available_at=now,
+                    updated_at=now,
+                )
+                .returning(WorkQueueItemModel.id)
+            )
+            return updated.first() is not None
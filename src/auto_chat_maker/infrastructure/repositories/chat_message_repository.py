@@ -0,0 +1,315 @@
+"""
+チャットメッセージリポジトリのSQLAlchemy実装
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, cast
+
+from sqlalchemy import (
+    CursorResult,
+    Insert,
+    ScalarResult,
+    Select,
+    delete,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.database.models import ChatMessageModel
+from auto_chat_maker.infrastructure.repositories.pagination import (
+    DEFAULT_CHUNK_SIZE,
+    apply_keyset,
+    stream_entities,
+)
+from auto_chat_maker.utils.exceptions import DatabaseError
+
+
+def _to_entity(model: ChatMessageModel) -> ChatMessage:
+    return ChatMessage(
+        id=model.id,
+        message_id=model.message_id,
+        chat_id=model.chat_id,
+        thread_id=model.thread_id,
+        content=model.content,
+        sender_id=model.sender_id,
+        sender_name=model.sender_name,
+        message_type=model.message_type,
+        sent_at=model.sent_at,
+        processed_at=model.processed_at,
+        is_processed=model.is_processed,
+        metadata=model.metadata_ or {},
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+    )
+
+
+def _to_row(message: ChatMessage) -> Dict[str, Any]:
+    return {
+        "message_id": message.message_id,
+        "chat_id": message.chat_id,
+        "thread_id": message.thread_id,
+        "content": message.content,
+        "sender_id": message.sender_id,
+        "sender_name": message.sender_name,
+        "message_type": message.message_type,
+        "sent_at": message.sent_at,
+        "processed_at": message.processed_at,
+        "is_processed": message.is_processed,
+        "metadata_": dict(message.metadata),
+        "created_at": message.created_at,
+        "updated_at": message.updated_at,
+    }
+
+
+def _unique_by_message_id(messages: List[ChatMessage]) -> List[ChatMessage]:
+    """バッチ内でmessage_idが重複するものは先頭のみ残す"""
+    seen: Dict[str, ChatMessage] = {}
+    for message in messages:
+        seen.setdefault(message.message_id, message)
+    return list(seen.values())
+
+
+def _apply(model: ChatMessageModel, message: ChatMessage) -> None:
+    model.message_id = message.message_id
+    model.chat_id = message.chat_id
+    model.thread_id = message.thread_id
+    model.content = message.content
+    model.sender_id = message.sender_id
+    model.sender_name = message.sender_name
+    model.message_type = message.message_type
+    model.sent_at = message.sent_at
+    model.processed_at = message.processed_at
+    model.is_processed = message.is_processed
+    model.metadata_ = dict(message.metadata)
+    model.created_at = message.created_at
+    model.updated_at = message.updated_at
+
+
+class SQLAlchemyChatMessageRepository:
+    """ChatMessageRepositoryのSQLAlchemy実装"""
+
+    def __init__(self, database: Database) -> None:
+        self._database = database
+
+    async def create(self, message: ChatMessage) -> ChatMessage:
+        """メッセージを作成"""
+        model = ChatMessageModel()
+        _apply(model, message)
+        async with self._database.session() as session:
+            session.add(model)
+            await session.flush()
+            return _to_entity(model)
+
+    async def create_many(
+        self, messages: List[ChatMessage]
+    ) -> List[ChatMessage]:
+        """複数のメッセージを一括作成
+
+        executemanyで1往復にまとめる。message_idが既存と重複する場合は
+        DatabaseErrorとなり、バッチ全体がロールバックされる。
+        """
+        if not messages:
+            return []
+        async with self._database.session() as session:
+            models: ScalarResult[ChatMessageModel] = await session.scalars(
+                insert(ChatMessageModel).returning(
+                    ChatMessageModel, sort_by_parameter_order=True
+                ),
+                [_to_row(message) for message in messages],
+            )
+            return [_to_entity(model) for model in models]
+
+    async def upsert_many(
+        self, messages: List[ChatMessage]
+    ) -> List[ChatMessage]:
+        """message_idをキーに一括登録し、新規登録分のみを返す
+
+        ``INSERT ... ON CONFLICT(message_id) DO NOTHING``で既存行を
+        スキップするため、Graphからの再配信を事前チェックなしで扱える。
+        """
+        unique_messages = _unique_by_message_id(messages)
+        if not unique_messages:
+            return []
+        statement = self._insert_ignoring_duplicates()
+        async with self._database.session() as session:
+            models: ScalarResult[ChatMessageModel] = await session.scalars(
+                statement.returning(ChatMessageModel),
+                [_to_row(message) for message in unique_messages],
+            )
+            inserted = {model.message_id: model for model in models}
+        # 入力順を保って返す
+        return [
+            _to_entity(inserted[message.message_id])
+            for message in unique_messages
+            if message.message_id in inserted
+        ]
+
+    def _insert_ignoring_duplicates(self) -> Insert:
+        """message_id重複時に何もしないINSERT文を生成"""
+        backend = self._database.url.get_backend_name()
+        if backend == "sqlite":
+            return sqlite.insert(ChatMessageModel).on_conflict_do_nothing(
+                index_elements=[ChatMessageModel.message_id]
+            )
+        if backend == "postgresql":
+            return postgresql.insert(ChatMessageModel).on_conflict_do_nothing(
+                index_elements=[ChatMessageModel.message_id]
+            )
+        raise DatabaseError(
+            "一括アップサートに対応していないデータベースです",
+            error_code="UNSUPPORTED_BACKEND",
+            details={"backend": backend},
+        )
+
+    async def get_by_id(self, message_id: int) -> Optional[ChatMessage]:
+        """IDでメッセージを取得"""
+        async with self._database.session() as session:
+            model = await session.get(ChatMessageModel, message_id)
+            return _to_entity(model) if model is not None else None
+
+    async def get_by_message_id(
+        self, message_id: str
+    ) -> Optional[ChatMessage]:
+        """Microsoft TeamsのメッセージIDでメッセージを取得"""
+        async with self._database.session() as session:
+            model = await session.scalar(
+                select(ChatMessageModel).where(
+                    ChatMessageModel.message_id == message_id
+                )
+            )
+            return _to_entity(model) if model is not None else None
+
+    async def find_existing_message_ids(
+        self, message_ids: List[str]
+    ) -> Set[str]:
+        """登録済みのmessage_idを取得
+
+        message_idのユニークインデックスのみを参照し、行は読み込まない。
+        """
+        if not message_ids:
+            return set()
+        async with self._database.session() as session:
+            existing: ScalarResult[str] = await session.scalars(
+                select(ChatMessageModel.message_id).where(
+                    ChatMessageModel.message_id.in_(set(message_ids))
+                )
+            )
+            return set(existing)
+
+    async def list_recent_message_ids(self, limit: int) -> List[str]:
+        """最近登録されたメッセージのmessage_idを取得（新しい順）"""
+        async with self._database.session() as session:
+            recent: ScalarResult[str] = await session.scalars(
+                select(ChatMessageModel.message_id)
+                .order_by(ChatMessageModel.id.desc())
+                .limit(limit)
+            )
+            return list(recent)
+
+    async def update(self, message: ChatMessage) -> ChatMessage:
+        """メッセージを更新"""
+        async with self._database.session() as session:
+            model = (
+                await session.get(ChatMessageModel, message.id)
+                if message.id is not None
+                else None
+            )
+            if model is None:
+                raise DatabaseError(
+                    "更新対象のメッセージが見つかりません",
+                    error_code="NOT_FOUND",
+                    details={"id": message.id},
+                )
+            _apply(model, message)
+            await session.flush()
+            return _to_entity(model)
+
+    async def delete(self, message_id: int) -> bool:
+        """メッセージを削除"""
+        async with self._database.session() as session:
+            result = cast(
+                CursorResult,
+                await session.execute(
+                    delete(ChatMessageModel).where(
+                        ChatMessageModel.id == message_id
+                    )
+                ),
+            )
+            return bool(result.rowcount)
+
+    async def list_unprocessed(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[ChatMessage]:
+        """未処理のメッセージを取得
+
+        after_id・limitを指定するとID昇順のキーセットページを返す。
+        """
+        statement = apply_keyset(
+            self._unprocessed_statement(), ChatMessageModel.id, after_id, limit
+        )
+        async with self._database.session() as session:
+            models: ScalarResult[ChatMessageModel] = await session.scalars(
+                statement
+            )
+            return [_to_entity(model) for model in models]
+
+    def iter_unprocessed(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[ChatMessage]:
+        """未処理のメッセージをチャンク単位で逐次取得"""
+        return stream_entities(
+            self._database,
+            apply_keyset(self._unprocessed_statement(), ChatMessageModel.id),
+            _to_entity,
+            chunk_size,
+        )
+
+    @staticmethod
+    def _unprocessed_statement() -> Select:
+        return select(ChatMessageModel).where(
+            ChatMessageModel.is_processed.is_(False)
+        )
+
+    async def list_by_chat_id(
+        self,
+        chat_id: str,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[ChatMessage]:
+        """チャットIDでメッセージを取得
+
+        after_id・limitを指定するとID昇順のキーセットページを返す。
+        """
+        statement = apply_keyset(
+            self._by_chat_id_statement(chat_id),
+            ChatMessageModel.id,
+            after_id,
+            limit,
+        )
+        async with self._database.session() as session:
+            models: ScalarResult[ChatMessageModel] = await session.scalars(
+                statement
+            )
+            return [_to_entity(model) for model in models]
+
+    def iter_by_chat_id(
+        self, chat_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[ChatMessage]:
+        """チャットIDでメッセージをチャンク単位で逐次取得"""
+        return stream_entities(
+            self._database,
+            apply_keyset(
+                self._by_chat_id_statement(chat_id), ChatMessageModel.id
+            ),
+            _to_entity,
+            chunk_size,
+        )
+
+    @staticmethod
+    def _by_chat_id_statement(chat_id: str) -> Select:
+        return select(ChatMessageModel).where(
+            ChatMessageModel.chat_id == chat_id
+        )
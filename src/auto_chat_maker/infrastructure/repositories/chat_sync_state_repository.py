@@ -0,0 +1,77 @@
+"""
+チャット同期状態リポジトリのSQLAlchemy実装
+"""
+from typing import List, Optional
+
+from sqlalchemy import ScalarResult, select, union
+
+from auto_chat_maker.domain.models.chat_sync_state import ChatSyncState
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.database.models import (
+    ChatMessageModel,
+    ChatSyncStateModel,
+)
+
+
+def _to_entity(model: ChatSyncStateModel) -> ChatSyncState:
+    return ChatSyncState(
+        id=model.id,
+        chat_id=model.chat_id,
+        watermark=model.watermark,
+        synced_at=model.synced_at,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+    )
+
+
+def _apply(model: ChatSyncStateModel, state: ChatSyncState) -> None:
+    model.chat_id = state.chat_id
+    model.watermark = state.watermark
+    model.synced_at = state.synced_at
+    model.created_at = state.created_at
+    model.updated_at = state.updated_at
+
+
+class SQLAlchemyChatSyncStateRepository:
+    """ChatSyncStateRepositoryのSQLAlchemy実装"""
+
+    def __init__(self, database: Database) -> None:
+        self._database = database
+
+    async def get(self, chat_id: str) -> Optional[ChatSyncState]:
+        """チャットIDで同期状態を取得"""
+        async with self._database.session() as session:
+            model = await session.scalar(
+                select(ChatSyncStateModel).where(
+                    ChatSyncStateModel.chat_id == chat_id
+                )
+            )
+            return _to_entity(model) if model is not None else None
+
+    async def save(self, state: ChatSyncState) -> ChatSyncState:
+        """同期状態を登録・更新（chat_idが既存なら上書き）"""
+        async with self._database.session() as session:
+            model = await session.scalar(
+                select(ChatSyncStateModel).where(
+                    ChatSyncStateModel.chat_id == state.chat_id
+                )
+            )
+            if model is None:
+                model = ChatSyncStateModel()
+                session.add(model)
+            else:
+                # 作成日時は最初に登録した値を保つ
+                state.created_at = model.created_at
+            _apply(model, state)
+            await session.flush()
+            return _to_entity(model)
+
+    async def list_chat_ids(self) -> List[str]:
+        """同期対象のチャットID（同期状態またはメッセージがあるもの）を取得"""
+        statement = union(
+            select(ChatSyncStateModel.chat_id),
+            select(ChatMessageModel.chat_id),
+        )
+        async with self._database.session() as session:
+            chat_ids: ScalarResult[str] = await session.scalars(statement)
+            return sorted(chat_ids)
@@ -0,0 +1,53 @@
+"""
+キーセットページネーション・ストリーミング取得の共通処理
+"""
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncScalarResult
+from sqlalchemy.orm import InstrumentedAttribute
+
+from auto_chat_maker.infrastructure.database.connection import Database
+
+T = TypeVar("T")
+
+# ストリーミング取得時に1回のフェッチで読み込む行数の既定値
+DEFAULT_CHUNK_SIZE = 500
+
+
+def apply_keyset(
+    statement: Select,
+    id_column: InstrumentedAttribute[int],
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """ID昇順のキーセットページネーションを適用
+
+    OFFSETを使わず ``id > after_id`` で続きを取得するため、
+    ページが進んでもインデックスの範囲走査のみで済む。
+    """
+    if after_id is not None:
+        statement = statement.where(id_column > after_id)
+    statement = statement.order_by(id_column)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+async def stream_entities(
+    database: Database,
+    statement: Select,
+    to_entity: Callable[[Any], T],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[T]:
+    """サーバーサイドカーソルからチャンク単位でエンティティを取り出す
+
+    結果全体をメモリに展開せず、chunk_size行ずつフェッチして変換する。
+    """
+    async with database.session() as session:
+        result: AsyncScalarResult[Any] = await session.stream_scalars(
+            statement.execution_options(yield_per=chunk_size)
+        )
+        async for partition in result.partitions():
+            for model in partition:
+                yield to_entity(model)
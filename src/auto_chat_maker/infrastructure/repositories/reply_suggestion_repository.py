@@ -0,0 +1,200 @@
+"""
+返信案リポジトリのSQLAlchemy実装
+"""
+from typing import AsyncIterator, List, Optional, cast
+
+from sqlalchemy import CursorResult, ScalarResult, Select, delete, select
+
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.database.models import (
+    ReplySuggestionModel,
+)
+from auto_chat_maker.infrastructure.repositories.pagination import (
+    DEFAULT_CHUNK_SIZE,
+    apply_keyset,
+    stream_entities,
+)
+from auto_chat_maker.utils.exceptions import DatabaseError
+
+
+def _to_entity(model: ReplySuggestionModel) -> ReplySuggestion:
+    return ReplySuggestion(
+        id=model.id,
+        message_id=model.message_id,
+        content=model.content,
+        confidence_score=model.confidence_score,
+        is_selected=model.is_selected,
+        is_sent=model.is_sent,
+        sent_at=model.sent_at,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+    )
+
+
+def _apply(model: ReplySuggestionModel, suggestion: ReplySuggestion) -> None:
+    model.message_id = suggestion.message_id
+    model.content = suggestion.content
+    model.confidence_score = suggestion.confidence_score
+    model.is_selected = suggestion.is_selected
+    model.is_sent = suggestion.is_sent
+    model.sent_at = suggestion.sent_at
+    model.created_at = suggestion.created_at
+    model.updated_at = suggestion.updated_at
+
+
+class SQLAlchemyReplySuggestionRepository:
+    """ReplySuggestionRepositoryのSQLAlchemy実装"""
+
+    def __init__(self, database: Database) -> None:
+        self._database = database
+
+    async def create(self, suggestion: ReplySuggestion) -> ReplySuggestion:
+        """返信案を作成"""
+        model = ReplySuggestionModel()
+        _apply(model, suggestion)
+        async with self._database.session() as session:
+            session.add(model)
+            await session.flush()
+            return _to_entity(model)
+
+    async def create_many(
+        self, suggestions: List[ReplySuggestion]
+    ) -> List[ReplySuggestion]:
+        """複数の返信案を1つのトランザクションで作成
+
+        途中で失敗した場合は全件ロールバックされ、一部のみ保存されることはない。
+        """
+        if not suggestions:
+            return []
+        models = []
+        for suggestion in suggestions:
+            model = ReplySuggestionModel()
+            _apply(model, suggestion)
+            models.append(model)
+        async with self._database.session() as session:
+            session.add_all(models)
+            await session.flush()
+            return [_to_entity(model) for model in models]
+
+    async def get_by_id(self, suggestion_id: int) -> Optional[ReplySuggestion]:
+        """IDで返信案を取得"""
+        async with self._database.session() as session:
+            model = await session.get(ReplySuggestionModel, suggestion_id)
+            return _to_entity(model) if model is not None else None
+
+    async def get_by_message_id(
+        self, message_id: str
+    ) -> List[ReplySuggestion]:
+        """メッセージIDで返信案を取得"""
+        async with self._database.session() as session:
+            models: ScalarResult[ReplySuggestionModel] = await session.scalars(
+                select(ReplySuggestionModel)
+                .where(ReplySuggestionModel.message_id == message_id)
+                .order_by(ReplySuggestionModel.id)
+            )
+            return [_to_entity(model) for model in models]
+
+    async def update(self, suggestion: ReplySuggestion) -> ReplySuggestion:
+        """返信案を更新"""
+        async with self._database.session() as session:
+            model = (
+                await session.get(ReplySuggestionModel, suggestion.id)
+                if suggestion.id is not None
+                else None
+            )
+            if model is None:
+                raise DatabaseError(
+                    "更新対象の返信案が見つかりません",
+                    error_code="NOT_FOUND",
+                    details={"id": suggestion.id},
+                )
+            _apply(model, suggestion)
+            await session.flush()
+            return _to_entity(model)
+
+    async def delete(self, suggestion_id: int) -> bool:
+        """返信案を削除"""
+        async with self._database.session() as session:
+            result = cast(
+                CursorResult,
+                await session.execute(
+                    delete(ReplySuggestionModel).where(
+                        ReplySuggestionModel.id == suggestion_id
+                    )
+                ),
+            )
+            return bool(result.rowcount)
+
+    async def list_selected(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[ReplySuggestion]:
+        """選択済みの返信案を取得
+
+        after_id・limitを指定するとID昇順のキーセットページを返す。
+        """
+        statement = apply_keyset(
+            self._selected_statement(),
+            ReplySuggestionModel.id,
+            after_id,
+            limit,
+        )
+        async with self._database.session() as session:
+            models: ScalarResult[ReplySuggestionModel] = await session.scalars(
+                statement
+            )
+            return [_to_entity(model) for model in models]
+
+    def iter_selected(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[ReplySuggestion]:
+        """選択済みの返信案をチャンク単位で逐次取得"""
+        return stream_entities(
+            self._database,
+            apply_keyset(self._selected_statement(), ReplySuggestionModel.id),
+            _to_entity,
+            chunk_size,
+        )
+
+    @staticmethod
+    def _selected_statement() -> Select:
+        return select(ReplySuggestionModel).where(
+            ReplySuggestionModel.is_selected.is_(True)
+        )
+
+    async def list_sent(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[ReplySuggestion]:
+        """送信済みの返信案を取得
+
+        after_id・limitを指定するとID昇順のキーセットページを返す。
+        """
+        statement = apply_keyset(
+            self._sent_statement(), ReplySuggestionModel.id, after_id, limit
+        )
+        async with self._database.session() as session:
+            models: ScalarResult[ReplySuggestionModel] = await session.scalars(
+                statement
+            )
+            return [_to_entity(model) for model in models]
+
+    def iter_sent(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[ReplySuggestion]:
+        """送信済みの返信案をチャンク単位で逐次取得"""
+        return stream_entities(
+            self._database,
+            apply_keyset(self._sent_statement(), ReplySuggestionModel.id),
+            _to_entity,
+            chunk_size,
+        )
+
+    @staticmethod
+    def _sent_statement() -> Select:
+        return select(ReplySuggestionModel).where(
+            ReplySuggestionModel.is_sent.is_(True)
+        )
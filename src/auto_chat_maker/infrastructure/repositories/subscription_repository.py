@@ -0,0 +1,154 @@
+"""
+サブスクリプションリポジトリのSQLAlchemy実装
+"""
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, cast
+
+from sqlalchemy import CursorResult, ScalarResult, Select, delete, select
+
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.database.models import SubscriptionModel
+from auto_chat_maker.infrastructure.repositories.pagination import (
+    DEFAULT_CHUNK_SIZE,
+    apply_keyset,
+    stream_entities,
+)
+from auto_chat_maker.utils.exceptions import DatabaseError
+
+
+def _to_entity(model: SubscriptionModel) -> Subscription:
+    return Subscription(
+        id=model.id,
+        subscription_id=model.subscription_id,
+        resource=model.resource,
+        change_type=model.change_type,
+        client_state=model.client_state,
+        notification_url=model.notification_url,
+        expiration_date_time=model.expiration_date_time,
+        is_active=model.is_active,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+    )
+
+
+def _apply(model: SubscriptionModel, subscription: Subscription) -> None:
+    model.subscription_id = subscription.subscription_id
+    model.resource = subscription.resource
+    model.change_type = subscription.change_type
+    model.client_state = subscription.client_state
+    model.notification_url = subscription.notification_url
+    model.expiration_date_time = subscription.expiration_date_time
+    model.is_active = subscription.is_active
+    model.created_at = subscription.created_at
+    model.updated_at = subscription.updated_at
+
+
+class SQLAlchemySubscriptionRepository:
+    """SubscriptionRepositoryのSQLAlchemy実装"""
+
+    def __init__(self, database: Database) -> None:
+        self._database = database
+
+    async def create(self, subscription: Subscription) -> Subscription:
+        """サブスクリプションを作成"""
+        model = SubscriptionModel()
+        _apply(model, subscription)
+        async with self._database.session() as session:
+            session.add(model)
+            await session.flush()
+            return _to_entity(model)
+
+    async def get_by_id(self, subscription_id: int) -> Optional[Subscription]:
+        """IDでサブスクリプションを取得"""
+        async with self._database.session() as session:
+            model = await session.get(SubscriptionModel, subscription_id)
+            return _to_entity(model) if model is not None else None
+
+    async def get_by_subscription_id(
+        self, subscription_id: str
+    ) -> Optional[Subscription]:
+        """Microsoft GraphのサブスクリプションIDで取得"""
+        async with self._database.session() as session:
+            model = await session.scalar(
+                select(SubscriptionModel).where(
+                    SubscriptionModel.subscription_id == subscription_id
+                )
+            )
+            return _to_entity(model) if model is not None else None
+
+    async def update(self, subscription: Subscription) -> Subscription:
+        """サブスクリプションを更新"""
+        async with self._database.session() as session:
+            model = (
+                await session.get(SubscriptionModel, subscription.id)
+                if subscription.id is not None
+                else None
+            )
+            if model is None:
+                raise DatabaseError(
+                    "更新対象のサブスクリプションが見つかりません",
+                    error_code="NOT_FOUND",
+                    details={"id": subscription.id},
+                )
+            _apply(model, subscription)
+            await session.flush()
+            return _to_entity(model)
+
+    async def delete(self, subscription_id: int) -> bool:
+        """サブスクリプションを削除"""
+        async with self._database.session() as session:
+            result = cast(
+                CursorResult,
+                await session.execute(
+                    delete(SubscriptionModel).where(
+                        SubscriptionModel.id == subscription_id
+                    )
+                ),
+            )
+            return bool(result.rowcount)
+
+    async def list_active(self) -> List[Subscription]:
+        """アクティブなサブスクリプションを取得"""
+        async with self._database.session() as session:
+            models: ScalarResult[SubscriptionModel] = await session.scalars(
+                select(SubscriptionModel)
+                .where(SubscriptionModel.is_active.is_(True))
+                .order_by(SubscriptionModel.id)
+            )
+            return [_to_entity(model) for model in models]
+
+    async def list_expired(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Subscription]:
+        """期限切れのサブスクリプションを取得
+
+        after_id・limitを指定するとID昇順のキーセットページを返す。
+        """
+        statement = apply_keyset(
+            self._expired_statement(), SubscriptionModel.id, after_id, limit
+        )
+        async with self._database.session() as session:
+            models: ScalarResult[SubscriptionModel] = await session.scalars(
+                statement
+            )
+            return [_to_entity(model) for model in models]
+
+    def iter_expired(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[Subscription]:
+        """期限切れのサブスクリプションをチャンク単位で逐次取得"""
+        return stream_entities(
+            self._database,
+            apply_keyset(self._expired_statement(), SubscriptionModel.id),
+            _to_entity,
+            chunk_size,
+        )
+
+    @staticmethod
+    def _expired_statement() -> Select:
+        return select(SubscriptionModel).where(
+            SubscriptionModel.expiration_date_time < datetime.utcnow()
+        )
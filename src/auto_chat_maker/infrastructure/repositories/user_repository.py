@@ -0,0 +1,135 @@
+"""
+ユーザーリポジトリのSQLAlchemy実装
+"""
+from typing import AsyncIterator, List, Optional, cast
+
+from sqlalchemy import CursorResult, ScalarResult, Select, delete, select
+
+from auto_chat_maker.domain.models.user import User
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.database.models import UserModel
+from auto_chat_maker.infrastructure.repositories.pagination import (
+    DEFAULT_CHUNK_SIZE,
+    apply_keyset,
+    stream_entities,
+)
+from auto_chat_maker.utils.exceptions import DatabaseError
+
+
+def _to_entity(model: UserModel) -> User:
+    return User(
+        id=model.id,
+        email=model.email,
+        name=model.name,
+        microsoft_id=model.microsoft_id,
+        is_active=model.is_active,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+    )
+
+
+def _apply(model: UserModel, user: User) -> None:
+    model.email = user.email
+    model.name = user.name
+    model.microsoft_id = user.microsoft_id
+    model.is_active = user.is_active
+    model.created_at = user.created_at
+    model.updated_at = user.updated_at
+
+
+class SQLAlchemyUserRepository:
+    """UserRepositoryのSQLAlchemy実装"""
+
+    def __init__(self, database: Database) -> None:
+        self._database = database
+
+    async def create(self, user: User) -> User:
+        """ユーザーを作成"""
+        model = UserModel()
+        _apply(model, user)
+        async with self._database.session() as session:
+            session.add(model)
+            await session.flush()
+            return _to_entity(model)
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """IDでユーザーを取得"""
+        async with self._database.session() as session:
+            model = await session.get(UserModel, user_id)
+            return _to_entity(model) if model is not None else None
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        """メールアドレスでユーザーを取得"""
+        async with self._database.session() as session:
+            model = await session.scalar(
+                select(UserModel).where(UserModel.email == email)
+            )
+            return _to_entity(model) if model is not None else None
+
+    async def get_by_microsoft_id(self, microsoft_id: str) -> Optional[User]:
+        """Microsoft IDでユーザーを取得"""
+        async with self._database.session() as session:
+            model = await session.scalar(
+                select(UserModel).where(UserModel.microsoft_id == microsoft_id)
+            )
+            return _to_entity(model) if model is not None else None
+
+    async def update(self, user: User) -> User:
+        """ユーザーを更新"""
+        async with self._database.session() as session:
+            model = (
+                await session.get(UserModel, user.id)
+                if user.id is not None
+                else None
+            )
+            if model is None:
+                raise DatabaseError(
+                    "更新対象のユーザーが見つかりません",
+                    error_code="NOT_FOUND",
+                    details={"id": user.id},
+                )
+            _apply(model, user)
+            await session.flush()
+            return _to_entity(model)
+
+    async def delete(self, user_id: int) -> bool:
+        """ユーザーを削除"""
+        async with self._database.session() as session:
+            result = cast(
+                CursorResult,
+                await session.execute(
+                    delete(UserModel).where(UserModel.id == user_id)
+                ),
+            )
+            return bool(result.rowcount)
+
+    async def list_all(
+        self,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[User]:
+        """全ユーザーを取得
+
+        after_id・limitを指定するとID昇順のキーセットページを返す。
+        """
+        statement = apply_keyset(
+            self._all_statement(), UserModel.id, after_id, limit
+        )
+        async with self._database.session() as session:
+            models: ScalarResult[UserModel] = await session.scalars(statement)
+            return [_to_entity(model) for model in models]
+
+    def iter_all(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[User]:
+        """全ユーザーをチャンク単位で逐次取得"""
+        return stream_entities(
+            self._database,
+            apply_keyset(self._all_statement(), UserModel.id),
+            _to_entity,
+            chunk_size,
+        )
+
+    @staticmethod
+    def _all_statement() -> Select:
+        return select(UserModel)
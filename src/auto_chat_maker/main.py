@@ -1,13 +1,15 @@
 """
 Auto Chat Maker メインアプリケーション
 """
-from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, List, Optional
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.routing import Route
 
 from auto_chat_maker.api.middleware.error_handler import (
     auto_chat_maker_exception_handler,
@@ -15,33 +17,357 @@ from auto_chat_maker.api.middleware.error_handler import (
     http_exception_handler,
     validation_exception_handler,
 )
+from auto_chat_maker.api.middleware.metrics import MetricsMiddleware
+from auto_chat_maker.api.middleware.timing import TimedRoute, TimingMiddleware
 from auto_chat_maker.config.settings import get_settings
 from auto_chat_maker.utils.exceptions import AutoChatMakerException
-from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.leader_lock import FileLeaderLock
+from auto_chat_maker.utils.log_sampling import LogSampler
+from auto_chat_maker.utils.logger import (
+    configure_logging,
+    flush_logging,
+    get_logger,
+)
+from auto_chat_maker.utils.metrics import (
+    DB_POOL_CONNECTIONS,
+    WORK_QUEUE_DEPTH,
+    get_metrics_registry,
+)
+from auto_chat_maker.utils.profiling import get_slow_callback_detector
+
+if TYPE_CHECKING:
+    # SQLAlchemy・httpxを読み込むモジュールはlifespan内でインポートし、
+    # モジュールのインポート（コールドスタート）を軽くする
+    from auto_chat_maker.infrastructure.database.connection import Database
+    from auto_chat_maker.infrastructure.queue.durable_queue import (
+        DurableWorkQueue,
+    )
 
 # ロガーの初期化
 logger = get_logger(__name__)
 
+_COLLECTOR_NAMES = ("db_pool", "work_queue_depth")
+
+
+def register_metrics_collectors(
+    database: "Database", queue: "DurableWorkQueue"
+) -> None:
+    """/metrics の出力時に参照で求める値のコレクターを登録"""
+    registry = get_metrics_registry()
+
+    def collect_db_pool() -> None:
+        for state, value in database.pool_status().items():
+            DB_POOL_CONNECTIONS.labels(state).set(value)
+
+    async def collect_queue_depth() -> None:
+        try:
+            depth = await queue.depth()
+        except Exception as e:
+            logger.warning("キューの深さを取得できません", error=str(e))
+            return
+        WORK_QUEUE_DEPTH.labels(queue.queue_name).set(depth)
+
+    registry.register_collector("db_pool", collect_db_pool)
+    registry.register_collector("work_queue_depth", collect_queue_depth)
+
+
+def unregister_metrics_collectors() -> None:
+    """コレクターの登録を解除"""
+    registry = get_metrics_registry()
+    for name in _COLLECTOR_NAMES:
+        registry.unregister_collector(name)
+
+
+async def cancel_task(task: "asyncio.Task[None]") -> None:
+    """タスクをキャンセルし、終了を待つ"""
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """アプリケーションのライフサイクル管理"""
-    # 起動時の処理
-    logger.info("アプリケーションを起動中...")
-    settings = get_settings()
-    logger.info(f"アプリケーション名: {settings.app_name}")
-    logger.info(f"バージョン: {settings.app_version}")
-    logger.info(f"デバッグモード: {settings.debug}")
+    from auto_chat_maker.application.schedulers.chat_sync_scheduler import (
+        ChatSyncScheduler,
+    )
+    from auto_chat_maker.application.schedulers.queue_worker import (
+        QueueWorker,
+    )
+    from auto_chat_maker.application.schedulers.reply_generation_scheduler import (  # noqa: E501
+        ReplyGenerationScheduler,
+        ReplyGenerationWaker,
+    )
+    from auto_chat_maker.application.schedulers.subscription_renewal_scheduler import (  # noqa: E501
+        SubscriptionRenewalScheduler,
+    )
+    from auto_chat_maker.infrastructure.database.connection import (
+        close_database,
+        init_database,
+    )
+    from auto_chat_maker.infrastructure.external.claude_client import (
+        ClaudeClient,
+    )
+    from auto_chat_maker.infrastructure.external.graph_client import (
+        GraphClient,
+    )
+    from auto_chat_maker.infrastructure.queue.durable_queue import (
+        DurableWorkQueue,
+    )
+    from auto_chat_maker.infrastructure.repositories.chat_message_repository import (  # noqa: E501
+        SQLAlchemyChatMessageRepository,
+    )
+    from auto_chat_maker.infrastructure.repositories.chat_sync_state_repository import (  # noqa: E501
+        SQLAlchemyChatSyncStateRepository,
+    )
+    from auto_chat_maker.infrastructure.repositories.reply_suggestion_repository import (  # noqa: E501
+        SQLAlchemyReplySuggestionRepository,
+    )
+    from auto_chat_maker.infrastructure.repositories.subscription_repository import (  # noqa: E501
+        SQLAlchemySubscriptionRepository,
+    )
+    from auto_chat_maker.services.ai_service import AIService
+    from auto_chat_maker.services.chat_sync import ChatSyncService
+    from auto_chat_maker.services.health_service import HealthService
+    from auto_chat_maker.services.notification_dedup import (
+        NotificationDeduplicator,
+    )
+    from auto_chat_maker.services.notification_processor import (
+        NotificationProcessor,
+    )
+    from auto_chat_maker.services.reply_cache import CachedReplyGenerator
+    from auto_chat_maker.services.subscription_index import (
+        IndexedSubscriptionRepository,
+        SubscriptionIndex,
+    )
+
+    async with AsyncExitStack() as stack:
+        # 起動時の処理
+        # 終了処理は作成と逆順に実行し、1つが失敗しても残りは必ず解放する
+        # （起動途中で失敗した場合も作成済みのものだけを解放する）
+        stack.callback(flush_logging)
+        logger.info("アプリケーションを起動中...")
+        settings = get_settings()
+        logger.info(f"アプリケーション名: {settings.app_name}")
+        logger.info(f"バージョン: {settings.app_version}")
+        logger.info(f"デバッグモード: {settings.debug}")
+
+        if settings.slow_callback_threshold > 0:
+            get_slow_callback_detector().enable(
+                settings.slow_callback_threshold
+            )
+            stack.callback(get_slow_callback_detector().disable)
+
+        database = await init_database(settings)
+        stack.push_async_callback(close_database)
+        app.state.database = database
+        app.state.notification_queue = DurableWorkQueue.from_settings(
+            settings, database, queue_name="graph_notifications"
+        )
+        if settings.enable_metrics:
+            register_metrics_collectors(database, app.state.notification_queue)
+            stack.callback(unregister_metrics_collectors)
+
+        # Webhook受信時のclientState検証・有効期限の管理用
+        # （リクエストごとにDBを参照しない）
+        subscription_index = SubscriptionIndex()
+        subscription_repository = IndexedSubscriptionRepository(
+            SQLAlchemySubscriptionRepository(database), subscription_index
+        )
+        await subscription_index.load(subscription_repository)
+        app.state.subscription_index = subscription_index
+        app.state.subscription_repository = subscription_repository
+        if settings.subscription_index_refresh_interval > 0:
+            index_refresh_task: "asyncio.Task[None]" = asyncio.create_task(
+                subscription_index.refresh_periodically(
+                    subscription_repository,
+                    settings.subscription_index_refresh_interval,
+                ),
+                name="subscription-index-refresh",
+            )
+            stack.push_async_callback(cancel_task, index_refresh_task)
 
-    yield
+        # 再送された通知をキューに入れる前に除外する
+        chat_message_repository = SQLAlchemyChatMessageRepository(database)
+        notification_deduplicator: Optional[NotificationDeduplicator] = None
+        if settings.notification_dedup_enabled:
+            notification_deduplicator = NotificationDeduplicator.from_settings(
+                settings, chat_message_repository
+            )
+            await notification_deduplicator.warm()
+        app.state.notification_deduplicator = notification_deduplicator
 
-    # 終了時の処理
-    logger.info("アプリケーションを終了中...")
+        # Claude APIクライアント（コネクションプールをアプリ全体で共有）
+        claude_client: Optional[ClaudeClient] = None
+        if settings.claude_api_key:
+            claude_client = ClaudeClient.from_settings(settings)
+            stack.push_async_callback(claude_client.aclose)
+        app.state.claude_client = claude_client
+        health_service = HealthService.from_settings(
+            settings, database, claude_client
+        )
+        stack.push_async_callback(health_service.aclose)
+        app.state.health_service = health_service
+
+        # Graph APIクライアント（コネクションプールをアプリ全体で共有）
+        graph_client: Optional[GraphClient] = getattr(
+            app.state, "graph_client", None
+        )
+        if (
+            graph_client is None
+            and settings.microsoft_tenant_id
+            and settings.microsoft_client_id
+            and settings.microsoft_client_secret
+        ):
+            graph_client = GraphClient.from_settings(settings)
+        if graph_client is not None:
+            stack.push_async_callback(graph_client.aclose)
+        app.state.graph_client = graph_client
+        if getattr(app.state, "subscription_renewer", None) is None:
+            app.state.subscription_renewer = graph_client
+
+        # 複数ワーカーで起動した場合はリーダーのワーカーだけが実行する
+        leader_schedulers: List[Callable[[], None]] = []
+        leader_lock = FileLeaderLock(settings.scheduler_lock_file)
+        stack.callback(leader_lock.release)
+
+        # 返信案生成スケジューラー（AIバックエンドが利用できる場合のみ）
+        reply_scheduler: Optional[ReplyGenerationScheduler] = None
+        reply_waker: Optional[ReplyGenerationWaker] = None
+        reply_wakeup_worker: Optional[QueueWorker] = None
+        reply_generator = getattr(app.state, "reply_generator", None)
+        reply_cache: Optional[CachedReplyGenerator] = None
+        if reply_generator is None and claude_client is not None:
+            reply_generator = AIService.from_settings(settings, claude_client)
+            if settings.reply_cache_enabled:
+                reply_cache = CachedReplyGenerator.from_settings(
+                    settings, reply_generator
+                )
+                stack.callback(reply_cache.close)
+                reply_generator = reply_cache
+        app.state.reply_cache = reply_cache
+        if settings.enable_ai_processing and reply_generator is not None:
+            reply_scheduler = ReplyGenerationScheduler.from_settings(
+                settings,
+                chat_message_repository,
+                SQLAlchemyReplySuggestionRepository(database),
+                reply_generator,
+            )
+            leader_schedulers.append(reply_scheduler.start)
+            stack.push_async_callback(reply_scheduler.stop)
+            # リーダー以外のワーカーで登録した新着はキュー経由でリーダーを起こす
+            reply_waker = ReplyGenerationWaker(
+                reply_scheduler,
+                DurableWorkQueue.from_settings(
+                    settings, database, queue_name="reply_generation_wakeup"
+                ),
+            )
+            reply_wakeup_worker = QueueWorker.from_settings(
+                settings, reply_waker.queue, reply_waker.handle
+            )
+            leader_schedulers.append(reply_wakeup_worker.start)
+            stack.push_async_callback(reply_wakeup_worker.stop)
+        app.state.reply_scheduler = reply_scheduler
+        app.state.reply_waker = reply_waker
+
+        # サブスクリプション更新スケジューラー（Graphクライアントがある場合のみ）
+        renewal_scheduler: Optional[SubscriptionRenewalScheduler] = None
+        subscription_renewer = getattr(app.state, "subscription_renewer", None)
+        if subscription_renewer is not None:
+            renewal_scheduler = SubscriptionRenewalScheduler.from_settings(
+                settings,
+                subscription_index,
+                subscription_repository,
+                subscription_renewer,
+            )
+            leader_schedulers.append(renewal_scheduler.start)
+            stack.push_async_callback(renewal_scheduler.stop)
+        app.state.renewal_scheduler = renewal_scheduler
+
+        # Webhookで取りこぼしたメッセージの差分同期（起動時と定期実行）
+        chat_sync_scheduler: Optional[ChatSyncScheduler] = None
+        if graph_client is not None and settings.chat_sync_enabled:
+            chat_sync_scheduler = ChatSyncScheduler.from_settings(
+                settings,
+                ChatSyncService.from_settings(
+                    settings,
+                    graph_client,
+                    chat_message_repository,
+                    SQLAlchemyChatSyncStateRepository(database),
+                    subscription_repository=subscription_repository,
+                ),
+                on_synced=reply_waker.wake
+                if reply_waker is not None
+                else None,
+            )
+            leader_schedulers.append(chat_sync_scheduler.start)
+            stack.push_async_callback(chat_sync_scheduler.stop)
+        app.state.chat_sync_scheduler = chat_sync_scheduler
+
+        # Webhookで投入された変更通知の処理（全ワーカーで並行して消費する）
+        queue_worker: Optional[QueueWorker] = None
+        if graph_client is not None:
+            notification_processor = NotificationProcessor(
+                graph_client,
+                chat_message_repository,
+                on_created=reply_waker.wake
+                if reply_waker is not None
+                else None,
+                deduplicator=notification_deduplicator,
+            )
+            queue_worker = QueueWorker.from_settings(
+                settings,
+                app.state.notification_queue,
+                notification_processor,
+                on_dead_letter=notification_processor.on_dead_letter,
+            )
+            queue_worker.start()
+            stack.push_async_callback(queue_worker.stop)
+        else:
+            logger.warning("Graph APIの認証情報が未設定のため変更通知を処理しません")
+        app.state.queue_worker = queue_worker
+
+        def start_leader_schedulers() -> None:
+            for start in leader_schedulers:
+                start()
+
+        if leader_schedulers:
+            if leader_lock.try_acquire():
+                start_leader_schedulers()
+            else:
+                logger.info("他のワーカーがスケジューラーを実行中のため待機します")
+                leader_task: "asyncio.Task[None]" = asyncio.create_task(
+                    leader_lock.run_when_acquired(
+                        start_leader_schedulers,
+                        settings.scheduler_lock_poll_interval,
+                    ),
+                    name="scheduler-leader-election",
+                )
+                stack.push_async_callback(cancel_task, leader_task)
+
+        try:
+            yield
+        finally:
+            logger.info("アプリケーションを終了中...")
+
+
+async def root() -> dict[str, str]:
+    """ルートエンドポイント"""
+    return {"message": "Auto Chat Maker API", "version": "1.0.0"}
 
 
 def create_app() -> FastAPI:
     """FastAPIアプリケーションを作成"""
     settings = get_settings()
+    log_sampler = LogSampler.from_settings(settings)
+    configure_logging(
+        settings.log_level,
+        settings.log_format,
+        async_mode=settings.log_async,
+        queue_size=settings.log_queue_size,
+        queue_policy=settings.log_queue_policy,
+        log_profile=settings.log_profile,
+        sampler=log_sampler if log_sampler.enabled else None,
+    )
 
     app = FastAPI(
         title=settings.app_name,
@@ -50,6 +376,7 @@ def create_app() -> FastAPI:
         debug=settings.debug,
         lifespan=lifespan,
     )
+    app.router.route_class = TimedRoute
 
     # CORS設定
     app.add_middleware(
@@ -60,6 +387,17 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # リクエスト処理時間の内訳（Server-Timing・遅いリクエストのログ）
+    app.add_middleware(
+        TimingMiddleware,
+        slow_request_threshold=settings.slow_request_threshold,
+        server_timing=settings.enable_server_timing,
+    )
+
+    # リクエストメトリクス（CORSより外側で全リクエストを計測）
+    if settings.enable_metrics:
+        app.add_middleware(MetricsMiddleware)
+
     # エラーハンドラーの登録
     app.add_exception_handler(
         AutoChatMakerException, auto_chat_maker_exception_handler
@@ -71,43 +409,62 @@ def create_app() -> FastAPI:
     app.add_exception_handler(Exception, general_exception_handler)
 
     # ルーティングの登録
+    from auto_chat_maker.api.routes.health import (
+        STATIC_HEALTH_PATHS,
+        StaticHealthEndpoint,
+    )
     from auto_chat_maker.api.routes.health import router as health_router
 
+    # 高頻度のヘルスチェックは固定ペイロードのエンドポイントで応答する
+    static_health = StaticHealthEndpoint(settings)
+    for path in STATIC_HEALTH_PATHS:
+        app.router.routes.append(
+            Route(
+                path, static_health, methods=["GET"], include_in_schema=False
+            )
+        )
     app.include_router(health_router, prefix="/api")
+    app.add_api_route("/", root, methods=["GET"])
+
+    if settings.enable_metrics:
+        from auto_chat_maker.api.routes.metrics import router as metrics_router
+
+        app.include_router(metrics_router)
+
+    # 管理用エンドポイント（secret_keyが設定されている場合のみ）
+    if settings.secret_key:
+        from auto_chat_maker.api.routes.admin import router as admin_router
+
+        app.include_router(admin_router, prefix="/api/admin")
+
+    # Microsoft Graphの変更通知
+    if settings.enable_webhook_processing:
+        from auto_chat_maker.api.routes.webhook import router as webhook_router
+
+        app.include_router(webhook_router, prefix=settings.webhook_endpoint)
 
     # 他のルーティングは後で実装
-    # from auto_chat_maker.api.routes import auth, webhook, ui, chat
+    # from auto_chat_maker.api.routes import auth, ui, chat
     # app.include_router(auth.router, prefix="/api/auth")
-    # app.include_router(webhook.router, prefix="/api/webhook")
     # app.include_router(ui.router, prefix="/ui")
     # app.include_router(chat.router, prefix="/api/chat")
 
     return app
 
 
-# アプリケーションインスタンス
-app = create_app()
-
-
-@app.get("/")  # type: ignore[misc]
-async def root() -> dict[str, str]:
-    """ルートエンドポイント"""
-    return {"message": "Auto Chat Maker API", "version": "1.0.0"}
+# アプリケーションインスタンス（uvicorn等から最初に参照されたときに作成）
+app: FastAPI
 
 
-@app.get("/health")  # type: ignore[misc]
-async def health_check() -> dict[str, str]:
-    """ヘルスチェックエンドポイント"""
-    return {"status": "healthy", "service": "Auto Chat Maker"}
+def __getattr__(name: str) -> Any:
+    if name == "app":
+        instance = create_app()
+        globals()["app"] = instance
+        return instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    import uvicorn
+    from auto_chat_maker.cli import serve
 
-    settings = get_settings()
-    uvicorn.run(
-        "auto_chat_maker.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug,
-    )
+    serve()
@@ -0,0 +1,210 @@
+"""
+本番用のマルチワーカーサーバー
+
+親プロセスでアプリケーションを作成（プリロード）してソケットをbindし、
+ワーカーをforkして同じソケットで待ち受ける。アプリケーションの
+インポート・構築は親で1回だけ行い、DB接続・HTTPクライアント等の
+状態はlifespanで各ワーカーが個別に作成する（ワーカー間で共有しない）。
+異常終了したワーカーは再度forkして補充する。
+
+uvicornの--workersはspawnでワーカーを起動するため、
+アプリケーションのプリロードができない。
+"""
+import importlib.util
+import os
+import signal
+import socket
+import time
+from types import FrameType
+from typing import Dict, Optional
+
+import uvicorn
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+APP_IMPORT_STRING = "auto_chat_maker.main:app"
+
+# 起動直後に終了し続けるワーカーを再起動し続けないための間隔（秒）
+RESPAWN_DELAY = 1.0
+
+# ワーカーの起動に失敗した場合の終了コード（再起動しない）
+STARTUP_FAILURE = 3
+
+
+def default_workers() -> int:
+    """利用可能なCPU数（コンテナのCPU割り当てを考慮）"""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+
+def _exit_code(status: int) -> int:
+    """os.waitの終了ステータスを終了コードに変換（Python 3.8でも動作する）"""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def event_loop_implementation(settings: Optional[Settings] = None) -> str:
+    """uvloopがインストールされていれば利用する
+
+    遅いコールバックの検出はasyncioのループでのみ動作するため、
+    SLOW_CALLBACK_THRESHOLDが指定された場合はasyncioを使う。
+    """
+    if settings is not None and settings.slow_callback_threshold > 0:
+        return "asyncio"
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_implementation() -> str:
+    """httptoolsがインストールされていれば利用する"""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def build_config(
+    settings: Settings,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+) -> uvicorn.Config:
+    """設定値からuvicornの設定を作成し、アプリケーションを読み込む"""
+    config = uvicorn.Config(
+        APP_IMPORT_STRING,
+        host=settings.host if host is None else host,
+        port=settings.port if port is None else port,
+        loop=event_loop_implementation(settings),
+        http=http_implementation(),
+        backlog=settings.backlog,
+        timeout_keep_alive=settings.keep_alive_timeout,
+        limit_concurrency=settings.limit_concurrency,
+        # アクセスログはメトリクス・遅いリクエストのログで代替する
+        access_log=False,
+        log_config=None,
+    )
+    config.load()
+    return config
+
+
+class WorkerSupervisor:
+    """プリロードしたアプリケーションをforkしたワーカーで実行する"""
+
+    def __init__(self, config: uvicorn.Config, workers: int) -> None:
+        self._config = config
+        self._workers = workers
+        self._children: Dict[int, float] = {}  # PID -> 起動時刻
+        self._stopping = False
+
+    def run(self, sock: Optional[socket.socket] = None) -> None:
+        """ワーカーを起動し、すべて終了するまで監視"""
+        if sock is None:
+            sock = self._config.bind_socket()
+        previous = {
+            sig: signal.signal(sig, self._handle_signal)
+            for sig in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            logger.info(
+                "ワーカーを起動します",
+                workers=self._workers,
+                host=self._config.host,
+                port=self._config.port,
+                loop=self._config.loop,
+                http=self._config.http,
+            )
+            for _ in range(self._workers):
+                self._spawn(sock)
+            self._supervise(sock)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            sock.close()
+        logger.info("すべてのワーカーが終了しました")
+
+    def stop(self) -> None:
+        """全ワーカーにSIGTERMを送り、終了を待つ"""
+        self._stopping = True
+        for pid in self._children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _handle_signal(self, signum: int, frame: Optional[FrameType]) -> None:
+        self.stop()
+
+    def _spawn(self, sock: socket.socket) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(sock)
+        self._children[pid] = time.monotonic()
+
+    def _run_worker(self, sock: socket.socket) -> None:
+        # 子プロセス: 親のシグナルハンドラーを戻し、uvicornに任せる
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            server = uvicorn.Server(self._config)
+            server.run(sockets=[sock])
+            if not server.started:
+                # lifespanの起動処理の失敗等
+                exit_code = STARTUP_FAILURE
+        except BaseException:
+            logger.exception("ワーカーが異常終了しました", pid=os.getpid())
+            exit_code = 1
+        finally:
+            # 親から引き継いだatexit等を実行せずに終了する
+            os._exit(exit_code)
+
+    def _supervise(self, sock: socket.socket) -> None:
+        while self._children:
+            pid, status = os.wait()
+            started_at = self._children.pop(pid, None)
+            if started_at is None or self._stopping:
+                continue
+            exit_code = _exit_code(status)
+            if exit_code == STARTUP_FAILURE:
+                # 設定誤り等は再起動しても解消しないため全体を停止する
+                logger.error("ワーカーの起動に失敗したため停止します", pid=pid)
+                self.stop()
+                continue
+            logger.warning(
+                "ワーカーが終了したため再起動します",
+                pid=pid,
+                exit_code=exit_code,
+            )
+            # 起動直後の異常終了が続く場合に再起動を繰り返しすぎない
+            elapsed = time.monotonic() - started_at
+            if elapsed < RESPAWN_DELAY:
+                time.sleep(RESPAWN_DELAY - elapsed)
+            if not self._stopping:
+                self._spawn(sock)
+
+
+def serve(
+    settings: Settings,
+    workers: Optional[int] = None,
+    host: Optional[str] = None,
+    port: Optional[int] = None,
+    reload: bool = False,
+) -> None:
+    """サーバーを起動
+
+    reloadが有効な場合は開発用に1プロセスで起動する。
+    """
+    if reload:
+        uvicorn.run(
+            APP_IMPORT_STRING,
+            host=settings.host if host is None else host,
+            port=settings.port if port is None else port,
+            reload=True,
+        )
+        return
+    workers = workers or settings.workers or default_workers()
+    config = build_config(settings, host=host, port=port)
+    if workers == 1 or not hasattr(os, "fork"):
+        uvicorn.Server(config).run()
+        return
+    WorkerSupervisor(config, workers).run()
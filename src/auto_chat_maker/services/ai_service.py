@@ -0,0 +1,249 @@
+"""
+AI返信案生成サービス
+
+max_reply_suggestions件の返信案を1回のモデル呼び出しでJSONとして
+生成させ、ReplySuggestionに変換する。会話コンテキストの送信が1回で
+済むため、候補ごとに呼び出す場合と比べてトークン消費と待ち時間を抑えられる。
+信頼度がreply_quality_threshold未満の返信案は除外し、
+すべて除外された場合は再試行できるようAIProcessingErrorを送出する。
+"""
+import json
+import math
+import re
+import time
+from typing import Any, List, Optional, Tuple
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.infrastructure.external.claude_client import (
+    ClaudeClient,
+)
+from auto_chat_maker.services.prompt_service import PromptService
+from auto_chat_maker.utils.exceptions import AIProcessingError
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.metrics import AI_GENERATION_DURATION
+
+logger = get_logger(__name__)
+
+# ```json ... ``` のようなコードブロックを取り除くためのパターン
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+# JSONとして出力された（途中で切れたものを含む）とみなす先頭部分
+_JSON_START = re.compile(r"^\s*(?:```(?:json)?\s*)?(?=[\[{])")
+
+
+def _clamp(value: float) -> float:
+    return max(0.0, min(1.0, value))
+
+
+class AIService:
+    """AIによる返信案生成を統合管理するサービス"""
+
+    def __init__(
+        self,
+        claude_client: ClaudeClient,
+        prompt_service: Optional[PromptService] = None,
+        max_suggestions: int = 3,
+        fallback_confidence: float = 0.5,
+        min_confidence: float = 0.0,
+    ) -> None:
+        self._claude_client = claude_client
+        self._prompt_service = prompt_service or PromptService()
+        self._max_suggestions = max_suggestions
+        # モデルが信頼度を示さない出力が閾値で常に除外されないよう、
+        # 代わりに付ける信頼度は閾値以上にそろえる
+        self._fallback_confidence = max(fallback_confidence, min_confidence)
+        self._min_confidence = min_confidence
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, claude_client: ClaudeClient
+    ) -> "AIService":
+        """設定値からインスタンスを生成"""
+        return cls(
+            claude_client,
+            max_suggestions=settings.max_reply_suggestions,
+            min_confidence=settings.reply_quality_threshold,
+        )
+
+    async def generate_reply_suggestions(
+        self,
+        message: ChatMessage,
+        context: Optional[List[ChatMessage]] = None,
+    ) -> List[ReplySuggestion]:
+        """1回のモデル呼び出しで複数の返信案を生成"""
+        system, prompt = self._prompt_service.get_reply_generation_prompt(
+            message, self._max_suggestions, context
+        )
+        outcome = "error"
+        started = time.perf_counter()
+        try:
+            text = await self._claude_client.generate_response(
+                prompt, system=system
+            )
+            suggestions = self.parse_suggestions(message.message_id, text)
+            if not suggestions:
+                outcome = "empty"
+                raise AIProcessingError(
+                    "返信案を生成できませんでした",
+                    error_code="EMPTY_SUGGESTIONS",
+                    details={"message_id": message.message_id},
+                )
+            accepted = self.filter_suggestions(
+                suggestions, self._min_confidence
+            )
+            if not accepted:
+                outcome = "filtered"
+                raise AIProcessingError(
+                    "信頼度が閾値以上の返信案がありません",
+                    error_code="LOW_CONFIDENCE_SUGGESTIONS",
+                    details={
+                        "message_id": message.message_id,
+                        "threshold": self._min_confidence,
+                    },
+                )
+            if len(accepted) < len(suggestions):
+                logger.info(
+                    "信頼度が閾値未満の返信案を除外しました",
+                    message_id=message.message_id,
+                    excluded=len(suggestions) - len(accepted),
+                    threshold=self._min_confidence,
+                )
+            outcome = "success"
+            return accepted
+        finally:
+            AI_GENERATION_DURATION.labels(outcome).observe(
+                time.perf_counter() - started
+            )
+
+    def parse_suggestions(
+        self, message_id: str, text: str
+    ) -> List[ReplySuggestion]:
+        """モデル出力を返信案に変換
+
+        JSONでない出力は本文全体を1件の返信案として扱う。
+        途中で切れたJSONは完結している候補のみを取り出し、
+        1件も取り出せない場合はAIProcessingErrorを送出する。
+        """
+        candidates = self._extract_candidates(text)
+        if candidates is None and _JSON_START.match(text):
+            candidates = self._salvage_candidates(text)
+            if not candidates:
+                raise AIProcessingError(
+                    "返信案のJSONを解釈できません",
+                    error_code="INVALID_SUGGESTIONS",
+                    details={"message_id": message_id},
+                )
+            logger.warning(
+                "返信案のJSONが不完全なため完結した候補のみ利用します",
+                message_id=message_id,
+                count=len(candidates),
+            )
+        elif candidates is None:
+            logger.warning(
+                "返信案のJSONを解釈できないため本文をそのまま利用します",
+                message_id=message_id,
+            )
+            content = text.strip()
+            candidates = (
+                [{"content": content, "confidence": self._fallback_confidence}]
+                if content
+                else []
+            )
+
+        suggestions: List[ReplySuggestion] = []
+        seen = set()
+        for candidate in candidates:
+            content, confidence = self._normalize_candidate(candidate)
+            if not content or content in seen:
+                continue
+            seen.add(content)
+            suggestions.append(
+                ReplySuggestion(
+                    message_id=message_id,
+                    content=content,
+                    confidence_score=confidence,
+                    is_selected=False,
+                    is_sent=False,
+                    sent_at=None,
+                )
+            )
+        suggestions.sort(key=lambda s: s.confidence_score, reverse=True)
+        return suggestions[: self._max_suggestions]
+
+    @staticmethod
+    def filter_suggestions(
+        suggestions: List[ReplySuggestion], min_confidence: float
+    ) -> List[ReplySuggestion]:
+        """信頼度の低い返信案を除外"""
+        return [s for s in suggestions if s.confidence_score >= min_confidence]
+
+    def _extract_candidates(self, text: str) -> Optional[List[Any]]:
+        """出力からJSONの候補リストを取り出す"""
+        sources = [text]
+        fenced = _CODE_FENCE.search(text)
+        if fenced:
+            sources.insert(0, fenced.group(1))
+        # 前後に説明文が付いた場合に備えて括弧の範囲も試す
+        for opening, closing in (("{", "}"), ("[", "]")):
+            start, end = text.find(opening), text.rfind(closing)
+            if 0 <= start < end:
+                sources.append(text[start : end + 1])
+
+        for source in sources:
+            try:
+                data = json.loads(source)
+            except (json.JSONDecodeError, TypeError):
+                continue
+            if isinstance(data, dict):
+                data = data.get("suggestions")
+            if isinstance(data, list):
+                return data
+        return None
+
+    @staticmethod
+    def _salvage_candidates(text: str) -> List[Any]:
+        """途中で切れたJSONから完結している候補オブジェクトを取り出す"""
+        match = _JSON_START.match(text)
+        body = text[match.end() :] if match else text
+        if body.startswith("["):
+            start = 0
+        else:
+            key = body.find('"suggestions"')
+            start = body.find("[", key) if key >= 0 else -1
+            if start < 0:
+                return []
+        decoder = json.JSONDecoder()
+        candidates: List[Any] = []
+        position = start + 1
+        while True:
+            while position < len(body) and body[position] in " \t\r\n,":
+                position += 1
+            if position >= len(body) or body[position] == "]":
+                break
+            try:
+                candidate, position = decoder.raw_decode(body, position)
+            except json.JSONDecodeError:
+                break
+            if isinstance(candidate, (dict, str)):
+                candidates.append(candidate)
+        return candidates
+
+    def _normalize_candidate(self, candidate: Any) -> Tuple[str, float]:
+        """候補1件を(本文, 信頼度)に正規化"""
+        if isinstance(candidate, str):
+            return candidate.strip(), self._fallback_confidence
+        if not isinstance(candidate, dict):
+            return "", 0.0
+        content = candidate.get("content") or candidate.get("text") or ""
+        raw_confidence = candidate.get(
+            "confidence", candidate.get("confidence_score")
+        )
+        try:
+            confidence = float(raw_confidence)
+        except (TypeError, ValueError):
+            confidence = self._fallback_confidence
+        if math.isnan(confidence):
+            confidence = self._fallback_confidence
+        return str(content).strip(), _clamp(confidence)
@@ -0,0 +1,220 @@
+"""
+チャットメッセージの差分同期
+
+サブスクリプションの期限切れや停止中に取りこぼした変更通知を補うため、
+チャットごとに同期済みメッセージの最終更新日時（ウォーターマーク）を保存し、
+それ以降に作成・更新されたメッセージだけを取得して一括登録する。
+チャットのメッセージにはGraphのdelta APIがないため、
+lastModifiedDateTimeの絞り込みと@odata.nextLinkのページングで代替する。
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.chat_sync_state import ChatSyncState
+from auto_chat_maker.domain.repositories.interfaces import (
+    ChatMessageRepository,
+    ChatSyncStateRepository,
+    SubscriptionRepository,
+)
+from auto_chat_maker.infrastructure.external.graph_client import (
+    parse_chat_resource,
+    parse_graph_datetime,
+)
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 同じ時刻に更新されたメッセージを取りこぼさないよう重ねて取得する幅
+# （重複分はmessage_idのユニークインデックスで除外される）
+WATERMARK_OVERLAP = timedelta(seconds=1)
+
+
+class ChatMessageSource(Protocol):
+    """チャットのメッセージを最終更新日時の新しい順にページ単位で返す"""
+
+    def list_chat_messages(
+        self,
+        chat_id: str,
+        modified_after: Optional[datetime] = None,
+        page_size: int = 50,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        ...
+
+
+def chat_message_from_graph(
+    data: Dict[str, Any], chat_id: str, source: str = "sync"
+) -> Optional[ChatMessage]:
+    """GraphのchatMessageをエンティティに変換
+
+    システムイベントと削除済みのメッセージは対象外としてNoneを返す。
+    sourceは取得経路（sync・webhook）としてmetadataに記録する。
+    """
+    if data.get("messageType", "message") != "message" or data.get(
+        "deletedDateTime"
+    ):
+        return None
+    sender = (data.get("from") or {}).get("user") or {}
+    body = data.get("body") or {}
+    return ChatMessage(
+        message_id=data["id"],
+        chat_id=data.get("chatId") or chat_id,
+        thread_id=data.get("replyToId"),
+        content=body.get("content") or "",
+        sender_id=sender.get("id") or "",
+        sender_name=sender.get("displayName") or "",
+        message_type=body.get("contentType") or "text",
+        sent_at=parse_graph_datetime(data["createdDateTime"]),
+        processed_at=None,
+        is_processed=False,
+        metadata={
+            "source": source,
+            "last_modified_at": data.get("lastModifiedDateTime"),
+        },
+    )
+
+
+def _last_modified(data: Dict[str, Any]) -> Optional[datetime]:
+    value = data.get("lastModifiedDateTime") or data.get("createdDateTime")
+    return parse_graph_datetime(value) if value else None
+
+
+class ChatSyncService:
+    """チャットごとの差分同期"""
+
+    def __init__(
+        self,
+        source: ChatMessageSource,
+        message_repository: ChatMessageRepository,
+        state_repository: ChatSyncStateRepository,
+        page_size: int = 50,
+        initial_lookback: float = 86400.0,
+        concurrency: int = 4,
+        subscription_repository: Optional[SubscriptionRepository] = None,
+    ) -> None:
+        self._source = source
+        self._message_repository = message_repository
+        self._state_repository = state_repository
+        self._subscription_repository = subscription_repository
+        self._page_size = page_size
+        self._initial_lookback = timedelta(seconds=initial_lookback)
+        self._concurrency = concurrency
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        source: ChatMessageSource,
+        message_repository: ChatMessageRepository,
+        state_repository: ChatSyncStateRepository,
+        subscription_repository: Optional[SubscriptionRepository] = None,
+    ) -> "ChatSyncService":
+        """設定値からインスタンスを生成"""
+        return cls(
+            source,
+            message_repository,
+            state_repository,
+            page_size=settings.chat_sync_page_size,
+            initial_lookback=settings.chat_sync_initial_lookback,
+            concurrency=settings.chat_sync_concurrency,
+            subscription_repository=subscription_repository,
+        )
+
+    async def sync_chat(self, chat_id: str) -> int:
+        """1つのチャットを同期し、新規登録したメッセージ数を返す
+
+        初回はinitial_lookback秒前以降のみを取得し、履歴全体は取得しない。
+        ウォーターマークは全ページの登録が終わってから保存するため、
+        途中で失敗した場合は次回同じ範囲から再取得する。
+        """
+        state = await self._state_repository.get(chat_id)
+        if state is None:
+            state = ChatSyncState(
+                chat_id=chat_id, watermark=None, synced_at=None
+            )
+        if state.watermark is None:
+            modified_after = datetime.utcnow() - self._initial_lookback
+        else:
+            modified_after = state.watermark - WATERMARK_OVERLAP
+
+        watermark: Optional[datetime] = None
+        fetched = 0
+        inserted = 0
+        async for page in self._source.list_chat_messages(
+            chat_id, modified_after, self._page_size
+        ):
+            messages: List[ChatMessage] = []
+            for data in page:
+                last_modified = _last_modified(data)
+                if last_modified is not None and (
+                    watermark is None or last_modified > watermark
+                ):
+                    watermark = last_modified
+                message = chat_message_from_graph(data, chat_id)
+                if message is not None:
+                    messages.append(message)
+            fetched += len(page)
+            inserted += len(
+                await self._message_repository.upsert_many(messages)
+            )
+        state.advance(watermark)
+        await self._state_repository.save(state)
+        logger.debug(
+            "チャットを同期しました",
+            chat_id=chat_id,
+            fetched=fetched,
+            inserted=inserted,
+        )
+        return inserted
+
+    async def list_chat_ids(self) -> List[str]:
+        """同期対象のチャットIDを取得
+
+        まだメッセージを受信していないチャットも、購読中であれば
+        停止中に取りこぼした通知を補うため対象に含める。
+        """
+        chat_ids = set(await self._state_repository.list_chat_ids())
+        if self._subscription_repository is not None:
+            for (
+                subscription
+            ) in await self._subscription_repository.list_active():
+                chat_id, _ = parse_chat_resource(subscription.resource)
+                if chat_id is not None:
+                    chat_ids.add(chat_id)
+        return sorted(chat_ids)
+
+    async def sync_all(self, chat_ids: Optional[List[str]] = None) -> int:
+        """チャットを並行に同期し、新規登録したメッセージ数の合計を返す
+
+        chat_idsを省略すると同期状態またはメッセージがあるチャットと、
+        有効なサブスクリプションが購読しているチャットを対象とする。
+        失敗したチャットはログに記録し、他のチャットの同期は続ける。
+        """
+        if chat_ids is None:
+            chat_ids = await self.list_chat_ids()
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def sync(chat_id: str) -> int:
+            async with semaphore:
+                try:
+                    return await self.sync_chat(chat_id)
+                except Exception as e:
+                    logger.warning(
+                        "チャットを同期できません",
+                        chat_id=chat_id,
+                        error=str(e),
+                    )
+                    return 0
+
+        results: List[int] = await asyncio.gather(
+            *(sync(chat_id) for chat_id in chat_ids)
+        )
+        inserted = sum(results)
+        logger.info(
+            "チャットの同期が完了しました",
+            chats=len(chat_ids),
+            inserted=inserted,
+        )
+        return inserted
@@ -0,0 +1,211 @@
+"""
+依存サービスのヘルスチェックサービス
+
+データベース・MCPサーバー・Claude APIへのプローブを並行実行し、
+プローブごとにタイムアウトを設ける。結果は短時間キャッシュし、
+ロードバランサー等から頻繁に問い合わせがあっても依存先への
+呼び出しが増えないようにする。
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from pydantic import BaseModel
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.utils.exceptions import ExternalServiceError
+from auto_chat_maker.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    # 起動時間短縮のため、httpx・SQLAlchemyは実際に使うまでインポートしない
+    import httpx
+
+    from auto_chat_maker.infrastructure.database.connection import Database
+    from auto_chat_maker.infrastructure.external.claude_client import (
+        ClaudeClient,
+    )
+
+logger = get_logger(__name__)
+
+Probe = Callable[[], Awaitable[None]]
+
+STATUS_HEALTHY = "healthy"
+STATUS_UNHEALTHY = "unhealthy"
+STATUS_DEGRADED = "degraded"
+STATUS_NOT_CONFIGURED = "not_configured"
+
+
+class ProbeResult(BaseModel):
+    """1つの依存サービスのチェック結果"""
+
+    status: str
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: datetime
+
+
+class HealthReport(BaseModel):
+    """全依存サービスのチェック結果"""
+
+    status: str
+    ready: bool
+    components: Dict[str, ProbeResult]
+
+
+def http_probe(client: "httpx.AsyncClient", url: str) -> Probe:
+    """HTTPで応答があるかを確認するプローブを生成
+
+    5xx以外の応答は到達可能とみなす。
+    """
+
+    async def probe() -> None:
+        response = await client.get(url)
+        if response.status_code >= 500:
+            raise ExternalServiceError(
+                "依存サービスがエラーを返しました",
+                error_code="HEALTH_CHECK_FAILED",
+                details={"status_code": response.status_code},
+            )
+
+    return probe
+
+
+class HealthService:
+    """依存サービスのプローブを並行実行し、結果をキャッシュするサービス
+
+    criticalに含まれるプローブが失敗した場合のみreadyをFalseにする。
+    それ以外の失敗はstatusをdegradedにするが、リクエストは受け付ける。
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, Optional[Probe]],
+        critical: Tuple[str, ...] = ("database",),
+        timeout: float = 2.0,
+        cache_ttl: float = 5.0,
+        http_client: Optional["httpx.AsyncClient"] = None,
+    ) -> None:
+        self._probes = probes
+        self._critical = critical
+        self._timeout = timeout
+        self._cache_ttl = cache_ttl
+        self._http_client = http_client
+        self._cache: Dict[str, Tuple[float, ProbeResult]] = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Settings,
+        database: "Database",
+        claude_client: Optional["ClaudeClient"] = None,
+    ) -> "HealthService":
+        """設定値からインスタンスを生成"""
+        http_client: Optional["httpx.AsyncClient"] = None
+        mcp_probe: Optional[Probe] = None
+        if settings.mcp_server_url:
+            import httpx
+
+            http_client = httpx.AsyncClient(
+                timeout=settings.health_check_timeout
+            )
+            mcp_probe = http_probe(http_client, settings.mcp_server_url)
+        return cls(
+            {
+                "database": database.ping,
+                "mcp_server": mcp_probe,
+                "claude_api": (
+                    claude_client.ping if claude_client is not None else None
+                ),
+            },
+            timeout=settings.health_check_timeout,
+            cache_ttl=settings.health_check_cache_ttl,
+            http_client=http_client,
+        )
+
+    async def check(self) -> HealthReport:
+        """キャッシュが古いプローブのみ並行実行して結果を返す"""
+        results = self._fresh_results()
+        if len(results) < len(self._probes):
+            # 同時に来た問い合わせは先行するチェックの結果を共有する
+            async with self._lock:
+                results = self._fresh_results()
+                stale = [name for name in self._probes if name not in results]
+                if stale:
+                    checked = await asyncio.gather(
+                        *(self._run_probe(name) for name in stale)
+                    )
+                    now = time.monotonic()
+                    for name, result in zip(stale, checked):
+                        self._cache[name] = (now, result)
+                        results[name] = result
+        return self._report(results)
+
+    def _fresh_results(self) -> Dict[str, ProbeResult]:
+        now = time.monotonic()
+        return {
+            name: result
+            for name, (checked_at, result) in self._cache.items()
+            if now - checked_at < self._cache_ttl
+        }
+
+    async def _run_probe(self, name: str) -> ProbeResult:
+        probe = self._probes[name]
+        if probe is None:
+            return ProbeResult(
+                status=STATUS_NOT_CONFIGURED, checked_at=datetime.utcnow()
+            )
+        started = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            await asyncio.wait_for(probe(), self._timeout)
+        except asyncio.TimeoutError:
+            error = f"{self._timeout}秒以内に応答がありません"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        if error is not None:
+            logger.warning(
+                "依存サービスのヘルスチェックに失敗しました",
+                component=name,
+                error=error,
+            )
+        return ProbeResult(
+            status=STATUS_HEALTHY if error is None else STATUS_UNHEALTHY,
+            latency_ms=latency_ms,
+            error=error,
+            checked_at=datetime.utcnow(),
+        )
+
+    def _report(self, results: Dict[str, ProbeResult]) -> HealthReport:
+        failed: List[str] = [
+            name
+            for name, result in results.items()
+            if result.status == STATUS_UNHEALTHY
+        ]
+        ready = not any(name in self._critical for name in failed)
+        if not ready:
+            status = STATUS_UNHEALTHY
+        elif failed:
+            status = STATUS_DEGRADED
+        else:
+            status = STATUS_HEALTHY
+        return HealthReport(
+            status=status,
+            ready=ready,
+            components={name: results[name] for name in self._probes},
+        )
+
+    async def aclose(self) -> None:
+        """プローブ用のHTTPクライアントを閉じる"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
@@ -0,0 +1,207 @@
+"""
+変更通知の重複排除
+
+Microsoft Graphは通知を少なくとも1回配信し、応答が遅れると同じ
+メッセージの通知を再送する。重複した通知がキューに入ると、メッセージの
+取得とAI生成が重複して行われるため、キューへの投入前に除外する。
+
+キューで処理待ちまたは登録済みのメッセージのみを重複とみなすため、
+デッドレターになった通知は受け付けの記録を取り消す（forget）。
+最近受け付けたmessage_idを保持するLRUと、それより古いmessage_idを
+コンパクトに保持するブルームフィルターの2段で判定する。ブルームフィルターは
+偽陽性があるため、該当した場合のみChatMessageRepositoryの
+message_idユニークインデックスで確認する。どちらにも該当しないものは
+DBを参照せずに新規とみなす。
+"""
+import hashlib
+import math
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Set
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.domain.repositories.interfaces import (
+    ChatMessageRepository,
+)
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.metrics import NOTIFICATION_DEDUP_LOOKUPS
+
+logger = get_logger(__name__)
+
+# 判定結果（メトリクスのラベル）
+RESULT_RECENT = "recent"  # LRUに該当（重複）
+RESULT_CONFIRMED = "confirmed"  # ブルームフィルター該当・DBに登録済み（重複）
+RESULT_FALSE_POSITIVE = "false_positive"  # ブルームフィルター該当・DBに未登録
+RESULT_NEW = "new"  # どちらにも該当しない
+
+
+class BloomFilter:
+    """文字列のブルームフィルター
+
+    capacity件を登録した時点の偽陽性率がerror_rateとなるよう
+    ビット数とハッシュ関数の数を決める。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        if capacity <= 0:
+            raise ValueError("capacityは1以上を指定してください")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rateは0より大きく1未満を指定してください")
+        self.capacity = capacity
+        self._size = max(
+            8,
+            math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self._hash_count = max(1, round(self._size / capacity * math.log(2)))
+        self._bits = bytearray((self._size + 7) // 8)
+        self.count = 0
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def is_full(self) -> bool:
+        """想定件数に達したかどうか（以降は偽陽性率が上がる）"""
+        return self.count >= self.capacity
+
+    def add(self, item: str) -> None:
+        """要素を登録"""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # 1回のハッシュ計算から2つの値を取り出すダブルハッシング
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return (
+            (first + i * second) % self._size for i in range(self._hash_count)
+        )
+
+
+class NotificationDeduplicator:
+    """message_idで変更通知の重複を判定する
+
+    ブルームフィルターは削除ができないため、想定件数に達したら
+    新しいフィルターに切り替え、直前の世代も併せて参照する。
+    それより古いmessage_idはDBのユニークインデックスで重複が防がれる。
+    """
+
+    def __init__(
+        self,
+        repository: ChatMessageRepository,
+        recent_size: int = 10000,
+        bloom_capacity: int = 100000,
+        error_rate: float = 0.01,
+    ) -> None:
+        self._repository = repository
+        self._recent_size = recent_size
+        self._error_rate = error_rate
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._current = BloomFilter(bloom_capacity, error_rate)
+        self._previous = BloomFilter(bloom_capacity, error_rate)
+        self._counts: Dict[str, int] = {
+            RESULT_RECENT: 0,
+            RESULT_CONFIRMED: 0,
+            RESULT_FALSE_POSITIVE: 0,
+            RESULT_NEW: 0,
+        }
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, repository: ChatMessageRepository
+    ) -> "NotificationDeduplicator":
+        """設定値からインスタンスを生成"""
+        return cls(
+            repository,
+            recent_size=settings.notification_dedup_recent_size,
+            bloom_capacity=settings.notification_dedup_bloom_capacity,
+            error_rate=settings.notification_dedup_error_rate,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """判定結果ごとの件数を取得"""
+        return dict(self._counts, recent_entries=len(self._recent))
+
+    async def warm(self) -> int:
+        """最近登録されたメッセージを読み込み、読み込んだ件数を返す
+
+        再起動直後に届く再送通知もDBを参照せずに除外できるようにする。
+        """
+        message_ids = await self._repository.list_recent_message_ids(
+            self._recent_size
+        )
+        # 新しい順に返るため、古いものから登録してLRUの順序を保つ
+        for message_id in reversed(message_ids):
+            self._remember(message_id)
+        logger.info("通知の重複排除を初期化しました", count=len(message_ids))
+        return len(message_ids)
+
+    async def filter_new(self, message_ids: List[str]) -> List[str]:
+        """未処理のmessage_idのみを入力順で返し、受け付け済みとして記録する
+
+        同じリスト内の重複も除外する。
+        """
+        unique_ids = list(dict.fromkeys(message_ids))
+        new_ids: Set[str] = set()
+        candidates: List[str] = []
+        for message_id in unique_ids:
+            if message_id in self._recent:
+                self._recent.move_to_end(message_id)
+                self._record(RESULT_RECENT)
+            elif message_id in self._current or message_id in self._previous:
+                candidates.append(message_id)
+            else:
+                # DBの確認を待つ間に届いた同じ通知を除外するため先に記録する
+                self._remember(message_id)
+                self._record(RESULT_NEW)
+                new_ids.add(message_id)
+        if candidates:
+            existing = await self._repository.find_existing_message_ids(
+                candidates
+            )
+            for message_id in candidates:
+                if message_id in existing:
+                    self._remember(message_id)
+                    self._record(RESULT_CONFIRMED)
+                elif message_id in self._recent:
+                    # DBの確認中に他のリクエストが受け付けた
+                    self._record(RESULT_RECENT)
+                else:
+                    self._remember(message_id)
+                    self._record(RESULT_FALSE_POSITIVE)
+                    new_ids.add(message_id)
+        return [
+            message_id for message_id in unique_ids if message_id in new_ids
+        ]
+
+    def forget(self, message_ids: Iterable[str]) -> None:
+        """キューへの投入に失敗した場合や処理がデッドレターになった場合に
+        受け付けの記録を取り消す
+
+        ブルームフィルターからは削除できないが、再送時はDBで
+        未登録と確認されるため新規として扱われる。
+        """
+        for message_id in message_ids:
+            self._recent.pop(message_id, None)
+
+    def _remember(self, message_id: str) -> None:
+        self._recent[message_id] = None
+        self._recent.move_to_end(message_id)
+        while len(self._recent) > self._recent_size:
+            self._recent.popitem(last=False)
+        if message_id in self._current:
+            return
+        if self._current.is_full:
+            self._previous = self._current
+            self._current = BloomFilter(
+                self._previous.capacity, self._error_rate
+            )
+        self._current.add(message_id)
+
+    def _record(self, result: str) -> None:
+        self._counts[result] += 1
+        NOTIFICATION_DEDUP_LOOKUPS.labels(result).inc()
@@ -0,0 +1,99 @@
+"""
+変更通知の処理
+
+Webhookでキューに投入された変更通知をワーカーで取り出し、
+通知が指すメッセージをGraphから取得して登録する。
+ワーカーはリースしたアイテムを並行して処理し、個別の取得は
+GraphClientが$batchにまとめるため、件数に比例して往復回数は増えない。
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol
+
+from auto_chat_maker.domain.repositories.interfaces import (
+    ChatMessageRepository,
+)
+from auto_chat_maker.infrastructure.external.graph_client import (
+    parse_chat_resource,
+)
+from auto_chat_maker.services.chat_sync import chat_message_from_graph
+from auto_chat_maker.services.notification_dedup import (
+    NotificationDeduplicator,
+)
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChatMessageFetcher(Protocol):
+    """チャットのメッセージを1件取得する"""
+
+    async def get_chat_message(
+        self, chat_id: str, message_id: str
+    ) -> Dict[str, Any]:
+        ...
+
+
+def created_message_id(payload: Dict[str, Any]) -> Optional[str]:
+    """メッセージ作成の通知ならmessage_idを返す"""
+    resource_data = payload.get("resource_data")
+    if payload.get("change_type") != "created" or not isinstance(
+        resource_data, dict
+    ):
+        return None
+    message_id = resource_data.get("id")
+    return str(message_id) if message_id else None
+
+
+class NotificationProcessor:
+    """キューに投入された変更通知のハンドラー
+
+    メッセージ作成の通知のみを処理し、更新・削除の通知は何もせずに完了とする。
+    取得に失敗した場合は例外を送出し、キューの再試行に任せる。
+    """
+
+    def __init__(
+        self,
+        fetcher: ChatMessageFetcher,
+        message_repository: ChatMessageRepository,
+        on_created: Optional[Callable[[], Awaitable[None]]] = None,
+        deduplicator: Optional[NotificationDeduplicator] = None,
+    ) -> None:
+        self._fetcher = fetcher
+        self._message_repository = message_repository
+        self._on_created = on_created
+        self._deduplicator = deduplicator
+
+    async def __call__(self, payload: Dict[str, Any]) -> None:
+        message_id = created_message_id(payload)
+        if message_id is None:
+            logger.debug(
+                "メッセージ作成以外の通知のため処理しません",
+                change_type=payload.get("change_type"),
+                resource=payload.get("resource"),
+            )
+            return
+        chat_id, _ = parse_chat_resource(str(payload.get("resource", "")))
+        if chat_id is None:
+            # 再試行しても解決しないため完了として扱う
+            logger.warning(
+                "通知のresourceからチャットを特定できません",
+                resource=payload.get("resource"),
+                message_id=message_id,
+            )
+            return
+        data = await self._fetcher.get_chat_message(chat_id, message_id)
+        message = chat_message_from_graph(data, chat_id, source="webhook")
+        if message is None:
+            return
+        inserted = await self._message_repository.upsert_many([message])
+        if inserted and self._on_created is not None:
+            await self._on_created()
+
+    def on_dead_letter(self, payload: Dict[str, Any]) -> None:
+        """デッドレターになった通知の受け付け記録を取り消す
+
+        登録もキューへの残留もしていないメッセージの再送を
+        重複として捨てないようにする。
+        """
+        message_id = created_message_id(payload)
+        if message_id is not None and self._deduplicator is not None:
+            self._deduplicator.forget([message_id])
@@ -0,0 +1,49 @@
+"""
+AIプロンプト管理サービス
+"""
+from typing import List, Optional, Tuple
+
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+
+# プロンプトの内容を変更した場合は更新する（キャッシュキー等に利用）
+PROMPT_VERSION = "reply-suggestions-v1"
+
+REPLY_GENERATION_SYSTEM_PROMPT = """\
+あなたはMicrosoft Teamsのビジネスチャットで返信案を作成するアシスタントです。
+受信したメッセージに対して、丁寧かつ簡潔な日本語の返信案を作成してください。
+返信案はそれぞれ異なる方針（例: 即答する、確認する、後で対応する）にしてください。
+出力は次の形式のJSONのみとし、前後に説明文を付けないでください。
+{"suggestions": [{"content": "返信案の本文", "confidence": 0.0から1.0の数値}]}
+"""
+
+
+class PromptService:
+    """AIプロンプトの組み立てを管理するサービス"""
+
+    def __init__(self, max_context_messages: int = 10) -> None:
+        self._max_context_messages = max_context_messages
+
+    def get_reply_generation_prompt(
+        self,
+        message: ChatMessage,
+        count: int,
+        context: Optional[List[ChatMessage]] = None,
+    ) -> Tuple[str, str]:
+        """返信案生成用の(システムプロンプト, ユーザープロンプト)を生成
+
+        1回の呼び出しでcount件の返信案を生成させる。
+        """
+        lines: List[str] = []
+        history = (context or [])[-self._max_context_messages :]
+        if history:
+            lines.append("# これまでの会話")
+            lines.extend(
+                f"{previous.sender_name}: {previous.content}"
+                for previous in history
+            )
+            lines.append("")
+        lines.append("# 返信対象のメッセージ")
+        lines.append(f"{message.sender_name}: {message.content}")
+        lines.append("")
+        lines.append(f"返信案を{count}件作成してください。")
+        return REPLY_GENERATION_SYSTEM_PROMPT, "\n".join(lines)
@@ -0,0 +1,352 @@
+"""
+返信案キャッシュ
+
+「ありがとうございます」「了解です」のように繰り返し届くメッセージで
+毎回AI生成を行わないよう、正規化したメッセージ内容・会話コンテキスト・
+モデル・温度・返信案の件数・プロンプトバージョンのハッシュをキーに返信案を再利用する。
+プロセス内のLRU+TTLキャッシュと、再起動後も残る任意のSQLiteキャッシュの
+2段構成とする。
+"""
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.services.prompt_service import PROMPT_VERSION
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.metrics import (
+    REPLY_CACHE_HIT_RATIO,
+    REPLY_CACHE_LOOKUPS,
+)
+
+logger = get_logger(__name__)
+
+# キャッシュする値: (返信案の本文, 信頼度) のリスト
+CachedReplies = List[Tuple[str, float]]
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ContextualReplyGenerator(Protocol):
+    """会話コンテキストを受け取れる返信案生成器"""
+
+    async def generate_reply_suggestions(
+        self,
+        message: ChatMessage,
+        context: Optional[List[ChatMessage]] = None,
+    ) -> List[ReplySuggestion]:
+        ...
+
+
+def normalize_text(text: str) -> str:
+    """表記揺れを吸収するためにテキストを正規化
+
+    全角・半角の統一（NFKC）、大文字小文字の統一、空白の畳み込みを行う。
+    """
+    normalized = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def make_cache_key(
+    message: ChatMessage,
+    context: Optional[List[ChatMessage]],
+    model: str,
+    temperature: float,
+    suggestion_count: int = 3,
+    prompt_version: str = PROMPT_VERSION,
+    max_context_messages: int = 10,
+) -> str:
+    """返信案キャッシュのキーを生成"""
+    history = (context or [])[-max_context_messages:]
+    material = {
+        "content": normalize_text(message.content),
+        "context": [normalize_text(previous.content) for previous in history],
+        "model": model,
+        "temperature": round(temperature, 3),
+        "suggestion_count": suggestion_count,
+        "prompt_version": prompt_version,
+    }
+    encoded = json.dumps(material, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class InMemoryReplyCache:
+    """プロセス内のLRU+TTLキャッシュ"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, CachedReplies]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedReplies]:
+        """キャッシュを取得（期限切れは削除してNoneを返す）"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: CachedReplies) -> None:
+        """キャッシュを保存し、上限を超えた古いエントリを追い出す"""
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self._entries.clear()
+
+
+class SQLiteReplyCache:
+    """再起動後も残るSQLiteキャッシュ
+
+    標準ライブラリのsqlite3をスレッドで実行し、イベントループを塞がない。
+    """
+
+    def __init__(
+        self, path: str, max_entries: int = 10000, ttl: float = 3600.0
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = asyncio.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS reply_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_reply_cache_accessed_at"
+            " ON reply_cache (accessed_at)"
+        )
+        self._connection.commit()
+
+    async def get(self, key: str) -> Optional[CachedReplies]:
+        """キャッシュを取得"""
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: CachedReplies) -> None:
+        """キャッシュを保存"""
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value)
+
+    def _get(self, key: str) -> Optional[CachedReplies]:
+        now = time.time()
+        row = self._connection.execute(
+            "SELECT value, expires_at FROM reply_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._connection.execute(
+                "DELETE FROM reply_cache WHERE key = ?", (key,)
+            )
+            self._connection.commit()
+            return None
+        self._connection.execute(
+            "UPDATE reply_cache SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self._connection.commit()
+        return [
+            (content, float(score)) for content, score in json.loads(row[0])
+        ]
+
+    def _set(self, key: str, value: CachedReplies) -> None:
+        now = time.time()
+        self._connection.execute(
+            "INSERT OR REPLACE INTO reply_cache"
+            " (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), now + self._ttl, now),
+        )
+        # 期限切れと、上限を超えた最終アクセスの古いエントリを削除
+        self._connection.execute(
+            "DELETE FROM reply_cache WHERE expires_at <= ?", (now,)
+        )
+        self._connection.execute(
+            "DELETE FROM reply_cache WHERE key IN ("
+            " SELECT key FROM reply_cache ORDER BY accessed_at DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        self._connection.close()
+
+
+class CachedReplyGenerator:
+    """返信案生成器の前段に置くキャッシュ
+
+    同じキーの生成が同時に走った場合は1回の生成結果を共有する。
+    """
+
+    def __init__(
+        self,
+        generator: ContextualReplyGenerator,
+        model: str,
+        temperature: float,
+        suggestion_count: int = 3,
+        memory_cache: Optional[InMemoryReplyCache] = None,
+        persistent_cache: Optional[SQLiteReplyCache] = None,
+    ) -> None:
+        self._generator = generator
+        self._model = model
+        self._temperature = temperature
+        self._suggestion_count = suggestion_count
+        # 空のキャッシュは偽と評価されるためNoneと明示的に比較する
+        self._memory_cache = (
+            InMemoryReplyCache() if memory_cache is None else memory_cache
+        )
+        self._persistent_cache = persistent_cache
+        self._in_flight: Dict[str, "asyncio.Future[CachedReplies]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, generator: ContextualReplyGenerator
+    ) -> "CachedReplyGenerator":
+        """設定値からインスタンスを生成"""
+        persistent_cache = None
+        if settings.reply_cache_sqlite_path:
+            persistent_cache = SQLiteReplyCache(
+                settings.reply_cache_sqlite_path,
+                ttl=settings.reply_cache_ttl,
+            )
+        return cls(
+            generator,
+            model=settings.claude_model,
+            temperature=settings.claude_temperature,
+            suggestion_count=settings.max_reply_suggestions,
+            memory_cache=InMemoryReplyCache(
+                max_entries=settings.reply_cache_max_entries,
+                ttl=settings.reply_cache_ttl,
+            ),
+            persistent_cache=persistent_cache,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """ヒット・ミスの統計を取得"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "persistent_hits": self.persistent_hits,
+            "entries": len(self._memory_cache),
+        }
+
+    async def generate_reply_suggestions(
+        self,
+        message: ChatMessage,
+        context: Optional[List[ChatMessage]] = None,
+    ) -> List[ReplySuggestion]:
+        """キャッシュを参照し、なければ生成して保存"""
+        key = make_cache_key(
+            message,
+            context,
+            self._model,
+            self._temperature,
+            suggestion_count=self._suggestion_count,
+        )
+        cached = await self._lookup(key)
+        if cached is not None:
+            self._record_lookup(hit=True)
+            return self._to_suggestions(message, cached)
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._record_lookup(hit=True)
+            return self._to_suggestions(message, await in_flight)
+
+        self._record_lookup(hit=False)
+        future: "asyncio.Future[CachedReplies]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+        try:
+            suggestions = await self._generator.generate_reply_suggestions(
+                message, context
+            )
+            value = [(s.content, s.confidence_score) for s in suggestions]
+            # 空の結果を保存すると同じ内容のメッセージで再生成されなくなる
+            if value:
+                self._memory_cache.set(key, value)
+                if self._persistent_cache is not None:
+                    await self._persistent_cache.set(key, value)
+            future.set_result(value)
+            return suggestions
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 待機者がいない場合に未回収例外の警告を出さない
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def _record_lookup(self, hit: bool) -> None:
+        """ヒット・ミスの件数とヒット率を記録"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        REPLY_CACHE_LOOKUPS.labels("hit" if hit else "miss").inc()
+        REPLY_CACHE_HIT_RATIO.set(self.hits / (self.hits + self.misses))
+
+    async def _lookup(self, key: str) -> Optional[CachedReplies]:
+        cached = self._memory_cache.get(key)
+        if cached is not None or self._persistent_cache is None:
+            return cached
+        cached = await self._persistent_cache.get(key)
+        if cached is not None:
+            self.persistent_hits += 1
+            self._memory_cache.set(key, cached)
+        return cached
+
+    @staticmethod
+    def _to_suggestions(
+        message: ChatMessage, cached: CachedReplies
+    ) -> List[ReplySuggestion]:
+        """キャッシュ値を対象メッセージの返信案に変換"""
+        return [
+            ReplySuggestion(
+                message_id=message.message_id,
+                content=content,
+                confidence_score=confidence,
+                is_selected=False,
+                is_sent=False,
+                sent_at=None,
+            )
+            for content, confidence in cached
+        ]
+
+    def close(self) -> None:
+        """永続キャッシュを閉じる"""
+        if self._persistent_cache is not None:
+            self._persistent_cache.close()
+        logger.info("返信案キャッシュを閉じました", **self.stats())
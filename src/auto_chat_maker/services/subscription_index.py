@@ -0,0 +1,191 @@
+"""
+Webhookサブスクリプションのインメモリインデックス
+
+Webhookの受信ごとにDBを参照しないよう、アクティブなサブスクリプションを
+subscription_idをキーとして保持し、clientStateの検証に利用する。
+有効期限の最小ヒープも保持し、更新スケジューラーはテーブルを走査せずに
+次に期限を迎えるサブスクリプションを取り出せる。
+"""
+import asyncio
+import heapq
+import hmac
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.domain.repositories.interfaces import (
+    SubscriptionRepository,
+)
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SubscriptionIndex:
+    """subscription_idをキーとするアクティブなサブスクリプションの索引
+
+    ヒープの要素は更新時に削除せず、取り出し時に古いものを読み飛ばす。
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._heap: List[Tuple[datetime, str]] = []
+        # ヒープに登録済みの有効期限（subscription_idごと）
+        self._scheduled: Dict[str, datetime] = {}
+        self.changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def __iter__(self) -> Iterator[Subscription]:
+        return iter(list(self._subscriptions.values()))
+
+    async def load(self, repository: SubscriptionRepository) -> None:
+        """アクティブなサブスクリプションを読み込み、索引を置き換える"""
+        subscriptions = await repository.list_active()
+        self._subscriptions = {}
+        self._heap = []
+        self._scheduled = {}
+        for subscription in subscriptions:
+            self.put(subscription)
+        logger.info(
+            "サブスクリプションの索引を読み込みました",
+            count=len(self._subscriptions),
+        )
+
+    async def refresh_periodically(
+        self, repository: SubscriptionRepository, interval: float
+    ) -> None:
+        """他のワーカーでの作成・更新を反映するため定期的に読み直す"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.load(repository)
+            except Exception as e:
+                logger.warning("サブスクリプションの索引を更新できません", error=str(e))
+
+    def get(self, subscription_id: str) -> Optional[Subscription]:
+        """サブスクリプションを取得"""
+        return self._subscriptions.get(subscription_id)
+
+    def put(self, subscription: Subscription) -> None:
+        """サブスクリプションを追加・更新（非アクティブなら削除）"""
+        subscription_id = subscription.subscription_id
+        if not subscription.is_active:
+            self.remove(subscription_id)
+            return
+        self._subscriptions[subscription_id] = subscription
+        expiration = subscription.expiration_date_time
+        if self._scheduled.get(subscription_id) != expiration:
+            self._scheduled[subscription_id] = expiration
+            heapq.heappush(self._heap, (expiration, subscription_id))
+            self.changed.set()
+
+    def remove(self, subscription_id: str) -> None:
+        """サブスクリプションを削除"""
+        self._subscriptions.pop(subscription_id, None)
+        self._scheduled.pop(subscription_id, None)
+
+    def find_by_id(self, db_id: int) -> Optional[Subscription]:
+        """DBのIDでサブスクリプションを検索"""
+        for subscription in self._subscriptions.values():
+            if subscription.id == db_id:
+                return subscription
+        return None
+
+    def verify_client_state(
+        self, subscription_id: str, client_state: Optional[str]
+    ) -> bool:
+        """通知のclientStateがサブスクリプション作成時の値と一致するか"""
+        subscription = self._subscriptions.get(subscription_id)
+        if subscription is None:
+            return False
+        expected = subscription.client_state or ""
+        return hmac.compare_digest(
+            (client_state or "").encode(), expected.encode()
+        )
+
+    def next_expiration(self) -> Optional[datetime]:
+        """最も早く期限を迎えるサブスクリプションの有効期限"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_expiring(self, before: datetime) -> List[Subscription]:
+        """before以前に期限を迎えるサブスクリプションをヒープから取り出す
+
+        取り出したサブスクリプションは索引に残る。再度putするまで
+        ヒープには現れない。
+        """
+        expiring: List[Subscription] = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > before:
+                return expiring
+            _, subscription_id = heapq.heappop(self._heap)
+            del self._scheduled[subscription_id]
+            expiring.append(self._subscriptions[subscription_id])
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            expiration, subscription_id = self._heap[0]
+            if self._scheduled.get(subscription_id) == expiration:
+                return
+            heapq.heappop(self._heap)
+
+
+class IndexedSubscriptionRepository:
+    """書き込みを索引にも反映するSubscriptionRepository"""
+
+    def __init__(
+        self, repository: SubscriptionRepository, index: SubscriptionIndex
+    ) -> None:
+        self._repository = repository
+        self._index = index
+
+    async def create(self, subscription: Subscription) -> Subscription:
+        """サブスクリプションを作成"""
+        created = await self._repository.create(subscription)
+        self._index.put(created)
+        return created
+
+    async def get_by_id(self, subscription_id: int) -> Optional[Subscription]:
+        """IDでサブスクリプションを取得"""
+        return await self._repository.get_by_id(subscription_id)
+
+    async def get_by_subscription_id(
+        self, subscription_id: str
+    ) -> Optional[Subscription]:
+        """Microsoft GraphのサブスクリプションIDで取得"""
+        return await self._repository.get_by_subscription_id(subscription_id)
+
+    async def update(self, subscription: Subscription) -> Subscription:
+        """サブスクリプションを更新"""
+        updated = await self._repository.update(subscription)
+        self._index.put(updated)
+        return updated
+
+    async def delete(self, subscription_id: int) -> bool:
+        """サブスクリプションを削除"""
+        deleted = await self._repository.delete(subscription_id)
+        subscription = self._index.find_by_id(subscription_id)
+        if subscription is not None:
+            self._index.remove(subscription.subscription_id)
+        return deleted
+
+    async def list_active(self) -> List[Subscription]:
+        """アクティブなサブスクリプションを取得"""
+        return await self._repository.list_active()
+
+    async def list_expired(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None
+    ) -> List[Subscription]:
+        """期限切れのサブスクリプションを取得"""
+        return await self._repository.list_expired(
+            after_id=after_id, limit=limit
+        )
+
+    def iter_expired(
+        self, chunk_size: int = 500
+    ) -> AsyncIterator[Subscription]:
+        """期限切れのサブスクリプションをチャンク単位で逐次取得"""
+        return self._repository.iter_expired(chunk_size)
@@ -95,3 +95,9 @@ class NetworkError(ExternalServiceError):
     """ネットワークエラー"""
 
     pass
+
+
+class CircuitOpenError(ExternalServiceError):
+    """サーキットブレーカーによる呼び出し停止エラー"""
+
+    pass
@@ -0,0 +1,76 @@
+"""
+ワーカー間のリーダー選出モジュール
+
+複数ワーカーで起動した場合に、定期実行のスケジューラーを
+1つのワーカーだけが動かすためのファイルロック。
+fcntl.flockはプロセスの終了時にOSが解放するため、リーダーが
+異常終了しても待機中の別のワーカーが引き継げる。
+同一ホスト内のワーカー間でのみ有効。
+"""
+import asyncio
+import os
+from typing import Callable, Optional
+
+from auto_chat_maker.utils.logger import get_logger
+
+try:
+    import fcntl
+
+    _HAS_FCNTL = True
+except ImportError:  # pragma: no cover - Windowsではfork・複数ワーカー非対応
+    _HAS_FCNTL = False
+
+logger = get_logger(__name__)
+
+
+class FileLeaderLock:
+    """ファイルロックによるリーダー選出
+
+    fcntlが利用できない環境では常にリーダーとして扱う。
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def is_leader(self) -> bool:
+        """ロックを保持しているかどうか"""
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """ロックの取得を試み、リーダーになれたかを返す（待機しない）"""
+        if self._fd is not None:
+            return True
+        if not _HAS_FCNTL:
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # 調査用にリーダーのPIDを書き込む
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        logger.info("スケジューラーのリーダーになりました", pid=os.getpid())
+        return True
+
+    def release(self) -> None:
+        """ロックを解放"""
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+    async def run_when_acquired(
+        self, callback: Callable[[], None], poll_interval: float
+    ) -> None:
+        """ロックを取得できるまで待機し、取得したらcallbackを実行"""
+        while not self.try_acquire():
+            await asyncio.sleep(poll_interval)
+        callback()
@@ -0,0 +1,116 @@
+"""
+ログのサンプリング・レート制限モジュール
+
+ヘルスチェックやバリデーションエラーのように頻繁に出力されるログを、
+キーごとのサンプリング率と「時間窓ごとに先頭N件まで」のレート制限で
+間引くstructlogプロセッサーを提供する。キーはイベントの ``log_key``
+（なければイベント名）で、制限により抑制した件数は次の窓で最初に
+出力されるログの ``suppressed_count`` として報告する。
+"""
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from structlog import DropEvent
+from structlog.types import EventDict, WrappedLogger
+
+from auto_chat_maker.config.settings import Settings
+
+# (時間窓内の最大件数, 時間窓の秒数)
+RateLimit = Tuple[int, float]
+
+
+def parse_rate_limit(value: str) -> RateLimit:
+    """「件数/秒数」形式（例: 10/60）のレート制限を解釈"""
+    try:
+        count, window = value.split("/", 1)
+        return int(count), float(window)
+    except ValueError as e:
+        raise ValueError(f"ログのレート制限の形式が不正です: {value}") from e
+
+
+class _Window:
+    """キーごとの時間窓の集計"""
+
+    __slots__ = ("started_at", "count", "suppressed")
+
+    def __init__(self, started_at: float) -> None:
+        self.started_at = started_at
+        self.count = 0
+        self.suppressed = 0
+
+
+class LogSampler:
+    """キーごとのサンプリングとレート制限を行うstructlogプロセッサー"""
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limits: Optional[Dict[str, RateLimit]] = None,
+        key_field: str = "log_key",
+    ) -> None:
+        self._sample_rates = dict(sample_rates or {})
+        self._rate_limits = dict(rate_limits or {})
+        self._key_field = key_field
+        self._windows: Dict[str, _Window] = {}
+        self._lock = threading.Lock()
+        self.sampled_out = 0
+        self.suppressed = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "LogSampler":
+        """設定値からインスタンスを生成"""
+        return cls(
+            sample_rates=settings.log_sample_rates,
+            rate_limits={
+                key: parse_rate_limit(value)
+                for key, value in settings.log_rate_limits.items()
+            },
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """サンプリング・レート制限の設定があるか"""
+        return bool(self._sample_rates or self._rate_limits)
+
+    def __call__(
+        self, logger: WrappedLogger, method_name: str, event_dict: EventDict
+    ) -> EventDict:
+        key = event_dict.get(self._key_field) or event_dict.get("event")
+        if not isinstance(key, str):
+            return event_dict
+
+        rate = self._sample_rates.get(key)
+        if rate is not None and rate < 1:
+            if random.random() >= rate:
+                with self._lock:
+                    self.sampled_out += 1
+                raise DropEvent
+            # 集計時に件数を補正できるよう採用率を残す
+            event_dict["sample_rate"] = rate
+
+        limit = self._rate_limits.get(key)
+        if limit is not None:
+            self._apply_rate_limit(key, limit, event_dict)
+        return event_dict
+
+    def _apply_rate_limit(
+        self, key: str, limit: RateLimit, event_dict: EventDict
+    ) -> None:
+        """時間窓ごとに先頭max_events件だけ通し、残りは件数のみ数える"""
+        max_events, window = limit
+        now = time.monotonic()
+        with self._lock:
+            state = self._windows.get(key)
+            if state is None or now - state.started_at >= window:
+                previous_suppressed = 0 if state is None else state.suppressed
+                state = _Window(now)
+                self._windows[key] = state
+                if previous_suppressed:
+                    event_dict["suppressed_count"] = previous_suppressed
+            state.count += 1
+            if state.count > max_events:
+                state.suppressed += 1
+                self.suppressed += 1
+                raise DropEvent
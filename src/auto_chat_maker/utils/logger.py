@@ -1,51 +1,319 @@
 """
 ログ設定管理モジュール
+
+async_modeを有効にすると、ログレコードを上限付きキューに積むだけで
+呼び出し元に戻り、JSONへの整形と標準出力への書き込みはバックグラウンド
+スレッド（QueueListener）で行う。出力先の詰まりでイベントループが
+止まらないようにするための設定。
+
+log_profile="fast"では、レベル未満のログをプロセッサー実行前に捨て、
+タイムスタンプの整形を秒単位でキャッシュし、例外・スタック情報の
+プロセッサーは該当キーがあるときだけ実行し、orjson（未インストールなら
+標準のjson）でJSONを出力する。
 """
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
-from typing import Any, cast
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, List, Optional, Tuple, cast
 
 import structlog
-from structlog.stdlib import LoggerFactory
+from structlog.stdlib import LoggerFactory, ProcessorFormatter
+from structlog.types import EventDict, Processor, WrappedLogger
+
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # pragma: no cover - orjsonは任意の依存関係
+    _HAS_ORJSON = False
+
+# キューが満杯のときの方針
+QUEUE_POLICY_DROP = "drop"
+QUEUE_POLICY_BLOCK = "block"
+
+# 処理パイプラインの種類
+LOG_PROFILE_STANDARD = "standard"
+LOG_PROFILE_FAST = "fast"
+
+
+class CachedTimeStamper:
+    """整形済みの日時を秒単位でキャッシュするタイムスタンプ付与プロセッサー
+
+    TimeStamper(fmt="iso")と同じUTCのISO 8601形式を出力する。
+    """
+
+    def __init__(self, key: str = "timestamp") -> None:
+        self._key = key
+        self._cache: Tuple[int, str] = (-1, "")
+
+    def __call__(
+        self, logger: WrappedLogger, method_name: str, event_dict: EventDict
+    ) -> EventDict:
+        now = time.time()
+        second = int(now)
+        cached_second, prefix = self._cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._cache = (second, prefix)
+        microsecond = int((now - second) * 1_000_000)
+        event_dict[self._key] = f"{prefix}.{microsecond:06d}Z"
+        return event_dict
+
+
+class FastJSONRenderer:
+    """orjsonを利用するJSONレンダラー（未インストール時は標準のjson）"""
+
+    def __call__(
+        self, logger: WrappedLogger, method_name: str, event_dict: EventDict
+    ) -> str:
+        if _HAS_ORJSON:
+            try:
+                return orjson.dumps(
+                    event_dict, default=str, option=orjson.OPT_NON_STR_KEYS
+                ).decode("utf-8")
+            except TypeError:
+                # 64bitを超える整数などorjsonが扱えない値
+                pass
+        return json.dumps(
+            event_dict, ensure_ascii=False, default=str, separators=(",", ":")
+        )
+
+
+def _only_if_present(key: str, processor: Processor) -> Processor:
+    """event_dictにkeyがあるときだけプロセッサーを実行"""
+
+    def run(
+        logger: WrappedLogger, method_name: str, event_dict: EventDict
+    ) -> Any:
+        if key in event_dict:
+            return processor(logger, method_name, event_dict)
+        return event_dict
+
+    return run
+
+
+class BoundedQueueHandler(QueueHandler):
+    """上限付きキューへログレコードを渡すハンドラー
+
+    満杯時はpolicyに従い、"drop"なら破棄して件数を数え、
+    "block"なら空きができるまで待つ。
+    """
+
+    def __init__(
+        self,
+        log_queue: "queue.Queue[logging.LogRecord]",
+        policy: str = QUEUE_POLICY_DROP,
+    ) -> None:
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 整形はリスナースレッドで行うため、呼び出し元では何もしない
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.policy == QUEUE_POLICY_BLOCK:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 class LoggerConfig:
     """ログ設定クラス"""
 
-    def __init__(self, log_level: str = "INFO", log_format: str = "json"):
+    def __init__(
+        self,
+        log_level: str = "INFO",
+        log_format: str = "json",
+        async_mode: bool = False,
+        queue_size: int = 10000,
+        queue_policy: str = QUEUE_POLICY_DROP,
+        log_profile: str = LOG_PROFILE_STANDARD,
+        sampler: Optional[Processor] = None,
+    ):
+        if log_profile not in (LOG_PROFILE_STANDARD, LOG_PROFILE_FAST):
+            raise ValueError(f"不明なログプロファイルです: {log_profile}")
+        if queue_policy not in (QUEUE_POLICY_DROP, QUEUE_POLICY_BLOCK):
+            raise ValueError(f"不明なログキューの方針です: {queue_policy}")
         self.log_level = log_level
         self.log_format = log_format
+        self.async_mode = async_mode
+        self.queue_size = queue_size
+        self.queue_policy = queue_policy
+        self.log_profile = log_profile
+        # ログのサンプリング・レート制限を行うプロセッサー（LogSampler等）
+        self.sampler = sampler
+        self._queue_handler: Optional[BoundedQueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+        self._output_handler: Optional[logging.Handler] = None
         self._configure_logging()
 
+    def _renderer(self) -> Processor:
+        if self.log_format != "json":
+            return structlog.dev.ConsoleRenderer()
+        if self.log_profile == LOG_PROFILE_FAST:
+            return FastJSONRenderer()
+        return structlog.processors.JSONRenderer()
+
+    def _pre_processors(self) -> List[Processor]:
+        """レンダリング前に呼び出し元で実行するプロセッサー"""
+        if self.log_profile == LOG_PROFILE_FAST:
+            # レベル判定と位置引数の展開はラッパー側で行われる
+            return [
+                *self._sampling_processors(),
+                structlog.stdlib.add_logger_name,
+                structlog.processors.add_log_level,
+                CachedTimeStamper(),
+                _only_if_present(
+                    "stack_info", structlog.processors.StackInfoRenderer()
+                ),
+                _only_if_present(
+                    "exc_info", structlog.processors.format_exc_info
+                ),
+            ]
+        return [
+            structlog.stdlib.filter_by_level,
+            *self._sampling_processors(),
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+        ]
+
+    def _sampling_processors(self) -> List[Processor]:
+        # 間引くログの整形処理を省くため、レベル判定の直後に実行する
+        return [] if self.sampler is None else [self.sampler]
+
+    def _wrapper_class(self, level: int) -> Any:
+        if self.log_profile == LOG_PROFILE_FAST:
+            # レベル未満のメソッドは何もしない関数になり、処理を一切行わない
+            return structlog.make_filtering_bound_logger(level)
+        return structlog.stdlib.BoundLogger
+
     def _configure_logging(self) -> None:
         """ログ設定を初期化"""
+        self.shutdown()
+        level = getattr(logging, self.log_level.upper())
+        processors = self._pre_processors()
+        if self.async_mode:
+            # 整形はリスナースレッドのProcessorFormatterに任せる
+            processors.append(ProcessorFormatter.wrap_for_formatter)
+        else:
+            if self.log_profile == LOG_PROFILE_STANDARD:
+                processors.append(structlog.processors.UnicodeDecoder())
+            processors.append(self._renderer())
+
         # structlogの設定
         structlog.configure(
-            processors=[
-                structlog.stdlib.filter_by_level,
-                structlog.stdlib.add_logger_name,
-                structlog.stdlib.add_log_level,
-                structlog.stdlib.PositionalArgumentsFormatter(),
-                structlog.processors.TimeStamper(fmt="iso"),
-                structlog.processors.StackInfoRenderer(),
-                structlog.processors.format_exc_info,
-                structlog.processors.UnicodeDecoder(),
-                structlog.processors.JSONRenderer()
-                if self.log_format == "json"
-                else structlog.dev.ConsoleRenderer(),
-            ],
+            processors=processors,
             context_class=dict,
             logger_factory=LoggerFactory(),
-            wrapper_class=structlog.stdlib.BoundLogger,
+            wrapper_class=self._wrapper_class(level),
             cache_logger_on_first_use=True,
         )
 
+        if self.async_mode:
+            self._start_listener(level)
+            return
+
         # 標準ライブラリのログレベル設定
         logging.basicConfig(
             format="%(message)s",
             stream=sys.stdout,
-            level=getattr(logging, self.log_level.upper()),
+            level=level,
+        )
+
+    def _start_listener(self, level: int) -> None:
+        """キューとバックグラウンドの出力スレッドを開始"""
+        output_handler = logging.StreamHandler(sys.stdout)
+        output_handler.setFormatter(
+            ProcessorFormatter(
+                processors=[
+                    ProcessorFormatter.remove_processors_meta,
+                    structlog.processors.UnicodeDecoder(),
+                    self._renderer(),
+                ],
+                # structlog以外（uvicorn等）のログにも同じ形式を適用
+                foreign_pre_chain=[
+                    structlog.stdlib.add_logger_name,
+                    structlog.stdlib.add_log_level,
+                    structlog.processors.TimeStamper(fmt="iso"),
+                ],
+            )
+        )
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(
+            self.queue_size
+        )
+        self._queue_handler = BoundedQueueHandler(log_queue, self.queue_policy)
+        self._output_handler = output_handler
+        self._listener = QueueListener(log_queue, output_handler)
+
+        root = logging.getLogger()
+        # basicConfigで追加された同期出力のハンドラーを置き換える
+        for handler in list(root.handlers):
+            if type(handler) is logging.StreamHandler:
+                root.removeHandler(handler)
+        root.addHandler(self._queue_handler)
+        root.setLevel(level)
+        self._listener.start()
+
+    @property
+    def dropped(self) -> int:
+        """キュー満杯により破棄したログの件数"""
+        return (
+            0 if self._queue_handler is None else self._queue_handler.dropped
+        )
+
+    def flush(self) -> None:
+        """キューに残ったログをすべて出力する
+
+        出力スレッドを停止して残りを書き出した後、再開する。
+        """
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._report_dropped()
+        self._listener.start()
+
+    def shutdown(self) -> None:
+        """キューに残ったログを出力し、非同期モードを終了"""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._report_dropped()
+        logging.getLogger().removeHandler(cast(Any, self._queue_handler))
+        self._listener = None
+        self._queue_handler = None
+
+    def _report_dropped(self) -> None:
+        """破棄したログの件数を出力スレッドを介さずに書き出す"""
+        if self._queue_handler is None or self._output_handler is None:
+            return
+        dropped = self._queue_handler.dropped
+        if not dropped:
+            return
+        self._queue_handler.dropped = 0
+        record = logging.LogRecord(
+            __name__,
+            logging.WARNING,
+            __file__,
+            0,
+            f"ログキューが満杯のため{dropped}件のログを破棄しました",
+            None,
+            None,
         )
+        self._output_handler.handle(record)
 
     def get_logger(self, name: str) -> structlog.stdlib.BoundLogger:
         """ロガーを取得"""
@@ -56,17 +324,67 @@ class LoggerConfig:
         self._configure_logging()
 
 
-# デフォルトロガー設定
-logger_config = LoggerConfig()
-get_logger = logger_config.get_logger
+# デフォルトロガー設定（最初にロガーを取得したときに初期化する）
+logger_config: Optional[LoggerConfig] = None
+
+
+def get_logger(name: str) -> structlog.stdlib.BoundLogger:
+    """ロガーを取得
+
+    ログ設定が未初期化の場合はデフォルト設定で初期化する。
+    モジュールのインポートだけではloggingの設定を変更しない。
+    """
+    global logger_config
+    if logger_config is None:
+        logger_config = LoggerConfig()
+    return logger_config.get_logger(name)
 
 
 def configure_logging(
-    log_level: str = "INFO", log_format: str = "json"
+    log_level: str = "INFO",
+    log_format: str = "json",
+    async_mode: bool = False,
+    queue_size: int = 10000,
+    queue_policy: str = QUEUE_POLICY_DROP,
+    log_profile: str = LOG_PROFILE_STANDARD,
+    sampler: Optional[Processor] = None,
 ) -> None:
     """ログ設定を更新"""
     global logger_config
-    logger_config = LoggerConfig(log_level, log_format)
+    if logger_config is not None:
+        logger_config.shutdown()
+    logger_config = LoggerConfig(
+        log_level,
+        log_format,
+        async_mode=async_mode,
+        queue_size=queue_size,
+        queue_policy=queue_policy,
+        log_profile=log_profile,
+        sampler=sampler,
+    )
+
+
+def flush_logging() -> None:
+    """非同期モードのキューに残ったログを出力"""
+    if logger_config is not None:
+        logger_config.flush()
+
+
+def _shutdown_logging() -> None:
+    if logger_config is not None:
+        logger_config.shutdown()
+
+
+def _restart_after_fork() -> None:
+    # 出力スレッドはforkで引き継がれないため、子プロセスで作り直す
+    if logger_config is not None and logger_config.async_mode:
+        logger_config.setup_logging()
+
+
+# プロセス終了時にキューの残りを書き出す
+atexit.register(_shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
 
 
 class AppLogger:
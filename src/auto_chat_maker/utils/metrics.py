@@ -0,0 +1,379 @@
+"""
+メトリクス収集モジュール
+
+Prometheusのテキスト形式で出力できるカウンター・ゲージ・
+固定バケットのヒストグラムを提供する。記録処理はイベントループ上の
+単純な加算のみでロックを取らず、本番環境で常時有効にできる軽さにする。
+キューの深さやコネクションプールの使用数のように記録ではなく
+参照で求める値は、出力時に呼び出すコレクターとして登録する。
+"""
+import inspect
+import math
+from bisect import bisect_left
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 応答時間向けの既定バケット（秒）
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Collector = Callable[[], Union[None, Awaitable[None]]]
+ChildT = TypeVar("ChildT")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric(Generic[ChildT]):
+    """ラベルごとの子メトリクスを管理する基底クラス"""
+
+    metric_type = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], ChildT] = {}
+
+    def _new_child(self) -> ChildT:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> ChildT:
+        """ラベル値に対応する子メトリクスを取得"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}のラベル数が一致しません: {self.labelnames}")
+            child = self._new_child()
+            self._children[key] = child
+        return child
+
+    def _default(self) -> ChildT:
+        return self.labels()
+
+    def _samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(サフィックス, ラベル文字列, 値) を列挙"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """テキスト形式の行を生成"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {_format_value(value)}"
+            for suffix, labels, value in self._samples()
+        )
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric[_CounterChild]):
+    """単調増加するカウンター（名前は ``_total`` で終える）"""
+
+    metric_type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """ラベルなしのカウンターを加算"""
+        self._default().inc(amount)
+
+    def _samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, child in list(self._children.items()):
+            yield "", _format_labels(self.labelnames, key), child.value
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Gauge(_Metric[_GaugeChild]):
+    """増減する値"""
+
+    metric_type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        """ラベルなしのゲージを設定"""
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """ラベルなしのゲージを加算"""
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """ラベルなしのゲージを減算"""
+        self._default().dec(amount)
+
+    def _samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, child in list(self._children.items()):
+            yield "", _format_labels(self.labelnames, key), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # 最後の要素は+Infバケット
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric[_HistogramChild]):
+    """固定バケットのヒストグラム"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """ラベルなしのヒストグラムに記録"""
+        self._default().observe(value)
+
+    def _samples(self) -> Iterable[Tuple[str, str, float]]:
+        bucket_names = self.labelnames + ("le",)
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                yield "_bucket", _format_labels(
+                    bucket_names, key + (bound,)
+                ), cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield "_sum", labels, child.sum
+            yield "_count", labels, child.count
+
+
+class MetricsRegistry:
+    """メトリクスとコレクターを保持し、テキスト形式で出力するクラス"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric[Any]] = {}
+        self._collectors: Dict[str, Collector] = {}
+
+    def _register(self, metric: Any) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """カウンターを登録（同名があればそれを返す）"""
+        metric: Counter = self._register(
+            Counter(name, documentation, labelnames)
+        )
+        return metric
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        """ゲージを登録（同名があればそれを返す）"""
+        metric: Gauge = self._register(Gauge(name, documentation, labelnames))
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """ヒストグラムを登録（同名があればそれを返す）"""
+        metric: Histogram = self._register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+        return metric
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """出力時に呼び出すコレクターを登録（同名は置き換え）"""
+        self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        """コレクターの登録を解除"""
+        self._collectors.pop(name, None)
+
+    async def collect(self) -> None:
+        """コレクターを実行してゲージ等を最新化"""
+        for collector in list(self._collectors.values()):
+            result = collector()
+            if inspect.isawaitable(result):
+                await result
+
+    def render(self) -> str:
+        """全メトリクスをテキスト形式で出力"""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """共有のメトリクスレジストリを取得"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+_default = get_metrics_registry()
+
+# HTTPリクエスト
+HTTP_REQUEST_DURATION = _default.histogram(
+    "http_request_duration_seconds",
+    "ルートごとのリクエスト処理時間",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_PROGRESS = _default.gauge(
+    "http_requests_in_progress", "処理中のリクエスト数"
+)
+
+# ワークキュー
+WORK_QUEUE_DEPTH = _default.gauge(
+    "work_queue_depth", "未完了のキューアイテム数", ("queue",)
+)
+WORK_QUEUE_ACK_LATENCY = _default.histogram(
+    "work_queue_ack_latency_seconds",
+    "キュー投入（Webhook受信）から処理完了（ack）までの時間",
+    ("queue",),
+)
+WORK_QUEUE_ITEMS = _default.counter(
+    "work_queue_items_total", "処理したキューアイテム数", ("queue", "outcome")
+)
+WEBHOOK_NOTIFICATIONS = _default.counter(
+    "webhook_notifications_total",
+    "受信したWebhook通知数（accepted・duplicate・rejected・invalid）",
+    ("outcome",),
+)
+NOTIFICATION_DEDUP_LOOKUPS = _default.counter(
+    "notification_dedup_lookups_total",
+    "通知の重複判定数（recent・confirmed・false_positive・new）",
+    ("result",),
+)
+
+# AI生成
+AI_GENERATION_DURATION = _default.histogram(
+    "ai_generation_duration_seconds", "返信案の生成時間", ("outcome",)
+)
+AI_TOKENS = _default.counter(
+    "ai_tokens_total", "Claude APIで消費したトークン数", ("model", "type")
+)
+REPLY_CACHE_LOOKUPS = _default.counter(
+    "reply_cache_lookups_total", "返信案キャッシュの参照数", ("result",)
+)
+REPLY_CACHE_HIT_RATIO = _default.gauge(
+    "reply_cache_hit_ratio", "返信案キャッシュのヒット率"
+)
+
+# データベース
+DB_POOL_CONNECTIONS = _default.gauge(
+    "db_pool_connections", "コネクションプールの接続数", ("state",)
+)
+
+# 外部サービス
+EXTERNAL_CALLS = _default.counter(
+    "external_calls_total", "外部サービス呼び出しの結果", ("dependency", "outcome")
+)
+EXTERNAL_CALL_DURATION = _default.histogram(
+    "external_call_duration_seconds",
+    "外部サービス呼び出しの所要時間",
+    ("dependency",),
+)
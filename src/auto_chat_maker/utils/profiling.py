@@ -0,0 +1,268 @@
+"""
+実行時に切り替え可能なプロファイリングモジュール
+
+本番環境で遅延が増えたときに原因を調べるための2つの仕組みを提供する。
+
+- SamplingProfiler: バックグラウンドスレッドからイベントループのスレッドの
+  スタックを一定間隔で採取し、flamegraph.pl・speedscope等で読める
+  collapsed stacks形式で集計する。指定秒数または指定リクエスト数で停止する。
+- SlowCallbackDetector: イベントループの1ステップ（コールバック・タスクの
+  1回の再開）が閾値より長くブロックした場合にログを出力する。
+
+どちらも無効時はリクエスト処理に負荷をかけない。
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from auto_chat_maker.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 1スタックあたりの最大フレーム数
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """フレームをルートから順に「;」で連結した文字列にする"""
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """イベントループのスレッドを対象とするサンプリングプロファイラー
+
+    リクエストのカウントはTimingMiddlewareから request_finished で通知される。
+    asyncioでは複数リクエストが同じスレッドで交互に実行されるため、
+    採取範囲は「N件のリクエストが完了するまでの間」のスレッド全体となる。
+    """
+
+    def __init__(
+        self, interval: float = 0.005, max_duration: float = 300.0
+    ) -> None:
+        self.interval = interval
+        self.max_duration = max_duration
+        self._stacks: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target_thread_id = 0
+        self._remaining_requests: Optional[int] = None
+        self._started_at = 0.0
+        self._stopped_at = 0.0
+
+    @property
+    def active(self) -> bool:
+        """採取中かどうか"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self,
+        duration: Optional[float] = None,
+        requests: Optional[int] = None,
+        interval: Optional[float] = None,
+    ) -> None:
+        """呼び出し元スレッドのスタック採取を開始
+
+        durationとrequestsのどちらにも達していなくても
+        max_duration秒経過したら停止する。
+        """
+        if self.active:
+            raise RuntimeError("プロファイリングは既に実行中です")
+        if interval is not None:
+            self.interval = interval
+        deadline = min(duration or self.max_duration, self.max_duration)
+        with self._lock:
+            self._stacks = Counter()
+        self._remaining_requests = requests
+        self._target_thread_id = threading.get_ident()
+        self._stop_event.clear()
+        self._started_at = time.monotonic()
+        self._stopped_at = 0.0
+        self._thread = threading.Thread(
+            target=self._sample,
+            args=(self._started_at + deadline,),
+            name="sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            "プロファイリングを開始しました",
+            duration=deadline,
+            requests=requests,
+            interval=self.interval,
+        )
+
+    def stop(self) -> None:
+        """採取を停止"""
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def request_finished(self) -> None:
+        """リクエストの完了を通知（指定件数に達したら停止）"""
+        if self._remaining_requests is None:
+            return
+        self._remaining_requests -= 1
+        if self._remaining_requests <= 0:
+            self._remaining_requests = None
+            self._stop_event.set()
+
+    def _sample(self, deadline: float) -> None:
+        while not self._stop_event.is_set() and time.monotonic() < deadline:
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is None:
+                break
+            stack = collapse_stack(frame)
+            del frame
+            with self._lock:
+                self._stacks[stack] += 1
+            self._stop_event.wait(self.interval)
+        self._stopped_at = time.monotonic()
+        self._remaining_requests = None
+        logger.info(
+            "プロファイリングを終了しました",
+            samples=sum(self._stacks.values()),
+        )
+
+    def collapsed(self) -> str:
+        """collapsed stacks形式（「スタック 件数」の行）で結果を出力"""
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def status(self) -> Dict[str, Any]:
+        """現在の状態を取得"""
+        end = time.monotonic() if self.active else self._stopped_at
+        with self._lock:
+            samples = sum(self._stacks.values())
+        return {
+            "active": self.active,
+            "interval": self.interval,
+            "samples": samples,
+            "elapsed": round(max(end - self._started_at, 0.0), 3)
+            if self._started_at
+            else 0.0,
+            "remaining_requests": self._remaining_requests,
+        }
+
+
+def _is_asyncio_loop() -> bool:
+    """実行中のイベントループが標準のasyncioの実装かどうか
+
+    ループの実行前はuvicornが選択したループを判定できないため真とする。
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return isinstance(loop, asyncio.BaseEventLoop)
+
+
+class SlowCallbackDetector:
+    """イベントループの1ステップが閾値を超えてブロックしたらログを出力する
+
+    asyncio.Handle._run を計測付きの関数に差し替える。
+    差し替えはプロセス全体に作用するため、get_slow_callback_detector()の
+    共有インスタンスから利用する。
+    uvloopはasyncio.Handleを使わないため、uvloopのループ上では有効化しない。
+    """
+
+    def __init__(self, threshold: float = 0.1) -> None:
+        self.threshold = threshold
+        self.detected = 0
+        self._original_run: Optional[Any] = None
+
+    @property
+    def enabled(self) -> bool:
+        """検出が有効かどうか"""
+        return self._original_run is not None
+
+    def enable(self, threshold: Optional[float] = None) -> None:
+        """検出を有効化"""
+        if threshold is not None:
+            self.threshold = threshold
+        if self._original_run is not None:
+            return
+        if not _is_asyncio_loop():
+            logger.warning(
+                "asyncio以外のイベントループでは遅いコールバックを検出できません",
+                loop=type(asyncio.get_running_loop()).__module__,
+            )
+            return
+        original_run = asyncio.Handle._run
+        detector = self
+
+        def timed_run(handle: asyncio.Handle) -> None:
+            started = time.perf_counter()
+            original_run(handle)
+            elapsed = time.perf_counter() - started
+            if elapsed >= detector.threshold:
+                detector.report(handle, elapsed)
+
+        self._original_run = original_run
+        setattr(asyncio.Handle, "_run", timed_run)
+        logger.info("遅いコールバックの検出を開始しました", threshold=self.threshold)
+
+    def disable(self) -> None:
+        """検出を無効化"""
+        if self._original_run is None:
+            return
+        setattr(asyncio.Handle, "_run", self._original_run)
+        self._original_run = None
+        logger.info("遅いコールバックの検出を終了しました")
+
+    def report(self, handle: asyncio.Handle, elapsed: float) -> None:
+        """ブロックしたステップをログ出力"""
+        self.detected += 1
+        fields: Dict[str, Any] = {}
+        # タスクの再開はラッパー経由で呼ばれるため、元のタスクを特定する
+        callback = getattr(handle, "_callback", None)
+        owner = getattr(callback, "__self__", None)
+        if isinstance(owner, asyncio.Task):
+            coro = owner.get_coro()
+            fields["task"] = owner.get_name()
+            fields["coroutine"] = getattr(coro, "__qualname__", repr(coro))
+        logger.warning(
+            "イベントループが長時間ブロックされました",
+            callback=repr(handle),
+            **fields,
+            duration_ms=round(elapsed * 1000, 1),
+            threshold_ms=round(self.threshold * 1000, 1),
+            log_key="slow_callback",
+        )
+
+
+_profiler: Optional[SamplingProfiler] = None
+_slow_callback_detector: Optional[SlowCallbackDetector] = None
+
+
+def get_sampling_profiler() -> SamplingProfiler:
+    """共有のサンプリングプロファイラーを取得"""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
+
+
+def get_slow_callback_detector() -> SlowCallbackDetector:
+    """共有の遅いコールバック検出器を取得"""
+    global _slow_callback_detector
+    if _slow_callback_detector is None:
+        _slow_callback_detector = SlowCallbackDetector()
+    return _slow_callback_detector
@@ -0,0 +1,263 @@
+"""
+外部API呼び出しの流量制御モジュール
+
+エンドポイントごとのトークンバケットでリクエストレートを抑え、
+AIMD（加算的増加・乗算的減少）方式の適応的な同時実行数制御で
+429/503を受けたら絞り、正常時は徐々に広げる。Retry-Afterを受けた
+エンドポイントは指定時間（+ジッター）だけ送信を止め、再試行が
+一斉に集中しないようにする。
+呼び出しの結果と所要時間は依存先ごとのメトリクスとして記録する。
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from auto_chat_maker.utils.exceptions import (
+    ExternalServiceError,
+    NetworkError,
+    RateLimitError,
+    TimeoutError,
+)
+from auto_chat_maker.utils.metrics import (
+    EXTERNAL_CALL_DURATION,
+    EXTERNAL_CALLS,
+)
+from auto_chat_maker.utils.timing import PHASE_EXTERNAL, record_timing
+
+# 過負荷とみなすHTTPステータス
+OVERLOAD_STATUS_CODES = frozenset({429, 503})
+
+
+def call_outcome(error: Optional[BaseException]) -> str:
+    """外部サービス呼び出しの結果をメトリクスのラベル値に分類"""
+    if error is None:
+        return "success"
+    if isinstance(error, RateLimitError):
+        return "rate_limited"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    if isinstance(error, NetworkError):
+        return "network_error"
+    if isinstance(error, ExternalServiceError):
+        status_code = error.details.get("status_code")
+        if isinstance(status_code, int) and status_code >= 500:
+            return "server_error"
+        return "client_error"
+    if isinstance(error, asyncio.CancelledError):
+        return "cancelled"
+    return "error"
+
+
+class TokenBucket:
+    """非同期トークンバケット
+
+    rate（トークン/秒）で補充され、capacityまでバーストを許容する。
+    rateが0以下の場合はレート制限を行わず、deferによる停止のみ反映する。
+    待機者はロックの順（FIFO）にトークンを受け取る。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """トークンを取得できるまで待機"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def defer(self, seconds: float, jitter: float = 0.1) -> None:
+        """指定秒数（Retry-After）だけ送信を止める
+
+        複数のクライアントが同時に再開しないよう最大jitter割合の揺らぎを加える。
+        """
+        delay = seconds * (1 + random.uniform(0, jitter))
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + delay)
+        self._tokens = 0.0
+        self._updated_at = now + delay
+
+
+class RateLimiter:
+    """キー（エンドポイント）ごとのトークンバケットを管理するクラス"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        """キーに対応するバケットを取得（なければ作成）"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self._rate, self._capacity)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, key: str = "default") -> None:
+        """キーのトークンを取得"""
+        await self.bucket(key).acquire()
+
+    def defer(self, key: str, seconds: float) -> None:
+        """キーへの送信を指定秒数止める"""
+        self.bucket(key).defer(seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD方式で上限を調整する同時実行数リミッター
+
+    成功するたびに上限を1/上限ずつ増やし（おおよそ上限件の成功で+1）、
+    過負荷を受けると上限をbackoff_factor倍に減らす。同時に返ってきた
+    複数の過負荷応答で過剰に絞らないよう、減少はcooldown秒に1回とする。
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff_factor: float = 0.5,
+        cooldown: float = 1.0,
+    ) -> None:
+        self._limit = float(initial_limit)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._backoff_factor = backoff_factor
+        self._cooldown = cooldown
+        self._last_decrease = float("-inf")
+        self._in_flight = 0
+        self._waiters: "Deque[asyncio.Future[None]]" = deque()
+
+    @property
+    def limit(self) -> int:
+        """現在の同時実行数の上限"""
+        return max(self._min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        """実行中の件数"""
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        """実行枠を確保できるまで待機"""
+        if not self._waiters and self._in_flight < self.limit:
+            self._in_flight += 1
+            return
+        waiter: "asyncio.Future[None]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 枠を受け取った直後にキャンセルされたので次の待機者へ譲る
+                self._in_flight -= 1
+                self._wake_waiters()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, overloaded: bool = False) -> None:
+        """実行枠を返却し、結果に応じて上限を調整"""
+        self._in_flight -= 1
+        if overloaded:
+            now = time.monotonic()
+            if now - self._last_decrease >= self._cooldown:
+                self._limit = max(
+                    float(self._min_limit), self._limit * self._backoff_factor
+                )
+                self._last_decrease = now
+        else:
+            self._limit = min(
+                float(self._max_limit), self._limit + 1 / self._limit
+            )
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+
+class OutboundLimiter:
+    """外部サービス1つ分のレート制限と適応的同時実行数制御をまとめたクラス"""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_second: float = 0.0,
+        burst: Optional[int] = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+    ) -> None:
+        self.name = name
+        self.rate_limiter = RateLimiter(
+            requests_per_second,
+            float(burst) if burst is not None else None,
+        )
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial_limit=initial_concurrency,
+            min_limit=min_concurrency,
+            max_limit=max_concurrency,
+        )
+
+    @asynccontextmanager
+    async def limit(self, key: str = "default") -> AsyncIterator[None]:
+        """レートと同時実行数の枠を確保して処理を実行
+
+        ブロック内でRateLimitError（429）やステータス503の
+        ExternalServiceErrorが送出された場合は過負荷として扱い、
+        details["retry_after"]があればその間このキーへの送信を止める。
+        """
+        await self.rate_limiter.acquire(key)
+        await self.concurrency.acquire()
+        overloaded = False
+        error: Optional[BaseException] = None
+        started = time.perf_counter()
+        try:
+            yield
+        except ExternalServiceError as e:
+            error = e
+            overloaded = isinstance(e, RateLimitError) or (
+                e.details.get("status_code") in OVERLOAD_STATUS_CODES
+            )
+            retry_after = e.details.get("retry_after")
+            if overloaded and retry_after:
+                self.rate_limiter.defer(key, float(retry_after))
+            raise
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self.concurrency.release(overloaded)
+            elapsed = time.perf_counter() - started
+            EXTERNAL_CALL_DURATION.labels(self.name).observe(elapsed)
+            record_timing(PHASE_EXTERNAL, elapsed)
+            EXTERNAL_CALLS.labels(self.name, call_outcome(error)).inc()
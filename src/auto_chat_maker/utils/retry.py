@@ -0,0 +1,290 @@
+"""
+外部サービス呼び出しの再試行・サーキットブレーカーモジュール
+
+ジッター付き指数バックオフで再試行し、試行ごと・全体の期限を守る。
+依存先ごとのサーキットブレーカーは連続失敗でオープンになり、
+回復待ちの間は即座に失敗させてワーカーやDB接続を占有し続けない。
+一定時間後はハーフオープンにして少数の試行で回復を確認する。
+"""
+import asyncio
+import copy
+import functools
+import random
+import time
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Optional, Type, TypeVar
+
+from auto_chat_maker.config.mcp_settings import MCPSettings
+from auto_chat_maker.utils.exceptions import (
+    CircuitOpenError,
+    ExternalServiceError,
+    NetworkError,
+    RateLimitError,
+    TimeoutError,
+)
+from auto_chat_maker.utils.logger import get_logger
+from auto_chat_maker.utils.metrics import EXTERNAL_CALLS
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def is_service_failure(error: BaseException) -> bool:
+    """依存先の障害とみなす例外かどうかを判定
+
+    ネットワークエラー・タイムアウト・5xx応答を障害とする。
+    レート制限（429）は依存先が応答しているため障害に含めない。
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (NetworkError, TimeoutError)):
+        return True
+    if isinstance(error, ExternalServiceError):
+        status_code = error.details.get("status_code")
+        return isinstance(status_code, int) and status_code >= 500
+    return False
+
+
+def is_retryable(error: BaseException) -> bool:
+    """再試行すべき例外かどうかを判定
+
+    依存先の障害とレート制限を再試行対象とする。
+    サーキットオープンは即時失敗させるため対象外。
+    """
+    return isinstance(error, RateLimitError) or is_service_failure(error)
+
+
+class RetryPolicy:
+    """ジッター付き指数バックオフの再試行ポリシー
+
+    関数呼び出し（call）とデコレーター（インスタンスを直接適用）の
+    どちらでも利用できる。
+    期限切れ時は呼び出し中の処理がキャンセルされ、サーキットブレーカーは
+    失敗を判定できないため、circuit_breakerを指定した場合はここで記録する。
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        attempt_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        retryable: Callable[[BaseException], bool] = is_retryable,
+        circuit_breaker: Optional["CircuitBreaker"] = None,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self._retryable = retryable
+        self.circuit_breaker = circuit_breaker
+
+    @classmethod
+    def from_mcp_settings(cls, mcp_settings: MCPSettings) -> "RetryPolicy":
+        """MCP設定（max_retries・retry_delay・connection_timeout）から生成"""
+        return cls(
+            max_attempts=mcp_settings.max_retries + 1,
+            base_delay=mcp_settings.retry_delay,
+            attempt_timeout=mcp_settings.connection_timeout,
+        )
+
+    def with_circuit_breaker(
+        self, circuit_breaker: "CircuitBreaker"
+    ) -> "RetryPolicy":
+        """期限切れをcircuit_breakerの失敗として記録するポリシーを返す
+
+        circuit_breakerが設定済みの場合はそのまま返す。
+        """
+        if self.circuit_breaker is not None:
+            return self
+        policy = copy.copy(self)
+        policy.circuit_breaker = circuit_breaker
+        return policy
+
+    def backoff(self, attempt: int) -> float:
+        """attempt回目の失敗後の待機秒数（フルジッター）"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        """関数を再試行ポリシーに従って実行"""
+        deadline_at = (
+            None if self.deadline is None else time.monotonic() + self.deadline
+        )
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._attempt(func, deadline_at, *args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self._retryable(e):
+                    raise
+                delay = self.backoff(attempt)
+                retry_after = getattr(e, "details", {}).get("retry_after")
+                if retry_after:
+                    delay = max(delay, float(retry_after))
+                if (
+                    deadline_at is not None
+                    and time.monotonic() + delay >= deadline_at
+                ):
+                    raise
+                logger.warning(
+                    "外部サービス呼び出しを再試行します",
+                    attempt=attempt,
+                    delay=round(delay, 3),
+                    error=str(e),
+                )
+                await asyncio.sleep(delay)
+
+    async def _attempt(
+        self,
+        func: Callable[..., Awaitable[T]],
+        deadline_at: Optional[float],
+        *args: Any,
+        **kwargs: Any,
+    ) -> T:
+        """1回分の試行を期限付きで実行"""
+        timeout = self.attempt_timeout
+        if deadline_at is not None:
+            remaining = deadline_at - time.monotonic()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        if timeout is None:
+            return await func(*args, **kwargs)
+        try:
+            return await asyncio.wait_for(func(*args, **kwargs), timeout)
+        except asyncio.TimeoutError as e:
+            # 外部からのキャンセル（CancelledError）は障害として扱わない
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_failure()
+            raise TimeoutError(
+                "外部サービス呼び出しが期限内に完了しませんでした",
+                error_code="DEADLINE_EXCEEDED",
+                details={"timeout": timeout},
+            ) from e
+
+    def __call__(
+        self, func: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        """デコレーターとして関数に再試行ポリシーを適用"""
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            return await self.call(func, *args, **kwargs)
+
+        return wrapper
+
+
+class CircuitBreaker:
+    """依存先ごとのサーキットブレーカー
+
+    ``async with breaker:`` で囲んだ処理の失敗が連続してfailure_threshold回
+    に達するとオープンになり、recovery_timeout秒の間はCircuitOpenErrorで
+    即座に失敗させる。その後ハーフオープンでhalf_open_max_calls件だけ
+    試行し、成功すればクローズ、失敗すれば再びオープンにする。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = is_service_failure,
+    ) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._half_open_max_calls = half_open_max_calls
+        self._is_failure = is_failure
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> str:
+        """現在の状態（回復待ち時間の経過を反映）"""
+        if (
+            self._state == STATE_OPEN
+            and time.monotonic() - self._opened_at >= self._recovery_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """呼び出し可否を判定し、不可ならCircuitOpenErrorを送出"""
+        state = self.state
+        if state == STATE_CLOSED:
+            return
+        if (
+            state == STATE_HALF_OPEN
+            and self._half_open_calls < self._half_open_max_calls
+        ):
+            self._half_open_calls += 1
+            return
+        EXTERNAL_CALLS.labels(self.name, "circuit_open").inc()
+        remaining = self._recovery_timeout - (
+            time.monotonic() - self._opened_at
+        )
+        raise CircuitOpenError(
+            f"{self.name}への呼び出しを一時停止しています",
+            error_code="CIRCUIT_OPEN",
+            details={"service": self.name, "retry_after": max(remaining, 0)},
+        )
+
+    def record_success(self) -> None:
+        """成功を記録"""
+        if self._state != STATE_CLOSED:
+            logger.info("サーキットをクローズしました", service=self.name)
+        self._state = STATE_CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        """失敗を記録し、閾値に達したらオープンにする"""
+        self._failures += 1
+        if (
+            self._state == STATE_HALF_OPEN
+            or self._failures >= self._failure_threshold
+        ):
+            if self._state != STATE_OPEN:
+                logger.warning(
+                    "サーキットをオープンしました",
+                    service=self.name,
+                    failures=self._failures,
+                )
+            self._state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+    async def __aenter__(self) -> "CircuitBreaker":
+        self.before_call()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc is None or (
+            isinstance(exc, Exception) and not self._is_failure(exc)
+        ):
+            # 入力エラー等は依存先が応答しているため成功として扱う
+            self.record_success()
+        elif isinstance(exc, Exception):
+            self.record_failure()
+        elif self._state == STATE_HALF_OPEN:
+            # キャンセル時は判定できないので試行枠だけ返す
+            self._half_open_calls = max(self._half_open_calls - 1, 0)
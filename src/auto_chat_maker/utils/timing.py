@@ -0,0 +1,97 @@
+"""
+リクエスト単位の処理時間計測モジュール
+
+リクエストごとのタイマーをcontextvarsで保持し、ルーティング・ハンドラー・
+DBクエリ・外部サービス呼び出しの所要時間をフェーズ別に積算する。
+計測箇所はタイマーの有無だけを確認するため、リクエスト外（スケジューラー等）
+から呼ばれても何もしない。
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Dict, Iterator, Optional, Tuple
+
+PHASE_ROUTING = "routing"
+PHASE_HANDLER = "handler"
+PHASE_DB = "db"
+PHASE_EXTERNAL = "external"
+
+_current_timer: ContextVar[Optional["RequestTimer"]] = ContextVar(
+    "request_timer", default=None
+)
+
+
+class RequestTimer:
+    """1リクエスト分のフェーズ別所要時間"""
+
+    __slots__ = ("started_at", "durations", "counts")
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        """フェーズの所要時間を積算"""
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def elapsed(self) -> float:
+        """開始からの経過秒数"""
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timingヘッダーの値を生成"""
+        entries = [
+            f"{phase};dur={seconds * 1000:.1f}"
+            for phase, seconds in self.durations.items()
+        ]
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+    def summary(self) -> Dict[str, float]:
+        """ログ出力用にフェーズ別の所要時間（ミリ秒）を返す"""
+        summary = {
+            f"{phase}_ms": round(seconds * 1000, 1)
+            for phase, seconds in self.durations.items()
+        }
+        for phase in (PHASE_DB, PHASE_EXTERNAL):
+            if phase in self.counts:
+                summary[f"{phase}_count"] = self.counts[phase]
+        return summary
+
+
+TimerToken = Token[Optional[RequestTimer]]
+
+
+def start_request_timer() -> Tuple[RequestTimer, TimerToken]:
+    """現在のコンテキストでリクエストタイマーを開始"""
+    timer = RequestTimer()
+    return timer, _current_timer.set(timer)
+
+
+def reset_request_timer(token: TimerToken) -> None:
+    """リクエストタイマーを終了"""
+    _current_timer.reset(token)
+
+
+def current_request_timer() -> Optional[RequestTimer]:
+    """現在のリクエストタイマーを取得（リクエスト外ではNone）"""
+    return _current_timer.get()
+
+
+def record_timing(phase: str, seconds: float) -> None:
+    """現在のリクエストにフェーズの所要時間を記録"""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """ブロックの所要時間を現在のリクエストに記録"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(phase, time.perf_counter() - started)
@@ -0,0 +1,212 @@
+"""
+Webhookエンドポイントのテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+from fastapi import FastAPI
+
+from auto_chat_maker.api.routes.webhook import router as webhook_router
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.services.notification_dedup import (
+    NotificationDeduplicator,
+)
+from auto_chat_maker.services.subscription_index import SubscriptionIndex
+
+WEBHOOK_PATH = "/api/webhook/microsoft-graph"
+
+
+class RecordingQueue:
+    """投入されたペイロードを記録するキュー"""
+
+    def __init__(self) -> None:
+        self.calls: List[List[Dict[str, Any]]] = []
+
+    async def enqueue_many(self, payloads: List[Dict[str, Any]]) -> List[int]:
+        self.calls.append(payloads)
+        return list(range(len(payloads)))
+
+
+class StoredMessages:
+    """登録済みのメッセージがないChatMessageRepository"""
+
+    async def find_existing_message_ids(
+        self, message_ids: List[str]
+    ) -> Set[str]:
+        return set()
+
+
+def make_subscription(
+    subscription_id: str, client_state: Optional[str] = "secret"
+) -> Subscription:
+    """テスト用のサブスクリプションを作成"""
+    return Subscription(
+        subscription_id=subscription_id,
+        resource="/chats/getAllMessages",
+        client_state=client_state,
+        notification_url="https://example.com" + WEBHOOK_PATH,
+        expiration_date_time=datetime.utcnow() + timedelta(hours=1),
+    )
+
+
+def notification(
+    subscription_id: str = "sub-1",
+    client_state: Optional[str] = "secret",
+    message_id: str = "m1",
+) -> Dict[str, Any]:
+    """Graphの変更通知を作成"""
+    return {
+        "subscriptionId": subscription_id,
+        "clientState": client_state,
+        "changeType": "created",
+        "resource": f"chats('c1')/messages('{message_id}')",
+        "resourceData": {"id": message_id},
+        "tenantId": "tenant",
+    }
+
+
+class TestWebhookRoute:
+    """Webhookエンドポイントのテスト"""
+
+    def setup_method(self) -> None:
+        self.queue = RecordingQueue()
+        self.index = SubscriptionIndex()
+        self.index.put(make_subscription("sub-1"))
+        self.deduplicator: Optional[NotificationDeduplicator] = None
+
+    def post(
+        self,
+        body: Any = None,
+        params: Optional[Dict[str, str]] = None,
+        with_state: bool = True,
+    ) -> httpx.Response:
+        app = FastAPI()
+        app.include_router(webhook_router, prefix=WEBHOOK_PATH)
+        if with_state:
+            app.state.notification_queue = self.queue
+            app.state.subscription_index = self.index
+            app.state.notification_deduplicator = self.deduplicator
+
+        async def scenario() -> httpx.Response:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.post(
+                    WEBHOOK_PATH, params=params, json=body
+                )
+
+        return asyncio.run(scenario())
+
+    def test_validation_handshake(self) -> None:
+        """検証リクエストにはキュー・索引を使わずトークンを返すことをテスト"""
+        # Act
+        response = self.post(
+            params={"validationToken": "token <&> 123"}, with_state=False
+        )
+
+        # Assert
+        assert response.status_code == 200
+        assert response.text == "token <&> 123"
+        assert response.headers["content-type"].startswith("text/plain")
+
+    def test_batch_is_validated_deduplicated_and_enqueued_once(self) -> None:
+        """検証・重複排除した通知を1回で投入して202を返すことをテスト"""
+        # Arrange
+        body = {
+            "value": [
+                notification(message_id="m1"),
+                notification(message_id="m1"),
+                notification(message_id="m2"),
+                notification(client_state="wrong", message_id="m3"),
+                notification(subscription_id="unknown", message_id="m4"),
+                "not-a-notification",
+            ]
+        }
+
+        # Act
+        response = self.post(body)
+
+        # Assert
+        assert response.status_code == 202
+        assert len(self.queue.calls) == 1
+        payloads = self.queue.calls[0]
+        assert [p["resource_data"]["id"] for p in payloads] == ["m1", "m2"]
+        assert all("clientState" not in p for p in payloads)
+        assert payloads[0]["subscription_id"] == "sub-1"
+
+    def test_redelivered_messages_are_dropped(self) -> None:
+        """受け付け済みのメッセージの再送通知を投入しないことをテスト"""
+        # Arrange
+        self.deduplicator = NotificationDeduplicator(
+            StoredMessages()  # type: ignore[arg-type]
+        )
+        self.post({"value": [notification(message_id="m1")]})
+        updated = dict(notification(message_id="m1"), changeType="updated")
+
+        # Act
+        response = self.post(
+            {
+                "value": [
+                    notification(message_id="m1"),
+                    notification(message_id="m2"),
+                    updated,
+                ]
+            }
+        )
+
+        # Assert
+        assert response.status_code == 202
+        assert len(self.queue.calls) == 2
+        assert [
+            (p["change_type"], p["resource_data"]["id"])
+            for p in self.queue.calls[1]
+        ] == [("created", "m2"), ("updated", "m1")]
+
+    def test_all_rejected_does_not_enqueue(self) -> None:
+        """有効な通知がなければキューに投入しないことをテスト"""
+        # Act
+        response = self.post({"value": [notification(client_state=None)]})
+
+        # Assert
+        assert response.status_code == 202
+        assert self.queue.calls == []
+
+    def test_malformed_body(self) -> None:
+        """valueを含まない本文は400を返すことをテスト"""
+        # Act
+        response = self.post({"items": []})
+
+        # Assert
+        assert response.status_code == 400
+        assert self.queue.calls == []
+
+
+class TestSubscriptionIndex:
+    """SubscriptionIndexのテスト"""
+
+    def test_verify_client_state(self) -> None:
+        """clientStateの一致・不一致と非アクティブ化の反映をテスト"""
+        # Arrange
+        index = SubscriptionIndex()
+        subscription = make_subscription("sub-1")
+        index.put(subscription)
+        index.put(make_subscription("sub-2", client_state=None))
+
+        # Act
+        matched = index.verify_client_state("sub-1", "secret")
+        mismatched = index.verify_client_state("sub-1", "other")
+        without_state = index.verify_client_state("sub-2", None)
+        subscription.deactivate()
+        index.put(subscription)
+        after_deactivate = index.verify_client_state("sub-1", "secret")
+
+        # Assert
+        assert matched
+        assert not mismatched
+        assert without_state
+        assert not after_deactivate
+        assert len(index) == 1
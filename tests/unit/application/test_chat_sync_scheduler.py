@@ -0,0 +1,75 @@
+"""
+ChatSyncSchedulerのテスト
+"""
+
+import asyncio
+from typing import List, Optional
+
+from auto_chat_maker.application.schedulers.chat_sync_scheduler import (
+    ChatSyncScheduler,
+)
+
+
+class FakeSyncService:
+    """同期の呼び出しを記録するサービス"""
+
+    def __init__(self, results: List[int]) -> None:
+        self.results = results
+        self.calls = 0
+
+    async def sync_all(self, chat_ids: Optional[List[str]] = None) -> int:
+        self.calls += 1
+        return self.results.pop(0) if self.results else 0
+
+
+class TestChatSyncScheduler:
+    """ChatSyncSchedulerのテスト"""
+
+    def test_syncs_on_start_and_notifies_new_messages(self) -> None:
+        """起動直後に同期し、新着があった場合のみ通知することをテスト"""
+        # Arrange
+        service = FakeSyncService([3, 0])
+        notified: List[bool] = []
+
+        async def record_notified() -> None:
+            notified.append(True)
+
+        scheduler = ChatSyncScheduler(
+            service,  # type: ignore[arg-type]
+            interval=0.05,
+            on_synced=record_notified,
+        )
+
+        async def scenario() -> None:
+            scheduler.start()
+            await asyncio.sleep(0.08)
+            await scheduler.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert service.calls == 2
+        assert notified == [True]
+
+    def test_zero_interval_runs_once(self) -> None:
+        """間隔が0の場合は起動時の1回のみ同期することをテスト"""
+        # Arrange
+        service = FakeSyncService([1])
+        scheduler = ChatSyncScheduler(
+            service, interval=0  # type: ignore[arg-type]
+        )
+
+        async def scenario() -> bool:
+            scheduler.start()
+            await asyncio.sleep(0.02)
+            running = scheduler.is_running
+            await scheduler.stop()
+            return running
+
+        # Act
+        running = asyncio.run(scenario())
+
+        # Assert
+        assert service.calls == 1
+        assert running is False
@@ -0,0 +1,181 @@
+"""
+QueueWorkerのテスト
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+from auto_chat_maker.application.schedulers.queue_worker import QueueWorker
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.external.graph_client import GraphClient
+from auto_chat_maker.infrastructure.queue.durable_queue import (
+    DurableWorkQueue,
+)
+from auto_chat_maker.infrastructure.repositories.chat_message_repository import (  # noqa: E501
+    SQLAlchemyChatMessageRepository,
+)
+from auto_chat_maker.services.notification_processor import (
+    NotificationProcessor,
+)
+
+
+async def static_token() -> str:
+    return "test-token"
+
+
+def batch_server(batches: List[List[str]]) -> Any:
+    """$batchのリクエストURLを記録してメッセージを返すハンドラー"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests = json.loads(request.content)["requests"]
+        batches.append([item["url"] for item in requests])
+        return httpx.Response(
+            200,
+            json={
+                "responses": [
+                    {
+                        "id": item["id"],
+                        "status": 200,
+                        "body": {
+                            "id": item["url"].rsplit("/", 1)[-1],
+                            "messageType": "message",
+                            "createdDateTime": "2024-12-01T10:00:00Z",
+                            "body": {"contentType": "text", "content": "了解"},
+                            "from": {
+                                "user": {"id": "u1", "displayName": "佐藤花子"}
+                            },
+                        },
+                    }
+                    for item in requests
+                ]
+            },
+        )
+
+    return handler
+
+
+class TestQueueWorker:
+    """QueueWorkerのテスト"""
+
+    def test_worker_acks_success_and_nacks_failure(
+        self, tmp_path: Path
+    ) -> None:
+        """成功はack、失敗はnackされ、デッドレターが通知されることをテスト"""
+
+        async def scenario() -> None:
+            # 複数ワーカーが並行して接続を使うためファイルDBを利用する
+            database = Database(f"sqlite:///{tmp_path / 'worker.db'}")
+            await database.create_tables()
+            queue = DurableWorkQueue(database, max_attempts=1)
+            handled: List[Dict[str, Any]] = []
+            dead_lettered: List[Dict[str, Any]] = []
+
+            async def handler(payload: Dict[str, Any]) -> None:
+                if payload.get("fail"):
+                    raise ValueError("invalid payload")
+                handled.append(payload)
+
+            worker = QueueWorker(
+                queue,
+                handler,
+                concurrency=2,
+                on_dead_letter=dead_lettered.append,
+            )
+            await queue.enqueue_many([{"n": 1}, {"fail": True}, {"n": 2}])
+
+            worker.start()
+            for _ in range(100):
+                if await queue.depth() == 0:
+                    break
+                await asyncio.sleep(0.01)
+            await worker.stop()
+
+            assert sorted(p["n"] for p in handled) == [1, 2]
+            dead = await queue.list_dead_letters()
+            assert [d.payload for d in dead] == [{"fail": True}]
+            assert "ValueError" in (dead[0].last_error or "")
+            assert dead_lettered == [{"fail": True}]
+            await database.dispose()
+
+        asyncio.run(scenario())
+
+    def test_expired_lease_at_max_attempts_is_reported(
+        self, tmp_path: Path
+    ) -> None:
+        """リース切れでデッドレターになったアイテムも通知されることをテスト"""
+
+        async def scenario() -> None:
+            database = Database(f"sqlite:///{tmp_path / 'worker.db'}")
+            await database.create_tables()
+            queue = DurableWorkQueue(database, max_attempts=1)
+            dead_lettered: List[Dict[str, Any]] = []
+            handled: List[Dict[str, Any]] = []
+
+            async def handler(payload: Dict[str, Any]) -> None:
+                handled.append(payload)
+
+            worker = QueueWorker(
+                queue, handler, on_dead_letter=dead_lettered.append
+            )
+            await queue.enqueue({"n": 1})
+            # ackする前にワーカーが停止した状態を再現する
+            await queue.lease(visibility_timeout=0)
+
+            assert await worker.run_once() == 0
+            assert handled == []
+            assert dead_lettered == [{"n": 1}]
+            await database.dispose()
+
+        asyncio.run(scenario())
+
+    def test_leased_batch_is_fetched_in_one_graph_batch(
+        self, tmp_path: Path
+    ) -> None:
+        """1回にリースした通知のメッセージ取得が1つの$batchになることをテスト"""
+
+        async def scenario() -> List[List[str]]:
+            database = Database(f"sqlite:///{tmp_path / 'worker.db'}")
+            await database.create_tables()
+            queue = DurableWorkQueue(database)
+            batches: List[List[str]] = []
+            graph_client = GraphClient(
+                static_token,
+                base_url="https://graph.test/v1.0",
+                transport=httpx.MockTransport(batch_server(batches)),
+            )
+            worker = QueueWorker(
+                queue,
+                NotificationProcessor(
+                    graph_client, SQLAlchemyChatMessageRepository(database)
+                ),
+                concurrency=1,
+                lease_batch_size=5,
+            )
+            await queue.enqueue_many(
+                [
+                    {
+                        "change_type": "created",
+                        "resource": f"chats('c1')/messages('m{i}')",
+                        "resource_data": {"id": f"m{i}"},
+                    }
+                    for i in range(5)
+                ]
+            )
+
+            handled = await worker.run_once()
+
+            assert handled == 5
+            assert await queue.depth() == 0
+            await graph_client.aclose()
+            await database.dispose()
+            return batches
+
+        batches = asyncio.run(scenario())
+        assert len(batches) == 1
+        assert sorted(batches[0]) == [
+            f"/chats/c1/messages/m{i}" for i in range(5)
+        ]
@@ -0,0 +1,240 @@
+"""
+ReplyGenerationSchedulerのテスト
+"""
+
+import asyncio
+from datetime import datetime
+from typing import List, Set
+
+from auto_chat_maker.application.schedulers.reply_generation_scheduler import (  # noqa: E501
+    ReplyGenerationScheduler,
+    ReplyGenerationWaker,
+)
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.queue.durable_queue import (
+    DurableWorkQueue,
+)
+from auto_chat_maker.infrastructure.repositories.chat_message_repository import (  # noqa: E501
+    SQLAlchemyChatMessageRepository,
+)
+from auto_chat_maker.infrastructure.repositories.reply_suggestion_repository import (  # noqa: E501
+    SQLAlchemyReplySuggestionRepository,
+)
+
+
+def make_message(message_id: str) -> ChatMessage:
+    return ChatMessage(
+        message_id=message_id,
+        chat_id="chat-1",
+        content="資料を共有してもらえますか？",
+        sender_id="user-1",
+        sender_name="佐藤花子",
+        sent_at=datetime(2024, 12, 1, 10, 0, 0),
+    )
+
+
+class FakeGenerator:
+    """並列数を記録するテスト用の返信案生成器"""
+
+    def __init__(self, failing: Set[str] = frozenset()) -> None:
+        self.failing = failing
+        self.active = 0
+        self.max_active = 0
+        self.calls: List[str] = []
+
+    async def generate_reply_suggestions(
+        self, message: ChatMessage
+    ) -> List[ReplySuggestion]:
+        self.calls.append(message.message_id)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if message.message_id in self.failing:
+                raise RuntimeError("generation failed")
+            return [
+                ReplySuggestion(
+                    message_id=message.message_id,
+                    content="共有します",
+                    confidence_score=0.9,
+                )
+            ]
+        finally:
+            self.active -= 1
+
+
+async def setup(
+    database: Database, count: int
+) -> SQLAlchemyChatMessageRepository:
+    await database.create_tables()
+    messages = SQLAlchemyChatMessageRepository(database)
+    await messages.create_many(
+        [make_message(f"msg-{i}") for i in range(count)]
+    )
+    return messages
+
+
+class TestReplyGenerationScheduler:
+    """ReplyGenerationSchedulerのテスト"""
+
+    def test_run_once_processes_all_batches(self) -> None:
+        """バッチを跨いで全件処理し、並列数が制限されることをテスト"""
+
+        async def scenario() -> None:
+            database = Database("sqlite:///:memory:")
+            messages = await setup(database, 7)
+            suggestions = SQLAlchemyReplySuggestionRepository(database)
+            generator = FakeGenerator()
+            scheduler = ReplyGenerationScheduler(
+                messages,
+                suggestions,
+                generator,
+                batch_size=3,
+                max_concurrency=2,
+            )
+
+            processed = await scheduler.run_once()
+
+            assert processed == 7
+            assert generator.max_active <= 2
+            assert await messages.list_unprocessed() == []
+            assert len(await suggestions.get_by_message_id("msg-0")) == 1
+            await database.dispose()
+
+        asyncio.run(scenario())
+
+    def test_failed_message_is_not_retried_in_same_run(self) -> None:
+        """失敗したメッセージは同一実行内で再試行されず未処理のまま残ること"""
+
+        async def scenario() -> None:
+            database = Database("sqlite:///:memory:")
+            messages = await setup(database, 4)
+            generator = FakeGenerator(failing={"msg-0"})
+            scheduler = ReplyGenerationScheduler(
+                messages,
+                SQLAlchemyReplySuggestionRepository(database),
+                generator,
+                batch_size=1,
+            )
+
+            processed = await scheduler.run_once()
+
+            assert processed == 3
+            assert generator.calls.count("msg-0") == 1
+            remaining = await messages.list_unprocessed()
+            assert [m.message_id for m in remaining] == ["msg-0"]
+            await database.dispose()
+
+        asyncio.run(scenario())
+
+    def test_notify_wakes_scheduler_before_interval(self) -> None:
+        """notifyでポーリング間隔を待たずに処理されることをテスト"""
+
+        async def scenario() -> None:
+            database = Database("sqlite:///:memory:")
+            messages = await setup(database, 0)
+            generator = FakeGenerator()
+            scheduler = ReplyGenerationScheduler(
+                messages,
+                SQLAlchemyReplySuggestionRepository(database),
+                generator,
+                interval=3600,
+            )
+            scheduler.start()
+            await asyncio.sleep(0.05)
+
+            await messages.create(make_message("msg-new"))
+            scheduler.notify()
+            for _ in range(100):
+                if not await messages.list_unprocessed():
+                    break
+                await asyncio.sleep(0.01)
+            await scheduler.stop()
+
+            assert generator.calls == ["msg-new"]
+            assert scheduler.is_running is False
+            await database.dispose()
+
+        asyncio.run(scenario())
+
+    def test_saved_suggestions_are_not_generated_again(self) -> None:
+        """返信案の保存後に停止したメッセージは再生成されないことをテスト"""
+
+        async def scenario() -> None:
+            database = Database("sqlite:///:memory:")
+            messages = await setup(database, 2)
+            suggestions = SQLAlchemyReplySuggestionRepository(database)
+            # 返信案の保存と処理済みの更新の間で停止した状態を再現する
+            await suggestions.create_many(
+                [
+                    ReplySuggestion(
+                        message_id="msg-0",
+                        content="承知しました",
+                        confidence_score=0.8,
+                    )
+                ]
+            )
+            generator = FakeGenerator()
+            scheduler = ReplyGenerationScheduler(
+                messages, suggestions, generator
+            )
+
+            processed = await scheduler.run_once()
+
+            assert processed == 2
+            assert generator.calls == ["msg-1"]
+            saved = await suggestions.get_by_message_id("msg-0")
+            assert [s.content for s in saved] == ["承知しました"]
+            assert await messages.list_unprocessed() == []
+            await database.dispose()
+
+        asyncio.run(scenario())
+
+
+class TestReplyGenerationWaker:
+    """ReplyGenerationWakerのテスト"""
+
+    def test_wakes_local_scheduler_or_enqueues_for_leader(self) -> None:
+        """動作中のスケジューラーは直接起こし、停止中はキューに投入することをテスト"""
+
+        async def scenario() -> None:
+            database = Database("sqlite:///:memory:")
+            messages = await setup(database, 0)
+            generator = FakeGenerator()
+            scheduler = ReplyGenerationScheduler(
+                messages,
+                SQLAlchemyReplySuggestionRepository(database),
+                generator,
+                interval=3600,
+            )
+            queue = DurableWorkQueue(database, queue_name="wakeup")
+            waker = ReplyGenerationWaker(scheduler, queue)
+
+            # リーダーでないワーカーではスケジューラーが動作していない
+            await waker.wake()
+            assert await queue.depth() == 1
+
+            # リーダーがキューから取り出して起こす
+            scheduler.start()
+            await asyncio.sleep(0.05)
+            await messages.create(make_message("msg-new"))
+            (item,) = await queue.lease()
+            await waker.handle(item.payload)
+            await queue.ack(item)
+            for _ in range(100):
+                if not await messages.list_unprocessed():
+                    break
+                await asyncio.sleep(0.01)
+
+            # 同じプロセスで動作中ならキューを使わない
+            await waker.wake()
+            depth = await queue.depth()
+            await scheduler.stop()
+
+            assert generator.calls == ["msg-new"]
+            assert depth == 0
+            await database.dispose()
+
+        asyncio.run(scenario())
@@ -0,0 +1,150 @@
+"""
+SubscriptionRenewalSchedulerのテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+from auto_chat_maker.application.schedulers.subscription_renewal_scheduler import (  # noqa: E501
+    SubscriptionRenewalScheduler,
+)
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.services.subscription_index import SubscriptionIndex
+
+
+class FakeRenewer:
+    """更新要求を記録するGraphクライアント"""
+
+    def __init__(self, failing: Set[str] = frozenset()) -> None:
+        self.failing = failing
+        self.calls: List[List[str]] = []
+        self._pending: List[str] = []
+
+    async def renew_subscription(
+        self, subscription_id: str, expiration: datetime
+    ) -> datetime:
+        # 同じイベントループの周回で呼ばれたものを1回の起床としてまとめる
+        self._pending.append(subscription_id)
+        await asyncio.sleep(0)
+        if self._pending:
+            self.calls.append(sorted(self._pending))
+            self._pending = []
+        if subscription_id in self.failing:
+            raise RuntimeError("renewal failed")
+        return expiration
+
+
+class InMemoryRepository:
+    """updateのみを実装したリポジトリ"""
+
+    def __init__(self) -> None:
+        self.saved: Dict[str, Subscription] = {}
+
+    async def update(self, subscription: Subscription) -> Subscription:
+        self.saved[subscription.subscription_id] = subscription
+        return subscription
+
+
+def make_subscription(subscription_id: str, seconds: float) -> Subscription:
+    """現在から指定秒数後に期限を迎えるサブスクリプションを作成"""
+    return Subscription(
+        subscription_id=subscription_id,
+        resource="/chats/getAllMessages",
+        notification_url="https://example.com/api/webhook/microsoft-graph",
+        expiration_date_time=datetime.utcnow() + timedelta(seconds=seconds),
+    )
+
+
+def make_scheduler(
+    index: SubscriptionIndex,
+    repository: InMemoryRepository,
+    renewer: FakeRenewer,
+) -> SubscriptionRenewalScheduler:
+    return SubscriptionRenewalScheduler(
+        index,
+        repository,  # type: ignore[arg-type]
+        renewer,
+        extension=3600,
+        margin=0.1,
+        batch_window=0.2,
+        retry_delay=0.05,
+    )
+
+
+class TestSubscriptionRenewalScheduler:
+    """SubscriptionRenewalSchedulerのテスト"""
+
+    def test_renews_subscriptions_in_same_window_together(self) -> None:
+        """同じ時間枠で期限を迎えるものがまとめて更新されることをテスト"""
+        # Arrange
+        index = SubscriptionIndex()
+        for subscription_id, seconds in (("a", 0.2), ("b", 0.3), ("c", 60)):
+            index.put(make_subscription(subscription_id, seconds))
+        repository = InMemoryRepository()
+        renewer = FakeRenewer()
+        scheduler = make_scheduler(index, repository, renewer)
+
+        async def scenario() -> None:
+            scheduler.start()
+            await asyncio.sleep(0.3)
+            await scheduler.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert renewer.calls == [["a", "b"]]
+        assert set(repository.saved) == {"a", "b"}
+        next_expiration = index.next_expiration()
+        assert next_expiration is not None
+        assert next_expiration - datetime.utcnow() < timedelta(seconds=61)
+
+    def test_wakes_up_for_newly_added_subscription(self) -> None:
+        """待機中に期限の早いサブスクリプションが追加されたら更新することをテスト"""
+        # Arrange
+        index = SubscriptionIndex()
+        index.put(make_subscription("late", 3600))
+        repository = InMemoryRepository()
+        renewer = FakeRenewer()
+        scheduler = make_scheduler(index, repository, renewer)
+
+        async def scenario() -> None:
+            scheduler.start()
+            await asyncio.sleep(0.05)
+            index.put(make_subscription("early", 0.1))
+            await asyncio.sleep(0.1)
+            await scheduler.stop()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert renewer.calls == [["early"]]
+
+    def test_failures_are_retried_and_expired_are_deactivated(self) -> None:
+        """失敗したものは再試行し、期限切れは非アクティブにすることをテスト"""
+        # Arrange
+        index = SubscriptionIndex()
+        index.put(make_subscription("flaky", 60))
+        index.put(make_subscription("expired", -1))
+        repository = InMemoryRepository()
+        renewer = FakeRenewer(failing={"flaky", "expired"})
+        scheduler = make_scheduler(index, repository, renewer)
+        scheduler._margin = timedelta(seconds=120)
+
+        async def scenario() -> int:
+            first = await scheduler.run_once()
+            renewer.failing = set()
+            await scheduler.run_once()
+            return first
+
+        # Act
+        failed = asyncio.run(scenario())
+
+        # Assert
+        assert failed == 2
+        assert index.get("expired") is None
+        assert repository.saved["expired"].is_active is False
+        assert repository.saved["flaky"].is_active is True
+        assert index.get("flaky") is not None
@@ -10,8 +10,15 @@ t-wada氏のTDDの考え方に基づいて実装:
 """
 
 import os
+from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
+from auto_chat_maker.config import env_file as env_file_module
+from auto_chat_maker.config.azure_settings import AzureSettings
+from auto_chat_maker.config.env_file import clear_env_file_cache
+from auto_chat_maker.config.mcp_settings import MCPSettings
 from auto_chat_maker.config.settings import Settings, get_settings
 
 
@@ -251,3 +258,86 @@ class TestGetSettings:
 
         # Assert
         assert isinstance(settings, Settings)
+
+
+class TestEnvFile:
+    """.envの読み込みのテスト"""
+
+    def test_env_file_is_parsed_once_for_all_settings(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """3つの設定クラスが1回のパース結果を共有することをテスト"""
+        # Arrange
+        (tmp_path / ".env").write_text(
+            "APP_NAME=Env App\n"
+            "MCP_SERVER_URL=http://mcp:3000\n"
+            "AZURE_SCOPES=Chat.Read\n",
+            encoding="utf-8",
+        )
+        monkeypatch.chdir(tmp_path)
+        clear_env_file_cache()
+        original = env_file_module.dotenv_values
+        calls = []
+
+        def counting_read(*args: object, **kwargs: object) -> object:
+            calls.append(args[0])
+            return original(*args, **kwargs)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(env_file_module, "dotenv_values", counting_read)
+
+        # Act
+        with patch.dict(os.environ, {}, clear=True):
+            settings = Settings()
+            mcp_settings = MCPSettings()
+            azure_settings = AzureSettings()
+        clear_env_file_cache()
+
+        # Assert
+        assert len(calls) == 1
+        assert settings.app_name == "Env App"
+        assert settings.mcp_server_url == "http://mcp:3000"
+        assert mcp_settings.server_url == "http://mcp:3000"
+        assert azure_settings.scopes == "Chat.Read"
+
+    def test_env_file_keys_are_case_insensitive(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """.envのキーを大文字小文字を区別せずに読み込むことをテスト"""
+        # Arrange
+        (tmp_path / ".env").write_text(
+            "app_name=Lower App\nMCP_SERVER_URL=http://mcp:3000\n",
+            encoding="utf-8",
+        )
+        monkeypatch.chdir(tmp_path)
+        clear_env_file_cache()
+
+        # Act
+        with patch.dict(os.environ, {}, clear=True):
+            settings = Settings()
+        clear_env_file_cache()
+
+        # Assert
+        assert settings.app_name == "Lower App"
+        assert settings.mcp_server_url == "http://mcp:3000"
+
+    def test_env_file_is_reloaded_when_modified(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """.envが更新されたら読み直すことをテスト"""
+        # Arrange
+        env_file = tmp_path / ".env"
+        env_file.write_text("APP_NAME=Before\n", encoding="utf-8")
+        monkeypatch.chdir(tmp_path)
+        clear_env_file_cache()
+
+        # Act
+        with patch.dict(os.environ, {}, clear=True):
+            before = Settings()
+            env_file.write_text("APP_NAME=After\n", encoding="utf-8")
+            os.utime(env_file, ns=(0, env_file.stat().st_mtime_ns + 1))
+            after = Settings()
+        clear_env_file_cache()
+
+        # Assert
+        assert before.app_name == "Before"
+        assert after.app_name == "After"
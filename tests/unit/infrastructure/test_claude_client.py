@@ -0,0 +1,195 @@
+"""
+ClaudeClientのテスト
+
+httpx.MockTransportでClaude APIのスタブサーバーを再現する。
+"""
+
+import asyncio
+import json
+from typing import List
+
+import httpx
+import pytest
+
+from auto_chat_maker.infrastructure.external.claude_client import (
+    ClaudeClient,
+)
+from auto_chat_maker.utils.exceptions import (
+    ConfigurationError,
+    ExternalServiceError,
+    NetworkError,
+    RateLimitError,
+)
+
+
+def sse(*events: dict) -> bytes:
+    return "".join(
+        f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        for event in events
+    ).encode()
+
+
+def make_client(handler) -> ClaudeClient:  # type: ignore[no-untyped-def]
+    return ClaudeClient(
+        "test-key",
+        base_url="https://claude.test",
+        model="claude-test",
+        transport=httpx.MockTransport(handler),
+    )
+
+
+class TestClaudeClient:
+    """ClaudeClientのテスト"""
+
+    def test_missing_api_key_raises(self) -> None:
+        """APIキー未設定時にConfigurationErrorになることをテスト"""
+        with pytest.raises(ConfigurationError):
+            ClaudeClient(None)
+
+    def test_generate_response_sends_headers_and_payload(self) -> None:
+        """ヘッダーとペイロードが送信され、テキストが結合されることをテスト"""
+        requests: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(
+                200,
+                json={
+                    "content": [
+                        {"type": "text", "text": "14時"},
+                        {"type": "text", "text": "からです"},
+                    ]
+                },
+            )
+
+        async def scenario() -> str:
+            client = make_client(handler)
+            try:
+                return await client.generate_response(
+                    "会議は何時から？", max_tokens=100
+                )
+            finally:
+                await client.aclose()
+
+        # Act
+        text = asyncio.run(scenario())
+
+        # Assert
+        assert text == "14時からです"
+        body = json.loads(requests[0].content)
+        assert requests[0].url.path == "/v1/messages"
+        assert requests[0].headers["x-api-key"] == "test-key"
+        assert body["model"] == "claude-test"
+        assert body["max_tokens"] == 100
+        assert "stream" not in body
+
+    def test_stream_response_yields_text_deltas(self) -> None:
+        """SSEのテキスト差分が到着順に返されることをテスト"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert json.loads(request.content)["stream"] is True
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                content=sse(
+                    {"type": "message_start", "message": {}},
+                    {
+                        "type": "content_block_delta",
+                        "delta": {"type": "text_delta", "text": "了解"},
+                    },
+                    {"type": "ping"},
+                    {
+                        "type": "content_block_delta",
+                        "delta": {"type": "text_delta", "text": "です"},
+                    },
+                    {"type": "message_stop"},
+                ),
+            )
+
+        async def scenario() -> List[str]:
+            client = make_client(handler)
+            try:
+                return [chunk async for chunk in client.stream_response("確認")]
+            finally:
+                await client.aclose()
+
+        # Act & Assert
+        assert asyncio.run(scenario()) == ["了解", "です"]
+
+    def test_rate_limit_is_mapped_with_retry_after(self) -> None:
+        """429がRateLimitErrorに変換されRetry-Afterが保持されることをテスト"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(429, headers={"retry-after": "2"})
+
+        async def scenario() -> None:
+            client = make_client(handler)
+            try:
+                await client.generate_response("hello")
+            finally:
+                await client.aclose()
+
+        # Act & Assert
+        with pytest.raises(RateLimitError) as exc_info:
+            asyncio.run(scenario())
+        assert exc_info.value.details["retry_after"] == 2.0
+
+    def test_server_error_in_stream_is_mapped(self) -> None:
+        """ストリーミング時のエラーステータスが例外に変換されることをテスト"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(529, json={"type": "error"})
+
+        async def scenario() -> None:
+            client = make_client(handler)
+            try:
+                async for _ in client.stream_response("hello"):
+                    pass
+            finally:
+                await client.aclose()
+
+        # Act & Assert
+        with pytest.raises(ExternalServiceError) as exc_info:
+            asyncio.run(scenario())
+        assert exc_info.value.details["status_code"] == 529
+
+    def test_transport_error_is_mapped(self) -> None:
+        """接続エラーがNetworkErrorに変換されることをテスト"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("connection refused")
+
+        async def scenario() -> None:
+            client = make_client(handler)
+            try:
+                await client.generate_response("hello")
+            finally:
+                await client.aclose()
+
+        # Act & Assert
+        with pytest.raises(NetworkError):
+            asyncio.run(scenario())
+
+    def test_ping_lists_models_without_generation(self) -> None:
+        """疎通確認がモデル一覧APIを1件だけ取得することをテスト"""
+        # Arrange
+        requests: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"data": []})
+
+        async def scenario() -> None:
+            client = make_client(handler)
+            try:
+                await client.ping()
+            finally:
+                await client.aclose()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert requests[0].method == "GET"
+        assert requests[0].url.path == "/v1/models"
+        assert requests[0].url.params["limit"] == "1"
@@ -0,0 +1,95 @@
+"""
+Databaseクラスのテスト
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from auto_chat_maker.infrastructure.database.connection import (
+    Database,
+    to_async_url,
+)
+from auto_chat_maker.utils.exceptions import DatabaseError
+
+
+class TestToAsyncUrl:
+    """to_async_url関数のテスト"""
+
+    def test_sqlite_url_uses_aiosqlite(self) -> None:
+        """sqliteのURLがaiosqliteドライバに変換されることをテスト"""
+        # Act
+        url = to_async_url("sqlite:///./auto_chat_maker.db")
+
+        # Assert
+        assert url.drivername == "sqlite+aiosqlite"
+        assert url.database == "./auto_chat_maker.db"
+
+    def test_postgresql_url_uses_asyncpg(self) -> None:
+        """postgresqlのURLがasyncpgドライバに変換されることをテスト"""
+        # Act
+        url = to_async_url("postgresql://user:pass@db:5432/app")
+
+        # Assert
+        assert url.drivername == "postgresql+asyncpg"
+        assert url.host == "db"
+
+    def test_explicit_async_driver_is_kept(self) -> None:
+        """明示された非同期ドライバはそのまま維持されることをテスト"""
+        # Act
+        url = to_async_url("sqlite+aiosqlite:///:memory:")
+
+        # Assert
+        assert url.drivername == "sqlite+aiosqlite"
+
+
+class TestDatabase:
+    """Databaseクラスのテスト"""
+
+    def test_session_commits_and_reads(self) -> None:
+        """セッションでSQLを実行できることをテスト"""
+
+        async def scenario() -> int:
+            database = Database("sqlite:///:memory:")
+            try:
+                async with database.session() as session:
+                    result = await session.execute(text("SELECT 1"))
+                    return int(result.scalar_one())
+            finally:
+                await database.dispose()
+
+        # Act & Assert
+        assert asyncio.run(scenario()) == 1
+
+    def test_file_database_uses_connection_pool(self, tmp_path) -> None:
+        """ファイルDBではプール設定が反映されることをテスト"""
+        # Arrange
+        database = Database(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            pool_size=3,
+            max_overflow=2,
+        )
+
+        # Act
+        pool = database.engine.pool
+
+        # Assert
+        assert pool.size() == 3  # type: ignore[attr-defined]
+        asyncio.run(database.dispose())
+
+    def test_session_wraps_sqlalchemy_errors(self) -> None:
+        """SQLAlchemyのエラーがDatabaseErrorに変換されることをテスト"""
+
+        async def scenario() -> None:
+            database = Database("sqlite:///:memory:")
+            try:
+                async with database.session() as session:
+                    await session.execute(text("SELECT * FROM missing"))
+            finally:
+                await database.dispose()
+
+        # Act & Assert
+        with pytest.raises(DatabaseError) as exc_info:
+            asyncio.run(scenario())
+        assert exc_info.value.error_code == "DATABASE_ERROR"
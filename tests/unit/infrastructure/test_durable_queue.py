@@ -0,0 +1,117 @@
+"""
+DurableWorkQueueのテスト
+"""
+
+import asyncio
+from pathlib import Path
+
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.queue.durable_queue import (
+    DurableWorkQueue,
+)
+
+
+async def open_queue(url: str, **kwargs: float) -> DurableWorkQueue:
+    database = Database(url)
+    await database.create_tables()
+    return DurableWorkQueue(database, queue_name="test", **kwargs)
+
+
+class TestDurableWorkQueue:
+    """DurableWorkQueueのテスト"""
+
+    def test_lease_hides_items_until_ack(self) -> None:
+        """リース中のアイテムは再取得されず、ackで削除されることをテスト"""
+
+        async def scenario() -> None:
+            queue = await open_queue("sqlite:///:memory:")
+            await queue.enqueue_many([{"n": 1}, {"n": 2}])
+
+            first = await queue.lease(limit=1)
+            second = await queue.lease(limit=5)
+
+            assert [item.payload for item in first] == [{"n": 1}]
+            assert [item.payload for item in second] == [{"n": 2}]
+            assert await queue.lease() == []
+            assert await queue.ack(first[0]) is True
+            assert await queue.depth() == 1
+
+        asyncio.run(scenario())
+
+    def test_expired_lease_is_redelivered(self) -> None:
+        """可視性タイムアウト後に再取得され、古いリースのackは無効になること"""
+
+        async def scenario() -> None:
+            queue = await open_queue("sqlite:///:memory:")
+            await queue.enqueue({"n": 1})
+
+            stale = (await queue.lease(visibility_timeout=0))[0]
+            fresh = (await queue.lease())[0]
+
+            assert fresh.id == stale.id
+            assert fresh.attempts == 2
+            assert await queue.ack(stale) is False
+            assert await queue.ack(fresh) is True
+
+        asyncio.run(scenario())
+
+    def test_expired_lease_at_max_attempts_is_dead_lettered(self) -> None:
+        """上限の試行でリースが切れたアイテムがデッドレターとして返されること"""
+
+        async def scenario() -> None:
+            queue = await open_queue("sqlite:///:memory:", max_attempts=1)
+            await queue.enqueue({"n": 1})
+            await queue.lease(visibility_timeout=0)
+
+            assert await queue.lease() == []
+            dead = await queue.dead_letter_expired()
+            assert [(d.payload, d.attempts) for d in dead] == [({"n": 1}, 1)]
+            assert await queue.dead_letter_expired() == []
+            (stored,) = await queue.list_dead_letters()
+            assert stored.last_error == "visibility timeout exceeded"
+            assert await queue.depth() == 0
+
+        asyncio.run(scenario())
+
+    def test_nack_retries_then_dead_letters(self) -> None:
+        """nackで再試行され、上限到達でデッドレターになることをテスト"""
+
+        async def scenario() -> None:
+            queue = await open_queue(
+                "sqlite:///:memory:", max_attempts=2, retry_delay=0
+            )
+            await queue.enqueue({"n": 1})
+
+            item = (await queue.lease())[0]
+            await queue.nack(item, error="boom")
+            item = (await queue.lease())[0]
+            await queue.nack(item, error="boom again")
+
+            assert await queue.lease() == []
+            assert await queue.depth() == 0
+            dead = await queue.list_dead_letters()
+            assert [d.last_error for d in dead] == ["boom again"]
+            assert await queue.requeue_dead_letter(dead[0].id) is True
+            assert len(await queue.lease()) == 1
+
+        asyncio.run(scenario())
+
+    def test_items_survive_restart(self, tmp_path: Path) -> None:
+        """接続を作り直してもキューの内容が残ることをテスト"""
+        url = f"sqlite:///{tmp_path / 'queue.db'}"
+
+        async def enqueue() -> None:
+            queue = await open_queue(url)
+            await queue.enqueue({"resource": "chats/1/messages/1"})
+            await queue._database.dispose()
+
+        async def lease() -> None:
+            queue = await open_queue(url)
+            items = await queue.lease()
+            assert [item.payload for item in items] == [
+                {"resource": "chats/1/messages/1"}
+            ]
+            await queue._database.dispose()
+
+        asyncio.run(enqueue())
+        asyncio.run(lease())
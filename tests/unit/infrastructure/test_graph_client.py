@@ -0,0 +1,306 @@
+"""
+GraphClientのテスト
+
+httpx.MockTransportでMicrosoft Graphのスタブサーバーを再現する。
+"""
+
+import asyncio
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+
+from auto_chat_maker.infrastructure.external.graph_client import (
+    ClientCredentialsTokenProvider,
+    GraphClient,
+    parse_graph_datetime,
+)
+from auto_chat_maker.utils.exceptions import (
+    AuthenticationError,
+    ExternalServiceError,
+)
+from auto_chat_maker.utils.retry import RetryPolicy
+
+MESSAGE_URL = re.compile(r"^/chats/(?P<chat>[^/]+)/messages/(?P<message>.+)$")
+
+
+class FakeGraphServer:
+    """$batchとサブスクリプションAPIを実装したスタブサーバー"""
+
+    def __init__(self) -> None:
+        self.requests: List[httpx.Request] = []
+        self.batch_sizes: List[int] = []
+        # 指定回数だけ429を返すmessage_id
+        self.throttle: Dict[str, int] = {}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path == "/v1.0/$batch":
+            batch = json.loads(request.content)["requests"]
+            self.batch_sizes.append(len(batch))
+            return httpx.Response(
+                200, json={"responses": [self.handle(r) for r in batch]}
+            )
+        if request.method == "PATCH":
+            body = json.loads(request.content)
+            return httpx.Response(
+                200,
+                json={
+                    "id": request.url.path.rsplit("/", 1)[-1],
+                    "expirationDateTime": body["expirationDateTime"][:-1]
+                    + ".1234567Z",
+                },
+            )
+        if request.url.path == "/v1.0/chats/c1/messages":
+            if "$skiptoken" in request.url.params:
+                return httpx.Response(200, json={"value": [{"id": "m1"}]})
+            return httpx.Response(
+                200,
+                json={
+                    "value": [{"id": "m2"}],
+                    "@odata.nextLink": "https://graph.test/v1.0/chats/c1"
+                    "/messages?$skiptoken=page-2",
+                },
+            )
+        if request.method == "DELETE":
+            return httpx.Response(404, json={"error": {"code": "NotFound"}})
+        return httpx.Response(400)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        match = MESSAGE_URL.match(request["url"])
+        if match is None:
+            return {"id": request["id"], "status": 400, "body": {}}
+        message_id = match["message"]
+        if message_id == "missing":
+            return {
+                "id": request["id"],
+                "status": 404,
+                "body": {"error": {"code": "NotFound"}},
+            }
+        if self.throttle.get(message_id):
+            self.throttle[message_id] -= 1
+            return {
+                "id": request["id"],
+                "status": 429,
+                "headers": {"Retry-After": "0"},
+                "body": {},
+            }
+        return {
+            "id": request["id"],
+            "status": 200,
+            "body": {"id": message_id, "chatId": match["chat"]},
+        }
+
+
+async def static_token() -> str:
+    return "test-token"
+
+
+def make_client(server: FakeGraphServer, **kwargs: Any) -> GraphClient:
+    return GraphClient(
+        static_token,
+        base_url="https://graph.test/v1.0",
+        transport=httpx.MockTransport(server),
+        **kwargs,
+    )
+
+
+class TestGraphClientBatching:
+    """$batchへのまとめ送信のテスト"""
+
+    def test_burst_of_50_fetches_costs_three_round_trips(self) -> None:
+        """50件の同時取得が3回の$batchになり、結果が呼び出し元に戻ることをテスト"""
+        # Arrange
+        server = FakeGraphServer()
+
+        async def scenario() -> List[Dict[str, Any]]:
+            client = make_client(server)
+            try:
+                return await asyncio.gather(
+                    *(
+                        client.get_chat_message("chat-1", f"m{i}")
+                        for i in range(50)
+                    )
+                )
+            finally:
+                await client.aclose()
+
+        # Act
+        messages = asyncio.run(scenario())
+
+        # Assert
+        assert len(server.requests) == 3
+        assert server.batch_sizes == [20, 20, 10]
+        assert [m["id"] for m in messages] == [f"m{i}" for i in range(50)]
+        assert all(
+            r.headers["authorization"] == "Bearer test-token"
+            for r in server.requests
+        )
+
+    def test_item_errors_and_throttling(self) -> None:
+        """失敗したリクエストは呼び出し元だけに伝わり、429は再送されることをテスト"""
+        # Arrange
+        server = FakeGraphServer()
+        server.throttle["m2"] = 1
+
+        async def scenario() -> List[Any]:
+            client = make_client(
+                server, retry_policy=RetryPolicy(max_attempts=2, base_delay=0)
+            )
+            try:
+                return await asyncio.gather(
+                    client.get_resource("chats/c1/messages/m1"),
+                    client.get_chat_message("c1", "m2"),
+                    client.get_chat_message("c1", "missing"),
+                    return_exceptions=True,
+                )
+            finally:
+                await client.aclose()
+
+        # Act
+        first, second, missing = asyncio.run(scenario())
+
+        # Assert
+        assert first == {"id": "m1", "chatId": "c1"}
+        assert second == {"id": "m2", "chatId": "c1"}
+        assert isinstance(missing, ExternalServiceError)
+        assert missing.details["status_code"] == 404
+        assert server.batch_sizes == [3, 1]
+
+
+class TestGraphClientChatMessages:
+    """チャットメッセージ一覧のテスト"""
+
+    def test_list_chat_messages_follows_next_link(self) -> None:
+        """更新日時で絞り込み、nextLinkを辿って全ページを返すことをテスト"""
+        # Arrange
+        server = FakeGraphServer()
+
+        async def scenario() -> List[List[Dict[str, Any]]]:
+            client = make_client(server)
+            try:
+                return [
+                    page
+                    async for page in client.list_chat_messages(
+                        "c1", datetime(2025, 1, 1, 10, 0, 0)
+                    )
+                ]
+            finally:
+                await client.aclose()
+
+        # Act
+        pages = asyncio.run(scenario())
+
+        # Assert
+        assert pages == [[{"id": "m2"}], [{"id": "m1"}]]
+        first, second = server.requests
+        assert first.url.params["$filter"] == (
+            "lastModifiedDateTime gt 2025-01-01T10:00:00Z"
+        )
+        assert first.url.params["$orderby"] == "lastModifiedDateTime desc"
+        assert dict(second.url.params) == {"$skiptoken": "page-2"}
+
+
+class TestGraphClientSubscriptions:
+    """サブスクリプションAPIのテスト"""
+
+    def test_renew_and_delete_subscription(self) -> None:
+        """有効期限の延長と、存在しないサブスクリプションの削除をテスト"""
+        # Arrange
+        server = FakeGraphServer()
+
+        async def scenario() -> Any:
+            client = make_client(server)
+            try:
+                renewed = await client.renew_subscription(
+                    "sub-1", datetime(2025, 1, 1, 13, 0, 0)
+                )
+                deleted = await client.delete_subscription("sub-1")
+                return renewed, deleted
+            finally:
+                await client.aclose()
+
+        # Act
+        renewed, deleted = asyncio.run(scenario())
+
+        # Assert
+        patch = server.requests[0]
+        assert patch.url.path == "/v1.0/subscriptions/sub-1"
+        assert json.loads(patch.content) == {
+            "expirationDateTime": "2025-01-01T13:00:00Z"
+        }
+        assert renewed == datetime(2025, 1, 1, 13, 0, 0, 123456)
+        assert deleted is False
+
+
+class TestClientCredentialsTokenProvider:
+    """ClientCredentialsTokenProviderのテスト"""
+
+    def test_concurrent_calls_share_one_token_request(self) -> None:
+        """同時の呼び出しでトークン取得が1回だけ行われることをテスト"""
+        # Arrange
+        requests: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(
+                200, json={"access_token": "token-1", "expires_in": 3600}
+            )
+
+        async def scenario() -> List[str]:
+            async with httpx.AsyncClient(
+                transport=httpx.MockTransport(handler)
+            ) as client:
+                provider = ClientCredentialsTokenProvider(
+                    client,
+                    "https://login.test/tenant/oauth2/v2.0/token",
+                    "client-id",
+                    "client-secret",
+                )
+                tokens = await asyncio.gather(*(provider() for _ in range(5)))
+                tokens.append(await provider())
+                return tokens
+
+        # Act
+        tokens = asyncio.run(scenario())
+
+        # Assert
+        assert tokens == ["token-1"] * 6
+        assert len(requests) == 1
+        assert b"grant_type=client_credentials" in requests[0].content
+
+    def test_token_error_raises(self) -> None:
+        """トークン取得の失敗がAuthenticationErrorになることをテスト"""
+
+        async def scenario() -> None:
+            async with httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda r: httpx.Response(401))
+            ) as client:
+                provider = ClientCredentialsTokenProvider(
+                    client, "https://login.test/token", "id", "secret"
+                )
+                await provider()
+
+        with pytest.raises(AuthenticationError):
+            asyncio.run(scenario())
+
+
+class TestParseGraphDatetime:
+    """parse_graph_datetimeのテスト"""
+
+    def test_parses_utc_suffix_and_seven_digit_fraction(self) -> None:
+        # Act
+        parsed = parse_graph_datetime("2024-01-02T03:04:05.1234567Z")
+
+        # Assert
+        assert parsed == datetime(2024, 1, 2, 3, 4, 5, 123456)
+
+    def test_converts_offset_to_naive_utc(self) -> None:
+        # Act
+        parsed = parse_graph_datetime("2024-01-02T12:04:05.5+09:00")
+
+        # Assert
+        assert parsed == datetime(2024, 1, 2, 3, 4, 5, 500000)
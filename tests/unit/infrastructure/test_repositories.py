@@ -0,0 +1,380 @@
+"""
+SQLAlchemyリポジトリ実装のテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, TypeVar
+
+import pytest
+
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.domain.models.user import User
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.repositories.chat_message_repository import (  # noqa: E501
+    SQLAlchemyChatMessageRepository,
+)
+from auto_chat_maker.infrastructure.repositories.reply_suggestion_repository import (  # noqa: E501
+    SQLAlchemyReplySuggestionRepository,
+)
+from auto_chat_maker.infrastructure.repositories.subscription_repository import (  # noqa: E501
+    SQLAlchemySubscriptionRepository,
+)
+from auto_chat_maker.infrastructure.repositories.user_repository import (
+    SQLAlchemyUserRepository,
+)
+from auto_chat_maker.utils.exceptions import DatabaseError
+
+T = TypeVar("T")
+
+
+def run_with_database(
+    scenario: Callable[[Database], Awaitable[T]],
+) -> T:
+    """インメモリDBを用意してシナリオを実行"""
+
+    async def runner() -> T:
+        database = Database("sqlite:///:memory:")
+        await database.create_tables()
+        try:
+            return await scenario(database)
+        finally:
+            await database.dispose()
+
+    return asyncio.run(runner())
+
+
+def make_message(message_id: str, chat_id: str = "chat-1") -> ChatMessage:
+    return ChatMessage(
+        message_id=message_id,
+        chat_id=chat_id,
+        content="明日の会議は何時からですか？",
+        sender_id="user-1",
+        sender_name="田中太郎",
+        sent_at=datetime(2024, 12, 1, 10, 0, 0),
+        metadata={"team_id": "team-1"},
+    )
+
+
+class TestSQLAlchemyUserRepository:
+    """SQLAlchemyUserRepositoryのテスト"""
+
+    def test_create_and_get_by_email(self) -> None:
+        """作成したユーザーをメールアドレスで取得できることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyUserRepository(database)
+            created = await repository.create(
+                User(email="user1@example.com", name="田中太郎")
+            )
+
+            found = await repository.get_by_email("user1@example.com")
+
+            assert created.id is not None
+            assert found is not None
+            assert found.id == created.id
+            assert found.name == "田中太郎"
+
+        run_with_database(scenario)
+
+    def test_delete_returns_false_when_missing(self) -> None:
+        """存在しないユーザーの削除がFalseを返すことをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyUserRepository(database)
+
+            assert await repository.delete(999) is False
+
+        run_with_database(scenario)
+
+
+class TestSQLAlchemyChatMessageRepository:
+    """SQLAlchemyChatMessageRepositoryのテスト"""
+
+    def test_create_and_get_by_message_id(self) -> None:
+        """メタデータを含めて保存・取得できることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create(make_message("msg-1"))
+
+            found = await repository.get_by_message_id("msg-1")
+
+            assert found is not None
+            assert found.metadata == {"team_id": "team-1"}
+            assert found.is_processed is False
+
+        run_with_database(scenario)
+
+    def test_update_marks_message_processed(self) -> None:
+        """処理済みの更新がlist_unprocessedに反映されることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            first = await repository.create(make_message("msg-1"))
+            await repository.create(make_message("msg-2"))
+
+            first.mark_as_processed()
+            await repository.update(first)
+            unprocessed = await repository.list_unprocessed()
+
+            assert [m.message_id for m in unprocessed] == ["msg-2"]
+
+        run_with_database(scenario)
+
+    def test_update_missing_message_raises(self) -> None:
+        """存在しないメッセージの更新でDatabaseErrorになることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            message = make_message("msg-1")
+            message.id = 42
+
+            with pytest.raises(DatabaseError):
+                await repository.update(message)
+
+        run_with_database(scenario)
+
+    def test_duplicate_message_id_raises(self) -> None:
+        """message_idの重複がDatabaseErrorになることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create(make_message("msg-1"))
+
+            with pytest.raises(DatabaseError):
+                await repository.create(make_message("msg-1"))
+
+        run_with_database(scenario)
+
+    def test_list_by_chat_id(self) -> None:
+        """チャットIDで絞り込めることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create(make_message("msg-1", chat_id="a"))
+            await repository.create(make_message("msg-2", chat_id="b"))
+
+            messages = await repository.list_by_chat_id("a")
+
+            assert [m.message_id for m in messages] == ["msg-1"]
+
+        run_with_database(scenario)
+
+
+class TestSQLAlchemyReplySuggestionRepository:
+    """SQLAlchemyReplySuggestionRepositoryのテスト"""
+
+    def test_list_selected_and_sent(self) -> None:
+        """選択済み・送信済みの返信案を取得できることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyReplySuggestionRepository(database)
+            selected = await repository.create(
+                ReplySuggestion(
+                    message_id="msg-1", content="了解です", confidence_score=0.9
+                )
+            )
+            await repository.create(
+                ReplySuggestion(
+                    message_id="msg-1", content="確認します", confidence_score=0.8
+                )
+            )
+
+            selected.select()
+            selected.mark_as_sent()
+            await repository.update(selected)
+
+            assert [s.id for s in await repository.list_selected()] == [
+                selected.id
+            ]
+            assert [s.id for s in await repository.list_sent()] == [
+                selected.id
+            ]
+            assert len(await repository.get_by_message_id("msg-1")) == 2
+
+        run_with_database(scenario)
+
+
+class TestSQLAlchemySubscriptionRepository:
+    """SQLAlchemySubscriptionRepositoryのテスト"""
+
+    def test_list_expired(self) -> None:
+        """期限切れのサブスクリプションのみ取得できることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemySubscriptionRepository(database)
+            now = datetime.utcnow()
+            for subscription_id, delta in (("old", -1), ("new", 1)):
+                await repository.create(
+                    Subscription(
+                        subscription_id=subscription_id,
+                        resource="/chats/getAllMessages",
+                        notification_url="https://example.com/webhook",
+                        expiration_date_time=now + timedelta(hours=delta),
+                    )
+                )
+
+            expired = await repository.list_expired()
+
+            assert [s.subscription_id for s in expired] == ["old"]
+
+        run_with_database(scenario)
+
+
+class TestChatMessageBulkOperations:
+    """ChatMessageリポジトリの一括登録のテスト"""
+
+    def test_create_many_assigns_ids_in_order(self) -> None:
+        """一括作成で入力順にIDが採番されることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+
+            created = await repository.create_many(
+                [make_message("msg-1"), make_message("msg-2")]
+            )
+
+            assert [m.message_id for m in created] == ["msg-1", "msg-2"]
+            assert all(m.id is not None for m in created)
+            assert created[0].metadata == {"team_id": "team-1"}
+
+        run_with_database(scenario)
+
+    def test_create_many_with_empty_list(self) -> None:
+        """空リストの一括作成は何もしないことをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+
+            assert await repository.create_many([]) == []
+
+        run_with_database(scenario)
+
+    def test_upsert_many_returns_only_new_rows(self) -> None:
+        """既存・バッチ内重複を除いた新規行のみ返すことをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create(make_message("msg-1"))
+
+            inserted = await repository.upsert_many(
+                [
+                    make_message("msg-1"),
+                    make_message("msg-2"),
+                    make_message("msg-3"),
+                    make_message("msg-2"),
+                ]
+            )
+
+            assert [m.message_id for m in inserted] == ["msg-2", "msg-3"]
+            assert len(await repository.list_unprocessed()) == 3
+
+        run_with_database(scenario)
+
+    def test_upsert_many_is_idempotent(self) -> None:
+        """同じバッチを再送しても新規行が増えないことをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            batch = [make_message("msg-1"), make_message("msg-2")]
+
+            first = await repository.upsert_many(batch)
+            second = await repository.upsert_many(batch)
+
+            assert len(first) == 2
+            assert second == []
+
+        run_with_database(scenario)
+
+    def test_find_existing_and_recent_message_ids(self) -> None:
+        """登録済みのmessage_idの確認と最近の一覧取得をテスト"""
+
+        async def scenario(database: Database) -> None:
+            # Arrange
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create_many(
+                [make_message("m1"), make_message("m2"), make_message("m3")]
+            )
+
+            # Act
+            existing = await repository.find_existing_message_ids(
+                ["m1", "m3", "missing"]
+            )
+            recent = await repository.list_recent_message_ids(2)
+
+            # Assert
+            assert existing == {"m1", "m3"}
+            assert recent == ["m3", "m2"]
+            assert await repository.find_existing_message_ids([]) == set()
+
+        run_with_database(scenario)
+
+
+class TestChatMessagePagination:
+    """ChatMessageリポジトリのページネーション・ストリーミングのテスト"""
+
+    def test_list_unprocessed_keyset_pages(self) -> None:
+        """after_id・limitで重複なくページを辿れることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create_many(
+                [make_message(f"msg-{i}") for i in range(5)]
+            )
+
+            first = await repository.list_unprocessed(limit=2)
+            second = await repository.list_unprocessed(
+                after_id=first[-1].id, limit=2
+            )
+            third = await repository.list_unprocessed(
+                after_id=second[-1].id, limit=2
+            )
+
+            assert [m.message_id for m in first + second + third] == [
+                f"msg-{i}" for i in range(5)
+            ]
+            assert len(third) == 1
+
+        run_with_database(scenario)
+
+    def test_iter_by_chat_id_streams_in_chunks(self) -> None:
+        """チャンクサイズより多い行を順番に逐次取得できることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create_many(
+                [make_message(f"a-{i}", chat_id="a") for i in range(7)]
+                + [make_message("b-0", chat_id="b")]
+            )
+
+            streamed = [
+                message.message_id
+                async for message in repository.iter_by_chat_id(
+                    "a", chunk_size=3
+                )
+            ]
+
+            assert streamed == [f"a-{i}" for i in range(7)]
+
+        run_with_database(scenario)
+
+    def test_iter_unprocessed_can_stop_early(self) -> None:
+        """途中で打ち切ってもセッションが閉じられることをテスト"""
+
+        async def scenario(database: Database) -> None:
+            repository = SQLAlchemyChatMessageRepository(database)
+            await repository.create_many(
+                [make_message(f"msg-{i}") for i in range(5)]
+            )
+
+            iterator = repository.iter_unprocessed(chunk_size=2)
+            first = await iterator.__anext__()
+            await iterator.aclose()  # type: ignore[attr-defined]
+
+            assert first.message_id == "msg-0"
+            assert len(await repository.list_unprocessed()) == 5
+
+        run_with_database(scenario)
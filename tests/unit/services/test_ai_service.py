@@ -0,0 +1,223 @@
+"""
+AIServiceのテスト
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from typing import List
+
+import httpx
+import pytest
+
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.infrastructure.external.claude_client import (
+    ClaudeClient,
+)
+from auto_chat_maker.services.ai_service import AIService
+from auto_chat_maker.utils.exceptions import AIProcessingError
+
+
+def make_message() -> ChatMessage:
+    return ChatMessage(
+        message_id="msg-1",
+        chat_id="chat-1",
+        content="資料を共有してもらえますか？",
+        sender_id="user-1",
+        sender_name="佐藤花子",
+        sent_at=datetime(2024, 12, 1, 10, 0, 0),
+    )
+
+
+def make_service(
+    text: str, requests: List[httpx.Request], min_confidence: float = 0.0
+) -> AIService:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, json={"content": [{"type": "text", "text": text}]}
+        )
+
+    client = ClaudeClient(
+        "test-key",
+        base_url="https://claude.test",
+        transport=httpx.MockTransport(handler),
+    )
+    return AIService(client, max_suggestions=3, min_confidence=min_confidence)
+
+
+class TestAIService:
+    """AIServiceのテスト"""
+
+    def test_generates_all_suggestions_in_single_call(self) -> None:
+        """1回の呼び出しで複数の返信案が生成されることをテスト"""
+        # Arrange
+        requests: List[httpx.Request] = []
+        output = json.dumps(
+            {
+                "suggestions": [
+                    {"content": "承知しました。", "confidence": 0.6},
+                    {"content": "すぐに共有します。", "confidence": 0.9},
+                    {"content": "本日中に送ります。", "confidence": 0.7},
+                ]
+            },
+            ensure_ascii=False,
+        )
+        service = make_service(output, requests)
+
+        # Act
+        suggestions = asyncio.run(
+            service.generate_reply_suggestions(make_message())
+        )
+
+        # Assert
+        assert len(requests) == 1
+        body = json.loads(requests[0].content)
+        assert "3件" in body["messages"][0]["content"]
+        assert "JSON" in body["system"]
+        assert [s.content for s in suggestions] == [
+            "すぐに共有します。",
+            "本日中に送ります。",
+            "承知しました。",
+        ]
+        assert all(s.message_id == "msg-1" for s in suggestions)
+
+    def test_parse_fenced_json_with_clamping_and_truncation(self) -> None:
+        """コードブロック内のJSONを解釈し、信頼度の補正と件数制限をテスト"""
+        # Arrange
+        service = make_service("", [])
+        text = (
+            "以下が返信案です。\n```json\n"
+            '[{"content": "A", "confidence": 1.5},'
+            ' {"content": "B", "confidence": -1},'
+            ' "C", {"content": "A", "confidence": 0.1},'
+            ' {"content": "D", "confidence": 0.8}]\n```'
+        )
+
+        # Act
+        suggestions = service.parse_suggestions("msg-1", text)
+
+        # Assert
+        assert [(s.content, s.confidence_score) for s in suggestions] == [
+            ("A", 1.0),
+            ("D", 0.8),
+            ("C", 0.5),
+        ]
+
+    def test_parse_falls_back_to_raw_text(self) -> None:
+        """JSONでない出力は本文全体を1件の返信案にすることをテスト"""
+        # Arrange
+        service = make_service("", [])
+
+        # Act
+        suggestions = service.parse_suggestions("msg-1", " 了解です。 ")
+
+        # Assert
+        assert len(suggestions) == 1
+        assert suggestions[0].content == "了解です。"
+        assert suggestions[0].confidence_score == 0.5
+
+    def test_parse_salvages_truncated_json(self) -> None:
+        """途中で切れたJSONは完結した候補のみを返信案にすることをテスト"""
+        # Arrange
+        service = make_service("", [])
+        text = (
+            '{"suggestions": [{"content": "了解です", "confidence": 0.9},'
+            ' {"content": "確認しま'
+        )
+
+        # Act
+        suggestions = service.parse_suggestions("msg-1", text)
+
+        # Assert
+        assert [(s.content, s.confidence_score) for s in suggestions] == [
+            ("了解です", 0.9)
+        ]
+
+    def test_parse_json_without_suggestions_raises(self) -> None:
+        """suggestionsを含まないJSONは本文として扱わずエラーになることをテスト"""
+        # Arrange
+        service = make_service("", [])
+
+        # Act & Assert
+        with pytest.raises(AIProcessingError):
+            service.parse_suggestions("msg-1", '{"answer":"x"}')
+
+    def test_low_confidence_suggestions_are_filtered(self) -> None:
+        """信頼度が閾値未満の返信案が除外されることをテスト"""
+        # Arrange
+        output = json.dumps(
+            {
+                "suggestions": [
+                    {"content": "承知しました。", "confidence": 0.9},
+                    {"content": "はい。", "confidence": 0.4},
+                ]
+            },
+            ensure_ascii=False,
+        )
+        service = make_service(output, [], min_confidence=0.8)
+
+        # Act
+        suggestions = asyncio.run(
+            service.generate_reply_suggestions(make_message())
+        )
+
+        # Assert
+        assert [s.content for s in suggestions] == ["承知しました。"]
+
+    def test_raw_text_fallback_passes_threshold(self) -> None:
+        """JSONでない出力の返信案が閾値で除外されないことをテスト"""
+        # Arrange
+        service = make_service("了解です。", [], min_confidence=0.8)
+
+        # Act
+        suggestions = asyncio.run(
+            service.generate_reply_suggestions(make_message())
+        )
+
+        # Assert
+        assert [(s.content, s.confidence_score) for s in suggestions] == [
+            ("了解です。", 0.8)
+        ]
+
+    def test_all_filtered_raises(self) -> None:
+        """すべての返信案が閾値未満の場合にAIProcessingErrorになることをテスト"""
+        # Arrange
+        output = json.dumps(
+            {"suggestions": [{"content": "はい。", "confidence": 0.4}]},
+            ensure_ascii=False,
+        )
+        service = make_service(output, [], min_confidence=0.8)
+
+        # Act & Assert
+        with pytest.raises(AIProcessingError) as exc_info:
+            asyncio.run(service.generate_reply_suggestions(make_message()))
+        assert exc_info.value.error_code == "LOW_CONFIDENCE_SUGGESTIONS"
+
+    def test_empty_output_raises(self) -> None:
+        """空の出力でAIProcessingErrorになることをテスト"""
+        # Arrange
+        service = make_service('{"suggestions": []}', [])
+
+        # Act & Assert
+        with pytest.raises(AIProcessingError):
+            asyncio.run(service.generate_reply_suggestions(make_message()))
+
+    def test_filter_suggestions(self) -> None:
+        """信頼度の閾値で返信案が絞り込まれることをテスト"""
+        # Arrange
+        suggestions = [
+            ReplySuggestion(
+                message_id="msg-1", content="A", confidence_score=0.9
+            ),
+            ReplySuggestion(
+                message_id="msg-1", content="B", confidence_score=0.3
+            ),
+        ]
+
+        # Act
+        filtered = AIService.filter_suggestions(suggestions, 0.5)
+
+        # Assert
+        assert [s.content for s in filtered] == ["A"]
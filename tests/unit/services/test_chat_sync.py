@@ -0,0 +1,219 @@
+"""
+チャット差分同期のテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.repositories.chat_message_repository import (  # noqa: E501
+    SQLAlchemyChatMessageRepository,
+)
+from auto_chat_maker.infrastructure.repositories.chat_sync_state_repository import (  # noqa: E501
+    SQLAlchemyChatSyncStateRepository,
+)
+from auto_chat_maker.infrastructure.repositories.subscription_repository import (  # noqa: E501
+    SQLAlchemySubscriptionRepository,
+)
+from auto_chat_maker.services.chat_sync import ChatSyncService
+
+
+def graph_message(
+    message_id: str,
+    modified: str,
+    message_type: str = "message",
+    chat_id: str = "chat-1",
+) -> Dict[str, Any]:
+    """GraphのchatMessageを作成"""
+    return {
+        "id": message_id,
+        "chatId": chat_id,
+        "messageType": message_type,
+        "createdDateTime": modified,
+        "lastModifiedDateTime": modified,
+        "body": {"contentType": "text", "content": f"本文 {message_id}"},
+        "from": {"user": {"id": "user-1", "displayName": "田中太郎"}},
+    }
+
+
+class FakeMessageSource:
+    """チャットごとのページを返すGraphクライアント"""
+
+    def __init__(self, pages: Dict[str, List[List[Dict[str, Any]]]]) -> None:
+        self.pages = pages
+        self.failing: Set[str] = set()
+        self.calls: List[Dict[str, Any]] = []
+
+    async def list_chat_messages(
+        self,
+        chat_id: str,
+        modified_after: Optional[datetime] = None,
+        page_size: int = 50,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        self.calls.append(
+            {"chat_id": chat_id, "modified_after": modified_after}
+        )
+        for i, page in enumerate(self.pages.get(chat_id, [])):
+            if i > 0 and chat_id in self.failing:
+                raise RuntimeError("graph unavailable")
+            yield page
+
+
+class TestChatSyncService:
+    """ChatSyncServiceのテスト"""
+
+    def test_incremental_sync_uses_watermark(self) -> None:
+        """初回は指定期間のみ、2回目はウォーターマーク以降を取得することをテスト"""
+        # Arrange
+        source = FakeMessageSource(
+            {
+                "chat-1": [
+                    [
+                        graph_message("m3", "2025-01-01T10:02:00.500Z"),
+                        graph_message(
+                            "event",
+                            "2025-01-01T10:01:30Z",
+                            "systemEventMessage",
+                        ),
+                    ],
+                    [graph_message("m1", "2025-01-01T10:00:00Z")],
+                ]
+            }
+        )
+
+        async def scenario(database: Database) -> List[int]:
+            messages = SQLAlchemyChatMessageRepository(database)
+            states = SQLAlchemyChatSyncStateRepository(database)
+            service = ChatSyncService(
+                source,  # type: ignore[arg-type]
+                messages,
+                states,
+                initial_lookback=3600,
+            )
+
+            # Act
+            first = await service.sync_chat("chat-1")
+            second = await service.sync_chat("chat-1")
+
+            # Assert
+            state = await states.get("chat-1")
+            assert state is not None
+            assert state.watermark == datetime(2025, 1, 1, 10, 2, 0, 500000)
+            stored = await messages.list_by_chat_id("chat-1")
+            assert [m.message_id for m in stored] == ["m3", "m1"]
+            assert stored[0].sender_name == "田中太郎"
+            return [first, second]
+
+        inserted = run_with_database(scenario)
+
+        assert inserted == [2, 0]
+        lookback = datetime.utcnow() - source.calls[0]["modified_after"]
+        assert timedelta(minutes=59) < lookback < timedelta(minutes=61)
+        assert source.calls[1]["modified_after"] == datetime(
+            2025, 1, 1, 10, 1, 59, 500000
+        )
+
+    def test_failed_chat_keeps_watermark_and_others_continue(self) -> None:
+        """途中で失敗したチャットはウォーターマークを進めず、他は同期することをテスト"""
+        # Arrange
+        source = FakeMessageSource(
+            {
+                "chat-1": [
+                    [graph_message("a2", "2025-01-01T10:01:00Z")],
+                    [graph_message("a1", "2025-01-01T10:00:00Z")],
+                ],
+                "chat-2": [
+                    [
+                        graph_message(
+                            "b1", "2025-01-01T11:00:00Z", chat_id="chat-2"
+                        )
+                    ]
+                ],
+            }
+        )
+        source.failing.add("chat-1")
+
+        async def scenario(database: Database) -> int:
+            messages = SQLAlchemyChatMessageRepository(database)
+            states = SQLAlchemyChatSyncStateRepository(database)
+            # インメモリDBは1接続を共有するため順に同期する
+            service = ChatSyncService(
+                source,  # type: ignore[arg-type]
+                messages,
+                states,
+                concurrency=1,
+            )
+
+            # Act
+            inserted = await service.sync_all(["chat-1", "chat-2"])
+
+            # Assert
+            assert await states.get("chat-1") is None
+            state = await states.get("chat-2")
+            assert state is not None
+            assert state.watermark == datetime(2025, 1, 1, 11, 0, 0)
+            # 失敗したチャットも取得済みのページは登録され、同期対象に残る
+            assert await states.list_chat_ids() == ["chat-1", "chat-2"]
+            return inserted
+
+        assert run_with_database(scenario) == 1
+
+    def test_subscribed_chats_are_synced_before_first_message(self) -> None:
+        """同期状態が空でも購読中のチャットが同期されることをテスト"""
+        # Arrange
+        source = FakeMessageSource(
+            {
+                "c1": [
+                    [graph_message("m1", "2025-01-01T10:00:00Z", chat_id="c1")]
+                ]
+            }
+        )
+
+        async def scenario(database: Database) -> int:
+            messages = SQLAlchemyChatMessageRepository(database)
+            states = SQLAlchemyChatSyncStateRepository(database)
+            subscriptions = SQLAlchemySubscriptionRepository(database)
+            await subscriptions.create(
+                Subscription(
+                    subscription_id="sub-1",
+                    resource="/chats/c1/messages",
+                    client_state="secret",
+                    notification_url="https://example.com/webhook",
+                    expiration_date_time=datetime.utcnow()
+                    + timedelta(hours=1),
+                )
+            )
+            service = ChatSyncService(
+                source,  # type: ignore[arg-type]
+                messages,
+                states,
+                concurrency=1,
+                subscription_repository=subscriptions,
+            )
+
+            # Act
+            inserted = await service.sync_all()
+
+            # Assert
+            assert [call["chat_id"] for call in source.calls] == ["c1"]
+            assert await messages.get_by_message_id("m1") is not None
+            assert await states.list_chat_ids() == ["c1"]
+            return inserted
+
+        assert run_with_database(scenario) == 1
+
+
+def run_with_database(scenario: Any) -> Any:
+    """インメモリDBを用意してシナリオを実行"""
+
+    async def runner() -> Any:
+        database = Database("sqlite:///:memory:")
+        await database.create_tables()
+        try:
+            return await scenario(database)
+        finally:
+            await database.dispose()
+
+    return asyncio.run(runner())
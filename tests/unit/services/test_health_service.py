@@ -0,0 +1,259 @@
+"""
+ヘルスチェックサービスのテスト
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from auto_chat_maker.api.routes.health import StaticHealthEndpoint
+from auto_chat_maker.api.routes.health import router as health_router
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.main import create_app
+from auto_chat_maker.services.health_service import (
+    STATUS_DEGRADED,
+    STATUS_HEALTHY,
+    STATUS_NOT_CONFIGURED,
+    STATUS_UNHEALTHY,
+    HealthService,
+)
+from auto_chat_maker.utils.exceptions import NetworkError
+
+
+class CountingProbe:
+    """呼び出し回数を数えるプローブ"""
+
+    def __init__(
+        self, delay: float = 0.0, error: Optional[Exception] = None
+    ) -> None:
+        self.calls = 0
+        self._delay = delay
+        self._error = error
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        if self._error is not None:
+            raise self._error
+
+
+class TestHealthService:
+    """HealthServiceのテスト"""
+
+    def test_probes_run_concurrently_with_timeout(self) -> None:
+        """プローブが並行実行され、タイムアウトしたものは失敗になることをテスト"""
+        # Arrange
+        service = HealthService(
+            {
+                "database": CountingProbe(delay=0.05),
+                "mcp_server": CountingProbe(delay=0.05),
+                "claude_api": CountingProbe(delay=1.0),
+            },
+            timeout=0.1,
+        )
+
+        # Act
+        started = time.monotonic()
+        report = asyncio.run(service.check())
+        elapsed = time.monotonic() - started
+
+        # Assert
+        assert elapsed < 0.5
+        assert report.components["database"].status == STATUS_HEALTHY
+        assert report.components["claude_api"].status == STATUS_UNHEALTHY
+        assert report.status == STATUS_DEGRADED
+        assert report.ready
+
+    def test_results_are_cached_and_shared(self) -> None:
+        """TTL内の問い合わせや同時の問い合わせでプローブが再実行されないことをテスト"""
+        # Arrange
+        probe = CountingProbe(delay=0.01)
+        service = HealthService({"database": probe}, cache_ttl=60)
+
+        async def scenario() -> None:
+            await asyncio.gather(*(service.check() for _ in range(10)))
+            await service.check()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert probe.calls == 1
+
+    def test_expired_cache_is_refreshed(self) -> None:
+        """TTLを過ぎるとプローブが再実行されることをテスト"""
+        # Arrange
+        probe = CountingProbe()
+        service = HealthService({"database": probe}, cache_ttl=0.01)
+
+        async def scenario() -> None:
+            await service.check()
+            await asyncio.sleep(0.02)
+            await service.check()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert probe.calls == 2
+
+    def test_critical_failure_is_not_ready(self) -> None:
+        """必須の依存サービスが失敗するとready=Falseになることをテスト"""
+        # Arrange
+        service = HealthService(
+            {
+                "database": CountingProbe(error=NetworkError("接続失敗")),
+                "claude_api": None,
+            }
+        )
+
+        # Act
+        report = asyncio.run(service.check())
+
+        # Assert
+        assert not report.ready
+        assert report.status == STATUS_UNHEALTHY
+        assert "NetworkError" in (report.components["database"].error or "")
+        assert report.components["claude_api"].status == STATUS_NOT_CONFIGURED
+
+    def test_database_ping(self) -> None:
+        """データベースのプローブが疎通を確認できることをテスト"""
+        # Arrange
+        database = Database("sqlite:///:memory:")
+        service = HealthService({"database": database.ping})
+
+        async def scenario() -> bool:
+            try:
+                return (await service.check()).ready
+            finally:
+                await database.dispose()
+
+        # Act & Assert
+        assert asyncio.run(scenario())
+
+
+class TestHealthRoutes:
+    """liveness・readinessエンドポイントのテスト"""
+
+    def request(
+        self, path: str, health_service: Optional[HealthService]
+    ) -> httpx.Response:
+        app = FastAPI()
+        app.include_router(health_router, prefix="/api")
+        if health_service is not None:
+            app.state.health_service = health_service
+
+        async def scenario() -> httpx.Response:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.get(path)
+
+        return asyncio.run(scenario())
+
+    def test_liveness_does_not_probe(self) -> None:
+        """livenessは依存サービスを確認しないことをテスト"""
+        # Arrange
+        probe = CountingProbe(error=NetworkError("接続失敗"))
+
+        # Act
+        response = self.request(
+            "/api/health/live", HealthService({"database": probe})
+        )
+
+        # Assert
+        assert response.status_code == 200
+        assert probe.calls == 0
+
+    def test_readiness_status_codes(self) -> None:
+        """readinessが必須の依存サービスの状態に応じて200/503を返すことをテスト"""
+        # Act
+        ready = self.request(
+            "/api/health/ready", HealthService({"database": CountingProbe()})
+        )
+        not_ready = self.request(
+            "/api/health/ready",
+            HealthService(
+                {"database": CountingProbe(error=NetworkError("接続失敗"))}
+            ),
+        )
+        starting = self.request("/api/health/ready", None)
+
+        # Assert
+        assert ready.status_code == 200
+        assert ready.json()["components"]["database"]["status"] == "healthy"
+        assert not_ready.status_code == 503
+        assert starting.status_code == 503
+
+
+class TestStaticHealthEndpoint:
+    """固定ペイロードのヘルスチェックのテスト"""
+
+    def test_payload_contains_static_fields_and_timestamp(self) -> None:
+        """固定部分と現在時刻が正しいJSONとして出力されることをテスト"""
+        # Arrange
+        endpoint = StaticHealthEndpoint(
+            Settings(app_name="チャット", app_version="2.0.0", debug=True)
+        )
+
+        # Act
+        first = endpoint.render()
+        second = endpoint.render()
+        payload = json.loads(first)
+
+        # Assert
+        assert payload["status"] == "healthy"
+        assert payload["service"] == "チャット"
+        assert payload["version"] == "2.0.0"
+        assert payload["environment"] == "development"
+        assert payload["timestamp"][:4].isdigit()
+        assert len(first) == len(second)
+
+    @pytest.mark.slow
+    def test_health_requests_per_second(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """/health の処理件数/秒が通常のFastAPIルートを上回ること"""
+        # Arrange
+        caplog.set_level(logging.WARNING, logger="httpx")
+        app = create_app()
+
+        async def requests_per_second(path: str, count: int = 500) -> float:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                for _ in range(50):
+                    await client.get(path)
+                started = time.perf_counter()
+                for _ in range(count):
+                    response = await client.get(path)
+                    assert response.status_code == 200
+                return count / (time.perf_counter() - started)
+
+        # Act
+        # 交互に計測して各ルートの最良値を比べ、一時的な負荷の影響を除く
+        static_rps = api_rps = 0.0
+        for _ in range(4):
+            static_rps = max(
+                static_rps, asyncio.run(requests_per_second("/health"))
+            )
+            api_rps = max(
+                api_rps, asyncio.run(requests_per_second("/api/health/live"))
+            )
+
+        # Assert
+        # 絶対値は実行環境に依存するため、通常のルートとの比で比較する
+        ratio = static_rps / api_rps
+        assert ratio > 1.0, (
+            f"/health={static_rps:.0f}/s /api/health/live={api_rps:.0f}/s "
+            f"ratio={ratio:.2f}"
+        )
@@ -0,0 +1,135 @@
+"""
+変更通知の重複排除のテスト
+"""
+
+import asyncio
+from typing import List, Set
+
+from auto_chat_maker.services.notification_dedup import (
+    BloomFilter,
+    NotificationDeduplicator,
+)
+
+
+class FakeChatMessageRepository:
+    """登録済みのmessage_idと問い合わせを記録するリポジトリ"""
+
+    def __init__(self, stored: Set[str] = frozenset()) -> None:
+        self.stored = set(stored)
+        self.queries: List[List[str]] = []
+
+    async def find_existing_message_ids(
+        self, message_ids: List[str]
+    ) -> Set[str]:
+        self.queries.append(list(message_ids))
+        return self.stored & set(message_ids)
+
+    async def list_recent_message_ids(self, limit: int) -> List[str]:
+        return sorted(self.stored, reverse=True)[:limit]
+
+
+class TestBloomFilter:
+    """BloomFilterのテスト"""
+
+    def test_no_false_negatives_and_bounded_false_positives(self) -> None:
+        """登録済みは必ず該当し、偽陽性率が指定値程度に収まることをテスト"""
+        # Arrange
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            bloom.add(f"message-{i}")
+
+        # Act
+        missing = [i for i in range(5000) if f"message-{i}" not in bloom]
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+
+        # Assert
+        assert missing == []
+        assert false_positives < 10000 * 0.02
+        assert bloom.is_full
+
+
+class TestNotificationDeduplicator:
+    """NotificationDeduplicatorのテスト"""
+
+    def test_new_messages_do_not_query_database(self) -> None:
+        """初見のmessage_idはDBを参照せずに受け付けることをテスト"""
+        # Arrange
+        repository = FakeChatMessageRepository()
+        deduplicator = NotificationDeduplicator(
+            repository  # type: ignore[arg-type]
+        )
+
+        # Act
+        accepted = asyncio.run(deduplicator.filter_new(["m1", "m2", "m1"]))
+        redelivered = asyncio.run(deduplicator.filter_new(["m2", "m3"]))
+
+        # Assert
+        assert accepted == ["m1", "m2"]
+        assert redelivered == ["m3"]
+        assert repository.queries == []
+        assert deduplicator.stats()["recent"] == 1
+
+    def test_bloom_hits_are_confirmed_in_one_query(self) -> None:
+        """LRUから外れたものはブルームフィルター該当時のみDBで確認することをテスト"""
+        # Arrange
+        repository = FakeChatMessageRepository(stored={"m1"})
+        deduplicator = NotificationDeduplicator(
+            repository, recent_size=1  # type: ignore[arg-type]
+        )
+
+        async def scenario() -> List[str]:
+            await deduplicator.filter_new(["m1", "m2", "m3"])
+            # m1は保存済み、m2はキュー投入に失敗して未保存
+            deduplicator.forget(["m2"])
+            return await deduplicator.filter_new(["m1", "m2", "m3", "m4"])
+
+        # Act
+        accepted = asyncio.run(scenario())
+
+        # Assert
+        assert accepted == ["m2", "m4"]
+        assert repository.queries == [["m1", "m2"]]
+        stats = deduplicator.stats()
+        assert stats["confirmed"] == 1
+        assert stats["false_positive"] == 1
+        assert stats["recent"] == 1
+
+    def test_warm_loads_recent_messages(self) -> None:
+        """起動時に読み込んだメッセージの再送をDBを参照せずに除外することをテスト"""
+        # Arrange
+        repository = FakeChatMessageRepository(stored={"m1", "m2"})
+        deduplicator = NotificationDeduplicator(
+            repository  # type: ignore[arg-type]
+        )
+
+        async def scenario() -> List[str]:
+            await deduplicator.warm()
+            return await deduplicator.filter_new(["m1", "m2", "m3"])
+
+        # Act
+        accepted = asyncio.run(scenario())
+
+        # Assert
+        assert accepted == ["m3"]
+        assert repository.queries == []
+
+    def test_rotates_bloom_filter_when_full(self) -> None:
+        """ブルームフィルターが上限に達しても直前の世代を参照することをテスト"""
+        # Arrange
+        repository = FakeChatMessageRepository(stored={"m0"})
+        deduplicator = NotificationDeduplicator(
+            repository,  # type: ignore[arg-type]
+            recent_size=1,
+            bloom_capacity=4,
+        )
+
+        async def scenario() -> List[str]:
+            await deduplicator.filter_new([f"m{i}" for i in range(6)])
+            return await deduplicator.filter_new(["m0"])
+
+        # Act
+        accepted = asyncio.run(scenario())
+
+        # Assert
+        assert accepted == []
+        assert repository.queries == [["m0"]]
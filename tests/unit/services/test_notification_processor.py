@@ -0,0 +1,158 @@
+"""
+NotificationProcessorのテスト
+"""
+
+import asyncio
+from typing import Any, Dict, List, Set, Tuple
+
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.infrastructure.external.graph_client import (
+    parse_chat_resource,
+)
+from auto_chat_maker.services.notification_dedup import (
+    NotificationDeduplicator,
+)
+from auto_chat_maker.services.notification_processor import (
+    NotificationProcessor,
+)
+
+
+class FakeFetcher:
+    """取得したメッセージを記録するGraphクライアント"""
+
+    def __init__(self, message_type: str = "message") -> None:
+        self.calls: List[Tuple[str, str]] = []
+        self._message_type = message_type
+
+    async def get_chat_message(
+        self, chat_id: str, message_id: str
+    ) -> Dict[str, Any]:
+        self.calls.append((chat_id, message_id))
+        return {
+            "id": message_id,
+            "messageType": self._message_type,
+            "createdDateTime": "2024-12-01T10:00:00Z",
+            "body": {"contentType": "text", "content": "了解です"},
+            "from": {"user": {"id": "user-1", "displayName": "佐藤花子"}},
+        }
+
+
+class RecordingRepository:
+    """upsert_manyで登録済みのmessage_idを除外するリポジトリ"""
+
+    def __init__(self) -> None:
+        self.messages: Dict[str, ChatMessage] = {}
+
+    async def upsert_many(
+        self, messages: List[ChatMessage]
+    ) -> List[ChatMessage]:
+        inserted = [m for m in messages if m.message_id not in self.messages]
+        for message in inserted:
+            self.messages[message.message_id] = message
+        return inserted
+
+    async def find_existing_message_ids(
+        self, message_ids: List[str]
+    ) -> Set[str]:
+        return set(self.messages) & set(message_ids)
+
+    async def list_recent_message_ids(self, limit: int) -> List[str]:
+        return list(self.messages)[:limit]
+
+
+def payload(change_type: str = "created") -> Dict[str, Any]:
+    return {
+        "subscription_id": "sub-1",
+        "change_type": change_type,
+        "resource": "chats('19:abc@thread.v2')/messages('m1')",
+        "resource_data": {"id": "m1"},
+        "tenant_id": "tenant",
+    }
+
+
+class TestNotificationProcessor:
+    """NotificationProcessorのテスト"""
+
+    def test_created_message_is_fetched_and_stored_once(self) -> None:
+        """作成通知のメッセージが登録され、再処理では通知されないことをテスト"""
+        # Arrange
+        fetcher = FakeFetcher()
+        repository = RecordingRepository()
+        notified: List[bool] = []
+
+        async def record_notified() -> None:
+            notified.append(True)
+
+        processor = NotificationProcessor(
+            fetcher, repository, on_created=record_notified
+        )
+
+        async def scenario() -> None:
+            await processor(payload())
+            await processor(payload())
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert fetcher.calls == [("19:abc@thread.v2", "m1")] * 2
+        message = repository.messages["m1"]
+        assert message.chat_id == "19:abc@thread.v2"
+        assert message.metadata["source"] == "webhook"
+        assert notified == [True]
+
+    def test_other_changes_and_system_events_are_skipped(self) -> None:
+        """更新通知とシステムイベントは登録されないことをテスト"""
+        # Arrange
+        fetcher = FakeFetcher(message_type="systemEventMessage")
+        repository = RecordingRepository()
+        processor = NotificationProcessor(fetcher, repository)
+
+        async def scenario() -> None:
+            await processor(payload(change_type="updated"))
+            await processor(payload())
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert len(fetcher.calls) == 1
+        assert repository.messages == {}
+
+    def test_dead_lettered_message_is_accepted_again(self) -> None:
+        """デッドレターになったメッセージの再送が重複とみなされないことをテスト"""
+        # Arrange
+        repository = RecordingRepository()
+        deduplicator = NotificationDeduplicator(repository)
+        processor = NotificationProcessor(
+            FakeFetcher(), repository, deduplicator=deduplicator
+        )
+
+        async def scenario() -> Tuple[List[str], List[str]]:
+            first = await deduplicator.filter_new(["m1"])
+            processor.on_dead_letter(payload())
+            return first, await deduplicator.filter_new(["m1"])
+
+        # Act
+        first, redelivered = asyncio.run(scenario())
+
+        # Assert
+        assert first == ["m1"]
+        assert redelivered == ["m1"]
+
+
+class TestParseChatResource:
+    """parse_chat_resourceのテスト"""
+
+    def test_parses_notification_and_subscription_resources(self) -> None:
+        # Act & Assert
+        assert parse_chat_resource("chats('c1')/messages('m1')") == (
+            "c1",
+            "m1",
+        )
+        assert parse_chat_resource("/chats/19%3Aabc/messages") == (
+            "19:abc",
+            None,
+        )
+        assert parse_chat_resource("/chats/getAllMessages") == (None, None)
+        assert parse_chat_resource("/users/u1/chats") == (None, None)
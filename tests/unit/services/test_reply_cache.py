@@ -0,0 +1,250 @@
+"""
+返信案キャッシュのテスト
+"""
+
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.services.reply_cache import (
+    CachedReplyGenerator,
+    InMemoryReplyCache,
+    SQLiteReplyCache,
+    make_cache_key,
+)
+
+
+def make_message(message_id: str, content: str) -> ChatMessage:
+    return ChatMessage(
+        message_id=message_id,
+        chat_id="chat-1",
+        content=content,
+        sender_id="user-1",
+        sender_name="佐藤花子",
+        sent_at=datetime(2024, 12, 1, 10, 0, 0),
+    )
+
+
+class FakeGenerator:
+    """呼び出し回数を記録する返信案生成器"""
+
+    def __init__(
+        self, delay: float = 0, fail: bool = False, empty: bool = False
+    ) -> None:
+        self.calls = 0
+        self._delay = delay
+        self._fail = fail
+        self._empty = empty
+
+    async def generate_reply_suggestions(
+        self,
+        message: ChatMessage,
+        context: Optional[List[ChatMessage]] = None,
+    ) -> List[ReplySuggestion]:
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        if self._fail:
+            raise RuntimeError("生成失敗")
+        if self._empty:
+            return []
+        return [
+            ReplySuggestion(
+                message_id=message.message_id,
+                content="承知しました。",
+                confidence_score=0.9,
+            )
+        ]
+
+
+class TestCacheKey:
+    """キャッシュキーのテスト"""
+
+    def test_key_ignores_width_case_and_whitespace(self) -> None:
+        """全角・大文字・空白の揺れが同じキーになることをテスト"""
+        # Arrange
+        a = make_message("msg-1", "Ｏｋ　ありがとう ")
+        b = make_message("msg-2", "ok ありがとう")
+
+        # Act & Assert
+        assert make_cache_key(a, None, "m", 0.7) == make_cache_key(
+            b, None, "m", 0.7
+        )
+
+    def test_key_depends_on_context_model_count_and_prompt(self) -> None:
+        """コンテキスト・モデル・件数・プロンプトバージョンでキーが変わることをテスト"""
+        # Arrange
+        message = make_message("msg-1", "了解です")
+        context = [make_message("msg-0", "会議は14時からです")]
+        base = make_cache_key(message, None, "m", 0.7)
+
+        # Act & Assert
+        assert make_cache_key(message, context, "m", 0.7) != base
+        assert make_cache_key(message, None, "other", 0.7) != base
+        assert make_cache_key(message, None, "m", 0.2) != base
+        assert (
+            make_cache_key(message, None, "m", 0.7, suggestion_count=5) != base
+        )
+        assert (
+            make_cache_key(message, None, "m", 0.7, prompt_version="v2")
+            != base
+        )
+
+
+class TestInMemoryReplyCache:
+    """InMemoryReplyCacheのテスト"""
+
+    def test_lru_eviction(self) -> None:
+        """上限を超えると最も使われていないエントリが追い出されることをテスト"""
+        # Arrange
+        cache = InMemoryReplyCache(max_entries=2)
+        cache.set("a", [("A", 0.5)])
+        cache.set("b", [("B", 0.5)])
+
+        # Act
+        cache.get("a")
+        cache.set("c", [("C", 0.5)])
+
+        # Assert
+        assert cache.get("a") == [("A", 0.5)]
+        assert cache.get("b") is None
+        assert cache.get("c") == [("C", 0.5)]
+
+    def test_ttl_expiry(self) -> None:
+        """TTLを過ぎたエントリが取得できないことをテスト"""
+        # Arrange
+        cache = InMemoryReplyCache(ttl=0)
+        cache.set("a", [("A", 0.5)])
+
+        # Act & Assert
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+
+class TestCachedReplyGenerator:
+    """CachedReplyGeneratorのテスト"""
+
+    def test_repeated_message_hits_cache(self) -> None:
+        """同じ内容のメッセージでは生成をスキップすることをテスト"""
+        # Arrange
+        generator = FakeGenerator()
+        cached = CachedReplyGenerator(generator, model="m", temperature=0.7)
+
+        async def scenario() -> List[ReplySuggestion]:
+            await cached.generate_reply_suggestions(
+                make_message("msg-1", "ありがとう")
+            )
+            return await cached.generate_reply_suggestions(
+                make_message("msg-2", " ありがとう ")
+            )
+
+        # Act
+        suggestions = asyncio.run(scenario())
+
+        # Assert
+        assert generator.calls == 1
+        assert suggestions[0].message_id == "msg-2"
+        assert suggestions[0].content == "承知しました。"
+        assert cached.stats()["hits"] == 1
+        assert cached.stats()["misses"] == 1
+
+    def test_concurrent_requests_share_generation(self) -> None:
+        """同じキーの同時生成が1回にまとめられることをテスト"""
+        # Arrange
+        generator = FakeGenerator(delay=0.05)
+        cached = CachedReplyGenerator(generator, model="m", temperature=0.7)
+
+        async def scenario() -> None:
+            await asyncio.gather(
+                *(
+                    cached.generate_reply_suggestions(
+                        make_message(f"msg-{i}", "了解")
+                    )
+                    for i in range(5)
+                )
+            )
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert generator.calls == 1
+        assert cached.hits == 4
+
+    def test_failures_are_not_cached(self) -> None:
+        """生成に失敗した結果はキャッシュされないことをテスト"""
+        # Arrange
+        generator = FakeGenerator(fail=True)
+        cached = CachedReplyGenerator(generator, model="m", temperature=0.7)
+        message = make_message("msg-1", "了解")
+
+        # Act
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                asyncio.run(cached.generate_reply_suggestions(message))
+
+        # Assert
+        assert generator.calls == 2
+
+    def test_empty_results_are_not_cached(self, tmp_path: Path) -> None:
+        """返信案が空の結果はどちらの段にもキャッシュされないことをテスト"""
+        # Arrange
+        generator = FakeGenerator(empty=True)
+        cached = CachedReplyGenerator(
+            generator,
+            model="m",
+            temperature=0.7,
+            persistent_cache=SQLiteReplyCache(str(tmp_path / "cache.db")),
+        )
+        message = make_message("msg-1", "了解")
+
+        # Act
+        for _ in range(2):
+            assert (
+                asyncio.run(cached.generate_reply_suggestions(message)) == []
+            )
+        cached.close()
+
+        # Assert
+        assert generator.calls == 2
+        assert cached.hits == 0
+
+    def test_sqlite_tier_survives_restart(self, tmp_path: Path) -> None:
+        """SQLiteキャッシュが再生成後のインスタンスでも利用されることをテスト"""
+        # Arrange
+        path = str(tmp_path / "reply_cache.db")
+        generator = FakeGenerator()
+        message = make_message("msg-1", "ありがとう")
+
+        async def scenario() -> CachedReplyGenerator:
+            first = CachedReplyGenerator(
+                generator,
+                model="m",
+                temperature=0.7,
+                persistent_cache=SQLiteReplyCache(path),
+            )
+            await first.generate_reply_suggestions(message)
+            first.close()
+
+            second = CachedReplyGenerator(
+                generator,
+                model="m",
+                temperature=0.7,
+                persistent_cache=SQLiteReplyCache(path),
+            )
+            await second.generate_reply_suggestions(message)
+            await second.generate_reply_suggestions(message)
+            second.close()
+            return second
+
+        # Act
+        second = asyncio.run(scenario())
+
+        # Assert
+        assert generator.calls == 1
+        assert second.persistent_hits == 1
+        assert second.hits == 2
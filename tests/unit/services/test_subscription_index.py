@@ -0,0 +1,104 @@
+"""
+サブスクリプション索引のテスト
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.infrastructure.repositories.subscription_repository import (  # noqa: E501
+    SQLAlchemySubscriptionRepository,
+)
+from auto_chat_maker.services.subscription_index import (
+    IndexedSubscriptionRepository,
+    SubscriptionIndex,
+)
+
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_subscription(subscription_id: str, minutes: int) -> Subscription:
+    """有効期限をBASE_TIMEからの分数で指定してサブスクリプションを作成"""
+    return Subscription(
+        subscription_id=subscription_id,
+        resource="/chats/getAllMessages",
+        client_state="secret",
+        notification_url="https://example.com/api/webhook/microsoft-graph",
+        expiration_date_time=BASE_TIME + timedelta(minutes=minutes),
+    )
+
+
+class TestExpirationHeap:
+    """有効期限ヒープのテスト"""
+
+    def test_pop_expiring_in_expiration_order(self) -> None:
+        """期限の早い順に、指定時刻以前のものだけ取り出されることをテスト"""
+        # Arrange
+        index = SubscriptionIndex()
+        for subscription_id, minutes in (("c", 30), ("a", 10), ("b", 20)):
+            index.put(make_subscription(subscription_id, minutes))
+
+        # Act
+        first = index.pop_expiring(BASE_TIME + timedelta(minutes=20))
+        next_expiration = index.next_expiration()
+
+        # Assert
+        assert [s.subscription_id for s in first] == ["a", "b"]
+        assert next_expiration == BASE_TIME + timedelta(minutes=30)
+        assert len(index) == 3
+
+    def test_updated_and_removed_entries_are_skipped(self) -> None:
+        """更新前の期限・削除済みのサブスクリプションが取り出されないことをテスト"""
+        # Arrange
+        index = SubscriptionIndex()
+        index.put(make_subscription("renewed", 10))
+        index.put(make_subscription("removed", 15))
+        index.put(make_subscription("renewed", 60))
+        index.put(make_subscription("renewed", 60))
+        index.remove("removed")
+
+        # Act
+        early = index.pop_expiring(BASE_TIME + timedelta(minutes=30))
+        late = index.pop_expiring(BASE_TIME + timedelta(minutes=90))
+
+        # Assert
+        assert early == []
+        assert [s.subscription_id for s in late] == ["renewed"]
+        assert index.next_expiration() is None
+
+
+class TestIndexedSubscriptionRepository:
+    """IndexedSubscriptionRepositoryのテスト"""
+
+    def test_writes_are_reflected_in_index(self) -> None:
+        """作成・更新・削除が索引に反映されることをテスト"""
+
+        async def scenario() -> None:
+            database = Database("sqlite:///:memory:")
+            try:
+                await database.create_tables()
+                index = SubscriptionIndex()
+                repository = IndexedSubscriptionRepository(
+                    SQLAlchemySubscriptionRepository(database), index
+                )
+
+                # Act & Assert
+                created = await repository.create(make_subscription("s1", 10))
+                assert index.verify_client_state("s1", "secret")
+
+                created.expiration_date_time = BASE_TIME + timedelta(hours=2)
+                await repository.update(created)
+                assert index.next_expiration() == created.expiration_date_time
+
+                reloaded = SubscriptionIndex()
+                await reloaded.load(repository)
+                assert reloaded.get("s1") is not None
+
+                assert created.id is not None
+                await repository.delete(created.id)
+                assert index.get("s1") is None
+            finally:
+                await database.dispose()
+
+        asyncio.run(scenario())
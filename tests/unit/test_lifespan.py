@@ -0,0 +1,321 @@
+"""
+アプリケーションのライフサイクル（lifespan）のテスト
+
+Graph APIはhttpx.MockTransportのスタブで置き換え、
+Webhookで受信した通知がワーカーで処理されるまでを確認する。
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from auto_chat_maker.application.schedulers.reply_generation_scheduler import (  # noqa: E501
+    ReplyGenerationScheduler,
+)
+from auto_chat_maker.config import settings as settings_module
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.domain.models.chat_message import ChatMessage
+from auto_chat_maker.domain.models.reply_suggestion import ReplySuggestion
+from auto_chat_maker.domain.models.subscription import Subscription
+from auto_chat_maker.infrastructure.database import connection
+from auto_chat_maker.infrastructure.external.graph_client import GraphClient
+from auto_chat_maker.infrastructure.repositories.chat_message_repository import (  # noqa: E501
+    SQLAlchemyChatMessageRepository,
+)
+from auto_chat_maker.infrastructure.repositories.reply_suggestion_repository import (  # noqa: E501
+    SQLAlchemyReplySuggestionRepository,
+)
+from auto_chat_maker.main import create_app, lifespan
+from auto_chat_maker.utils.leader_lock import FileLeaderLock
+from auto_chat_maker.utils.metrics import WORK_QUEUE_ACK_LATENCY
+
+WEBHOOK_PATH = "/api/webhook/microsoft-graph"
+
+
+class FakeGraphServer:
+    """$batchでチャットのメッセージを返すスタブサーバー"""
+
+    def __init__(self) -> None:
+        self.fetched: List[str] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/v1.0/$batch":
+            return httpx.Response(404, json={"error": {"code": "NotFound"}})
+        responses = []
+        for item in json.loads(request.content)["requests"]:
+            self.fetched.append(item["url"])
+            message_id = item["url"].rsplit("/", 1)[-1]
+            responses.append(
+                {
+                    "id": item["id"],
+                    "status": 200,
+                    "body": {
+                        "id": message_id,
+                        "chatId": "c1",
+                        "messageType": "message",
+                        "createdDateTime": "2024-12-01T10:00:00.1234567Z",
+                        "lastModifiedDateTime": "2024-12-01T10:00:00Z",
+                        "body": {"contentType": "text", "content": "こんにちは"},
+                        "from": {
+                            "user": {"id": "user-1", "displayName": "佐藤花子"}
+                        },
+                    },
+                }
+            )
+        return httpx.Response(200, json={"responses": responses})
+
+
+class FakeReplyGenerator:
+    """1件の返信案を返す生成器"""
+
+    async def generate_reply_suggestions(
+        self, message: ChatMessage
+    ) -> List[ReplySuggestion]:
+        return [
+            ReplySuggestion(
+                message_id=message.message_id,
+                content="承知しました",
+                confidence_score=0.9,
+            )
+        ]
+
+
+async def static_token() -> str:
+    return "test-token"
+
+
+def make_app(server: FakeGraphServer) -> FastAPI:
+    """Graph APIをスタブに置き換えたアプリケーションを作成"""
+    app = create_app()
+    app.state.graph_client = GraphClient(
+        static_token,
+        base_url="https://graph.test/v1.0",
+        transport=httpx.MockTransport(server),
+    )
+    return app
+
+
+def notification(message_id: str) -> Dict[str, Any]:
+    """Graphの変更通知を作成"""
+    return {
+        "subscriptionId": "sub-1",
+        "clientState": "secret",
+        "changeType": "created",
+        "resource": f"chats('c1')/messages('{message_id}')",
+        "resourceData": {"id": message_id},
+        "tenantId": "tenant",
+    }
+
+
+async def register_subscription(app: FastAPI) -> None:
+    await app.state.subscription_repository.create(
+        Subscription(
+            subscription_id="sub-1",
+            resource="/chats/c1/messages",
+            client_state="secret",
+            notification_url="https://example.com" + WEBHOOK_PATH,
+            expiration_date_time=datetime.utcnow() + timedelta(hours=1),
+        )
+    )
+
+
+async def post_notifications(
+    app: FastAPI, notifications: List[Dict[str, Any]]
+) -> int:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            WEBHOOK_PATH, json={"value": notifications}
+        )
+    return response.status_code
+
+
+async def wait_for_messages(
+    app: FastAPI, message_ids: List[str]
+) -> List[Optional[ChatMessage]]:
+    """メッセージが登録されるまで待機（最大2秒）"""
+    repository = SQLAlchemyChatMessageRepository(app.state.database)
+    messages: List[Optional[ChatMessage]] = []
+    for _ in range(200):
+        messages = [
+            await repository.get_by_message_id(message_id)
+            for message_id in message_ids
+        ]
+        if all(message is not None for message in messages):
+            break
+        await asyncio.sleep(0.01)
+    return messages
+
+
+@pytest.fixture
+def settings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Settings:
+    """ファイルDB・スケジューラー無効の設定をget_settingsに差し込む"""
+    settings = Settings(
+        database_url=f"sqlite:///{tmp_path / 'app.db'}",
+        scheduler_lock_file=str(tmp_path / "scheduler.lock"),
+        claude_api_key="",
+        secret_key="",
+        chat_sync_enabled=False,
+        subscription_index_refresh_interval=0,
+        work_queue_poll_interval=0.05,
+    )
+    monkeypatch.setattr(settings_module, "_settings", settings)
+    return settings
+
+
+class TestLifespan:
+    """lifespanで起動するバックグラウンド処理のテスト"""
+
+    def test_webhook_notification_is_persisted_by_worker(
+        self, settings: Settings
+    ) -> None:
+        """Webhookで受信した通知のメッセージがchat_messagesに登録されること"""
+        # Arrange
+        server = FakeGraphServer()
+        app = make_app(server)
+
+        async def scenario() -> List[Optional[ChatMessage]]:
+            async with lifespan(app):
+                await register_subscription(app)
+                status_code = await post_notifications(
+                    app, [notification("m1")]
+                )
+                assert status_code == 202
+                messages = await wait_for_messages(app, ["m1"])
+                assert app.state.queue_worker.is_running
+            return messages
+
+        # Act
+        (message,) = asyncio.run(scenario())
+
+        # Assert
+        assert server.fetched == ["/chats/c1/messages/m1"]
+        assert message is not None
+        assert message.chat_id == "c1"
+        assert message.content == "こんにちは"
+        assert message.metadata["source"] == "webhook"
+        assert app.state.queue_worker.is_running is False
+
+    def test_webhook_to_persisted_message_end_to_end(
+        self, settings: Settings
+    ) -> None:
+        """受信から登録・ackまでをポーリングを待たずに処理し、再送は除外すること"""
+        # Arrange
+        settings.work_queue_poll_interval = 30
+        server = FakeGraphServer()
+        app = make_app(server)
+        acked = WORK_QUEUE_ACK_LATENCY.labels("graph_notifications")
+        acked_before = acked.count
+
+        async def scenario() -> Tuple[List[Optional[ChatMessage]], int]:
+            async with lifespan(app):
+                await register_subscription(app)
+                assert (
+                    await post_notifications(
+                        app, [notification("m1"), notification("m2")]
+                    )
+                    == 202
+                )
+                messages = await wait_for_messages(app, ["m1", "m2"])
+                # Graphからの再送
+                assert (
+                    await post_notifications(app, [notification("m1")]) == 202
+                )
+                for _ in range(100):
+                    if acked.count - acked_before >= 2:
+                        break
+                    await asyncio.sleep(0.01)
+                depth = await app.state.notification_queue.depth()
+            return messages, depth
+
+        # Act
+        messages, depth = asyncio.run(scenario())
+
+        # Assert
+        assert all(message is not None for message in messages)
+        assert sorted(server.fetched) == [
+            "/chats/c1/messages/m1",
+            "/chats/c1/messages/m2",
+        ]
+        assert depth == 0
+        assert acked.count - acked_before == 2
+
+    def test_non_leader_wakes_leader_reply_generation(
+        self, settings: Settings
+    ) -> None:
+        """リーダー以外のワーカーの新着がキュー経由でリーダーの生成を起こすこと"""
+        # Arrange
+        settings.scheduler_lock_poll_interval = 0.05
+        server = FakeGraphServer()
+        app = make_app(server)
+        app.state.reply_generator = FakeReplyGenerator()
+        # 他のプロセスがリーダーとしてロックを保持している状態を再現する
+        other_leader = FileLeaderLock(settings.scheduler_lock_file)
+        assert other_leader.try_acquire()
+
+        async def scenario() -> Tuple[bool, int, int, List[ReplySuggestion]]:
+            async with lifespan(app):
+                await register_subscription(app)
+                await post_notifications(app, [notification("m1")])
+                await wait_for_messages(app, ["m1"])
+                queue = app.state.reply_waker.queue
+                reply_running = app.state.reply_scheduler.is_running
+                pending = await queue.depth()
+
+                # リーダーが交代すると起床要求が消費される
+                other_leader.release()
+                suggestions = SQLAlchemyReplySuggestionRepository(
+                    app.state.database
+                )
+                saved: List[ReplySuggestion] = []
+                for _ in range(200):
+                    saved = await suggestions.get_by_message_id("m1")
+                    if saved and await queue.depth() == 0:
+                        break
+                    await asyncio.sleep(0.01)
+                return reply_running, pending, await queue.depth(), saved
+
+        # Act
+        reply_running, pending, drained, saved = asyncio.run(scenario())
+
+        # Assert
+        assert reply_running is False
+        assert pending == 1
+        assert drained == 0
+        assert [s.content for s in saved] == ["承知しました"]
+
+    def test_teardown_releases_everything_when_a_stop_fails(
+        self, settings: Settings, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """停止処理の1つが失敗しても残りのリソースが解放されること"""
+        # Arrange
+        app = make_app(FakeGraphServer())
+        app.state.reply_generator = FakeReplyGenerator()
+
+        async def failing_stop(self: ReplyGenerationScheduler) -> None:
+            raise RuntimeError("stop failed")
+
+        monkeypatch.setattr(ReplyGenerationScheduler, "stop", failing_stop)
+
+        async def scenario() -> None:
+            async with lifespan(app):
+                assert app.state.reply_scheduler.is_running
+
+        # Act
+        with pytest.raises(RuntimeError, match="stop failed"):
+            asyncio.run(scenario())
+
+        # Assert
+        assert app.state.queue_worker.is_running is False
+        assert connection._database is None
+        # リーダーのロックが解放され、再起動したワーカーが取得できる
+        lock = FileLeaderLock(settings.scheduler_lock_file)
+        assert lock.try_acquire()
+        lock.release()
@@ -0,0 +1,78 @@
+"""
+アプリケーションの起動時間（コールドスタート）のテスト
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+# fastapi以外（自パッケージ・structlog等）のインポートにかけてよい時間（ミリ秒）
+IMPORT_TIME_BUDGET_MS = 300
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess[str]:
+    """src配下をパスに含めた新しいPythonプロセスで実行"""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+def cumulative_import_times(stderr: str) -> Dict[str, int]:
+    """-X importtimeの出力からモジュールごとの累積時間（マイクロ秒）を取得"""
+    times: Dict[str, int] = {}
+    pattern = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)")
+    for line in stderr.splitlines():
+        match = pattern.match(line)
+        if match:
+            times.setdefault(match.group(2), int(match.group(1)))
+    return times
+
+
+class TestColdStart:
+    """mainモジュールのインポートのテスト"""
+
+    def test_import_does_not_load_heavy_modules(self) -> None:
+        """インポートだけではアプリ・DB・HTTPクライアントを読み込まないこと"""
+        # Arrange
+        script = (
+            "import sys\n"
+            "import auto_chat_maker.main as main\n"
+            "print('app' in vars(main))\n"
+            "print(sorted(m for m in ('sqlalchemy', 'httpx') "
+            "if m in sys.modules))\n"
+            "print(type(main.app).__name__)\n"
+        )
+
+        # Act
+        lines = run_python("-c", script).stdout.splitlines()
+
+        # Assert
+        assert lines == ["False", "[]", "FastAPI"]
+
+    @pytest.mark.slow
+    def test_import_time_budget(self) -> None:
+        """python -X importtimeで計測したインポート時間が予算内であること"""
+        # Act
+        result = run_python(
+            "-X", "importtime", "-c", "import auto_chat_maker.main"
+        )
+        times = cumulative_import_times(result.stderr)
+        own_ms = (times["auto_chat_maker.main"] - times["fastapi"]) / 1000
+
+        # Assert
+        assert own_ms < IMPORT_TIME_BUDGET_MS, (
+            f"auto_chat_maker.main={own_ms:.0f}ms（fastapiを除く）"
+            f" > {IMPORT_TIME_BUDGET_MS}ms"
+        )
@@ -0,0 +1,151 @@
+"""
+本番用サーバー・CLIのテスト
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+import pytest
+from click.testing import CliRunner
+
+from auto_chat_maker import server
+from auto_chat_maker.cli import main
+from auto_chat_maker.config.settings import Settings, get_settings
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+
+def free_port() -> int:
+    """空いているポート番号を取得"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+class TestBuildConfig:
+    """build_configのテスト"""
+
+    def test_uses_settings(self) -> None:
+        """バックログ・keep-alive・同時接続数の上限が設定値から反映されることをテスト"""
+        # Arrange
+        settings = Settings(
+            backlog=512, keep_alive_timeout=30, limit_concurrency=100
+        )
+
+        # Act
+        config = server.build_config(settings, host="127.0.0.1", port=0)
+
+        # Assert
+        assert config.loaded
+        assert config.backlog == 512
+        assert config.timeout_keep_alive == 30
+        assert config.limit_concurrency == 100
+        assert config.port == 0
+        assert config.loop in ("uvloop", "asyncio")
+        assert config.http in ("httptools", "h11")
+
+    def test_slow_callback_detection_forces_asyncio_loop(self) -> None:
+        """遅いコールバックの検出を指定するとuvloopを使わないことをテスト"""
+        # Arrange
+        settings = Settings(slow_callback_threshold=0.1)
+
+        # Act
+        config = server.build_config(settings, host="127.0.0.1", port=0)
+
+        # Assert
+        assert config.loop == "asyncio"
+
+
+class TestServeCommand:
+    """serveコマンドのテスト"""
+
+    def test_options_are_passed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """コマンドラインの指定がサーバーに渡されることをテスト"""
+        # Arrange
+        calls: Dict[str, Any] = {}
+        monkeypatch.setattr(
+            server, "serve", lambda settings, **kwargs: calls.update(kwargs)
+        )
+        monkeypatch.setattr(get_settings(), "debug", True)
+
+        # Act
+        result = CliRunner().invoke(
+            main, ["serve", "--workers", "4", "--port", "9000"]
+        )
+
+        # Assert
+        assert result.exit_code == 0, result.output
+        assert calls == {
+            "workers": 4,
+            "host": None,
+            "port": 9000,
+            "reload": True,
+        }
+
+    def test_rejects_zero_workers(self) -> None:
+        """ワーカー数に0を指定するとエラーになることをテスト"""
+        # Act
+        result = CliRunner().invoke(main, ["serve", "--workers", "0"])
+
+        # Assert
+        assert result.exit_code != 0
+
+    @pytest.mark.slow
+    def test_multiple_workers_serve_and_shutdown(self, tmp_path: Path) -> None:
+        """複数ワーカーで応答し、SIGTERMで全ワーカーが停止することをテスト"""
+        # Arrange
+        port = free_port()
+        env = dict(
+            os.environ,
+            PYTHONPATH=str(SRC_DIR),
+            DATABASE_URL=f"sqlite:///{tmp_path / 'test.db'}",
+            SCHEDULER_LOCK_FILE=str(tmp_path / "scheduler.lock"),
+        )
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                "from auto_chat_maker.cli import main; main()",
+                "serve",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--workers",
+                "2",
+                "--no-reload",
+            ],
+            cwd=tmp_path,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        try:
+            # Act
+            status_code = None
+            deadline = time.monotonic() + 20
+            while time.monotonic() < deadline:
+                try:
+                    response = httpx.get(f"http://127.0.0.1:{port}/health")
+                    status_code = response.status_code
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+            process.send_signal(signal.SIGTERM)
+            exit_code = process.wait(timeout=20)
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+        # Assert
+        assert status_code == 200
+        assert exit_code == 0
@@ -0,0 +1,60 @@
+"""
+ワーカー間のリーダー選出のテスト
+"""
+
+import asyncio
+from pathlib import Path
+from typing import List
+
+from auto_chat_maker.utils.leader_lock import FileLeaderLock
+
+
+class TestFileLeaderLock:
+    """FileLeaderLockのテスト"""
+
+    def test_only_one_holder(self, tmp_path: Path) -> None:
+        """同じファイルのロックは1つだけが取得でき、解放後は引き継げることをテスト"""
+        # Arrange
+        path = str(tmp_path / "scheduler.lock")
+        first = FileLeaderLock(path)
+        second = FileLeaderLock(path)
+
+        # Act
+        first_acquired = first.try_acquire()
+        second_acquired = second.try_acquire()
+        first.release()
+        second_after_release = second.try_acquire()
+        second.release()
+
+        # Assert
+        assert first_acquired
+        assert not second_acquired
+        assert second_after_release
+        assert not first.is_leader
+
+    def test_run_when_acquired(self, tmp_path: Path) -> None:
+        """リーダーが解放するまで待機し、取得後にコールバックを実行することをテスト"""
+        # Arrange
+        path = str(tmp_path / "scheduler.lock")
+        leader = FileLeaderLock(path)
+        follower = FileLeaderLock(path)
+        leader.try_acquire()
+        started: List[str] = []
+
+        async def scenario() -> None:
+            task = asyncio.create_task(
+                follower.run_when_acquired(
+                    lambda: started.append("follower"), poll_interval=0.01
+                )
+            )
+            await asyncio.sleep(0.05)
+            assert not started
+            leader.release()
+            await asyncio.wait_for(task, timeout=1)
+
+        # Act
+        asyncio.run(scenario())
+        follower.release()
+
+        # Assert
+        assert started == ["follower"]
@@ -0,0 +1,120 @@
+"""
+ログのサンプリング・レート制限のテスト
+"""
+
+import io
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+import pytest
+import structlog
+from structlog import DropEvent
+
+from auto_chat_maker.config.settings import Settings
+from auto_chat_maker.utils.log_sampling import LogSampler, parse_rate_limit
+from auto_chat_maker.utils.logger import LoggerConfig
+
+
+def run(sampler: LogSampler, event_dict: Dict[str, Any]) -> bool:
+    """プロセッサーを実行し、出力されるならTrueを返す"""
+    try:
+        sampler(None, "info", event_dict)
+    except DropEvent:
+        return False
+    return True
+
+
+class TestLogSampler:
+    """LogSamplerのテスト"""
+
+    def test_rate_limit_reports_suppressed_count(self) -> None:
+        """窓内の先頭N件だけ通し、抑制件数を次の窓で報告することをテスト"""
+        # Arrange
+        sampler = LogSampler(rate_limits={"health_check": (2, 0.05)})
+        events: List[Dict[str, Any]] = [
+            {"event": "ヘルスチェック実行", "log_key": "health_check"} for _ in range(5)
+        ]
+
+        # Act
+        passed = [run(sampler, event) for event in events]
+        time.sleep(0.06)
+        next_event: Dict[str, Any] = {
+            "event": "ヘルスチェック実行",
+            "log_key": "health_check",
+        }
+        next_passed = run(sampler, next_event)
+
+        # Assert
+        assert passed == [True, True, False, False, False]
+        assert next_passed
+        assert next_event["suppressed_count"] == 3
+        assert sampler.suppressed == 3
+
+    def test_sampling_by_event_name(self) -> None:
+        """log_keyがない場合はイベント名でサンプリングすることをテスト"""
+        # Arrange
+        sampler = LogSampler(sample_rates={"頻出イベント": 0.0, "全件": 1.0})
+
+        # Act & Assert
+        assert not run(sampler, {"event": "頻出イベント"})
+        assert run(sampler, {"event": "全件"})
+        assert run(sampler, {"event": "対象外"})
+        assert sampler.sampled_out == 1
+
+    def test_sampled_events_carry_rate(self, monkeypatch: Any) -> None:
+        """採用されたイベントにサンプリング率が付与されることをテスト"""
+        # Arrange
+        monkeypatch.setattr("random.random", lambda: 0.05)
+        sampler = LogSampler(sample_rates={"hot": 0.1})
+        event: Dict[str, Any] = {"event": "x", "log_key": "hot"}
+
+        # Act
+        passed = run(sampler, event)
+
+        # Assert
+        assert passed
+        assert event["sample_rate"] == 0.1
+
+    def test_from_settings(self) -> None:
+        """設定値からサンプリング率とレート制限が読み込まれることをテスト"""
+        # Arrange
+        settings = Settings(
+            log_sample_rates={"hot": 0.5},
+            log_rate_limits={"validation_error": "3/10"},
+        )
+
+        # Act
+        sampler = LogSampler.from_settings(settings)
+
+        # Assert
+        assert sampler.enabled
+        assert parse_rate_limit("3/10") == (3, 10.0)
+        with pytest.raises(ValueError):
+            parse_rate_limit("3per10")
+
+    def test_integrated_with_logger_config(self) -> None:
+        """LoggerConfigに組み込むと超過分のログが出力されないことをテスト"""
+        # Arrange
+        LoggerConfig(
+            sampler=LogSampler(rate_limits={"validation_error": (1, 60)})
+        )
+        stream = io.StringIO()
+        std_logger = logging.getLogger("sampling_test_logger")
+        std_logger.handlers = [logging.StreamHandler(stream)]
+        std_logger.propagate = False
+        std_logger.setLevel(logging.INFO)
+        logger = structlog.get_logger("sampling_test_logger")
+
+        try:
+            # Act
+            for _ in range(3):
+                logger.error("バリデーションエラーが発生", log_key="validation_error")
+        finally:
+            LoggerConfig()
+
+        # Assert
+        lines = stream.getvalue().strip().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["log_key"] == "validation_error"
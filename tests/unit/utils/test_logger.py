@@ -7,13 +7,22 @@ t-wada氏のTDDの考え方に基づいて実装:
 3. Refactor: コードの改善
 """
 
+import io
 import json
 import logging
+import queue
+import re
+import time
 
 import pytest
 import structlog
 
-from auto_chat_maker.utils.logger import AppLogger, LoggerConfig
+from auto_chat_maker.utils.logger import (
+    AppLogger,
+    BoundedQueueHandler,
+    FastJSONRenderer,
+    LoggerConfig,
+)
 
 
 def test_logger_config_setup_logging(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -107,3 +116,135 @@ def test_app_logger_debug_logs_message(
         log_data = json.loads(json_str)
         assert log_data["event"] == message
         assert log_data["debug_info"] == "test"
+
+
+def test_async_mode_renders_on_background_thread(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """非同期モードでキュー経由のログがflush時に出力されること"""
+    # Arrange
+    config = LoggerConfig(log_level="INFO", async_mode=True)
+    logger = structlog.get_logger("async_test_logger")
+
+    try:
+        # Act
+        logger.info("非同期ログテスト", user="test")
+        config.flush()
+        output = capsys.readouterr().out
+    finally:
+        config.shutdown()
+        LoggerConfig()
+
+    # Assert
+    log_data = json.loads(output.strip().splitlines()[-1])
+    assert log_data["event"] == "非同期ログテスト"
+    assert log_data["user"] == "test"
+    assert log_data["level"] == "info"
+    assert "timestamp" in log_data
+
+
+def test_bounded_queue_handler_drops_when_full() -> None:
+    """drop方針ではキュー満杯時に破棄して件数を数えること"""
+    # Arrange
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(1)
+    handler = BoundedQueueHandler(log_queue, policy="drop")
+    record = logging.LogRecord(
+        "test", logging.INFO, __file__, 0, "m", None, None
+    )
+
+    # Act
+    handler.emit(record)
+    handler.emit(record)
+
+    # Assert
+    assert log_queue.qsize() == 1
+    assert handler.dropped == 1
+
+
+def test_logger_config_rejects_unknown_queue_policy() -> None:
+    """不明なキュー方針を指定するとValueErrorになること"""
+    # Act & Assert
+    with pytest.raises(ValueError):
+        LoggerConfig(async_mode=True, queue_policy="unknown")
+
+
+def _capture_structlog(name: str) -> io.StringIO:
+    """指定ロガーの出力をStringIOに向ける"""
+    stream = io.StringIO()
+    std_logger = logging.getLogger(name)
+    std_logger.handlers = [logging.StreamHandler(stream)]
+    std_logger.propagate = False
+    std_logger.setLevel(logging.DEBUG)
+    return stream
+
+
+def test_fast_profile_renders_json_lazily() -> None:
+    """高速プロファイルでJSONが出力され、レベル未満のログが捨てられること"""
+    # Arrange
+    LoggerConfig(log_level="INFO", log_profile="fast")
+    stream = _capture_structlog("fast_profile_logger")
+    logger = structlog.get_logger("fast_profile_logger")
+
+    try:
+        # Act
+        logger.debug("出力されない")
+        logger.info("高速ログテスト", user="テスト")
+        try:
+            raise RuntimeError("失敗")
+        except RuntimeError:
+            logger.exception("例外ログテスト")
+    finally:
+        LoggerConfig()
+
+    # Assert
+    lines = stream.getvalue().strip().splitlines()
+    assert len(lines) == 2
+    assert "テスト" in lines[0]
+    info = json.loads(lines[0])
+    assert info["event"] == "高速ログテスト"
+    assert info["level"] == "info"
+    assert info["logger"] == "fast_profile_logger"
+    assert re.fullmatch(
+        r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z", info["timestamp"]
+    )
+    assert "stack_info" not in info
+    assert "RuntimeError: 失敗" in json.loads(lines[1])["exception"]
+
+
+def test_fast_json_renderer_falls_back_for_unsupported_values() -> None:
+    """orjsonが扱えない値でも標準のjsonで出力できること"""
+    # Arrange
+    renderer = FastJSONRenderer()
+
+    # Act
+    rendered = renderer(None, "info", {"event": "大きな値", "n": 2**70})
+
+    # Assert
+    assert json.loads(rendered) == {"event": "大きな値", "n": 2**70}
+
+
+@pytest.mark.slow
+def test_fast_profile_benchmark() -> None:
+    """高速プロファイルの処理件数/秒が標準プロファイルを上回ること"""
+
+    def events_per_second(profile: str, count: int = 5000) -> float:
+        LoggerConfig(log_level="INFO", log_profile=profile)
+        name = f"benchmark_{profile}"
+        _capture_structlog(name)
+        logging.getLogger(name).setLevel(logging.INFO)
+        logger = structlog.get_logger(name)
+        started = time.perf_counter()
+        for i in range(count):
+            logger.info("ヘルスチェック実行", status="healthy", count=i)
+            logger.debug("詳細ログ", count=i)
+        return count / (time.perf_counter() - started)
+
+    try:
+        # Act
+        standard = events_per_second("standard")
+        fast = events_per_second("fast")
+    finally:
+        LoggerConfig()
+
+    # Assert
+    assert fast > standard, f"standard={standard:.0f}/s fast={fast:.0f}/s"
@@ -0,0 +1,163 @@
+"""
+メトリクス収集モジュールのテスト
+"""
+
+import asyncio
+from typing import Dict
+
+import httpx
+from fastapi import APIRouter, FastAPI
+
+from auto_chat_maker.api.middleware.metrics import MetricsMiddleware
+from auto_chat_maker.api.routes.metrics import router as metrics_router
+from auto_chat_maker.utils.metrics import (
+    CONTENT_TYPE,
+    HTTP_REQUEST_DURATION,
+    MetricsRegistry,
+    get_metrics_registry,
+)
+
+
+def parse_samples(text: str) -> Dict[str, float]:
+    """テキスト形式の出力をサンプル名（ラベル込み）→値の辞書に変換"""
+    samples: Dict[str, float] = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestMetricsRegistry:
+    """MetricsRegistryのテスト"""
+
+    def test_counter_and_gauge_rendering(self) -> None:
+        """カウンターとゲージがラベル付きで出力されることをテスト"""
+        # Arrange
+        registry = MetricsRegistry()
+        calls = registry.counter(
+            "calls_total", "呼び出し数", ("dependency", "outcome")
+        )
+        depth = registry.gauge("depth", "深さ")
+
+        # Act
+        calls.labels("claude", "success").inc()
+        calls.labels("claude", "success").inc(2)
+        depth.set(5)
+        text = registry.render()
+
+        # Assert
+        assert "# TYPE calls_total counter" in text
+        samples = parse_samples(text)
+        assert (
+            samples['calls_total{dependency="claude",outcome="success"}'] == 3
+        )
+        assert samples["depth"] == 5
+
+    def test_histogram_buckets_are_cumulative(self) -> None:
+        """ヒストグラムのバケットが累積値で、境界値を含むことをテスト"""
+        # Arrange
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "latency_seconds", "処理時間", buckets=(0.1, 1.0)
+        )
+
+        # Act
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        samples = parse_samples(registry.render())
+
+        # Assert
+        assert samples['latency_seconds_bucket{le="0.1"}'] == 2
+        assert samples['latency_seconds_bucket{le="1"}'] == 3
+        assert samples['latency_seconds_bucket{le="+Inf"}'] == 4
+        assert samples["latency_seconds_count"] == 4
+        assert samples["latency_seconds_sum"] == 3.65
+
+    def test_same_name_returns_existing_metric(self) -> None:
+        """同名のメトリクスを登録すると既存のものを返すことをテスト"""
+        # Arrange
+        registry = MetricsRegistry()
+
+        # Act
+        first = registry.counter("events_total", "イベント数")
+        second = registry.counter("events_total", "イベント数")
+
+        # Assert
+        assert first is second
+
+    def test_collectors_run_before_render(self) -> None:
+        """同期・非同期のコレクターが収集時に実行されることをテスト"""
+        # Arrange
+        registry = MetricsRegistry()
+        depth = registry.gauge("queue_depth", "深さ", ("queue",))
+
+        async def collect_depth() -> None:
+            depth.labels("graph_notifications").set(7)
+
+        registry.register_collector("depth", collect_depth)
+        registry.register_collector("pool", lambda: depth.labels("x").set(1))
+
+        # Act
+        asyncio.run(registry.collect())
+        samples = parse_samples(registry.render())
+
+        # Assert
+        assert samples['queue_depth{queue="graph_notifications"}'] == 7
+        assert samples['queue_depth{queue="x"}'] == 1
+
+    def test_label_values_are_escaped(self) -> None:
+        """ラベル値の引用符と改行がエスケープされることをテスト"""
+        # Arrange
+        registry = MetricsRegistry()
+        counter = registry.counter("errors_total", "エラー数", ("message",))
+
+        # Act
+        counter.labels('a"b\nc').inc()
+
+        # Assert
+        assert 'errors_total{message="a\\"b\\nc"} 1' in registry.render()
+
+
+class TestMetricsEndpoint:
+    """/metrics とリクエスト計測ミドルウェアのテスト"""
+
+    def test_records_route_template_and_serves_metrics(self) -> None:
+        """プレフィックス込みのルート単位で記録され、/metricsで出力されることをテスト"""
+        # Arrange
+        items_router = APIRouter()
+
+        @items_router.get("/items/{item_id}")  # type: ignore[misc]
+        async def get_item(item_id: str) -> Dict[str, str]:
+            return {"id": item_id}
+
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(items_router, prefix="/api")
+        app.include_router(metrics_router)
+        child = HTTP_REQUEST_DURATION.labels(
+            "GET", "/api/items/{item_id}", 200
+        )
+        before = child.count
+
+        async def scenario() -> httpx.Response:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                await client.get("/api/items/1")
+                await client.get("/api/items/2")
+                await client.get("/missing")
+                return await client.get("/metrics")
+
+        # Act
+        response = asyncio.run(scenario())
+
+        # Assert
+        assert response.status_code == 200
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert child.count - before == 2
+        assert (
+            'route="unmatched",status="404"' in get_metrics_registry().render()
+        )
+        assert "http_request_duration_seconds_bucket" in response.text
@@ -0,0 +1,211 @@
+"""
+プロファイリングモジュールと管理用エンドポイントのテスト
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from auto_chat_maker.api.routes.admin import router as admin_router
+from auto_chat_maker.config.settings import get_settings
+from auto_chat_maker.utils import profiling
+from auto_chat_maker.utils.profiling import (
+    SamplingProfiler,
+    SlowCallbackDetector,
+)
+
+
+class FakeLogger:
+    """ログを記録するロガー"""
+
+    def __init__(self) -> None:
+        self.warnings: List[Tuple[str, Dict[str, Any]]] = []
+
+    def info(self, event: str, **kwargs: Any) -> None:
+        pass
+
+    def warning(self, event: str, **kwargs: Any) -> None:
+        self.warnings.append((event, kwargs))
+
+
+def busy_function(seconds: float) -> None:
+    """指定秒数CPUを使い続ける"""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class TestSamplingProfiler:
+    """SamplingProfilerのテスト"""
+
+    def test_collects_collapsed_stacks(self) -> None:
+        """採取したスタックがcollapsed stacks形式で出力されることをテスト"""
+        # Arrange
+        profiler = SamplingProfiler(interval=0.001)
+
+        # Act
+        profiler.start(duration=5)
+        busy_function(0.1)
+        profiler.stop()
+        lines = profiler.collapsed().splitlines()
+
+        # Assert
+        assert not profiler.active
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert any(
+            "busy_function (test_profiling.py" in line for line in lines
+        )
+
+    def test_stops_after_requests(self) -> None:
+        """指定件数のリクエスト完了で停止することをテスト"""
+        # Arrange
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start(duration=5, requests=2)
+
+        # Act
+        profiler.request_finished()
+        still_active = profiler.active
+        profiler.request_finished()
+        time.sleep(0.05)
+
+        # Assert
+        assert still_active
+        assert not profiler.active
+        assert profiler.status()["samples"] > 0
+
+
+class TestSlowCallbackDetector:
+    """SlowCallbackDetectorのテスト"""
+
+    def test_reports_blocking_task_step(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """閾値を超えてループをブロックしたタスクが報告されることをテスト"""
+        # Arrange
+        fake_logger = FakeLogger()
+        monkeypatch.setattr(profiling, "logger", fake_logger)
+        detector = SlowCallbackDetector(threshold=0.02)
+
+        async def blocking_step() -> None:
+            await asyncio.sleep(0)
+            busy_function(0.03)
+
+        async def scenario() -> None:
+            detector.enable()
+            try:
+                await asyncio.create_task(blocking_step(), name="blocker")
+                await asyncio.sleep(0.001)
+            finally:
+                detector.disable()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert not detector.enabled
+        assert detector.detected == 1
+        _, fields = fake_logger.warnings[0]
+        assert fields["task"] == "blocker"
+        assert fields["coroutine"].endswith("blocking_step")
+        assert fields["duration_ms"] >= 20
+
+    def test_refuses_to_enable_under_uvloop(self) -> None:
+        """uvloopのループ上では有効化されないことをテスト"""
+        # Arrange
+        uvloop = pytest.importorskip("uvloop")
+        detector = SlowCallbackDetector(threshold=0.01)
+
+        async def scenario() -> bool:
+            detector.enable()
+            return detector.enabled
+
+        loop = uvloop.new_event_loop()
+
+        # Act
+        try:
+            enabled = loop.run_until_complete(scenario())
+        finally:
+            detector.disable()
+            loop.close()
+
+        # Assert
+        assert enabled is False
+
+
+class TestAdminProfilingRoutes:
+    """管理用プロファイリングエンドポイントのテスト"""
+
+    def request(
+        self, method: str, path: str, token: str = "", **kwargs: Any
+    ) -> httpx.Response:
+        app = FastAPI()
+        app.include_router(admin_router, prefix="/api/admin")
+
+        async def scenario() -> httpx.Response:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.request(
+                    method,
+                    path,
+                    headers={"X-Admin-Token": token} if token else {},
+                    **kwargs,
+                )
+
+        return asyncio.run(scenario())
+
+    def test_requires_secret_key(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """secret_key未設定なら404、トークン不一致なら403になることをテスト"""
+        # Arrange
+        settings = get_settings()
+        monkeypatch.setattr(settings, "secret_key", None)
+
+        # Act
+        disabled = self.request("GET", "/api/admin/profiling", token="x")
+        monkeypatch.setattr(settings, "secret_key", "s3cret")
+        forbidden = self.request("GET", "/api/admin/profiling", token="wrong")
+        allowed = self.request("GET", "/api/admin/profiling", token="s3cret")
+
+        # Assert
+        assert disabled.status_code == 404
+        assert forbidden.status_code == 403
+        assert allowed.status_code == 200
+        assert allowed.json()["profiler"]["active"] is False
+
+    def test_start_and_stop_returns_profile(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """開始・停止で結果がファイルとして返ることをテスト"""
+        # Arrange
+        monkeypatch.setattr(get_settings(), "secret_key", "s3cret")
+        monkeypatch.setattr(
+            profiling, "_profiler", SamplingProfiler(interval=0.001)
+        )
+
+        # Act
+        started = self.request(
+            "POST",
+            "/api/admin/profiling/start",
+            token="s3cret",
+            json={"duration": 5},
+        )
+        busy_function(0.05)
+        stopped = self.request(
+            "POST", "/api/admin/profiling/stop", token="s3cret"
+        )
+
+        # Assert
+        assert started.status_code == 200
+        assert started.json()["profiler"]["active"] is True
+        assert stopped.status_code == 200
+        assert "profile.collapsed" in stopped.headers["content-disposition"]
+        assert stopped.text.strip()
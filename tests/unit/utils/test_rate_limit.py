@@ -0,0 +1,176 @@
+"""
+流量制御モジュールのテスト
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from auto_chat_maker.utils.exceptions import (
+    ExternalServiceError,
+    RateLimitError,
+)
+from auto_chat_maker.utils.rate_limit import (
+    AdaptiveConcurrencyLimiter,
+    OutboundLimiter,
+    TokenBucket,
+)
+
+
+class TestTokenBucket:
+    """TokenBucketのテスト"""
+
+    def test_burst_then_rate_limited(self) -> None:
+        """容量分は即時に取得でき、超過分はレートに従って待つことをテスト"""
+
+        # Arrange
+        async def scenario() -> float:
+            bucket = TokenBucket(rate=50, capacity=2)
+            started = time.monotonic()
+            for _ in range(4):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        # Act
+        elapsed = asyncio.run(scenario())
+
+        # Assert
+        assert elapsed >= 0.03
+
+    def test_defer_blocks_even_when_unlimited(self) -> None:
+        """レート無制限でもRetry-Afterの停止が反映されることをテスト"""
+
+        # Arrange
+        async def scenario() -> float:
+            bucket = TokenBucket(rate=0)
+            bucket.defer(0.05, jitter=0)
+            started = time.monotonic()
+            await bucket.acquire()
+            return time.monotonic() - started
+
+        # Act
+        elapsed = asyncio.run(scenario())
+
+        # Assert
+        assert elapsed >= 0.04
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """AdaptiveConcurrencyLimiterのテスト"""
+
+    def test_aimd_adjustment(self) -> None:
+        """過負荷で乗算的に減り、成功で加算的に増えることをテスト"""
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=8, max_limit=10, cooldown=60
+        )
+
+        async def scenario() -> None:
+            await limiter.acquire()
+            limiter.release(overloaded=True)
+            assert limiter.limit == 4
+            # クールダウン中の過負荷では減らさない
+            await limiter.acquire()
+            limiter.release(overloaded=True)
+            assert limiter.limit == 4
+            for _ in range(20):
+                await limiter.acquire()
+                limiter.release()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert limiter.limit == 7
+
+    def test_caps_concurrent_calls(self) -> None:
+        """同時実行数が上限を超えないことをテスト"""
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2)
+        peak = 0
+
+        async def call() -> None:
+            nonlocal peak
+            await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        async def scenario() -> None:
+            await asyncio.gather(*(call() for _ in range(6)))
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    def test_cancelled_waiter_does_not_leak_slot(self) -> None:
+        """待機中にキャンセルされても枠が失われないことをテスト"""
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1)
+
+        async def scenario() -> None:
+            await limiter.acquire()
+            waiter = asyncio.create_task(limiter.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            limiter.release()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+        # Act & Assert
+        asyncio.run(scenario())
+        assert limiter.in_flight == 1
+
+
+class TestOutboundLimiter:
+    """OutboundLimiterのテスト"""
+
+    def test_rate_limit_error_defers_key_and_shrinks(self) -> None:
+        """429でキーへの送信停止と同時実行数の縮小が行われることをテスト"""
+        # Arrange
+        limiter = OutboundLimiter("test", initial_concurrency=4)
+
+        async def scenario() -> float:
+            with pytest.raises(RateLimitError):
+                async with limiter.limit("/chats"):
+                    raise RateLimitError("制限", details={"retry_after": 0.05})
+            # 別のキーは止まらない
+            async with limiter.limit("/users"):
+                pass
+            started = time.monotonic()
+            async with limiter.limit("/chats"):
+                pass
+            return time.monotonic() - started
+
+        # Act
+        elapsed = asyncio.run(scenario())
+
+        # Assert
+        assert elapsed >= 0.04
+        assert limiter.concurrency.limit == 2
+
+    def test_only_overload_statuses_shrink(self) -> None:
+        """503は過負荷として扱い、それ以外のエラーは扱わないことをテスト"""
+        # Arrange
+        limiter = OutboundLimiter("test", initial_concurrency=8)
+
+        async def fail(status_code: int) -> None:
+            with pytest.raises(ExternalServiceError):
+                async with limiter.limit():
+                    raise ExternalServiceError(
+                        "エラー", details={"status_code": status_code}
+                    )
+
+        # Act
+        asyncio.run(fail(400))
+        after_400 = limiter.concurrency.limit
+        asyncio.run(fail(503))
+
+        # Assert
+        assert after_400 == 8
+        assert limiter.concurrency.limit == 4
@@ -0,0 +1,316 @@
+"""
+再試行・サーキットブレーカーモジュールのテスト
+"""
+
+import asyncio
+import time
+from typing import List, Optional
+
+import httpx
+import pytest
+
+from auto_chat_maker.config.mcp_settings import MCPSettings
+from auto_chat_maker.infrastructure.external.claude_client import (
+    ClaudeClient,
+)
+from auto_chat_maker.utils.exceptions import (
+    CircuitOpenError,
+    ExternalServiceError,
+    NetworkError,
+    RateLimitError,
+    TimeoutError,
+    ValidationError,
+)
+from auto_chat_maker.utils.retry import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    RetryPolicy,
+)
+
+
+class Flaky:
+    """指定回数だけ失敗してから成功する呼び出し"""
+
+    def __init__(self, failures: int, error: Exception) -> None:
+        self.calls = 0
+        self._failures = failures
+        self._error = error
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.calls <= self._failures:
+            raise self._error
+        return "ok"
+
+
+class TestRetryPolicy:
+    """RetryPolicyのテスト"""
+
+    def test_retries_transient_errors(self) -> None:
+        """一時的なエラーを再試行して成功することをテスト"""
+        # Arrange
+        policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+        flaky = Flaky(2, NetworkError("接続失敗"))
+
+        # Act
+        result = asyncio.run(policy.call(flaky))
+
+        # Assert
+        assert result == "ok"
+        assert flaky.calls == 3
+
+    def test_does_not_retry_client_errors(self) -> None:
+        """4xxや入力エラーは再試行しないことをテスト"""
+        # Arrange
+        policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+        bad_request = Flaky(
+            5, ExternalServiceError("失敗", details={"status_code": 400})
+        )
+        invalid = Flaky(5, ValidationError("不正"))
+
+        # Act & Assert
+        with pytest.raises(ExternalServiceError):
+            asyncio.run(policy.call(bad_request))
+        with pytest.raises(ValidationError):
+            asyncio.run(policy.call(invalid))
+        assert bad_request.calls == 1
+        assert invalid.calls == 1
+
+    def test_gives_up_after_max_attempts(self) -> None:
+        """最大試行回数に達したら最後の例外を送出することをテスト"""
+        # Arrange
+        policy = RetryPolicy(max_attempts=2, base_delay=0.001)
+        flaky = Flaky(
+            5, ExternalServiceError("失敗", details={"status_code": 503})
+        )
+
+        # Act & Assert
+        with pytest.raises(ExternalServiceError):
+            asyncio.run(policy.call(flaky))
+        assert flaky.calls == 2
+
+    def test_deadline_stops_retrying(self) -> None:
+        """Retry-Afterが全体の期限を超える場合は待たずに失敗することをテスト"""
+        # Arrange
+        policy = RetryPolicy(max_attempts=5, base_delay=0.001, deadline=0.5)
+        flaky = Flaky(5, RateLimitError("制限", details={"retry_after": 10}))
+
+        # Act
+        started = time.monotonic()
+        with pytest.raises(RateLimitError):
+            asyncio.run(policy.call(flaky))
+
+        # Assert
+        assert flaky.calls == 1
+        assert time.monotonic() - started < 0.5
+
+    def test_attempt_timeout(self) -> None:
+        """試行ごとの期限を超えるとTimeoutErrorになり再試行されることをテスト"""
+        # Arrange
+        policy = RetryPolicy(
+            max_attempts=2, base_delay=0.001, attempt_timeout=0.01
+        )
+        calls: List[int] = []
+
+        async def slow() -> None:
+            calls.append(1)
+            await asyncio.sleep(1)
+
+        # Act & Assert
+        with pytest.raises(TimeoutError):
+            asyncio.run(policy.call(slow))
+        assert len(calls) == 2
+
+    def test_decorator(self) -> None:
+        """デコレーターとして利用できることをテスト"""
+        # Arrange
+        flaky = Flaky(1, NetworkError("接続失敗"))
+        decorated = RetryPolicy(max_attempts=2, base_delay=0.001)(flaky)
+
+        # Act & Assert
+        assert asyncio.run(decorated()) == "ok"
+
+    def test_from_mcp_settings(self) -> None:
+        """MCP設定の再試行回数と待機秒数が反映されることをテスト"""
+        # Arrange
+        mcp_settings = MCPSettings(
+            max_retries=4, retry_delay=2, connection_timeout=10
+        )
+
+        # Act
+        policy = RetryPolicy.from_mcp_settings(mcp_settings)
+
+        # Assert
+        assert policy.max_attempts == 5
+        assert policy.base_delay == 2
+        assert policy.attempt_timeout == 10
+
+
+class TestCircuitBreaker:
+    """CircuitBreakerのテスト"""
+
+    def test_opens_fails_fast_and_recovers(self) -> None:
+        """連続失敗でオープンし、回復待ち後のハーフオープンでクローズすることをテスト"""
+        # Arrange
+        breaker = CircuitBreaker(
+            "claude", failure_threshold=2, recovery_timeout=0.05
+        )
+
+        async def call(error: Optional[Exception] = None) -> None:
+            async with breaker:
+                if error is not None:
+                    raise error
+
+        async def scenario() -> None:
+            for _ in range(2):
+                with pytest.raises(NetworkError):
+                    await call(NetworkError("接続失敗"))
+            assert breaker.state == STATE_OPEN
+            with pytest.raises(CircuitOpenError):
+                await call()
+            await asyncio.sleep(0.06)
+            assert breaker.state == STATE_HALF_OPEN
+            await call()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert breaker.state == STATE_CLOSED
+
+    def test_half_open_failure_reopens(self) -> None:
+        """ハーフオープン中の失敗で再びオープンになることをテスト"""
+        # Arrange
+        breaker = CircuitBreaker(
+            "graph", failure_threshold=1, recovery_timeout=0.01
+        )
+
+        async def scenario() -> None:
+            with pytest.raises(TimeoutError):
+                async with breaker:
+                    raise TimeoutError("タイムアウト")
+            await asyncio.sleep(0.02)
+            with pytest.raises(TimeoutError):
+                async with breaker:
+                    raise TimeoutError("タイムアウト")
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert breaker.state == STATE_OPEN
+
+    def test_rate_limit_does_not_open(self) -> None:
+        """レート制限は依存先の障害として数えないことをテスト"""
+        # Arrange
+        breaker = CircuitBreaker("claude", failure_threshold=1)
+
+        async def scenario() -> None:
+            with pytest.raises(RateLimitError):
+                async with breaker:
+                    raise RateLimitError("制限")
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert breaker.state == STATE_CLOSED
+
+
+class TestClaudeClientResilience:
+    """ClaudeClientへの再試行・サーキットブレーカー適用のテスト"""
+
+    def test_retries_server_errors_then_opens_circuit(self) -> None:
+        """5xxを再試行し、閾値到達後はAPIを呼ばずに失敗することをテスト"""
+        # Arrange
+        requests: List[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(503)
+
+        client = ClaudeClient(
+            "test-key",
+            base_url="https://claude.test",
+            transport=httpx.MockTransport(handler),
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001),
+            circuit_breaker=CircuitBreaker("claude", failure_threshold=2),
+        )
+
+        async def scenario() -> None:
+            try:
+                with pytest.raises(ExternalServiceError):
+                    await client.generate_response("こんにちは")
+                with pytest.raises(CircuitOpenError):
+                    await client.generate_response("こんにちは")
+            finally:
+                await client.aclose()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert len(requests) == 2
+
+    def test_hanging_calls_open_circuit(self) -> None:
+        """期限切れでキャンセルされた呼び出しもサーキットの失敗になることをテスト"""
+        # Arrange
+        requests: List[httpx.Request] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            await asyncio.sleep(10)
+            return httpx.Response(200)
+
+        breaker = CircuitBreaker("claude", failure_threshold=2)
+        client = ClaudeClient(
+            "test-key",
+            base_url="https://claude.test",
+            transport=httpx.MockTransport(handler),
+            retry_policy=RetryPolicy(max_attempts=1, attempt_timeout=0.01),
+            circuit_breaker=breaker,
+        )
+
+        async def scenario() -> None:
+            try:
+                for _ in range(2):
+                    with pytest.raises(TimeoutError):
+                        await client.generate_response("こんにちは")
+                with pytest.raises(CircuitOpenError):
+                    await client.generate_response("こんにちは")
+            finally:
+                await client.aclose()
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert len(requests) == 2
+        assert breaker.state == STATE_OPEN
+
+    def test_external_cancellation_is_not_failure(self) -> None:
+        """呼び出し元のキャンセルはサーキットの失敗にならないことをテスト"""
+        # Arrange
+        breaker = CircuitBreaker("claude", failure_threshold=1)
+        policy = RetryPolicy(
+            max_attempts=1, attempt_timeout=10
+        ).with_circuit_breaker(breaker)
+
+        async def hang() -> None:
+            async with breaker:
+                await asyncio.sleep(10)
+
+        async def scenario() -> None:
+            task = asyncio.create_task(policy.call(hang))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        # Act
+        asyncio.run(scenario())
+
+        # Assert
+        assert breaker.state == STATE_CLOSED
@@ -0,0 +1,150 @@
+"""
+リクエスト処理時間の内訳計測のテスト
+"""
+
+import asyncio
+from typing import Any, Dict, List, Tuple
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from sqlalchemy import text
+
+from auto_chat_maker.api.middleware import timing as timing_middleware
+from auto_chat_maker.api.middleware.timing import TimedRoute, TimingMiddleware
+from auto_chat_maker.infrastructure.database.connection import Database
+from auto_chat_maker.utils.rate_limit import OutboundLimiter
+from auto_chat_maker.utils.timing import (
+    PHASE_DB,
+    PHASE_EXTERNAL,
+    RequestTimer,
+    current_request_timer,
+    record_timing,
+)
+
+
+class FakeLogger:
+    """警告ログを記録するロガー"""
+
+    def __init__(self) -> None:
+        self.warnings: List[Tuple[str, Dict[str, Any]]] = []
+
+    def warning(self, event: str, **kwargs: Any) -> None:
+        self.warnings.append((event, kwargs))
+
+
+def parse_server_timing(value: str) -> Dict[str, float]:
+    """Server-Timingヘッダーをフェーズ名→ミリ秒の辞書に変換"""
+    phases: Dict[str, float] = {}
+    for entry in value.split(","):
+        name, duration = entry.strip().split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+class TestRequestTimer:
+    """RequestTimerのテスト"""
+
+    def test_accumulates_phases(self) -> None:
+        """同じフェーズの時間と回数が積算されることをテスト"""
+        # Arrange
+        timer = RequestTimer()
+
+        # Act
+        timer.add(PHASE_DB, 0.002)
+        timer.add(PHASE_DB, 0.003)
+
+        # Assert
+        assert timer.summary() == {"db_ms": 5.0, "db_count": 2}
+        assert parse_server_timing(timer.server_timing(0.01)) == {
+            "db": 5.0,
+            "total": 10.0,
+        }
+
+    def test_record_outside_request_is_ignored(self) -> None:
+        """リクエスト外での記録は何もしないことをテスト"""
+        # Act
+        record_timing(PHASE_DB, 1.0)
+
+        # Assert
+        assert current_request_timer() is None
+
+
+class TestTimingMiddleware:
+    """TimingMiddlewareのテスト"""
+
+    @pytest.fixture
+    def fake_logger(self, monkeypatch: pytest.MonkeyPatch) -> FakeLogger:
+        fake = FakeLogger()
+        monkeypatch.setattr(timing_middleware, "logger", fake)
+        return fake
+
+    def build_app(self, database: Database, threshold: float) -> FastAPI:
+        router = APIRouter(route_class=TimedRoute)
+        limiter = OutboundLimiter("graph")
+
+        @router.get("/items/{item_id}")  # type: ignore[misc]
+        async def get_item(item_id: str) -> Dict[str, str]:
+            async with database.session() as session:
+                await session.execute(text("SELECT 1"))
+            async with limiter.limit():
+                await asyncio.sleep(0.01)
+            return {"id": item_id}
+
+        app = FastAPI()
+        app.add_middleware(TimingMiddleware, slow_request_threshold=threshold)
+        app.include_router(router, prefix="/api")
+        return app
+
+    def request(self, app: FastAPI, path: str) -> httpx.Response:
+        async def scenario() -> httpx.Response:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                return await client.get(path)
+
+        return asyncio.run(scenario())
+
+    def test_server_timing_header_contains_phases(
+        self, fake_logger: FakeLogger
+    ) -> None:
+        """Server-Timingにルーティング・ハンドラー・DB・外部呼び出しが含まれることをテスト"""
+        # Arrange
+        database = Database("sqlite:///:memory:")
+        app = self.build_app(database, threshold=10.0)
+
+        # Act
+        response = self.request(app, "/api/items/1")
+        asyncio.run(database.dispose())
+
+        # Assert
+        phases = parse_server_timing(response.headers["server-timing"])
+        assert {
+            "routing",
+            "handler",
+            PHASE_DB,
+            PHASE_EXTERNAL,
+            "total",
+        } <= set(phases)
+        assert phases[PHASE_EXTERNAL] >= 10.0
+        assert phases["handler"] >= phases[PHASE_EXTERNAL]
+        assert fake_logger.warnings == []
+
+    def test_logs_only_slow_requests(self, fake_logger: FakeLogger) -> None:
+        """閾値を超えたリクエストのみ内訳付きでログ出力されることをテスト"""
+        # Arrange
+        database = Database("sqlite:///:memory:")
+        app = self.build_app(database, threshold=0.005)
+
+        # Act
+        self.request(app, "/api/items/1")
+        asyncio.run(database.dispose())
+
+        # Assert
+        assert len(fake_logger.warnings) == 1
+        _, fields = fake_logger.warnings[0]
+        assert fields["route"] == "/api/items/{item_id}"
+        assert fields["status_code"] == 200
+        assert fields["db_count"] >= 1
+        assert fields["external_count"] == 1